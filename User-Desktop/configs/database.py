@@ -1,9 +1,19 @@
 import sqlite3
+import math
 import os
+import re
+import sys
+import time
 from sqlite3 import Error
 import logging
+import threading
+from collections import Counter, OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
+from configs import settings
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -11,34 +21,833 @@ logging.basicConfig(
 )
 logger = logging.getLogger('database')
 
+# Number of distinct SQL strings kept compiled by the sqlite3 module and
+# classified by the StatementCache.
+STATEMENT_CACHE_SIZE = 256
+
+# Default number of rows pulled per fetchmany() call when streaming results.
+FETCH_BATCH_SIZE = 500
+
+# Statement kinds that produce a result set.
+ROW_RETURNING_KINDS = ('SELECT', 'PRAGMA', 'WITH', 'EXPLAIN', 'VALUES')
+
+_LEADING_COMMENTS = re.compile(r'^(\s+|--[^\n]*(\n|$)|/\*.*?\*/)+', re.DOTALL)
+
+# Literal values and IN lists are folded so that queries differing only in
+# their values share one statistics entry.
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w."])\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+# Latency samples kept per statement shape for the percentiles.
+QUERY_STATS_SAMPLES = 1000
+
+# Statement kinds EXPLAIN QUERY PLAN can describe in the slow-query log.
+EXPLAINABLE_KINDS = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+Statement = namedtuple('Statement', ['sql', 'kind', 'returns_rows', 'shape'])
+
+# Secondary indexes managed with the schema as (name, table, columns).
+# Composite column orders follow the search screen's filter combinations
+# (type -> building -> bedrooms). create_tables() creates missing entries,
+# rebuilds changed ones and drops managed indexes no longer listed here.
+MANAGED_INDEX_PREFIX = 'idx_'
+INDEXES = (
+    ('idx_realstat_type_build_beds', 'Realstatspecification', ('Rstatetcode', 'Buildtcode', 'N-of-bedrooms')),
+    ('idx_realstat_build_beds', 'Realstatspecification', ('Buildtcode', 'N-of-bedrooms')),
+    ('idx_realstat_beds_area', 'Realstatspecification', ('N-of-bedrooms', 'Property-area')),
+    ('idx_realstat_area', 'Realstatspecification', ('Property-area',)),
+    ('idx_realstat_corner_type', 'Realstatspecification', ('Property-corner', 'Rstatetcode')),
+    ('idx_realstat_offer_province', 'Realstatspecification', ('Offer-Type-Code', 'Province-code')),
+    ('idx_realstat_province_region', 'Realstatspecification', ('Province-code', 'Region-code')),
+    ('idx_realstat_owner', 'Realstatspecification', ('Ownercode',)),
+    ('idx_owners_name', 'Owners', ('ownername',)),
+    ('idx_maincode_recty_name', 'Maincode', ('Recty', 'Name', 'Code')),
+    ('idx_photos_hash', 'realstatephotos', ('photohash',)),
+)
+
+# Columns added to existing tables after their first release, as
+# (table, column, definition). create_tables() adds any that a database
+# created by an older version lacks.
+ADDED_COLUMNS = (
+    ('realstatephotos', 'photohash', 'CHAR(64)'),
+)
+
+
+# Full-text search over property addresses/descriptions and owner details.
+# fts_docs gives every indexed row a stable document id (implicit rowids of
+# the source tables may change on VACUUM); search_fts stores the text keyed
+# by that id. Triggers keep both in step with Realstatspecification and Owners;
+# the insert triggers tolerate INSERT OR REPLACE of an already indexed row.
+SEARCH_INDEX_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS fts_docs (
+        docid INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        code TEXT NOT NULL,
+        UNIQUE (kind, code)
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS fts_property_insert AFTER INSERT ON Realstatspecification BEGIN
+        INSERT OR IGNORE INTO fts_docs (kind, code) VALUES ('property', new.realstatecode);
+        DELETE FROM search_fts WHERE rowid =
+            (SELECT docid FROM fts_docs WHERE kind = 'property' AND code = new.realstatecode);
+        INSERT INTO search_fts (rowid, title, body) VALUES (
+            (SELECT docid FROM fts_docs WHERE kind = 'property' AND code = new.realstatecode),
+            new."Property-address", new.Descriptions);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fts_property_update
+    AFTER UPDATE OF realstatecode, "Property-address", Descriptions ON Realstatspecification BEGIN
+        UPDATE fts_docs SET code = new.realstatecode WHERE kind = 'property' AND code = old.realstatecode;
+        DELETE FROM search_fts WHERE rowid =
+            (SELECT docid FROM fts_docs WHERE kind = 'property' AND code = new.realstatecode);
+        INSERT INTO search_fts (rowid, title, body) VALUES (
+            (SELECT docid FROM fts_docs WHERE kind = 'property' AND code = new.realstatecode),
+            new."Property-address", new.Descriptions);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fts_property_delete AFTER DELETE ON Realstatspecification BEGIN
+        DELETE FROM search_fts WHERE rowid =
+            (SELECT docid FROM fts_docs WHERE kind = 'property' AND code = old.realstatecode);
+        DELETE FROM fts_docs WHERE kind = 'property' AND code = old.realstatecode;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fts_owner_insert AFTER INSERT ON Owners BEGIN
+        INSERT OR IGNORE INTO fts_docs (kind, code) VALUES ('owner', new.Ownercode);
+        DELETE FROM search_fts WHERE rowid =
+            (SELECT docid FROM fts_docs WHERE kind = 'owner' AND code = new.Ownercode);
+        INSERT INTO search_fts (rowid, title, body) VALUES (
+            (SELECT docid FROM fts_docs WHERE kind = 'owner' AND code = new.Ownercode),
+            new.ownername, coalesce(new.ownerphone, '') || ' ' || coalesce(new.Note, ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fts_owner_update
+    AFTER UPDATE OF Ownercode, ownername, ownerphone, Note ON Owners BEGIN
+        UPDATE fts_docs SET code = new.Ownercode WHERE kind = 'owner' AND code = old.Ownercode;
+        DELETE FROM search_fts WHERE rowid =
+            (SELECT docid FROM fts_docs WHERE kind = 'owner' AND code = new.Ownercode);
+        INSERT INTO search_fts (rowid, title, body) VALUES (
+            (SELECT docid FROM fts_docs WHERE kind = 'owner' AND code = new.Ownercode),
+            new.ownername, coalesce(new.ownerphone, '') || ' ' || coalesce(new.Note, ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fts_owner_delete AFTER DELETE ON Owners BEGIN
+        DELETE FROM search_fts WHERE rowid =
+            (SELECT docid FROM fts_docs WHERE kind = 'owner' AND code = old.Ownercode);
+        DELETE FROM fts_docs WHERE kind = 'owner' AND code = old.Ownercode;
+    END""",
+)
+
+# Repopulates the search index from the source tables
+SEARCH_INDEX_REBUILD = (
+    "DELETE FROM search_fts",
+    "DELETE FROM fts_docs",
+    "INSERT INTO fts_docs (kind, code) SELECT 'property', realstatecode FROM Realstatspecification",
+    "INSERT INTO fts_docs (kind, code) SELECT 'owner', Ownercode FROM Owners",
+    """INSERT INTO search_fts (rowid, title, body)
+       SELECT d.docid, r."Property-address", r.Descriptions
+       FROM fts_docs d JOIN Realstatspecification r ON d.kind = 'property' AND r.realstatecode = d.code""",
+    """INSERT INTO search_fts (rowid, title, body)
+       SELECT d.docid, o.ownername, coalesce(o.ownerphone, '') || ' ' || coalesce(o.Note, '')
+       FROM fts_docs d JOIN Owners o ON d.kind = 'owner' AND o.Ownercode = d.code""",
+)
+
+
+# Change log of Realstatspecification rows, read by views that patch their
+# loaded rows instead of reloading them (see PropertyListSource). Renaming an
+# owner logs that owner's properties because lists show the owner name.
+# AUTOINCREMENT keeps sequence numbers unique after old entries are pruned.
+CHANGE_LOG_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS property_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        code TEXT NOT NULL
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS chg_property_insert AFTER INSERT ON Realstatspecification BEGIN
+        INSERT INTO property_changes (code) VALUES (new.realstatecode);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS chg_property_update AFTER UPDATE ON Realstatspecification BEGIN
+        INSERT INTO property_changes (code) VALUES (new.realstatecode);
+        INSERT INTO property_changes (code)
+            SELECT old.realstatecode WHERE old.realstatecode IS NOT new.realstatecode;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS chg_property_delete AFTER DELETE ON Realstatspecification BEGIN
+        INSERT INTO property_changes (code) VALUES (old.realstatecode);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS chg_owner_rename AFTER UPDATE OF ownername ON Owners BEGIN
+        INSERT INTO property_changes (code)
+            SELECT realstatecode FROM Realstatspecification WHERE Ownercode = new.Ownercode;
+    END""",
+)
+
+
+# Version counter of the Maincode table, bumped by triggers on every change.
+# Unlike PRAGMA data_version it is the same for every connection and also
+# changes on commits made by the reading connection (see MaincodeCache).
+MAINCODE_VERSION_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS maincode_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )""",
+    "INSERT OR IGNORE INTO maincode_version (id, version) VALUES (1, 0)",
+    """CREATE TRIGGER IF NOT EXISTS maincode_version_insert AFTER INSERT ON Maincode BEGIN
+        UPDATE maincode_version SET version = version + 1 WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS maincode_version_update AFTER UPDATE ON Maincode BEGIN
+        UPDATE maincode_version SET version = version + 1 WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS maincode_version_delete AFTER DELETE ON Maincode BEGIN
+        UPDATE maincode_version SET version = version + 1 WHERE id = 1;
+    END""",
+)
+
+
+# Dashboard statistics per (dimension, group): counts, area and bedroom sums
+# in property_stats, bedroom histograms in property_bedroom_stats. Triggers
+# keep them current, so the dashboard reads one row per group instead of
+# scanning Realstatspecification. NULL keys are grouped under ''; properties
+# without a bedroom count stay out of the histogram. Groups whose count drops
+# to zero are removed. STATS_REBUILD recomputes both tables to repair drift.
+STATS_DIMENSIONS = (
+    ('all', None),
+    ('type', 'Rstatetcode'),
+    ('province', '"Province-code"'),
+    ('offer', '"Offer-Type-Code"'),
+    ('owner', 'Ownercode'),
+)
+
+
+def _stats_key(row, column):
+    """Group key expression of a dimension column for new/old rows or a table alias."""
+    return "''" if column is None else f"coalesce({row}.{column}, '')"
+
+
+def _stats_delta(row, sign):
+    """Trigger body statements adding (sign '+') or removing (sign '-') a row from the statistics."""
+    statements = []
+    for dimension, column in STATS_DIMENSIONS:
+        key = _stats_key(row, column)
+        statements.append(f"""INSERT INTO property_stats
+            (dimension, group_key, count, area_sum, area_count, bedrooms_sum, bedrooms_count)
+            VALUES ('{dimension}', {key}, {sign}1,
+                {sign}coalesce({row}."Property-area", 0), {sign}({row}."Property-area" IS NOT NULL),
+                {sign}coalesce({row}."N-of-bedrooms", 0), {sign}({row}."N-of-bedrooms" IS NOT NULL))
+            ON CONFLICT (dimension, group_key) DO UPDATE SET
+                count = count + excluded.count,
+                area_sum = area_sum + excluded.area_sum,
+                area_count = area_count + excluded.area_count,
+                bedrooms_sum = bedrooms_sum + excluded.bedrooms_sum,
+                bedrooms_count = bedrooms_count + excluded.bedrooms_count;""")
+        statements.append(f"""INSERT INTO property_bedroom_stats (dimension, group_key, bedrooms, count)
+            SELECT '{dimension}', {key}, {row}."N-of-bedrooms", {sign}1
+            WHERE {row}."N-of-bedrooms" IS NOT NULL
+            ON CONFLICT (dimension, group_key, bedrooms) DO UPDATE SET count = count + excluded.count;""")
+        if sign == '-':
+            statements.append(f"""DELETE FROM property_stats
+                WHERE dimension = '{dimension}' AND group_key = {key} AND count <= 0;""")
+            statements.append(f"""DELETE FROM property_bedroom_stats
+                WHERE dimension = '{dimension}' AND group_key = {key}
+                AND bedrooms = {row}."N-of-bedrooms" AND count <= 0;""")
+    return "\n        ".join(statements)
+
+
+STATS_COLUMNS = ('Rstatetcode', '"Province-code"', '"Offer-Type-Code"', 'Ownercode',
+                 '"Property-area"', '"N-of-bedrooms"')
+
+STATS_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS property_stats (
+        dimension TEXT NOT NULL,
+        group_key TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        area_sum REAL NOT NULL,
+        area_count INTEGER NOT NULL,
+        bedrooms_sum INTEGER NOT NULL,
+        bedrooms_count INTEGER NOT NULL,
+        PRIMARY KEY (dimension, group_key)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS property_bedroom_stats (
+        dimension TEXT NOT NULL,
+        group_key TEXT NOT NULL,
+        bedrooms INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (dimension, group_key, bedrooms)
+    ) WITHOUT ROWID""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_property_insert AFTER INSERT ON Realstatspecification BEGIN
+        {_stats_delta('new', '+')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_property_update
+    AFTER UPDATE OF {', '.join(STATS_COLUMNS)} ON Realstatspecification BEGIN
+        {_stats_delta('old', '-')}
+        {_stats_delta('new', '+')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_property_delete AFTER DELETE ON Realstatspecification BEGIN
+        {_stats_delta('old', '-')}
+    END""",
+)
+
+# Recomputes the statistics tables from Realstatspecification
+STATS_REBUILD = (
+    "DELETE FROM property_stats",
+    "DELETE FROM property_bedroom_stats",
+) + tuple(
+    f"""INSERT INTO property_stats
+        (dimension, group_key, count, area_sum, area_count, bedrooms_sum, bedrooms_count)
+        SELECT '{dimension}', {_stats_key('r', column)}, COUNT(*),
+            coalesce(SUM(r."Property-area"), 0), COUNT(r."Property-area"),
+            coalesce(SUM(r."N-of-bedrooms"), 0), COUNT(r."N-of-bedrooms")
+        FROM Realstatspecification r GROUP BY 2"""
+    for dimension, column in STATS_DIMENSIONS
+) + tuple(
+    f"""INSERT INTO property_bedroom_stats (dimension, group_key, bedrooms, count)
+        SELECT '{dimension}', {_stats_key('r', column)}, r."N-of-bedrooms", COUNT(*)
+        FROM Realstatspecification r WHERE r."N-of-bedrooms" IS NOT NULL GROUP BY 2, 3"""
+    for dimension, column in STATS_DIMENSIONS
+)
+
+
+def _bulk_stats_statements():
+    """Statements adding the rows of temp.bulk_codes to the statistics tables."""
+    batch = """WITH batch AS MATERIALIZED (
+        SELECT r.Rstatetcode, r."Province-code", r."Offer-Type-Code", r.Ownercode,
+            r."Property-area", r."N-of-bedrooms"
+        FROM temp.bulk_codes b CROSS JOIN Realstatspecification r ON r.realstatecode = b.code
+    )"""
+    totals = ' UNION ALL '.join(
+        f"""SELECT '{dimension}', {_stats_key('r', column)}, COUNT(*),
+            coalesce(SUM(r."Property-area"), 0), COUNT(r."Property-area"),
+            coalesce(SUM(r."N-of-bedrooms"), 0), COUNT(r."N-of-bedrooms")
+        FROM batch r WHERE true GROUP BY 2"""
+        for dimension, column in STATS_DIMENSIONS
+    )
+    bedrooms = ' UNION ALL '.join(
+        f"""SELECT '{dimension}', {_stats_key('r', column)}, r."N-of-bedrooms", COUNT(*)
+        FROM batch r WHERE r."N-of-bedrooms" IS NOT NULL GROUP BY 2, 3"""
+        for dimension, column in STATS_DIMENSIONS
+    )
+    return (
+        f"""{batch}
+        INSERT INTO property_stats
+            (dimension, group_key, count, area_sum, area_count, bedrooms_sum, bedrooms_count)
+        {totals}
+        ON CONFLICT (dimension, group_key) DO UPDATE SET
+            count = count + excluded.count,
+            area_sum = area_sum + excluded.area_sum,
+            area_count = area_count + excluded.area_count,
+            bedrooms_sum = bedrooms_sum + excluded.bedrooms_sum,
+            bedrooms_count = bedrooms_count + excluded.bedrooms_count""",
+        f"""{batch}
+        INSERT INTO property_bedroom_stats (dimension, group_key, bedrooms, count)
+        {bedrooms}
+        ON CONFLICT (dimension, group_key, bedrooms) DO UPDATE SET count = count + excluded.count""",
+    )
+
+
+# Per-row insert triggers on Realstatspecification that bulk_property_load()
+# suspends, mapped to the set-based statements doing their work for all rows
+# of a batch at once; the inserted codes are in temp.bulk_codes. CROSS JOIN
+# keeps SQLite from scanning a Realstatspecification index instead of the batch.
+BULK_INSERT_TRIGGERS = {
+    'chg_property_insert': (
+        "INSERT INTO property_changes (code) SELECT code FROM temp.bulk_codes ORDER BY code",
+    ),
+    'stats_property_insert': _bulk_stats_statements(),
+    'fts_property_insert': (
+        "INSERT OR IGNORE INTO fts_docs (kind, code) SELECT 'property', code FROM temp.bulk_codes",
+        """INSERT INTO search_fts (rowid, title, body)
+           SELECT d.docid, r."Property-address", r.Descriptions
+           FROM temp.bulk_codes b
+           CROSS JOIN fts_docs d ON d.kind = 'property' AND d.code = b.code
+           CROSS JOIN Realstatspecification r ON r.realstatecode = b.code""",
+    ),
+}
+
+def quote_column(name):
+    """Quote a column name when it contains hyphens (e.g. "Property-area")."""
+    return f'"{name}"' if '-' in name else name
+
+
+def index_sql(name, table, columns):
+    """Return the CREATE INDEX statement for a catalogue entry."""
+    return f"CREATE INDEX {name} ON {table} ({', '.join(quote_column(c) for c in columns)})"
+
+
+def classify_query(query):
+    """
+    Classify a SQL string by its leading keyword.
+
+    Args:
+        query (str): SQL query text
+
+    Returns:
+        Statement: The query together with its kind and whether it returns rows
+    """
+    body = _LEADING_COMMENTS.sub('', query)
+    match = re.match(r'[A-Za-z]+', body)
+    kind = match.group(0).upper() if match else ''
+    return Statement(query, kind, kind in ROW_RETURNING_KINDS, normalize_sql(body))
+
+
+def normalize_sql(query):
+    """
+    Reduce a SQL string to its shape for statistics.
+
+    String and number literals become '?', IN lists become 'IN (...)' and
+    whitespace is collapsed.
+
+    Args:
+        query (str): SQL query text
+
+    Returns:
+        str: The normalized query
+    """
+    shape = _STRING_LITERAL.sub('?', query)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def query_caller():
+    """Return 'module.function' of the nearest caller outside this module."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename == _MODULE_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return '?'
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+_MODULE_FILE = query_caller.__code__.co_filename
+
+
+class ShapeStats:
+    """Counters for one statement shape."""
+
+    __slots__ = ('count', 'total', 'max', 'rows', 'latencies', 'callers')
+
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.latencies = deque(maxlen=samples)
+        self.callers = Counter()
+
+    def percentile(self, ordered, fraction):
+        """Nearest-rank percentile of an ordered sample, in milliseconds."""
+        if not ordered:
+            return 0.0
+        # Smallest sample with at least fraction of the samples at or below it
+        rank = math.ceil(fraction * len(ordered) - 1e-9)
+        return ordered[min(max(rank, 1), len(ordered)) - 1] * 1000
+
+
+class QueryStats:
+    """
+    Call counts, latencies and row counts per normalized statement.
+
+    Totals cover every call since the last reset; the percentiles are taken
+    over the most recent samples calls of each statement.
+    """
+
+    def __init__(self, samples=QUERY_STATS_SAMPLES):
+        """
+        Initialize empty statistics.
+
+        Args:
+            samples (int): Latency samples kept per statement for the percentiles
+        """
+        self.samples = samples
+        self._shapes = {}
+        self._lock = threading.Lock()
+
+    def record(self, shape, seconds, rows, caller):
+        """
+        Record one execution.
+
+        Args:
+            shape (str): Normalized statement
+            seconds (float): Execution time
+            rows (int): Rows returned (or affected)
+            caller (str): Function that issued the statement
+        """
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                entry = self._shapes[shape] = ShapeStats(self.samples)
+            entry.count += 1
+            entry.total += seconds
+            entry.max = max(entry.max, seconds)
+            entry.rows += rows
+            entry.latencies.append(seconds)
+            entry.callers[caller] += 1
+
+    def snapshot(self, sort_by='total_ms', limit=None):
+        """
+        Return the statistics as plain dicts.
+
+        Args:
+            sort_by (str): Key to sort by, descending ('total_ms', 'count',
+                           'p95_ms', 'rows', ...)
+            limit (int, optional): Maximum number of statements
+
+        Returns:
+            list: One dict per statement with sql, count, total_ms, mean_ms,
+                  p50_ms, p95_ms, p99_ms, max_ms, rows and callers
+        """
+        with self._lock:
+            entries = [(shape, entry, sorted(entry.latencies), dict(entry.callers))
+                       for shape, entry in self._shapes.items()]
+
+        stats = []
+        for shape, entry, ordered, callers in entries:
+            stats.append({
+                'sql': shape,
+                'count': entry.count,
+                'total_ms': entry.total * 1000,
+                'mean_ms': entry.total * 1000 / entry.count,
+                'p50_ms': entry.percentile(ordered, 0.50),
+                'p95_ms': entry.percentile(ordered, 0.95),
+                'p99_ms': entry.percentile(ordered, 0.99),
+                'max_ms': entry.max * 1000,
+                'rows': entry.rows,
+                'callers': callers,
+            })
+        stats.sort(key=lambda item: item[sort_by], reverse=True)
+        return stats[:limit] if limit is not None else stats
+
+    def reset(self):
+        """Drop all statistics."""
+        with self._lock:
+            self._shapes = {}
+
+    def __len__(self):
+        return len(self._shapes)
+
+
+class StatementCache:
+    """LRU cache of classified statements keyed by SQL text."""
+
+    def __init__(self, maxsize=STATEMENT_CACHE_SIZE):
+        """
+        Initialize the statement cache.
+
+        Args:
+            maxsize (int): Maximum number of statements to keep
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query):
+        """Return the cached Statement for a query, classifying it on first use."""
+        with self._lock:
+            statement = self._entries.get(query)
+            if statement is not None:
+                self._entries.move_to_end(query)
+                self.hits += 1
+                return statement
+
+            self.misses += 1
+            statement = classify_query(query)
+            self._entries[query] = statement
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return statement
+
+    def clear(self):
+        """Drop all cached statements."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Record(tuple):
+    """
+    Lightweight result row.
+
+    A Record is a plain tuple of column values. Rows produced by the same
+    statement share one column index on their class, so a row costs no more
+    than the tuple itself while still supporting name lookups (case-insensitive,
+    like sqlite3.Row) and the read-only dict methods used throughout the app.
+    """
+
+    __slots__ = ()
+    _columns = ()
+    _index = {}
+    _folded_index = {}
+
+    def _position(self, key):
+        position = self._index.get(key)
+        if position is None:
+            position = self._folded_index.get(key.lower())
+            if position is None:
+                raise KeyError(key)
+        return position
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._position(key))
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return key in self._index or key.lower() in self._folded_index
+        return tuple.__contains__(self, key)
+
+    def get(self, key, default=None):
+        """Return the value of a column, or default if the column is absent."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """Return the column names."""
+        return list(self._index)
+
+    def values(self):
+        """Return the column values."""
+        return [tuple.__getitem__(self, i) for i in self._index.values()]
+
+    def items(self):
+        """Return (column, value) pairs."""
+        return [(name, tuple.__getitem__(self, i)) for name, i in self._index.items()]
+
+    def as_dict(self):
+        """Return a mutable dictionary copy of the row."""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"<Record {self.as_dict()!r}>"
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def record_class(columns):
+    """
+    Return the Record subclass for a tuple of column names.
+
+    Duplicate names resolve to the last column, matching dict(row) semantics.
+    """
+    index = {name: position for position, name in enumerate(columns)}
+    folded_index = {name.lower(): position for name, position in index.items()}
+    return type('Record', (Record,), {
+        '__slots__': (),
+        '_columns': columns,
+        '_index': index,
+        '_folded_index': folded_index,
+    })
+
+
+def record_factory(description):
+    """Return the Record class for a cursor description."""
+    return record_class(tuple(column[0] for column in description))
+
+class ThreadConnection:
+    """A pooled connection plus the state DatabaseManager keeps per thread."""
+
+    __slots__ = ('connection', 'cursor', 'transaction_depth', 'thread')
+
+    def __init__(self, connection, thread):
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.transaction_depth = 0
+        self.thread = thread
+
+
+class ConnectionPool:
+    """
+    Gives every thread its own connection to one database.
+
+    A thread's connection is opened on first use and kept in a thread-local
+    slot. At most max_connections are open at once; connections of threads
+    that have exited are closed when a slot is needed. An in-memory database
+    exists only inside its connection, so in shared mode the pool hands the
+    same connection to every thread (callers must not use it concurrently).
+    """
+
+    def __init__(self, connect, max_connections=None, timeout=None, shared=False):
+        """
+        Initialize the pool.
+
+        Args:
+            connect (callable): Opens a new connection, or returns None on failure
+            max_connections (int, optional): Defaults to settings.DATABASE_POOL_SIZE
+            timeout (float, optional): Seconds to wait for a free slot,
+                                       defaults to settings.DATABASE_POOL_TIMEOUT
+            shared (bool): Share a single connection between all threads
+        """
+        self._connect = connect
+        self.max_connections = max_connections or settings.DATABASE_POOL_SIZE
+        self.timeout = settings.DATABASE_POOL_TIMEOUT if timeout is None else timeout
+        self.shared = shared
+        self._local = threading.local()
+        self._slots = threading.Condition()
+        self._states = []
+
+    def get(self):
+        """
+        Return the calling thread's connection state, opening it if needed.
+
+        Returns:
+            ThreadConnection: The thread's connection, or None if none could be opened
+        """
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            state = self._states[0] if self.shared and self._states else self._open()
+            self._local.state = state
+        return state
+
+    def _open(self):
+        """Open a connection for the calling thread once a slot is free."""
+        with self._slots:
+            if not self._slots.wait_for(self._has_free_slot, self.timeout):
+                logger.error(f"No free database connection after {self.timeout}s "
+                             f"({self.max_connections} in use)")
+                return None
+
+            connection = self._connect()
+            if connection is None:
+                return None
+            state = ThreadConnection(connection, threading.current_thread())
+            self._states.append(state)
+            return state
+
+    def _has_free_slot(self):
+        """Close connections of exited threads; True if a slot is free (lock held)."""
+        for state in [s for s in self._states if not s.thread.is_alive()]:
+            self._states.remove(state)
+            state.connection.close()
+        return len(self._states) < self.max_connections
+
+    def release(self):
+        """Close the calling thread's connection and free its slot."""
+        state = getattr(self._local, 'state', None)
+        if state is None or self.shared:
+            return
+        self._local.state = None
+        with self._slots:
+            if state in self._states:
+                self._states.remove(state)
+                state.connection.close()
+            self._slots.notify()
+
+    def close_all(self, before_close=None):
+        """
+        Close every connection of the pool.
+
+        Args:
+            before_close (callable, optional): Called with each connection before it closes
+        """
+        with self._slots:
+            for state in self._states:
+                if before_close:
+                    before_close(state.connection)
+                state.connection.close()
+            self._states = []
+            self._slots.notify_all()
+        self._local = threading.local()
+
+    def __len__(self):
+        return len(self._states)
+
+
 class DatabaseManager:
     """Database manager for handling SQLite connections (both local and cloud)."""
 
-    def __init__(self, db_path=None, cloud_url=None):
+    def __init__(self, db_path=None, cloud_url=None, pragmas=None, optimize_on_close=None,
+                 slow_query_ms=None):
         """
         Initialize the database manager.
 
         Args:
             db_path (str, optional): Path to local SQLite database
             cloud_url (str, optional): URL for cloud SQLite connection
+            pragmas (dict, optional): PRAGMA profile applied on connect,
+                                      defaults to settings.DATABASE_PRAGMAS
+            optimize_on_close (bool, optional): Run PRAGMA optimize on close,
+                                                defaults to settings.DATABASE_OPTIMIZE_ON_CLOSE
+            slow_query_ms (float, optional): Log statements slower than this,
+                                             defaults to settings.DATABASE_SLOW_QUERY_MS
         """
         # Use absolute path for local database
         self.db_path = db_path or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'local.db')
         self.cloud_url = cloud_url
-        self.connection = None
-        self.cursor = None
+        self.pool = None
+        self.statements = StatementCache()
+        self.fts_enabled = False
+        self.pragmas = settings.DATABASE_PRAGMAS if pragmas is None else pragmas
+        self.optimize_on_close = (settings.DATABASE_OPTIMIZE_ON_CLOSE
+                                  if optimize_on_close is None else optimize_on_close)
+        self.query_stats = QueryStats() if settings.DATABASE_QUERY_STATS else None
+        self.slow_query_ms = settings.DATABASE_SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms
 
     def create_connection(self, db_path):
         """ Create a database connection to the SQLite database specified by db_path. """
         try:
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+            # Rows are wrapped in Record objects by execute_query/iter_query.
+            # Each connection is used by one thread at a time (see ConnectionPool);
+            # check_same_thread is off so close() can close them all.
+            conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE,
+                                   check_same_thread=False)
+            self.apply_pragmas(conn)
             logger.info(f"Connected to database: {db_path}")
             return conn
         except Error as e:
             logger.error(f"Error connecting to database: {e}")
             return None
 
+    def apply_pragmas(self, conn):
+        """
+        Apply the performance PRAGMA profile to a connection.
+
+        A PRAGMA the SQLite build rejects is logged and skipped so that the
+        connection remains usable with the library defaults.
+
+        Args:
+            conn (sqlite3.Connection): Connection to configure
+        """
+        for name, value in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except Error as e:
+                logger.warning(f"Could not apply PRAGMA {name}={value}: {e}")
+
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        logger.info(f"Database journal mode: {journal_mode}")
+
+    def check_integrity(self, mode='quick'):
+        """
+        Verify the database file.
+
+        Args:
+            mode (str): 'quick' for PRAGMA quick_check (skips index content
+                        checks, roughly linear in database size) or 'full'
+                        for PRAGMA integrity_check
+
+        Returns:
+            bool: True if the database passed the check, False otherwise
+        """
+        if not self.connection:
+            logger.error("No database connection")
+            return False
+
+        pragma = 'integrity_check' if mode == 'full' else 'quick_check'
+        try:
+            problems = [row[0] for row in self.connection.execute(f"PRAGMA {pragma}")]
+        except Error as e:
+            logger.error(f"Integrity check failed: {e}")
+            return False
+
+        if problems == ['ok']:
+            logger.info(f"Database {pragma} passed")
+            return True
+
+        for problem in problems:
+            logger.error(f"Database {pragma}: {problem}")
+        return False
+
     def connect_local(self):
         """Connect to the local SQLite database."""
         try:
@@ -46,9 +855,7 @@ class DatabaseManager:
             if self.db_path != ":memory:":
                 os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-            self.connection = self.create_connection(self.db_path)
-            if self.connection:
-                self.cursor = self.connection.cursor()
+            if self._open_pool(self.db_path, shared=self.db_path == ":memory:"):
                 logger.info(f"Connected to local database at {self.db_path}")
                 return True
             return False
@@ -66,9 +873,7 @@ class DatabaseManager:
             return False
 
         try:
-            self.connection = self.create_connection(self.cloud_url)
-            if self.connection:
-                self.cursor = self.connection.cursor()
+            if self._open_pool(self.cloud_url):
                 logger.info(f"Connected to cloud database at {self.cloud_url}")
                 return True
             return False
@@ -76,6 +881,43 @@ class DatabaseManager:
             logger.error(f"Error connecting to cloud database: {e}")
             return False
 
+    def _open_pool(self, target, shared=False):
+        """Replace the connection pool and open the calling thread's connection."""
+        if self.pool is not None:
+            self.pool.close_all()
+        self.pool = ConnectionPool(lambda: self.create_connection(target), shared=shared)
+        if self.pool.get() is None:
+            self.pool = None
+            return False
+        return True
+
+    @property
+    def connection(self):
+        """The calling thread's connection (opened on first use), or None."""
+        state = self.pool.get() if self.pool is not None else None
+        return state.connection if state is not None else None
+
+    @property
+    def cursor(self):
+        """The calling thread's cursor, or None."""
+        state = self.pool.get() if self.pool is not None else None
+        return state.cursor if state is not None else None
+
+    @property
+    def _transaction_depth(self):
+        """Nesting depth of transaction() blocks on the calling thread."""
+        state = self.pool.get() if self.pool is not None else None
+        return state.transaction_depth if state is not None else 0
+
+    @_transaction_depth.setter
+    def _transaction_depth(self, value):
+        self.pool.get().transaction_depth = value
+
+    def release_connection(self):
+        """Close the calling thread's connection; the next query reopens one."""
+        if self.pool is not None:
+            self.pool.release()
+
     def test_connection(self):
         """Test the database connection by executing a simple query."""
         if not self.connection:
@@ -171,53 +1013,495 @@ class DatabaseManager:
                 Storagepath VARCHAR(50),
                 photofilename VARCHAR(30),
                 Photoextension CHAR(4),
+                photohash CHAR(64),
                 FOREIGN KEY (realstatecode) REFERENCES Realstatspecification(realstatecode),
                 PRIMARY KEY (realstatecode, photofilename)
             )
             ''')
 
+            # Create code_sequences table (next value per code family, see CodeAllocator)
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS code_sequences (
+                name VARCHAR(30) PRIMARY KEY,
+                next_value INTEGER NOT NULL
+            )
+            ''')
+
+            for statement in CHANGE_LOG_SCHEMA:
+                self.cursor.execute(statement)
+
+            for statement in MAINCODE_VERSION_SCHEMA:
+                self.cursor.execute(statement)
+
+            self._create_statistics()
+
+            self._add_missing_columns()
+            self._sync_indexes()
+
             self.connection.commit()
             logger.info("Database tables created successfully")
-            return True
         except Error as e:
             logger.error(f"Error creating tables: {e}")
             return False
 
-    def execute_query(self, query, params=None):
+        self.create_search_index()
+        return True
+
+    def create_search_index(self):
+        """
+        Create the full-text search index and its sync triggers.
+
+        The index is optional: if the SQLite build lacks FTS5, full-text
+        searches fall back to LIKE scans and fts_enabled is set to False.
+
+        Returns:
+            bool: True if the index is available, False otherwise
+        """
+        try:
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'fts_docs'")
+            is_new = self.cursor.fetchone() is None
+
+            for statement in SEARCH_INDEX_SCHEMA:
+                self.cursor.execute(statement)
+
+            # Index rows that existed before the search index did
+            if is_new:
+                for statement in SEARCH_INDEX_REBUILD:
+                    self.cursor.execute(statement)
+
+            self.connection.commit()
+            self.fts_enabled = True
+        except Error as e:
+            self.connection.rollback()
+            logger.warning(f"Full-text search unavailable: {e}")
+            self.fts_enabled = False
+
+        return self.fts_enabled
+
+    def rebuild_search_index(self):
+        """
+        Repopulate the full-text search index from the source tables.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.fts_enabled:
+            return False
+
+        try:
+            with self.transaction():
+                for statement in SEARCH_INDEX_REBUILD:
+                    self.cursor.execute(statement)
+            return True
+        except Error as e:
+            logger.error(f"Error rebuilding search index: {e}")
+            return False
+
+    def _create_statistics(self):
+        """Create the dashboard statistics tables and triggers, backfilling them when new."""
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'property_stats'")
+        is_new = self.cursor.fetchone() is None
+
+        for statement in STATS_SCHEMA:
+            self.cursor.execute(statement)
+
+        # Count rows that existed before the statistics tables did
+        if is_new:
+            for statement in STATS_REBUILD:
+                self.cursor.execute(statement)
+
+    def rebuild_statistics(self):
+        """
+        Recompute the dashboard statistics tables from Realstatspecification.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            with self.transaction():
+                for statement in STATS_REBUILD:
+                    self.cursor.execute(statement)
+            return True
+        except Error as e:
+            logger.error(f"Error rebuilding statistics: {e}")
+            return False
+
+    def snapshot(self, path):
+        """
+        Write a compacted, self-contained copy of the database with VACUUM INTO.
+
+        The copy is taken from one read transaction, so it is consistent even
+        while other connections write. It cannot run inside transaction().
+
+        Args:
+            path (str): File to create; it must not exist
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.connection or self.in_transaction:
+            logger.error("Cannot snapshot the database: no connection or a transaction is open")
+            return False
+        try:
+            if self.connection.in_transaction:
+                self.connection.commit()
+            self.cursor.execute("VACUUM INTO ?", (path,))
+            return True
+        except Error as e:
+            logger.error(f"Error writing database snapshot: {e}")
+            return False
+
+    def bulk_insert_properties(self, query, params_seq, codes):
+        """
+        Insert many properties with set-based trigger work.
+
+        Runs in its own IMMEDIATE transaction (or the enclosing one), see
+        bulk_property_load(). Errors roll the batch back and are raised.
+
+        Args:
+            query (str): INSERT INTO Realstatspecification statement
+            params_seq (list): Parameter tuples, one per property
+            codes (list): realstatecode of each inserted property
+
+        Returns:
+            bool: True if successful
+        """
+        statement = self.statements.get(query)
+        started = time.perf_counter()
+
+        with self.bulk_property_load() as cursor:
+            cursor.executemany(statement.sql, params_seq)
+            rows = max(cursor.rowcount, 0)
+            cursor.executemany("INSERT INTO temp.bulk_codes (code) VALUES (?)", ((code,) for code in codes))
+
+        self._record_query(statement, None, time.perf_counter() - started, rows)
+        return True
+
+    @contextmanager
+    def bulk_property_load(self):
+        """
+        Suspend the per-row property insert triggers for a bulk load.
+
+        The block runs in an IMMEDIATE transaction (or the enclosing one) and
+        must put the realstatecode of every property it inserts into
+        temp.bulk_codes. The triggers in BULK_INSERT_TRIGGERS are dropped for
+        the block; on exit their work is done once for all inserted rows and
+        they are restored before the transaction ends, so other connections
+        never see them missing. An error rolls the block back, triggers included.
+
+        Yields:
+            sqlite3.Cursor: The calling thread's cursor
+        """
+        with self.transaction('IMMEDIATE'):
+            cursor = self.cursor
+            names = tuple(BULK_INSERT_TRIGGERS)
+            cursor.execute(
+                f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+                f"AND name IN ({', '.join('?' for _ in names)})", names
+            )
+            triggers = cursor.fetchall()
+            for name, _ in triggers:
+                cursor.execute(f"DROP TRIGGER {name}")
+
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS bulk_codes (code TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM temp.bulk_codes")
+
+            yield cursor
+
+            for name, sql in triggers:
+                for apply in BULK_INSERT_TRIGGERS[name]:
+                    cursor.execute(apply)
+                cursor.execute(sql)
+            cursor.execute("DELETE FROM temp.bulk_codes")
+
+    def _add_missing_columns(self):
+        """Add the columns in ADDED_COLUMNS that the existing tables lack."""
+        for table, column, definition in ADDED_COLUMNS:
+            self.cursor.execute(f"PRAGMA table_info({quote_column(table)})")
+            if column not in {row[1] for row in self.cursor.fetchall()}:
+                self.cursor.execute(f"ALTER TABLE {quote_column(table)} ADD COLUMN {quote_column(column)} {definition}")
+                logger.info(f"Added column {table}.{column}")
+
+    def _sync_indexes(self):
+        """Bring the managed secondary indexes in line with INDEXES."""
+        self.cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND name LIKE ?",
+            (MANAGED_INDEX_PREFIX + '%',)
+        )
+        existing = {row[0]: row[1] for row in self.cursor.fetchall()}
+
+        for name, table, columns in INDEXES:
+            sql = index_sql(name, table, columns)
+            if existing.pop(name, None) == sql:
+                continue
+            self.cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            self.cursor.execute(sql)
+            logger.info(f"Created index {name}")
+
+        # Anything left is a managed index that has been removed from the catalogue
+        for name in existing:
+            self.cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            logger.info(f"Dropped obsolete index {name}")
+
+    def explain(self, query, params=None):
+        """
+        Return the query plan SQLite chooses for a query.
+
+        Args:
+            query (str): SQL query to explain
+            params (tuple, optional): Parameters for the query
+
+        Returns:
+            list: EXPLAIN QUERY PLAN detail strings, e.g. 'SEARCH r USING INDEX ...'
+        """
+        rows = self.connection.execute("EXPLAIN QUERY PLAN " + query, params or ()).fetchall()
+        return [row[3] for row in rows]
+
+    def execute_query(self, query, params=None, strict=False):
         """
         Execute a SQL query.
 
         Args:
             query (str): SQL query to execute
             params (tuple, optional): Parameters for the query
+            strict (bool): Raise database errors instead of logging them and
+                           returning None (e.g. so a failed statement rolls
+                           back the enclosing transaction() block)
 
         Returns:
             list: Query results or None if error
         """
         if not self.connection:
             logger.error("No database connection")
+            if strict:
+                raise Error("No database connection")
             return None
 
+        statement = self.statements.get(query)
+        started = time.perf_counter()
+
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
+            cursor = self.cursor
+            cursor.execute(statement.sql, params or ())
 
-            if query.strip().upper().startswith(('SELECT', 'PRAGMA')):
-                return [dict(row) for row in self.cursor.fetchall()]
+            if statement.returns_rows:
+                records = self._fetch_records(cursor)
+                self._record_query(statement, params, time.perf_counter() - started, len(records))
+                return records
             else:
-                self.connection.commit()
+                self._commit_unless_in_transaction()
+                self._record_query(statement, params, time.perf_counter() - started, max(cursor.rowcount, 0))
                 return True
         except Error as e:
             logger.error(f"Query execution error: {e}")
+            if strict:
+                raise
+            return None
+
+    def execute_batch(self, query, params_seq, strict=False):
+        """
+        Execute a data-modifying SQL statement once per parameter tuple.
+
+        The whole batch runs through a single executemany() call and is
+        committed once (or left to the enclosing transaction).
+
+        Args:
+            query (str): SQL statement to execute
+            params_seq (iterable): Parameter tuples, one per execution
+            strict (bool): Raise database errors instead of logging them and
+                           returning None; inside transaction() the rows
+                           executed before the failure are otherwise kept
+
+        Returns:
+            bool: True if successful, None if error
+        """
+        if not self.connection:
+            logger.error("No database connection")
+            if strict:
+                raise Error("No database connection")
             return None
 
+        statement = self.statements.get(query)
+        started = time.perf_counter()
+
+        try:
+            cursor = self.cursor
+            cursor.executemany(statement.sql, params_seq)
+            self._commit_unless_in_transaction()
+            self._record_query(statement, None, time.perf_counter() - started, max(cursor.rowcount, 0))
+            return True
+        except Error as e:
+            logger.error(f"Batch execution error: {e}")
+            if self._transaction_depth == 0:
+                # Keep batches atomic: drop the rows executed before the failure
+                self.connection.rollback()
+            if strict:
+                raise
+            return None
+
+    @contextmanager
+    def transaction(self, mode='DEFERRED'):
+        """
+        Group statements into one transaction that commits once on exit.
+
+        Nested calls open a SAVEPOINT inside the enclosing transaction, so an
+        inner block can be rolled back on its own. Any exception raised in the
+        block rolls back that level and is re-raised.
+
+        Args:
+            mode (str): Locking mode for the outermost BEGIN
+                        ('DEFERRED', 'IMMEDIATE' or 'EXCLUSIVE')
+
+        Yields:
+            DatabaseManager: This manager
+        """
+        if not self.connection:
+            raise Error("No database connection")
+
+        depth = self._transaction_depth
+        savepoint = f"sp_{depth}"
+
+        if depth == 0:
+            if self.connection.in_transaction:
+                # Flush an implicit transaction left open by the sqlite3 module
+                self.connection.commit()
+            self.cursor.execute(f"BEGIN {mode}")
+        else:
+            self.cursor.execute(f"SAVEPOINT {savepoint}")
+
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if depth == 0:
+                self.connection.rollback()
+            else:
+                self.cursor.execute(f"ROLLBACK TO {savepoint}")
+                self.cursor.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            self._transaction_depth -= 1
+            if depth == 0:
+                self.connection.commit()
+            else:
+                self.cursor.execute(f"RELEASE {savepoint}")
+
+    @property
+    def in_transaction(self):
+        """True while inside a transaction() block."""
+        return self._transaction_depth > 0
+
+    def _commit_unless_in_transaction(self):
+        """Commit pending changes unless a transaction() block owns them."""
+        if self._transaction_depth == 0:
+            self.connection.commit()
+
+    def iter_query(self, query, params=None, batch_size=FETCH_BATCH_SIZE):
+        """
+        Stream the rows of a query without materializing the full result.
+
+        Rows are pulled from SQLite with fetchmany() in batches of batch_size,
+        on a dedicated cursor so other queries can run while iterating.
+
+        Args:
+            query (str): SQL query returning rows
+            params (tuple, optional): Parameters for the query
+            batch_size (int): Number of rows fetched per round trip
+
+        Yields:
+            Record: One row at a time
+        """
+        for batch in self.iter_batches(query, params, batch_size):
+            yield from batch
+
+    def iter_batches(self, query, params=None, batch_size=FETCH_BATCH_SIZE, strict=False):
+        """
+        Stream the rows of a query as lists of at most batch_size Records.
+
+        Args:
+            query (str): SQL query returning rows
+            params (tuple, optional): Parameters for the query
+            batch_size (int): Number of rows fetched per round trip
+            strict (bool): Raise database errors instead of logging them and
+                           ending the iteration (e.g. so an export cannot
+                           silently stop short)
+
+        Yields:
+            list: A batch of Record rows
+        """
+        if not self.connection:
+            logger.error("No database connection")
+            if strict:
+                raise Error("No database connection")
+            return
+
+        statement = self.statements.get(query)
+        cursor = self.connection.cursor()
+        # Time spent in SQLite only; the consumer's time between batches is excluded
+        elapsed = 0.0
+        count = 0
+        try:
+            started = time.perf_counter()
+            cursor.execute(statement.sql, params or ())
+            if cursor.description is None:
+                return
+            row_class = record_factory(cursor.description)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                elapsed += time.perf_counter() - started
+                if not rows:
+                    break
+                count += len(rows)
+                yield [row_class(row) for row in rows]
+                started = time.perf_counter()
+        except Error as e:
+            logger.error(f"Query execution error: {e}")
+            if strict:
+                raise
+        finally:
+            cursor.close()
+            self._record_query(statement, params, elapsed, count)
+
+    def _record_query(self, statement, params, elapsed, rows):
+        """Add an execution to the statistics and log it if it was slow."""
+        if self.query_stats is not None:
+            self.query_stats.record(statement.shape, elapsed, rows, query_caller())
+
+        if self.slow_query_ms is not None and elapsed * 1000 >= self.slow_query_ms:
+            plan = ''
+            # Batches have no single parameter tuple to explain
+            if statement.kind in EXPLAINABLE_KINDS and (params is not None or '?' not in statement.sql):
+                try:
+                    plan = '\n    ' + '\n    '.join(self.explain(statement.sql, params))
+                except Error as e:
+                    plan = f' (plan unavailable: {e})'
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms, {rows} rows) from {query_caller()}: "
+                f"{statement.shape}{plan}"
+            )
+
+    def _fetch_records(self, cursor):
+        """Fetch all remaining rows of a cursor as Records."""
+        if cursor.description is None:
+            return []
+        row_class = record_factory(cursor.description)
+        return [row_class(row) for row in cursor.fetchall()]
+
     def close(self):
-        """Close the database connection."""
-        if self.connection:
-            self.connection.close()
-            logger.info("Database connection closed")
+        """Close the database connections of all threads."""
+        if self.pool is None:
+            return
+
+        def optimize(connection):
+            try:
+                connection.execute("PRAGMA optimize")
+            except Error as e:
+                logger.warning(f"PRAGMA optimize failed: {e}")
+
+        self.pool.close_all(optimize if self.optimize_on_close else None)
+        self.pool = None
+        logger.info("Database connection closed")
 
 # For backward compatibility with older code
 def create_connection(db_file):
@@ -1,3 +1,52 @@
 # settings.py
 
-# This file is intentionally left blank.
\ No newline at end of file
+# SQLite performance profile applied to every connection opened by
+# DatabaseManager. WAL lets the search/report screens read while a form is
+# writing; it needs the database on a local disk (not a network share).
+DATABASE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',     # Safe with WAL, skips an fsync per commit
+    'cache_size': -16000,        # Negative values are KiB (16 MB page cache)
+    'mmap_size': 268435456,      # 256 MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,        # Milliseconds to wait on a locked database
+}
+
+# Run PRAGMA optimize before a connection is closed.
+DATABASE_OPTIMIZE_ON_CLOSE = True
+
+# Integrity check run when the application connects:
+# None (skip), 'quick' (PRAGMA quick_check) or 'full' (PRAGMA integrity_check).
+DATABASE_INTEGRITY_CHECK = 'quick'
+
+# Connections per database: every thread using DatabaseManager gets its own
+# connection (up to this many at once). A thread that needs one while all are
+# taken waits up to DATABASE_POOL_TIMEOUT seconds.
+DATABASE_POOL_SIZE = 8
+DATABASE_POOL_TIMEOUT = 10.0
+
+# Query instrumentation: per-statement counters and latency percentiles
+# (see DatabaseAPI.get_query_stats), and a warning with the query plan for
+# statements slower than DATABASE_SLOW_QUERY_MS (None disables the log).
+DATABASE_QUERY_STATS = True
+DATABASE_SLOW_QUERY_MS = 250
+
+# Directory of the content-addressed photo store (see src/models/photo_store.py);
+# None keeps photos in data/photos inside the application folder.
+PHOTO_STORE_DIR = None
+
+# Threads hashing and copying photos when several are added at once.
+PHOTO_INGEST_WORKERS = 4
+
+# Directory of the photo thumbnail cache (see src/models/thumbnails.py);
+# None keeps it in data/thumbnails inside the application folder.
+THUMBNAIL_CACHE_DIR = None
+
+# Threads generating thumbnails.
+THUMBNAIL_WORKERS = 2
+
+# Memory kept for photo textures shared by all screens (see src/models/texture_cache.py).
+TEXTURE_CACHE_BYTES = 96 * 1024 * 1024
+
+# Rows of photos loaded ahead of the visible ones while a gallery scrolls.
+GALLERY_PREFETCH_ROWS = 2
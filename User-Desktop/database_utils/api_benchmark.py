@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+DatabaseAPI Benchmark
+Times the DatabaseAPI operations behind the screens (searches of several
+shapes, full listings, add/update/delete, photos and exports) against
+synthetic databases of several sizes.
+
+Databases are generated with synthetic_data.generate_dataset() and kept in
+--data-dir between runs, so only the first run at a scale pays for the
+generation. Operations that change data undo their changes outside the
+timed region. Results are written as JSON (benchmark_results.py) and can be
+compared with a stored baseline:
+
+    python database_utils/api_benchmark.py --output baseline.json
+    python database_utils/api_benchmark.py --baseline baseline.json
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_utils.benchmark_results import (REGRESSION_THRESHOLD, check_against_baseline, print_results,
+                                              timing_result, write_results)
+from database_utils.synthetic_data import generate_dataset
+from src.models.database_api import DatabaseAPI
+from src.models.export import available_exporters, export_path
+from src.models.search_criteria import SearchCriteria
+
+# Database sizes measured by default
+BENCHMARK_SCALES = (10000, 100000)
+
+# Timed runs per measurement, after one untimed warm-up run
+BENCHMARK_REPEATS = 5
+
+# Operations per run of the per-row measurements (lookups, add/update/delete)
+BENCHMARK_BATCH = 100
+
+# Seed of the generated databases
+BENCHMARK_SEED = 42
+
+# Company whose properties are generated and modified
+BENCHMARK_COMPANY = 'E901'
+
+# Property codes and lookup values the measurements work on, read from the
+# database, and a directory for their output files
+BenchmarkSample = namedtuple('BenchmarkSample', [
+    'codes', 'middle_code', 'owner_code', 'owner_name', 'region', 'workdir'
+])
+
+BENCHMARKS = []
+
+Benchmark = namedtuple('Benchmark', ['name', 'function'])
+
+
+def benchmark(name):
+    """Decorator adding a measurement to BENCHMARKS under its name."""
+    def register(function):
+        BENCHMARKS.append(Benchmark(name, function))
+        return function
+    return register
+
+
+class Stopwatch:
+    """Times the block it is used in; work outside the block is not counted."""
+
+    def __init__(self):
+        self.seconds = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._start
+
+
+def benchmark_property(index, owner_code):
+    """Property data for add_property()/update_property()."""
+    return {
+        'Rstatetcode': '03001',
+        'Buildtcode': '04001',
+        'Yearmake': '2020',
+        'Property-area': 100.0 + index,
+        'Unitm-code': '05001',
+        'N-of-bedrooms': 1 + index % 5,
+        'N-of-bathrooms': 1 + index % 3,
+        'Property-corner': index % 2 == 0,
+        'Offer-Type-Code': '06001',
+        'Property-address': f"Benchmark Street {index}",
+        'Ownercode': owner_code,
+        'Descriptions': f"Benchmark listing {index}",
+    }
+
+
+def read_sample(api, workdir, size=BENCHMARK_BATCH):
+    """
+    Pick the property codes and lookup values the measurements use.
+
+    Codes are spread evenly over the table, so lookups do not all hit the
+    same pages.
+    """
+    total = api.db.execute_query("SELECT COUNT(*) AS count FROM Realstatspecification")[0]['count']
+    if not total:
+        raise RuntimeError("The benchmark database has no properties")
+    step = max(total // size, 1)
+    codes = [row['realstatecode'] for row in api.db.execute_query(
+        "SELECT realstatecode FROM Realstatspecification ORDER BY realstatecode"
+    )[::step][:size]]
+    owner = api.db.execute_query(
+        "SELECT o.Ownercode, o.ownername FROM Realstatspecification r JOIN Owners o ON r.Ownercode = o.Ownercode "
+        "GROUP BY o.Ownercode ORDER BY COUNT(*) DESC, o.Ownercode LIMIT 1"
+    )[0]
+    region = api.db.execute_query(
+        'SELECT "Region-code" AS code FROM Realstatspecification WHERE "Region-code" IS NOT NULL '
+        'GROUP BY "Region-code" ORDER BY COUNT(*) DESC, "Region-code" LIMIT 1'
+    )
+    return BenchmarkSample(codes, codes[len(codes) // 2], owner['Ownercode'], owner['ownername'],
+                           region[0]['code'] if region else None, workdir)
+
+
+# Searches, as the search screen runs them: one page plus the total count
+
+def search_page(api, criteria, timer):
+    with timer:
+        api.search_properties_page(criteria)
+    return 1
+
+
+@benchmark('search.all')
+def search_all(api, sample, timer):
+    return search_page(api, SearchCriteria(), timer)
+
+
+@benchmark('search.type')
+def search_type(api, sample, timer):
+    return search_page(api, SearchCriteria().equals('Rstatetcode', '03002'), timer)
+
+
+@benchmark('search.ranges')
+def search_ranges(api, sample, timer):
+    criteria = SearchCriteria().between('Property-area', 80, 150).between('N-of-bedrooms', 2, 3)
+    return search_page(api, criteria, timer)
+
+
+@benchmark('search.region_offer')
+def search_region_offer(api, sample, timer):
+    criteria = SearchCriteria().equals('Region-code', sample.region).equals('Offer-Type-Code', '06002')
+    return search_page(api, criteria, timer)
+
+
+@benchmark('search.owner_name')
+def search_owner_name(api, sample, timer):
+    return search_page(api, SearchCriteria().contains('ownername', sample.owner_name), timer)
+
+
+@benchmark('search.address_like')
+def search_address_like(api, sample, timer):
+    return search_page(api, SearchCriteria.from_dict({'Property-address': '%Street 14,%'}), timer)
+
+
+@benchmark('search.full_text')
+def search_full_text(api, sample, timer):
+    return search_page(api, SearchCriteria().matches('renovated family'), timer)
+
+
+@benchmark('search.deep_page')
+def search_deep_page(api, sample, timer):
+    with timer:
+        api.search_properties_page(SearchCriteria(), after=sample.middle_code)
+    return 1
+
+
+@benchmark('search.full_result')
+def search_full_result(api, sample, timer):
+    with timer:
+        rows = api.search_properties(SearchCriteria().equals('Rstatetcode', '03002'))
+    return len(rows)
+
+
+@benchmark('search.summary')
+def search_summary(api, sample, timer):
+    with timer:
+        api.get_search_summary(SearchCriteria().equals('Offer-Type-Code', '06001'))
+    return 1
+
+
+# Listings
+
+@benchmark('properties.get_all')
+def get_all_properties(api, sample, timer):
+    with timer:
+        rows = api.get_all_properties()
+    return len(rows)
+
+
+@benchmark('owners.get_all')
+def get_all_owners(api, sample, timer):
+    with timer:
+        rows = api.get_all_owners()
+    return len(rows)
+
+
+@benchmark('properties.get_by_code')
+def get_property_by_code(api, sample, timer):
+    with timer:
+        for code in sample.codes:
+            api.get_property_by_code(code)
+    return len(sample.codes)
+
+
+@benchmark('properties.get_by_codes')
+def get_properties_by_codes(api, sample, timer):
+    with timer:
+        api.get_properties_by_codes(sample.codes)
+    return len(sample.codes)
+
+
+@benchmark('dashboard.stats')
+def dashboard_stats(api, sample, timer):
+    with timer:
+        api.get_dashboard_stats()
+    return 1
+
+
+# Changes, one statement (and its triggers) per operation like the forms
+
+@benchmark('properties.add')
+def add_properties(api, sample, timer):
+    with timer:
+        codes = [api.add_property(benchmark_property(i, sample.owner_code)) for i in range(BENCHMARK_BATCH)]
+    for code in codes:
+        api.delete_property(code)
+    return len(codes)
+
+
+@benchmark('properties.update')
+def update_properties(api, sample, timer):
+    originals = api.get_properties_by_codes(sample.codes)
+    with timer:
+        for i, code in enumerate(sample.codes):
+            api.update_property(code, {'Property-area': 100.0 + i, 'Descriptions': f"Updated listing {i}"})
+    for row in originals:
+        api.update_property(row['realstatecode'], {'Property-area': row['Property-area'],
+                                                   'Descriptions': row['Descriptions']})
+    return len(sample.codes)
+
+
+@benchmark('properties.delete')
+def delete_properties(api, sample, timer):
+    codes = [api.add_property(benchmark_property(i, sample.owner_code)) for i in range(BENCHMARK_BATCH)]
+    with timer:
+        for code in codes:
+            api.delete_property(code)
+    return len(codes)
+
+
+# Photos
+
+@benchmark('photos.get')
+def get_photos(api, sample, timer):
+    with timer:
+        for code in sample.codes:
+            api.get_property_photos(code)
+    return len(sample.codes)
+
+
+@benchmark('photos.get_by_codes')
+def get_photos_by_codes(api, sample, timer):
+    with timer:
+        api.get_photos_by_codes(sample.codes)
+    return len(sample.codes)
+
+
+@benchmark('photos.add_delete')
+def add_delete_photos(api, sample, timer):
+    with timer:
+        for code in sample.codes:
+            api.add_property_photo(code, '/photos/benchmark/', 'benchmark', '.jpg')
+        for code in sample.codes:
+            api.delete_property_photo(code, 'benchmark')
+    return 2 * len(sample.codes)
+
+
+def export_benchmark(name, exporter):
+    """Build the measurement of one export format."""
+    def run(api, sample, timer):
+        path = export_path(exporter.default_extension(), sample.workdir)
+        with timer:
+            export = exporter(path)
+            export.run(api)
+        os.remove(path)
+        return export.written
+    return Benchmark(f"export.{name}", run)
+
+
+def measure(api, sample, item, repeats):
+    """Run one measurement repeats times after a warm-up run; return (ops, timings)."""
+    timings = []
+    ops = None
+    for run in range(repeats + 1):
+        timer = Stopwatch()
+        ops = item.function(api, sample, timer)
+        if run:
+            timings.append(timer.seconds)
+    return ops, timings
+
+
+def benchmark_database(scale, data_dir, seed=BENCHMARK_SEED):
+    """Return the database of a scale, generating it on first use."""
+    path = os.path.join(data_dir, f"benchmark_{scale}_{seed}.db")
+    if not os.path.exists(path):
+        print(f"Generating {scale} properties into {path}...")
+        start = time.perf_counter()
+        partial = path + '.part'
+        for stale in (partial, partial + '-wal', partial + '-shm'):
+            if os.path.exists(stale):
+                os.remove(stale)
+        generate_dataset(partial, scale, seed=seed, company_code=BENCHMARK_COMPANY)
+        os.replace(partial, path)
+        print(f"✓ Generated in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def run_benchmarks(scales=BENCHMARK_SCALES, repeats=BENCHMARK_REPEATS, data_dir=None, only=None,
+                   seed=BENCHMARK_SEED):
+    """
+    Run the measurements at each scale.
+
+    Args:
+        scales (tuple): Numbers of properties to measure at
+        repeats (int): Timed runs per measurement
+        data_dir (str, optional): Directory keeping the generated databases
+                                  between runs, defaults to a temporary
+                                  directory removed afterwards
+        only (list, optional): Name prefixes of the measurements to run
+        seed (int): Seed of the generated databases
+
+    Returns:
+        list: Result dicts (see benchmark_results.timing_result)
+    """
+    items = list(BENCHMARKS) + [export_benchmark(name, exporter)
+                                for name, exporter in available_exporters().items()]
+    if only:
+        items = [item for item in items if any(item.name.startswith(prefix) for prefix in only)]
+
+    keep = data_dir is not None
+    data_dir = data_dir or tempfile.mkdtemp(prefix='api_benchmark_')
+    os.makedirs(data_dir, exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix='api_benchmark_out_')
+    results = []
+    try:
+        for scale in scales:
+            api = DatabaseAPI()
+            api.db.db_path = benchmark_database(scale, data_dir, seed)
+            if not api.connect():
+                raise RuntimeError(f"Could not open {api.db.db_path}")
+            try:
+                api.set_company_code(BENCHMARK_COMPANY)
+                sample = read_sample(api, workdir)
+                for item in items:
+                    ops, timings = measure(api, sample, item, repeats)
+                    result = timing_result(item.name, scale, ops, timings)
+                    results.append(result)
+                    print(f"  {item.name:<32} {scale:>9} {result['median_s']:>10.4f}s")
+            finally:
+                api.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if not keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='DatabaseAPI benchmark across data scales')
+    parser.add_argument('--scale', type=int, action='append', dest='scales',
+                        help=f'Number of properties (repeatable, default: {" ".join(map(str, BENCHMARK_SCALES))})')
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS,
+                        help=f'Timed runs per measurement (default: {BENCHMARK_REPEATS})')
+    parser.add_argument('--only', action='append', help='Run measurements starting with this name (repeatable)')
+    parser.add_argument('--data-dir', default='data/benchmark',
+                        help='Directory keeping the generated databases (default: data/benchmark)')
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED, help='Seed of the generated databases')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with this results file; exit with status 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f'Relative slowdown flagged as a regression (default: {REGRESSION_THRESHOLD})')
+    args = parser.parse_args()
+
+    settings = {'repeats': args.repeats, 'seed': args.seed, 'batch': BENCHMARK_BATCH}
+    results = run_benchmarks(args.scales or BENCHMARK_SCALES, args.repeats, args.data_dir, args.only, args.seed)
+    print()
+    print_results(results)
+    document = {'suite': 'api', 'settings': settings, 'results': results}
+    if args.output:
+        document = write_results(args.output, 'api', results, settings)
+        print(f"\n✓ Results written to {args.output}")
+    if args.baseline and not check_against_baseline(document, args.baseline, args.threshold):
+        sys.exit(1)
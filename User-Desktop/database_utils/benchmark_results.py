@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark Results
+Stores benchmark timings as JSON and compares a run against a stored
+baseline, flagging every measurement that got slower than a threshold.
+
+A results file holds one suite run:
+
+    {"suite": "api", "created": "...", "environment": {...}, "settings": {...},
+     "results": [{"name": "search.type", "scale": 100000, "median_s": 0.012, ...}]}
+
+Measurements are matched by (name, scale) and compared on median_s, so any
+suite that writes results in this form can be tracked against a baseline.
+"""
+
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+# Slowdown (current / baseline - 1) above which a measurement is a regression
+REGRESSION_THRESHOLD = 0.2
+
+# Differences smaller than this many seconds are timer noise, never regressions
+NOISE_FLOOR_SECONDS = 0.0005
+
+# Result of comparing one measurement with the baseline; status is one of
+# 'regression', 'improvement', 'unchanged', 'new' or 'missing'
+Comparison = namedtuple('Comparison', ['name', 'scale', 'baseline', 'current', 'ratio', 'status'])
+
+
+def timing_result(name, scale, ops, timings, **extra):
+    """
+    Summarize repeated timings of one measurement.
+
+    Args:
+        name (str): Measurement name, e.g. 'search.type'
+        scale (int): Number of properties in the database
+        ops (int): Operations performed by each timed run
+        timings (list): Seconds taken by each run
+        **extra: Additional fields stored with the result
+
+    Returns:
+        dict: Result with median_s, min_s, max_s and ops_per_second
+    """
+    median = statistics.median(timings)
+    result = {
+        'name': name,
+        'scale': scale,
+        'ops': ops,
+        'repeats': len(timings),
+        'median_s': round(median, 6),
+        'min_s': round(min(timings), 6),
+        'max_s': round(max(timings), 6),
+        'ops_per_second': round(ops / median, 1) if median else None,
+    }
+    result.update(extra)
+    return result
+
+
+def benchmark_environment():
+    """Describe the machine and library versions a run was measured on."""
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def write_results(path, suite, results, settings=None):
+    """
+    Write a suite run to a JSON file.
+
+    Args:
+        path (str): Output file
+        suite (str): Suite name ('api', 'ui', ...)
+        results (list): Result dicts from timing_result()
+        settings (dict, optional): Options the suite was run with
+
+    Returns:
+        dict: The written document
+    """
+    document = {
+        'suite': suite,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': benchmark_environment(),
+        'settings': settings or {},
+        'results': results,
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(document, output, indent=2)
+        output.write('\n')
+    return document
+
+
+def load_results(path):
+    """
+    Read a results file written by write_results().
+
+    Raises:
+        ValueError: If the file is not a benchmark results document
+    """
+    with open(path, encoding='utf-8') as source:
+        document = json.load(source)
+    if not isinstance(document, dict) or not isinstance(document.get('results'), list):
+        raise ValueError(f"{path} is not a benchmark results file")
+    return document
+
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD, noise_floor=NOISE_FLOOR_SECONDS):
+    """
+    Compare a run with a baseline run.
+
+    Args:
+        baseline (dict): Baseline document from load_results()
+        current (dict): Current document
+        threshold (float): Relative slowdown flagged as a regression (0.2 = 20%)
+        noise_floor (float): Absolute difference in seconds below which a
+                             change is ignored
+
+    Returns:
+        list: Comparisons in the current run's order, then baseline
+              measurements missing from the current run
+    """
+    previous = {(result['name'], result['scale']): result for result in baseline['results']}
+    comparisons = []
+    for result in current['results']:
+        key = (result['name'], result['scale'])
+        before = previous.pop(key, None)
+        now = result['median_s']
+        if before is None:
+            comparisons.append(Comparison(*key, None, now, None, 'new'))
+            continue
+
+        was = before['median_s']
+        ratio = now / was if was else None
+        status = 'unchanged'
+        if abs(now - was) >= noise_floor and ratio is not None:
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold):
+                status = 'improvement'
+        comparisons.append(Comparison(*key, was, now, ratio, status))
+
+    for (name, scale), before in previous.items():
+        comparisons.append(Comparison(name, scale, before['median_s'], None, None, 'missing'))
+    return comparisons
+
+
+def regressions(comparisons):
+    """Return the comparisons flagged as regressions."""
+    return [comparison for comparison in comparisons if comparison.status == 'regression']
+
+
+def print_comparison(comparisons):
+    """Print a comparison table, marking regressions."""
+    marks = {'regression': '✗', 'improvement': '✓'}
+    print(f"  {'Measurement':<32} {'Scale':>9} {'Baseline s':>11} {'Current s':>11} {'Change':>8}")
+    for comparison in comparisons:
+        baseline = f"{comparison.baseline:.4f}" if comparison.baseline is not None else '-'
+        current = f"{comparison.current:.4f}" if comparison.current is not None else '-'
+        change = f"{comparison.ratio - 1:+.0%}" if comparison.ratio is not None else comparison.status
+        print(f"{marks.get(comparison.status, ' ')} {comparison.name:<32} {comparison.scale:>9} "
+              f"{baseline:>11} {current:>11} {change:>8}")
+
+
+def print_results(results):
+    """Print a results table."""
+    print(f"{'Measurement':<32} {'Scale':>9} {'Median s':>10} {'Min s':>10} {'Ops/s':>12}")
+    for result in results:
+        print(f"{result['name']:<32} {result['scale']:>9} {result['median_s']:>10.4f} "
+              f"{result['min_s']:>10.4f} {result['ops_per_second'] or '-':>12}")
+
+
+def check_against_baseline(current, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """
+    Print the comparison of a run with a baseline file.
+
+    Returns:
+        bool: True if no measurement regressed
+    """
+    comparisons = compare_results(load_results(baseline_path), current, threshold)
+    print(f"\nComparison with {baseline_path} (threshold {threshold:.0%}):")
+    print_comparison(comparisons)
+    slower = regressions(comparisons)
+    if slower:
+        print(f"✗ {len(slower)} measurement(s) slower than the baseline")
+    else:
+        print("✓ No regressions")
+    return not slower
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare benchmark results with a baseline')
+    parser.add_argument('baseline', help='Baseline results file')
+    parser.add_argument('current', help='Results file to check')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f'Relative slowdown flagged as a regression (default: {REGRESSION_THRESHOLD})')
+    args = parser.parse_args()
+
+    sys.exit(0 if check_against_baseline(load_results(args.current), args.baseline, args.threshold) else 1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Export Throughput Benchmark
+Fills a scratch database with synthetic properties and times every
+available export format, reporting rows per second and peak memory.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.database_api import DatabaseAPI
+from src.models.export import EXPORT_BATCH_SIZE, available_exporters, export_path
+
+PROPERTY_INSERT = (
+    'INSERT INTO Realstatspecification (Companyco, realstatecode, Rstatetcode, Buildtcode, '
+    '"Property-area", "N-of-bedrooms", "N-of-bathrooms", "Property-corner", "Property-address", '
+    'Ownercode, Descriptions) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+
+def populate(api, rows, chunk_size=50000):
+    """Insert synthetic properties into the database of api."""
+    owner_code = api.add_owner("Benchmark Owner", "07901234567")
+    remaining = rows
+    while remaining > 0:
+        codes = api.reserve_property_codes(min(chunk_size, remaining))
+        offset = rows - remaining
+        params = [
+            (api.company_code, code, '03001' if i % 3 else '03002', '04001', 50.0 + i % 400,
+             i % 6, i % 4, i % 2 == 0, f'Street {i}, Block {i % 97}', owner_code, f'Listing number {i}')
+            for i, code in enumerate(codes, offset)
+        ]
+        api.db.bulk_insert_properties(PROPERTY_INSERT, params, codes)
+        remaining -= len(codes)
+
+
+def time_export(api, exporter, path, compress, batch_size, measure_memory=False):
+    """Run one export, returning (seconds, peak traced memory in bytes or None)."""
+    if os.path.exists(path):
+        os.remove(path)
+    if not measure_memory:
+        start = time.perf_counter()
+        exporter(path, compress=compress, batch_size=batch_size).run(api)
+        return time.perf_counter() - start, None
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        exporter(path, compress=compress, batch_size=batch_size).run(api)
+        return time.perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(rows=100000, formats=None, batch_size=EXPORT_BATCH_SIZE, compress=False, measure_memory=False):
+    """
+    Time each export format against a database of the given size.
+
+    Args:
+        rows (int): Number of synthetic properties
+        formats (list, optional): Format names to run, defaults to all available
+        batch_size (int): Rows fetched and written per batch
+        compress (bool): Gzip the text formats
+        measure_memory (bool): Also run each format under tracemalloc, which
+                               is several times slower, to report peak memory
+
+    Returns:
+        list: One result dict per format (format, rows, seconds, rows_per_second,
+              peak_memory_kb, file_size_kb)
+    """
+    workdir = tempfile.mkdtemp(prefix='export_benchmark_')
+    api = DatabaseAPI()
+    api.db.db_path = os.path.join(workdir, 'benchmark.db')
+    results = []
+    try:
+        if not api.connect():
+            raise RuntimeError("Could not open the benchmark database")
+        api.set_company_code('B001')
+        api.insert_initial_data()
+
+        print(f"Populating {rows} properties...")
+        start = time.perf_counter()
+        populate(api, rows)
+        print(f"✓ Populated in {time.perf_counter() - start:.1f}s")
+
+        exporters = available_exporters()
+        for name in formats or list(exporters):
+            if name not in exporters:
+                print(f"✗ Skipping {name}: format not available")
+                continue
+            exporter = exporters[name]
+            path = export_path(exporter.default_extension(compress), workdir)
+            seconds, _ = time_export(api, exporter, path, compress, batch_size)
+            peak = None
+            if measure_memory:
+                _, peak = time_export(api, exporter, path, compress, batch_size, measure_memory=True)
+
+            results.append({
+                'format': name,
+                'rows': rows,
+                'seconds': round(seconds, 3),
+                'rows_per_second': round(rows / seconds) if seconds else None,
+                'peak_memory_kb': round(peak / 1024) if peak is not None else None,
+                'file_size_kb': round(os.path.getsize(path) / 1024),
+            })
+            os.remove(path)
+    finally:
+        api.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export throughput benchmark')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of synthetic properties')
+    parser.add_argument('--format', action='append', dest='formats', help='Format to run (repeatable)')
+    parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE, help='Rows per batch')
+    parser.add_argument('--gzip', action='store_true', help='Compress the text formats')
+    parser.add_argument('--memory', action='store_true', help='Also measure peak memory (slower)')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, args.formats, args.batch_size, args.gzip, args.memory)
+    print(f"{'Format':<8} {'Rows/s':>10} {'Seconds':>8} {'Peak KB':>8} {'File KB':>9}")
+    for result in results:
+        print(f"{result['format']:<8} {result['rows_per_second']:>10} {result['seconds']:>8} "
+              f"{result['peak_memory_kb'] or '-':>8} {result['file_size_kb']:>9}")
@@ -8,11 +8,23 @@ import os
 import sqlite3
 import sys
 
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_utils.seed_merge import merge_seed
+from src.models.database_api import DatabaseAPI
+
+# Seed database written by create_seed_database()
+SEED_DB_PATH = "data/seed.db"
+
+# Company the seed properties are added to
+DEFAULT_COMPANY_CODE = 'E901'
+
 def create_seed_database():
     """Create seed database with sample data following Data_types.md specifications."""
     print("Creating seed database with sample data...")
 
-    seed_db_path = "data/seed.db"
+    seed_db_path = SEED_DB_PATH
 
     # Ensure data directory exists
     os.makedirs(os.path.dirname(seed_db_path), exist_ok=True)    # Remove existing seed database
@@ -203,236 +215,73 @@ def create_seed_database():
         print(f"✗ Error creating seed database: {e}")
         return None
 
-def load_seed_data(target_db="data/local.db", replace_existing=True):
-    """Load seed data from seed.db into target database.
-
-    Args:
-        target_db: Path to target database
-        replace_existing: If True, replace existing records with same unique keys.
-                         If False, skip existing records (INSERT OR IGNORE).
-    """
-    print(f"Loading seed data into: {target_db}")
-    print(f"Strategy: {'Replace existing' if replace_existing else 'Skip existing'} records")
-
-    seed_db_path = "data/seed.db"
+def _merge_into(target_db, replace, company_code):
+    """Merge seed.db into target_db with the set-based merge engine."""
+    seed_db_path = SEED_DB_PATH
 
     # Create seed database if it doesn't exist
     if not os.path.exists(seed_db_path):
         print("Seed database not found. Creating it...")
-        create_seed_database()
+        seed_db_path = create_seed_database()
+        if not seed_db_path:
+            return False
 
     if not os.path.exists(target_db):
         print(f"✗ Target database not found: {target_db}")
         return False
 
+    api = DatabaseAPI()
+    api.db.db_path = target_db
     try:
-        # Connect to both databases
-        main_conn = sqlite3.connect(target_db)
-        main_conn.row_factory = sqlite3.Row
-        main_cursor = main_conn.cursor()
-
-        seed_conn = sqlite3.connect(seed_db_path)
-        seed_conn.row_factory = sqlite3.Row
-        seed_cursor = seed_conn.cursor()
-
-        print("✓ Connected to both databases")
-
-        # Load data in correct order (respecting foreign keys)
-        tables_order = ['Maincode', 'Companyinfo', 'Owners', 'Realstatspecification', 'realstatephotos']
-
-        # Define which strategy to use for each table
-        insert_strategy = "INSERT OR REPLACE" if replace_existing else "INSERT OR IGNORE"
-
-        for table in tables_order:
-            print(f"Loading {table} data...")
-
-            # Get data from seed database
-            seed_cursor.execute(f'SELECT * FROM {table}')
-            rows = seed_cursor.fetchall()
-
-            if not rows:
-                print(f"  No data in {table}")
-                continue
-
-            # Insert/Update seed data with conflict resolution
-            inserted_count = 0
-            skipped_count = 0
-
-            for row in rows:
-                row_dict = dict(row)
-                fields = ', '.join([f'"{k}"' if '-' in k else k for k in row_dict.keys()])
-                placeholders = ', '.join(['?' for _ in row_dict.keys()])
-                query = f'{insert_strategy} INTO {table} ({fields}) VALUES ({placeholders})'
-
-                try:
-                    cursor_result = main_cursor.execute(query, tuple(row_dict.values()))
-                    if cursor_result.rowcount > 0:
-                        inserted_count += 1
-                    else:
-                        skipped_count += 1
-                except sqlite3.IntegrityError as e:
-                    print(f"    ⚠️  Skipped record due to constraint: {e}")
-                    skipped_count += 1
-                except Exception as e:
-                    print(f"    ❌ Error inserting record: {e}")
-                    skipped_count += 1
-
-            if inserted_count > 0:
-                print(f"  ✓ Inserted {inserted_count} records into {table}")
-            if skipped_count > 0:
-                print(f"  ⚠️  Skipped {skipped_count} records in {table} (already exist or constraint violation)")
-
-        # Commit changes
-        main_conn.commit()
-        print('\n✓ All data committed to main database')
+        if not api.connect():
+            print(f"✗ Could not open target database: {target_db}")
+            return False
+        api.set_company_code(company_code)
+        print("✓ Connected to target database")
 
-        # Close connections
-        main_conn.close()
-        seed_conn.close()
+        merged = merge_seed(api, seed_db_path, replace=replace)
+        for table, rows in merged.items():
+            print(f"  ✓ {'Merged' if replace else 'Added'} {rows} records in {table}")
 
-        print('✓ Seed data loaded successfully!')
+        print('\n✓ All data committed to main database')
         return True
-
     except Exception as e:
-        print(f'✗ Error loading seed data: {e}')
+        print(f'✗ Error merging seed data: {e}')
         return False
+    finally:
+        api.close()
 
-def smart_merge_seed_data(target_db="data/local.db"):
-    """Smart merge seed data: only add records that don't exist, preserve existing data.
+def load_seed_data(target_db="data/local.db", replace_existing=True, company_code=DEFAULT_COMPANY_CODE):
+    """Load seed data from seed.db into target database.
 
-    This function checks for existing records by unique constraints and only adds
-    new records, preserving any existing data in the target database.
+    Args:
+        target_db: Path to target database
+        replace_existing: If True, update existing records with the seed's values.
+                         If False, skip existing records.
+        company_code: Company the seed properties are added to
     """
-    print(f"Smart merging seed data into: {target_db}")
-    print("Strategy: Preserve existing data, only add missing records")
-
-    seed_db_path = "data/seed.db"
+    print(f"Loading seed data into: {target_db}")
+    print(f"Strategy: {'Replace existing' if replace_existing else 'Skip existing'} records")
 
-    # Create seed database if it doesn't exist
-    if not os.path.exists(seed_db_path):
-        print("Seed database not found. Creating it...")
-        create_seed_database()
+    if _merge_into(target_db, replace_existing, company_code):
+        print('✓ Seed data loaded successfully!')
+        return True
+    return False
 
-    if not os.path.exists(target_db):
-        print(f"✗ Target database not found: {target_db}")
-        return False
+def smart_merge_seed_data(target_db="data/local.db", company_code=DEFAULT_COMPANY_CODE):
+    """Smart merge seed data: only add records that don't exist, preserve existing data.
 
-    try:
-        # Connect to both databases
-        main_conn = sqlite3.connect(target_db)
-        main_conn.row_factory = sqlite3.Row
-        main_cursor = main_conn.cursor()
-
-        seed_conn = sqlite3.connect(seed_db_path)
-        seed_conn.row_factory = sqlite3.Row
-        seed_cursor = seed_conn.cursor()
-
-        print("✓ Connected to both databases")
-
-        # Define table-specific merge strategies
-        table_strategies = {
-            'Maincode': {
-                'check_field': 'Code',
-                'check_query': 'SELECT COUNT(*) FROM Maincode WHERE Code = ?'
-            },
-            'Companyinfo': {
-                'check_field': 'companycode',
-                'check_query': 'SELECT COUNT(*) FROM Companyinfo WHERE companycode = ?'
-            },
-            'Owners': {
-                'check_field': 'Ownercode',
-                'check_query': 'SELECT COUNT(*) FROM Owners WHERE Ownercode = ?'
-            },
-            'Realstatspecification': {
-                'check_field': 'id',
-                'check_query': 'SELECT COUNT(*) FROM Realstatspecification WHERE Realstate_name = ? AND owner_id = ?'
-            },
-            'realstatephotos': {
-                'check_field': 'photo_path',
-                'check_query': 'SELECT COUNT(*) FROM realstatephotos WHERE photo_path = ?'
-            }
-        }
-
-        tables_order = ['Maincode', 'Companyinfo', 'Owners', 'Realstatspecification', 'realstatephotos']
-
-        for table in tables_order:
-            print(f"Smart merging {table} data...")
-
-            # Get data from seed database
-            seed_cursor.execute(f'SELECT * FROM {table}')
-            rows = seed_cursor.fetchall()
-
-            if not rows:
-                print(f"  No data in {table}")
-                continue
-
-            strategy = table_strategies.get(table)
-            if not strategy:
-                print(f"  ⚠️  No merge strategy defined for {table}, skipping...")
-                continue
-
-            inserted_count = 0
-            skipped_count = 0
-
-            for row in rows:
-                row_dict = dict(row)
-
-                # Check if record already exists
-                exists = False
-                try:
-                    if table == 'Realstatspecification':
-                        # Special case for properties - check by name and owner
-                        main_cursor.execute(strategy['check_query'],
-                                          (row_dict.get('Realstate_name'), row_dict.get('owner_id')))
-                    else:
-                        # Standard check by unique field
-                        check_value = row_dict.get(strategy['check_field'])
-                        if check_value:
-                            main_cursor.execute(strategy['check_query'], (check_value,))
-                        else:
-                            exists = False
-
-                    if not exists:
-                        count = main_cursor.fetchone()[0]
-                        exists = count > 0
-                except Exception as e:
-                    print(f"    ⚠️  Error checking existing record: {e}")
-                    exists = False
-
-                if exists:
-                    skipped_count += 1
-                    continue
-
-                # Insert new record
-                try:
-                    fields = ', '.join([f'"{k}"' if '-' in k else k for k in row_dict.keys()])
-                    placeholders = ', '.join(['?' for _ in row_dict.keys()])
-                    query = f'INSERT INTO {table} ({fields}) VALUES ({placeholders})'
-                    main_cursor.execute(query, tuple(row_dict.values()))
-                    inserted_count += 1
-                except Exception as e:
-                    print(f"    ❌ Error inserting record: {e}")
-                    skipped_count += 1
-
-            if inserted_count > 0:
-                print(f"  ✓ Added {inserted_count} new records to {table}")
-            if skipped_count > 0:
-                print(f"  ⚠️  Skipped {skipped_count} existing records in {table}")
-
-        # Commit changes
-        main_conn.commit()
-        print('\n✓ All changes committed to main database')
-
-        # Close connections
-        main_conn.close()
-        seed_conn.close()
+    Each table is merged with one INSERT ... SELECT ... WHERE NOT EXISTS over
+    the attached seed database (see seed_merge.py), keyed by the main
+    table's primary key; existing records are never modified.
+    """
+    print(f"Smart merging seed data into: {target_db}")
+    print("Strategy: Preserve existing data, only add missing records")
 
+    if _merge_into(target_db, False, company_code):
         print('✓ Smart merge completed successfully!')
         return True
-
-    except Exception as e:
-        print(f'✗ Error during smart merge: {e}')
-        return False
+    return False
 
 if __name__ == "__main__":
     import argparse
@@ -443,17 +292,19 @@ if __name__ == "__main__":
     parser.add_argument('--smart-merge', help='Smart merge seed data (preserve existing)')
     parser.add_argument('--skip-existing', action='store_true',
                        help='Skip existing records instead of replacing them (default: replace)')
+    parser.add_argument('--company', default=DEFAULT_COMPANY_CODE,
+                       help='Company the seed properties are added to')
 
     args = parser.parse_args()
 
     if args.create_seed:
         create_seed_database()
     elif args.smart_merge:
-        smart_merge_seed_data(args.smart_merge)
+        smart_merge_seed_data(args.smart_merge, args.company)
     elif args.load_seed:
         replace_existing = not args.skip_existing
-        load_seed_data(args.load_seed, replace_existing)
+        load_seed_data(args.load_seed, replace_existing, args.company)
     else:
         # Default: load seed data into main database
         replace_existing = not args.skip_existing
-        load_seed_data(replace_existing=replace_existing)
\ No newline at end of file
+        load_seed_data(replace_existing=replace_existing, company_code=args.company)
\ No newline at end of file
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Set-based Seed Merge
+Merges a seed database into the main database by ATTACHing it and running
+one INSERT ... SELECT per table instead of checking and inserting row by row.
+
+A TableMapping describes how one seed table maps onto a main table: the SQL
+expression producing each main column and the main columns identifying a
+row. Seeds that already use the main schema (snapshots, generated data) map
+column for column; the legacy layout written by seed_data.create_seed_database()
+has its own mappings (LEGACY_SEED_MAPPINGS).
+"""
+
+import logging
+import os
+import sys
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configs.database import quote_column
+
+logger = logging.getLogger('database')
+
+# Schema name the seed database is attached under
+SEED_SCHEMA = 'seed'
+
+# Main tables in merge order (referenced tables first)
+MERGE_ORDER = ('Maincode', 'Companyinfo', 'Owners', 'Realstatspecification', 'realstatephotos')
+
+
+class TableMapping:
+    """
+    How the rows of a seed table become rows of a main table.
+
+    Column expressions are evaluated over the FROM clause in source, where
+    seed tables are reached as seed.<table> and the named parameter
+    :company_code holds the company the rows are merged for.
+    """
+
+    def __init__(self, target, key, columns, source, assign_codes=False):
+        """
+        Initialize the mapping.
+
+        Args:
+            target (str): Main table
+            key (tuple): Main columns identifying a row (its primary key)
+            columns (tuple): (main column, SQL expression) pairs
+            source (str): FROM clause over the seed tables
+            assign_codes (bool): Whether property codes must be assigned to
+                                 the seed's integer ids (temp.seed_property_codes)
+                                 before this table is merged
+        """
+        self.target = target
+        self.key = tuple(key)
+        self.columns = tuple(columns)
+        self.source = source
+        self.assign_codes = assign_codes
+
+    @property
+    def target_columns(self):
+        return [column for column, _ in self.columns]
+
+    def select_sql(self):
+        """SELECT producing the mapped rows, one column per main column."""
+        expressions = ', '.join(f"{expression} AS {quote_column(column)}" for column, expression in self.columns)
+        return f"SELECT {expressions} FROM {self.source}"
+
+    def _missing(self):
+        """FROM/WHERE clause of the mapped rows whose key is not in the main table yet."""
+        match = ' AND '.join(f"t.{quote_column(column)} = m.{quote_column(column)}" for column in self.key)
+        return (f"FROM ({self.select_sql()}) AS m "
+                f"WHERE NOT EXISTS (SELECT 1 FROM main.{self.target} AS t WHERE {match})")
+
+    def new_keys_sql(self, column):
+        """SELECT of one key column of the rows merge_sql(False) would insert."""
+        return f"SELECT m.{quote_column(column)} {self._missing()}"
+
+    def merge_sql(self, replace=False):
+        """
+        Return the statement merging every mapped row.
+
+        Args:
+            replace (bool): Update rows whose key already exists (upsert)
+                            instead of keeping them
+
+        Returns:
+            str: One INSERT ... SELECT statement
+        """
+        columns = ', '.join(quote_column(column) for column in self.target_columns)
+        selected = ', '.join(f"m.{quote_column(column)}" for column in self.target_columns)
+        if not replace:
+            # OR IGNORE drops seed rows repeating a key or breaking a constraint,
+            # as the row-by-row loader skipped them
+            return f"INSERT OR IGNORE INTO main.{self.target} ({columns}) SELECT {selected} {self._missing()}"
+
+        updates = [column for column in self.target_columns if column not in self.key]
+        key = ', '.join(quote_column(column) for column in self.key)
+        if updates:
+            current = ', '.join(quote_column(column) for column in updates)
+            incoming = ', '.join(f"excluded.{quote_column(column)}" for column in updates)
+            # Rows the seed does not change are left alone, so their update triggers do not fire
+            action = (f"DO UPDATE SET ({current}) = ({incoming}) "
+                      f"WHERE ({current}) IS NOT ({incoming})")
+        else:
+            action = 'DO NOTHING'
+        # WHERE true keeps ON CONFLICT from being parsed as part of the SELECT
+        return (f"INSERT INTO main.{self.target} ({columns}) SELECT {selected} "
+                f"FROM ({self.select_sql()}) AS m WHERE true ON CONFLICT ({key}) {action}")
+
+
+def _join_parts(separator, *parts):
+    """seed_join(separator, ...): the non-empty parts joined by separator."""
+    return separator.join(str(part).strip() for part in parts if part is not None and str(part).strip())
+
+
+def _path_stem(path):
+    """File name of a path without its extension."""
+    return os.path.splitext(os.path.basename(path))[0] if path else None
+
+
+def _path_ext(path):
+    """Extension of a path, with its dot."""
+    return os.path.splitext(path)[1] if path else None
+
+
+def _path_dir(path):
+    """Directory of a path."""
+    return os.path.dirname(path) if path else None
+
+
+# SQL functions available to mapping expressions: name -> (arguments, function)
+MAPPING_FUNCTIONS = {
+    'seed_join': (-1, _join_parts),
+    'seed_path_stem': (1, _path_stem),
+    'seed_path_ext': (1, _path_ext),
+    'seed_path_dir': (1, _path_dir),
+}
+
+# Address of a legacy seed property; together with the owner it identifies
+# a property already merged, since legacy seeds have no property codes
+LEGACY_ADDRESS = "seed_join(', ', s.district, s.street, s.alley, s.house_number)"
+
+# Main Maincode codes are the record type followed by three digits; legacy
+# seed codes are three digits, or country + city for cities ('00101').
+# The seed's price and unit specification have no main column.
+LEGACY_SEED_MAPPINGS = (
+    TableMapping('Maincode', ('Recty', 'Code'), (
+        ('Recty', 's.recty'),
+        ('Code', 's.recty || substr(s.Code, -3)'),
+        ('Name', 's."Desc"'),
+    ), 'seed.Maincode AS s'),
+    TableMapping('Companyinfo', ('Companyco',), (
+        ('Companyco', 'substr(s.companycode, 1, 4)'),
+        ('Companyna', 'substr(s.companyname, 1, 30)'),
+        ('Cophoneno', 's.phone'),
+        ('Caddress', 's.address'),
+    ), 'seed.Companyinfo AS s'),
+    TableMapping('Owners', ('Ownercode',), (
+        ('Ownercode', 's.Ownercode'),
+        ('ownername', 's.ownername'),
+        ('ownerphone', 's.phone'),
+        ('Note', 's.address'),
+    ), 'seed.Owners AS s'),
+    TableMapping('Realstatspecification', ('realstatecode',), (
+        ('Companyco', ':company_code'),
+        ('realstatecode', 'c.code'),
+        ('Rstatetcode', "'03' || s.property_type"),
+        ('Buildtcode', "'04' || s.Building_type"),
+        ('Unitm-code', "'05001'"),
+        ('Property-area', 's.area_m2'),
+        ('N-of-bedrooms', 's.rooms_count'),
+        ('Offer-Type-Code', "'06' || s.offer_type"),
+        ('Province-code', "'01' || substr(s.province, -3)"),
+        ('Region-code', "'02' || substr(s.city, -3)"),
+        ('Property-address', LEGACY_ADDRESS),
+        ('Photosituation', 'EXISTS (SELECT 1 FROM temp.seed_photo_properties AS p WHERE p.seed_id = s.id)'),
+        ('Ownercode', 'o.Ownercode'),
+        ('Descriptions', "seed_join('. ', s.Realstate_name, s.description)"),
+    ), 'temp.seed_property_codes AS c '
+       'CROSS JOIN seed.Realstatspecification AS s ON s.id = c.seed_id '
+       'LEFT JOIN seed.Owners AS o ON o.id = s.owner_id', assign_codes=True),
+    TableMapping('realstatephotos', ('realstatecode', 'photofilename'), (
+        ('realstatecode', 'c.code'),
+        ('Storagepath', 'seed_path_dir(s.photo_path)'),
+        ('photofilename', 'seed_path_stem(s.photo_path)'),
+        ('Photoextension', 'seed_path_ext(s.photo_path)'),
+    ), 'seed.realstatephotos AS s '
+       'JOIN temp.seed_property_codes AS c ON c.seed_id = s.realstate_id', assign_codes=True),
+)
+
+
+def table_columns(connection, schema, table):
+    """
+    Return the columns of a table.
+
+    Returns:
+        list: (name, position in the primary key or 0) pairs; empty if the
+              table does not exist
+    """
+    return [(row[1], row[5]) for row in connection.execute(f"PRAGMA {schema}.table_info({quote_column(table)})")]
+
+
+def schema_mappings(connection, schema=SEED_SCHEMA):
+    """
+    Build column-for-column mappings for a seed in the main schema.
+
+    Columns missing from the seed are left to their defaults; seed tables
+    lacking part of the main key are skipped.
+    """
+    mappings = []
+    for table in MERGE_ORDER:
+        seed_columns = {name.lower() for name, _ in table_columns(connection, schema, table)}
+        if not seed_columns:
+            continue
+        main_columns = table_columns(connection, 'main', table)
+        key = tuple(name for name, position in sorted(main_columns, key=lambda column: column[1]) if position)
+        columns = tuple((name, f"s.{quote_column(name)}") for name, _ in main_columns if name.lower() in seed_columns)
+        if not key or any(name.lower() not in seed_columns for name in key):
+            logger.warning(f"Seed table {table} lacks its key columns, skipping it")
+            continue
+        mappings.append(TableMapping(table, key, columns, f"{schema}.{table} AS s"))
+    return mappings
+
+
+def seed_mappings(connection, schema=SEED_SCHEMA):
+    """Choose the mappings for the attached seed: main schema or legacy layout."""
+    property_columns = {name.lower() for name, _ in table_columns(connection, schema, 'Realstatspecification')}
+    if property_columns and 'realstatecode' not in property_columns:
+        return LEGACY_SEED_MAPPINGS
+    return schema_mappings(connection, schema)
+
+
+def _assign_property_codes(api, cursor, params):
+    """
+    Map legacy seed property ids to property codes in temp.seed_property_codes.
+
+    Properties merged before (same owner and address for the company) keep
+    their code; the others get codes from the company's allocator in one
+    reservation. Also records the seed properties having photos in
+    temp.seed_photo_properties.
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS seed_property_codes (seed_id INTEGER PRIMARY KEY, code TEXT NOT NULL)")
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS seed_photo_properties (seed_id INTEGER PRIMARY KEY)")
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS seed_identities (seed_id INTEGER PRIMARY KEY, owner TEXT, address TEXT)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS temp.seed_identities_key ON seed_identities (owner, address)")
+    for table in ('seed_property_codes', 'seed_photo_properties', 'seed_identities'):
+        cursor.execute(f"DELETE FROM temp.{table}")
+
+    cursor.execute("INSERT OR IGNORE INTO temp.seed_photo_properties (seed_id) "
+                   "SELECT realstate_id FROM seed.realstatephotos WHERE realstate_id IS NOT NULL")
+
+    # One pass over each side joined through an index, rather than a lookup per seed row
+    cursor.execute(f"""
+        INSERT INTO temp.seed_identities (seed_id, owner, address)
+        SELECT s.id, coalesce(o.Ownercode, ''), {LEGACY_ADDRESS}
+        FROM seed.Realstatspecification AS s LEFT JOIN seed.Owners AS o ON o.id = s.owner_id""")
+    cursor.execute("""
+        INSERT OR IGNORE INTO temp.seed_property_codes (seed_id, code)
+        SELECT i.seed_id, r.realstatecode
+        FROM main.Realstatspecification AS r
+        CROSS JOIN temp.seed_identities AS i
+            ON i.owner = coalesce(r.Ownercode, '') AND i.address = r."Property-address"
+        WHERE r.Companyco = :company_code""", params)
+
+    cursor.execute("""
+        SELECT i.seed_id FROM temp.seed_identities AS i
+        WHERE NOT EXISTS (SELECT 1 FROM temp.seed_property_codes AS c WHERE c.seed_id = i.seed_id)
+        ORDER BY i.seed_id""")
+    seed_ids = [row[0] for row in cursor.fetchall()]
+    if seed_ids:
+        codes = api.reserve_property_codes(len(seed_ids), params['company_code'])
+        cursor.executemany("INSERT INTO temp.seed_property_codes (seed_id, code) VALUES (?, ?)", zip(seed_ids, codes))
+    cursor.execute("DELETE FROM temp.seed_identities")
+
+
+def merge_seed(api, seed_path, replace=False, mappings=None):
+    """
+    Merge a seed database into the database of api.
+
+    The seed is attached to the calling thread's connection and every table
+    is merged with one statement, all in one transaction: either the whole
+    seed is merged or nothing is. Properties go through
+    DatabaseManager.bulk_property_load(), so their search index, statistics
+    and change log are updated once for all rows.
+
+    Args:
+        api (DatabaseAPI): Connected API of the main database; its company
+                           code is used for legacy seed properties
+        seed_path (str): Seed database file
+        replace (bool): Overwrite existing rows with the seed's values
+                        instead of keeping them
+        mappings (list, optional): Table mappings, chosen from the seed's
+                                   schema by default
+
+    Returns:
+        dict: Main table -> rows inserted (and, with replace, rows changed)
+
+    Raises:
+        FileNotFoundError: If the seed database does not exist
+        ValueError: If a legacy seed is merged without a company code
+        sqlite3.Error: If a statement fails; nothing is merged
+    """
+    if not os.path.exists(seed_path):
+        raise FileNotFoundError(f"Seed database not found: {seed_path}")
+
+    db = api.db
+    connection = db.connection
+    for name, (arguments, function) in MAPPING_FUNCTIONS.items():
+        connection.create_function(name, arguments, function, deterministic=True)
+    if connection.in_transaction:
+        # ATTACH is not allowed inside a transaction
+        connection.commit()
+    connection.execute(f"ATTACH DATABASE ? AS {SEED_SCHEMA}", (seed_path,))
+
+    params = {'company_code': api.company_code}
+    merged = {}
+    try:
+        mappings = seed_mappings(connection) if mappings is None else mappings
+        with db.transaction('IMMEDIATE'):
+            cursor = db.cursor
+            codes_assigned = False
+            for mapping in mappings:
+                if mapping.assign_codes and not codes_assigned:
+                    _assign_property_codes(api, cursor, params)
+                    codes_assigned = True
+
+                if mapping.target == 'Realstatspecification':
+                    with db.bulk_property_load() as cursor:
+                        cursor.execute(
+                            f"INSERT OR IGNORE INTO temp.bulk_codes (code) {mapping.new_keys_sql('realstatecode')}",
+                            params
+                        )
+                        cursor.execute(mapping.merge_sql(replace), params)
+                        merged[mapping.target] = max(cursor.rowcount, 0)
+                else:
+                    cursor.execute(mapping.merge_sql(replace), params)
+                    merged[mapping.target] = max(cursor.rowcount, 0)
+                logger.info(f"Merged {merged[mapping.target]} seed rows into {mapping.target}")
+    finally:
+        connection.execute(f"DETACH DATABASE {SEED_SCHEMA}")
+
+        # Codes were written without the allocators, or reserved in a merge that
+        # rolled back, and lookup codes behind the cache's back
+        api.owner_codes.resync()
+        if api.company_code:
+            api.property_codes().resync()
+        api.maincodes.invalidate()
+    return merged
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Generator
+Generates realistic owners, properties, photo rows and a province/region
+Maincode hierarchy at a chosen scale (10k to 10M listings) for scale testing.
+
+Output is reproducible from a seed: properties are generated in fixed-size
+blocks, each from its own random stream, so the same seed gives the same
+rows whatever the number of shards or workers. Worker processes write the
+blocks into shard databases using the table definitions of
+configs/database.py, each in one bulk transaction; the shards are then
+merged into the target database in order with seed_merge.merge_seed().
+"""
+
+import logging
+import math
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configs.database import DatabaseManager, quote_column
+from database_utils.seed_merge import merge_seed
+from src.models.code_allocator import owner_code_space, property_code_space
+from src.models.database_api import DatabaseAPI
+
+logger = logging.getLogger('database')
+
+# Properties generated from one random stream; changing it changes the output
+GENERATOR_BLOCK_SIZE = 10000
+
+# Tables written by the generator, in merge order
+GENERATED_TABLES = ('Maincode', 'Companyinfo', 'Owners', 'Realstatspecification', 'realstatephotos')
+
+# Provinces (recty 01) with their share of the listings
+PROVINCES = (
+    ('Baghdad', 30), ('Basra', 8), ('Nineveh', 8), ('Erbil', 6), ('Sulaymaniyah', 6),
+    ('Duhok', 3), ('Kirkuk', 4), ('Najaf', 4), ('Karbala', 3), ('Babil', 5), ('Anbar', 4),
+    ('Diyala', 3), ('Wasit', 2), ('Saladin', 3), ('Dhi Qar', 4), ('Maysan', 2),
+    ('Muthanna', 2), ('Qadisiyyah', 3),
+)
+
+# Region (recty 02) names; every province gets REGIONS_PER_PROVINCE of them.
+# Region codes extend their province code: '02' + province (3) + region (2)
+REGION_NAMES = (
+    'Al-Karkh', 'Al-Rusafa', 'Al-Mansour', 'Al-Karrada', 'Al-Adhamiya', 'Al-Kadhimiya',
+    'Al-Jadriya', 'Zayouna', 'Al-Yarmouk', 'Al-Amiriya', 'Hay Al-Jamia', 'Al-Saadoun',
+    'City Center', 'Old Quarter', 'New City', 'Industrial Zone',
+)
+REGIONS_PER_PROVINCE = 8
+
+# Lookup codes shared with DatabaseAPI.insert_initial_data()
+LOOKUP_CODES = (
+    ('03', '03001', 'Residential', 'Homes, apartments'),
+    ('03', '03002', 'Commercial', 'Shops, offices'),
+    ('03', '03003', 'Industrial', 'Factories, warehouses'),
+    ('03', '03004', 'Agricultural', 'Farms, orchards'),
+    ('04', '04001', 'Apartment', 'Apartment unit'),
+    ('04', '04002', 'House', 'Detached house'),
+    ('04', '04003', 'Villa', 'Luxury house'),
+    ('04', '04004', 'Office', 'Office space'),
+    ('04', '04005', 'Shop', 'Retail space'),
+    ('04', '04006', 'Warehouse', 'Storage space'),
+    ('05', '05001', 'Square Meter', 'm²'),
+    ('05', '05002', 'Square Foot', 'sq ft'),
+    ('06', '06001', 'For Sale', 'Property for sale'),
+    ('06', '06002', 'For Rent', 'Property for rent'),
+)
+
+# Property type -> (share of listings, {building type: share})
+PROPERTY_TYPES = {
+    '03001': (70, {'04001': 50, '04002': 35, '04003': 15}),
+    '03002': (20, {'04004': 50, '04005': 50}),
+    '03003': (5, {'04006': 100}),
+    '03004': (5, {'04002': 100}),
+}
+
+# Building type -> typical (smallest, largest) area in square meters
+BUILDING_AREAS = {
+    '04001': (55, 220), '04002': (100, 450), '04003': (250, 1200),
+    '04004': (30, 400), '04005': (15, 250), '04006': (300, 5000),
+}
+
+# Share of listings offered for sale; the rest are for rent
+SALE_SHARE = 0.6
+
+# Share of corner properties
+CORNER_SHARE = 0.15
+
+# Registration and payment date of generated companies
+GENERATED_DATE = '2025-01-01'
+
+# Photo names in the order a listing's photos are taken
+PHOTO_NAMES = (
+    'front', 'living_room', 'kitchen', 'bedroom_1', 'bathroom', 'bedroom_2',
+    'garden', 'street_view', 'roof', 'entrance', 'bedroom_3', 'parking',
+)
+
+FIRST_NAMES = (
+    'Mohammed', 'Ali', 'Ahmed', 'Hussein', 'Omar', 'Mustafa', 'Hassan', 'Karim', 'Yousif', 'Zaid',
+    'Fatima', 'Zainab', 'Maryam', 'Sarah', 'Noor', 'Huda', 'Layla', 'Rana', 'Aya', 'Dina',
+)
+LAST_NAMES = (
+    'Al-Jubouri', 'Al-Tamimi', 'Al-Obaidi', 'Al-Dulaimi', 'Al-Saadi', 'Al-Khafaji', 'Al-Rubaie',
+    'Al-Zubaidi', 'Hassan', 'Ibrahim', 'Kareem', 'Mahmoud', 'Abdullah', 'Salman', 'Jasim',
+)
+OWNER_NOTES = ('Prefers calls after 5pm', 'Owns several listings', 'Contact through agent', 'Prefers WhatsApp')
+DESCRIPTION_OPENINGS = ('Well maintained', 'Newly renovated', 'Spacious', 'Bright', 'Quiet', 'Modern')
+DESCRIPTION_FEATURES = (
+    'Close to schools and markets.', 'Private parking included.', 'Generator subscription available.',
+    'Recently painted.', 'Walking distance to the main street.', 'Suitable for a family.',
+)
+
+PROPERTY_COLUMNS = (
+    'Companyco', 'realstatecode', 'Rstatetcode', 'Yearmake', 'Buildtcode', 'Property-area',
+    'Unitm-code', 'Property-facade', 'Property-depth', 'N-of-bedrooms', 'N-of-bathrooms',
+    'Property-corner', 'Offer-Type-Code', 'Province-code', 'Region-code', 'Property-address',
+    'Photosituation', 'Ownercode', 'Descriptions',
+)
+PHOTO_COLUMNS = ('realstatecode', 'Storagepath', 'photofilename', 'Photoextension')
+COMPANY_COLUMNS = (
+    'Companyco', 'Companyna', 'Cityco', 'Caddress', 'Cophoneno', 'Username', 'Password',
+    'SubscriptionTCode', 'Lastpayment', 'Subscriptionduration', 'Registrationdate', 'Descriptions',
+)
+
+# Settings of one generation run, passed to the shard workers
+DatasetSpec = namedtuple('DatasetSpec', [
+    'seed', 'properties', 'owners', 'companies', 'photos_per_property', 'block_size', 'schema'
+])
+
+
+def insert_sql(table, columns):
+    """INSERT statement for the given columns."""
+    return (f"INSERT INTO {table} ({', '.join(quote_column(column) for column in columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})")
+
+
+def table_schema(tables=GENERATED_TABLES):
+    """
+    Return the CREATE TABLE statements of configs/database.py.
+
+    The statements are read from a scratch in-memory database, so shards
+    always match the application's schema exactly.
+    """
+    db = DatabaseManager(':memory:', optimize_on_close=False)
+    try:
+        if not (db.connect_local() and db.create_tables()):
+            raise RuntimeError("Could not create the reference schema")
+        rows = db.connection.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'").fetchall()
+    finally:
+        db.close()
+    statements = {name: sql for name, sql in rows}
+    return tuple(statements[table] for table in tables)
+
+
+def _stream(seed, name):
+    """Random stream for one named part of the dataset."""
+    return random.Random(f"{seed}:{name}")
+
+
+def province_codes():
+    """Province and region codes: [(province code, name, [(region code, name), ...])]."""
+    hierarchy = []
+    for p, (province, _) in enumerate(PROVINCES, 1):
+        regions = [
+            (f"02{p:03d}{r:02d}", f"{province} - {REGION_NAMES[(p + r) % len(REGION_NAMES)]}")
+            for r in range(1, REGIONS_PER_PROVINCE + 1)
+        ]
+        hierarchy.append((f"01{p:03d}", province, regions))
+    return hierarchy
+
+
+def generate_maincodes():
+    """Maincode rows: the lookup codes plus the province/region hierarchy."""
+    rows = list(LOOKUP_CODES)
+    for province_code, province, regions in province_codes():
+        rows.append(('01', province_code, province, 'Province'))
+        rows.extend(('02', region_code, name, f"Region of {province} ({province_code})")
+                    for region_code, name in regions)
+    return rows
+
+
+def generate_companies(companies):
+    """Companyinfo rows for the company codes."""
+    return [
+        (code, f"Synthetic Realty {i + 1}", '0200101', f"Office {i + 1}, Al-Mansour", '07901234567',
+         f"user{code.lower()}", 'pass1234', '1', GENERATED_DATE, '3', GENERATED_DATE, 'Generated data')
+        for i, code in enumerate(companies)
+    ]
+
+
+def generate_owners(seed, count):
+    """Owner rows (Ownercode, ownername, ownerphone, Note)."""
+    rng = _stream(seed, 'owners')
+    space = owner_code_space()
+    owners = []
+    for i in range(count):
+        note = rng.choice(OWNER_NOTES) if rng.random() < 0.2 else None
+        owners.append((
+            space.format(i),
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            f"07{rng.choice('789')}{rng.randrange(10 ** 8):08d}",
+            note,
+        ))
+    return owners
+
+
+def generate_block(spec, block):
+    """
+    Generate one block of properties and their photos.
+
+    Args:
+        spec (DatasetSpec): Generation settings
+        block (int): Block number
+
+    Returns:
+        tuple: (property rows, photo rows) in PROPERTY_COLUMNS / PHOTO_COLUMNS order
+    """
+    rng = _stream(spec.seed, f"block:{block}")
+    hierarchy = province_codes()
+    provinces = range(len(hierarchy))
+    province_weights = [weight for _, weight in PROVINCES]
+    type_codes = list(PROPERTY_TYPES)
+    type_weights = [PROPERTY_TYPES[code][0] for code in type_codes]
+    names = {code: name for _, code, name, _ in LOOKUP_CODES}
+    spaces = [property_code_space(company) for company in spec.companies]
+    owner_space = owner_code_space()
+    max_photos = len(PHOTO_NAMES)
+
+    properties = []
+    photos = []
+    start = block * spec.block_size
+    for index in range(start, min(start + spec.block_size, spec.properties)):
+        # Each company's code space holds a contiguous range of the listings
+        space = spaces[index // spaces[0].capacity]
+        company, code = space.prefix, space.format(index % space.capacity)
+        property_type = rng.choices(type_codes, type_weights)[0]
+        buildings = PROPERTY_TYPES[property_type][1]
+        building = rng.choices(list(buildings), list(buildings.values()))[0]
+
+        # Areas skew towards the small end of the building type's range
+        smallest, largest = BUILDING_AREAS[building]
+        area = round(smallest * (largest / smallest) ** rng.betavariate(2, 4), 2)
+        facade = round(math.sqrt(area) * rng.uniform(0.5, 1.0), 2)
+        depth = round(area / facade, 2)
+        if property_type == '03001':
+            bedrooms = max(1, min(8, round(area / 45 + rng.gauss(0, 0.7))))
+            bathrooms = max(1, bedrooms // 2 + rng.randint(0, 1))
+        else:
+            bedrooms = None
+            bathrooms = rng.randint(0, 2)
+
+        p = rng.choices(provinces, province_weights)[0]
+        province_code, province, regions = hierarchy[p]
+        region_code, region = regions[rng.randrange(len(regions))]
+        offer = '06001' if rng.random() < SALE_SHARE else '06002'
+
+        # Few owners hold many listings, most hold a few
+        owner = owner_space.format(int(spec.owners * rng.random() ** 2))
+        photo_count = min(max_photos, int(rng.expovariate(1 / spec.photos_per_property))) \
+            if spec.photos_per_property > 0 else 0
+
+        properties.append((
+            company, code, property_type, str(rng.randint(1960, 2025)), building, area,
+            '05001', facade, depth, bedrooms, bathrooms, rng.random() < CORNER_SHARE, offer,
+            province_code, region_code,
+            f"{region}, Street {rng.randint(1, 120)}, House {rng.randint(1, 300)}",
+            photo_count > 0, owner,
+            f"{rng.choice(DESCRIPTION_OPENINGS)} {names[building].lower()} "
+            f"{names[offer].lower()} in {region}. {rng.choice(DESCRIPTION_FEATURES)}",
+        ))
+        storage = f"/photos/{company}/{code}/"
+        photos.extend((code, storage, name, '.jpg') for name in PHOTO_NAMES[:photo_count])
+    return properties, photos
+
+
+def write_shard(path, spec, first_block, last_block):
+    """
+    Write blocks first_block..last_block - 1 into a new shard database (worker entry point).
+
+    Returns:
+        tuple: (properties written, photos written)
+    """
+    connection = sqlite3.connect(path)
+    try:
+        # A shard is scratch data: no journal, no fsync
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        for statement in spec.schema:
+            connection.execute(statement)
+
+        property_insert = insert_sql('Realstatspecification', PROPERTY_COLUMNS)
+        photo_insert = insert_sql('realstatephotos', PHOTO_COLUMNS)
+        written = [0, 0]
+        with connection:
+            for block in range(first_block, last_block):
+                properties, photos = generate_block(spec, block)
+                connection.executemany(property_insert, properties)
+                connection.executemany(photo_insert, photos)
+                written[0] += len(properties)
+                written[1] += len(photos)
+        return tuple(written)
+    finally:
+        connection.close()
+
+
+def write_base(path, spec):
+    """Write the Maincode, Companyinfo and Owners rows into a new shard database."""
+    connection = sqlite3.connect(path)
+    try:
+        for statement in spec.schema:
+            connection.execute(statement)
+        with connection:
+            connection.executemany(insert_sql('Maincode', ('Recty', 'Code', 'Name', 'Description')),
+                                   generate_maincodes())
+            connection.executemany(insert_sql('Companyinfo', COMPANY_COLUMNS), generate_companies(spec.companies))
+            connection.executemany(insert_sql('Owners', ('Ownercode', 'ownername', 'ownerphone', 'Note')),
+                                   generate_owners(spec.seed, spec.owners))
+    finally:
+        connection.close()
+
+
+def company_codes(company_code, properties):
+    """Company codes needed for properties listings: company_code, then S001, S002, ..."""
+    needed = max(1, math.ceil(properties / property_code_space(company_code).capacity))
+    return [company_code] + [f"S{i:03d}" for i in range(1, needed)]
+
+
+def generate_dataset(target_db, properties, owners=None, photos_per_property=3.0, seed=0,
+                     company_code='E901', workers=None, shards=None, block_size=GENERATOR_BLOCK_SIZE):
+    """
+    Generate a synthetic dataset into a database.
+
+    Existing rows of the target are kept; generated rows whose codes already
+    exist are skipped.
+
+    Args:
+        target_db (str): Database file, created if missing
+        properties (int): Number of properties
+        owners (int, optional): Number of owners, defaults to the whole
+                                owner code space (1000)
+        photos_per_property (float): Average photo rows per property
+        seed (int): Random seed; the same seed gives the same data
+        company_code (str): Company of the properties; listings beyond its
+                            code space go to further companies (S001, ...)
+        workers (int, optional): Generator processes, defaults to the CPU count
+        shards (int, optional): Shard databases, defaults to 4 per worker so
+                                merging overlaps with generation
+        block_size (int): Properties per random stream
+
+    Returns:
+        dict: Table -> rows merged into the target
+    """
+    capacity = owner_code_space().capacity
+    owners = capacity if owners is None else owners
+    if not 1 <= owners <= capacity:
+        raise ValueError(f"owners must be between 1 and {capacity}")
+
+    blocks = math.ceil(properties / block_size)
+    workers = max(1, workers or os.cpu_count() or 1)
+    shards = max(1, min(blocks, shards or workers * 4)) if blocks else 0
+    spec = DatasetSpec(seed, properties, owners, tuple(company_codes(company_code, properties)),
+                       photos_per_property, block_size, table_schema())
+
+    target_dir = os.path.dirname(os.path.abspath(target_db))
+    os.makedirs(target_dir, exist_ok=True)
+    # Shards live next to the target so the merge reads from the same disk
+    workdir = tempfile.mkdtemp(prefix='synthetic_', dir=target_dir)
+    api = DatabaseAPI()
+    api.db.db_path = target_db
+    merged = dict.fromkeys(GENERATED_TABLES, 0)
+    try:
+        if not api.connect():
+            raise RuntimeError(f"Could not open {target_db}")
+        api.set_company_code(company_code)
+
+        base = os.path.join(workdir, 'base.db')
+        write_base(base, spec)
+        for table, rows in merge_seed(api, base).items():
+            merged[table] += rows
+
+        bounds = [(blocks * i // shards, blocks * (i + 1) // shards) for i in range(shards)]
+        with ProcessPoolExecutor(max_workers=min(workers, max(shards, 1))) as pool:
+            futures = [
+                pool.submit(write_shard, os.path.join(workdir, f"shard_{i:04d}.db"), spec, first, last)
+                for i, (first, last) in enumerate(bounds)
+            ]
+            # Merge in shard order so row order in the target is reproducible too
+            for i, future in enumerate(futures):
+                future.result()
+                path = os.path.join(workdir, f"shard_{i:04d}.db")
+                for table, rows in merge_seed(api, path).items():
+                    merged[table] += rows
+                os.remove(path)
+                logger.info(f"Merged shard {i + 1}/{shards}")
+        return merged
+    finally:
+        api.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic dataset for scale testing')
+    parser.add_argument('target', help='Database to fill (created if missing)')
+    parser.add_argument('--properties', type=int, default=10000, help='Number of properties (default: 10000)')
+    parser.add_argument('--owners', type=int, help='Number of owners (default: 1000)')
+    parser.add_argument('--photos', type=float, default=3.0, help='Average photos per property (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--company', default='E901', help='Company code of the properties (default: E901)')
+    parser.add_argument('--workers', type=int, help='Generator processes (default: CPU count)')
+
+    args = parser.parse_args()
+
+    print(f"Generating {args.properties} properties into {args.target} (seed {args.seed})...")
+    start = time.perf_counter()
+    counts = generate_dataset(args.target, args.properties, owners=args.owners, photos_per_property=args.photos,
+                              seed=args.seed, company_code=args.company, workers=args.workers)
+    for table, rows in counts.items():
+        print(f"  ✓ {rows} rows in {table}")
+    print(f"✓ Done in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+UI Performance Harness
+Boots MainApp without showing its window on a generated database, drives
+navigation and searches, and records per screen how long each action takes
+to settle, how long the screen method that fills the widgets runs, the
+frame times while it happens and the number of widgets the screen holds.
+
+Frames are pumped by the harness (EventLoop.idle) as fast as possible, so
+a frame time is the work Kivy does in that frame: clock callbacks, layout
+and canvas updates. The GL backend defaults to 'mock', which skips GPU
+work; pass --gl-backend sdl2 to include drawing. The window provider still
+needs a display; on a machine without one, run under xvfb-run.
+
+Results are written in the benchmark_results.py format and can be compared
+with a stored baseline like the DatabaseAPI benchmark:
+
+    python database_utils/ui_benchmark.py --output ui_baseline.json
+    python database_utils/ui_benchmark.py --baseline ui_baseline.json
+"""
+
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_utils.api_benchmark import BENCHMARK_SEED, benchmark_database
+from database_utils.benchmark_results import (REGRESSION_THRESHOLD, check_against_baseline, print_results,
+                                              timing_result, write_results)
+
+# Database sizes measured by default
+UI_SCALES = (10000, 100000)
+
+# Timed runs per scenario, after one untimed warm-up run
+UI_REPEATS = 5
+
+# Frames pumped after a screen has finished, so the layout and canvas work
+# triggered by the new widgets is measured too
+SETTLE_FRAMES = 5
+
+# Seconds a scenario may take before the harness gives up
+SETTLE_TIMEOUT = 120.0
+
+# Window size set by MainApp
+WINDOW_SIZE = (1024, 768)
+
+# One measured UI action. setup runs untimed before each run; trigger starts
+# the action; done tells when the screen has finished; callback names the
+# screen method filling the widgets, timed separately
+Scenario = namedtuple('Scenario', ['name', 'screen', 'setup', 'trigger', 'done', 'callback'])
+
+
+def configure_headless(gl_backend='mock'):
+    """
+    Configure Kivy for the harness. Must run before Kivy is imported.
+
+    Args:
+        gl_backend (str): Kivy GL backend; 'mock' skips all GPU work
+    """
+    if 'kivy' in sys.modules:
+        raise RuntimeError("configure_headless() must run before Kivy is imported")
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    os.environ.setdefault('KIVY_NO_FILELOG', '1')
+    os.environ['KIVY_GL_BACKEND'] = gl_backend
+
+    from kivy.config import Config
+    # Frames run back to back instead of being paced to the display
+    Config.set('graphics', 'maxfps', '0')
+    Config.set('graphics', 'width', str(WINDOW_SIZE[0]))
+    Config.set('graphics', 'height', str(WINDOW_SIZE[1]))
+    Config.set('graphics', 'window_state', 'hidden')
+
+
+def percentile(values, fraction):
+    """Return the value below which the given fraction of values fall (nearest rank)."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+
+def count_widgets(widget):
+    """Number of widgets in the tree under widget, itself included."""
+    return sum(1 for _ in widget.walk(restrict=True))
+
+
+def time_calls(obj, name):
+    """
+    Time every call of an object's method from now on.
+
+    Returns:
+        list: Seconds of each call, appended as calls happen
+    """
+    timings = []
+    method = getattr(obj, name)
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings.append(time.perf_counter() - start)
+
+    setattr(obj, name, timed)
+    return timings
+
+
+class FramePump:
+    """Runs Kivy frames and records how long each takes."""
+
+    def __init__(self, idle):
+        """
+        Initialize the pump.
+
+        Args:
+            idle (callable): Runs one frame (EventLoop.idle)
+        """
+        self.idle = idle
+        self.frames = []
+
+    def frame(self):
+        start = time.perf_counter()
+        self.idle()
+        self.frames.append(time.perf_counter() - start)
+
+    def until(self, done, timeout=SETTLE_TIMEOUT, settle=SETTLE_FRAMES):
+        """
+        Run frames until done() is true, then settle more.
+
+        Raises:
+            RuntimeError: If done() is not true within timeout seconds
+        """
+        deadline = time.perf_counter() + timeout
+        while not done():
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"Screen did not finish within {timeout:.0f}s")
+            self.frame()
+        for _ in range(settle):
+            self.frame()
+
+
+def measure_scenario(app, pump, scenario, scale, repeats=UI_REPEATS):
+    """
+    Run one scenario repeats times after a warm-up run.
+
+    Returns:
+        list: Result dicts for the scenario (time to settle, with frame and
+              widget statistics), its screen method and its slowest frame
+    """
+    screen = app.sm.get_screen(scenario.screen)
+    calls = time_calls(screen, scenario.callback)
+    latencies, callbacks, worst, p95s, frame_counts = [], [], [], [], []
+    for run in range(repeats + 1):
+        if scenario.setup:
+            scenario.setup(app, screen)
+            pump.until(lambda: scenario.done(screen))
+        del calls[:]
+        pump.frames = []
+
+        start = time.perf_counter()
+        scenario.trigger(app, screen)
+        pump.until(lambda: scenario.done(screen))
+        latency = time.perf_counter() - start
+        if not calls:
+            raise RuntimeError(f"{scenario.name}: {scenario.callback}() was not called")
+        if run:
+            latencies.append(latency)
+            callbacks.append(sum(calls))
+            worst.append(max(pump.frames))
+            p95s.append(percentile(pump.frames, 0.95))
+            frame_counts.append(len(pump.frames))
+
+    # Remove the timing wrapper again
+    delattr(screen, scenario.callback)
+    return [
+        timing_result(scenario.name, scale, 1, latencies,
+                      widgets=count_widgets(screen),
+                      frames=round(statistics.median(frame_counts)),
+                      frame_p95_ms=round(statistics.median(p95s) * 1000, 3),
+                      frame_max_ms=round(max(worst) * 1000, 3)),
+        timing_result(f"{scenario.name}.{scenario.callback}", scale, 1, callbacks),
+        timing_result(f"{scenario.name}.max_frame", scale, 1, worst),
+    ]
+
+
+# Screen states
+
+def properties_loaded(screen):
+    if screen.status_label.text.startswith('Failed'):
+        raise RuntimeError(screen.status_label.text)
+    return not screen.status_label.text
+
+
+def owners_loaded(screen):
+    if screen.stats_label.text.startswith('Failed'):
+        raise RuntimeError(screen.stats_label.text)
+    return not screen.stats_label.text.startswith('Loading')
+
+
+def search_finished(screen):
+    if screen.results_count.text.startswith('Search failed'):
+        raise RuntimeError(screen.results_count.text)
+    return not screen.search_button.disabled
+
+
+def always(screen):
+    return True
+
+
+# Actions
+
+def leave(app, screen):
+    app.change_screen('dashboard')
+
+
+def enter(app, screen):
+    app.change_screen(screen.name)
+
+
+def clear_results(app, screen):
+    enter(app, screen)
+    screen.clear_search(None)
+
+
+def new_search(app, screen):
+    clear_results(app, screen)
+    screen.perform_search(None)
+
+
+def clear_owner_search(app, screen):
+    enter(app, screen)
+    screen.clear_search(None)
+
+
+def type_owner_search(app, screen):
+    # Three characters start the search as the user types
+    screen.search_input.text = 'Ali'
+
+
+def search_type(app, screen):
+    screen.property_type_spinner.text = next(value for value in screen.property_type_spinner.values
+                                             if value.startswith('03002'))
+    screen.perform_search(None)
+
+
+def search_address(app, screen):
+    screen.address_input.text = 'Street 14'
+    screen.perform_search(None)
+
+
+SCENARIOS = (
+    Scenario('ui.property_management.enter', 'property_management', leave, enter,
+             properties_loaded, 'apply_refresh'),
+    Scenario('ui.property_management.load_properties', 'property_management', enter,
+             lambda app, screen: screen.load_properties(), properties_loaded, 'show_loaded_properties'),
+    Scenario('ui.owner_management.enter', 'owner_management', leave, enter,
+             owners_loaded, 'display_owners'),
+    Scenario('ui.owner_management.load_owners', 'owner_management', enter,
+             lambda app, screen: screen.load_owners(), owners_loaded, 'display_owners'),
+    Scenario('ui.owner_management.search', 'owner_management', clear_owner_search, type_owner_search,
+             owners_loaded, 'display_owners'),
+    Scenario('ui.search_report.search_all', 'search_report', clear_results,
+             lambda app, screen: screen.perform_search(None), search_finished, 'display_results'),
+    Scenario('ui.search_report.search_type', 'search_report', clear_results,
+             search_type, search_finished, 'display_results'),
+    Scenario('ui.search_report.search_address', 'search_report', clear_results,
+             search_address, search_finished, 'display_results'),
+    Scenario('ui.search_report.load_more', 'search_report', new_search,
+             lambda app, screen: screen.load_more_results(None), search_finished, 'display_results'),
+    Scenario('ui.search_report.sort', 'search_report', new_search,
+             lambda app, screen: screen.sort_results('Property-area'), search_finished,
+             'sort_results'),
+)
+
+
+def run_scale(db_path, scale, repeats=UI_REPEATS, only=None):
+    """
+    Boot MainApp on a database and run the scenarios (Kivy must be configured).
+
+    Returns:
+        list: Result dicts, starting with the time MainApp.build() took
+    """
+    from kivy.base import EventLoop
+    from kivy.core.window import Window
+    from kivy.uix.screenmanager import NoTransition
+    from src.main import MainApp
+    from src.models.database_api import get_api
+
+    get_api().db.db_path = db_path
+    EventLoop.ensure_window()
+    app = MainApp()
+
+    start = time.perf_counter()
+    root = app.build()
+    build_seconds = time.perf_counter() - start
+    if root is None:
+        raise RuntimeError(f"MainApp could not open {db_path}")
+
+    # Transitions animate over wall-clock time; measure the screens alone
+    app.sm.transition = NoTransition()
+    app.root = root
+    Window.add_widget(root)
+    app.dispatch('on_start')
+    pump = FramePump(EventLoop.idle)
+    results = [timing_result('ui.app.build', scale, 1, [build_seconds], widgets=count_widgets(root))]
+    try:
+        pump.until(always)
+        for scenario in SCENARIOS:
+            if only and not any(scenario.name.startswith(prefix) for prefix in only):
+                continue
+            scenario_results = measure_scenario(app, pump, scenario, scale, repeats)
+            results.extend(scenario_results)
+            print(f"  {scenario.name:<44} {scale:>9} {scenario_results[0]['median_s']:>10.4f}s "
+                  f"{scenario_results[0]['widgets']:>7} widgets")
+    finally:
+        app.dispatch('on_stop')
+        Window.remove_widget(root)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Headless UI performance harness')
+    parser.add_argument('--scale', type=int, action='append', dest='scales',
+                        help=f'Number of properties (repeatable, default: {" ".join(map(str, UI_SCALES))})')
+    parser.add_argument('--repeats', type=int, default=UI_REPEATS,
+                        help=f'Timed runs per scenario (default: {UI_REPEATS})')
+    parser.add_argument('--only', action='append', help='Run scenarios starting with this name (repeatable)')
+    parser.add_argument('--data-dir', default='data/benchmark',
+                        help='Directory keeping the generated databases (default: data/benchmark)')
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED, help='Seed of the generated databases')
+    parser.add_argument('--gl-backend', default='mock', help='Kivy GL backend (default: mock)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with this results file; exit with status 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f'Relative slowdown flagged as a regression (default: {REGRESSION_THRESHOLD})')
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.database:
+        # Child run: one scale in a fresh process, results as JSON on stdout
+        configure_headless(args.gl_backend)
+        scale = args.scales[0]
+        results = run_scale(args.database, scale, args.repeats, args.only)
+        print('RESULTS ' + json.dumps(results))
+        sys.exit(0)
+
+    # Kivy keeps one window and one app per process, so each scale runs in its own
+    results = []
+    for scale in args.scales or UI_SCALES:
+        db_path = benchmark_database(scale, args.data_dir, args.seed)
+        command = [sys.executable, os.path.abspath(__file__), '--database', db_path, '--scale', str(scale),
+                   '--repeats', str(args.repeats), '--gl-backend', args.gl_backend]
+        for prefix in args.only or ():
+            command += ['--only', prefix]
+        child = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+        lines = child.stdout.splitlines()
+        print('\n'.join(line for line in lines if not line.startswith('RESULTS ')))
+        if child.returncode:
+            sys.exit(f"✗ UI run at {scale} properties failed")
+        results.extend(json.loads(next(line for line in lines if line.startswith('RESULTS '))[len('RESULTS '):]))
+
+    print()
+    print_results(results)
+    settings = {'repeats': args.repeats, 'seed': args.seed, 'gl_backend': args.gl_backend}
+    document = {'suite': 'ui', 'settings': settings, 'results': results}
+    if args.output:
+        document = write_results(args.output, 'ui', results, settings)
+        print(f"\n✓ Results written to {args.output}")
+    if args.baseline and not check_against_baseline(document, args.baseline, args.threshold):
+        sys.exit(1)
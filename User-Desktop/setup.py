@@ -15,6 +15,9 @@ setup(
         'python-dateutil>=2.8.2',
         # sqlite3 is part of Python standard library
     ],
+    extras_require={
+        'xlsx': ['openpyxl>=3.1.0'],  # Excel export
+    },
     entry_points={
         'console_scripts': [
             'user-desktop-app=main:main',  # Adjust the entry point as necessary
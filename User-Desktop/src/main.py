@@ -8,6 +8,8 @@ import os
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.models.database_api import get_api
+from src.models.query_executor import get_executor
+from src.models.thumbnails import get_thumbnail_service
 
 # Import screens
 from src.screens.dashboard import DashboardScreen
@@ -60,7 +62,11 @@ class MainApp(App):
 
     def on_stop(self):
         """Clean up resources when the application stops."""
-        # Close the database connection
+        # Stop exports, background queries and thumbnail workers, then close the database connection
+        if hasattr(self, 'sm'):
+            self.sm.get_screen('search_report').shutdown()
+        get_executor().shutdown()
+        get_thumbnail_service().close()
         self.api.close()
         print("Application stopped, database connection closed.")
 
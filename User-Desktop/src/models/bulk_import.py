@@ -0,0 +1,416 @@
+"""
+Bulk CSV import of owners and properties.
+A CSV file is streamed in chunks: each chunk is validated and normalized,
+gets its codes from the code allocators in one call and is inserted with a
+single executemany() in its own transaction. Invalid rows are reported with
+their line number and skipped; the rest of the file is still imported.
+"""
+
+import csv
+import datetime
+import logging
+import re
+from collections import namedtuple
+from sqlite3 import Error
+
+from configs.database import quote_column
+from src.models.code_allocator import CodeSpaceExhausted
+
+logger = logging.getLogger('database')
+
+# Rows validated and inserted per transaction
+IMPORT_CHUNK_SIZE = 5000
+
+# Row errors kept in an ImportReport; later errors are only counted
+MAX_REPORTED_ERRORS = 1000
+
+# Owner phone numbers: 11 digits starting with 07 (as in OwnerForm)
+PHONE_PATTERN = re.compile(r'^07\d{9}$')
+
+# Characters dropped from phone numbers before validation
+_PHONE_SEPARATORS = re.compile(r'[\s()-]')
+
+# Header characters ignored when matching CSV columns to fields
+_HEADER_NOISE = re.compile(r'[^0-9a-z]')
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+_FALSE_VALUES = ('0', 'false', 'no', 'n', 'f')
+
+
+class RowError(namedtuple('RowError', ['line', 'message'])):
+    """A CSV row that was not imported; line is the row's line number in the file."""
+
+    def __str__(self):
+        return f"Line {self.line}: {self.message}"
+
+
+class ImportField:
+    """
+    A table column that can be filled from a CSV column.
+
+    Converters take the stripped, non-empty text of a cell and return the
+    stored value, raising ValueError for invalid input.
+    """
+
+    def __init__(self, column, convert, required=False, aliases=(), default=None):
+        """
+        Initialize the field.
+
+        Args:
+            column (str): Table column name
+            convert (callable): Converts cell text to the stored value
+            required (bool): Rows without a value are rejected
+            aliases (tuple): Other CSV header names for the column
+            default: Value stored when the CSV has no value
+        """
+        self.column = column
+        self.convert = convert
+        self.required = required
+        self.aliases = aliases
+        self.default = default
+
+    def header_keys(self):
+        """Normalized header names this field matches."""
+        return {normalize_header(name) for name in (self.column,) + self.aliases}
+
+
+def normalize_header(name):
+    """Normalize a CSV header for matching ("Property-area", "property area" -> "propertyarea")."""
+    return _HEADER_NOISE.sub('', name.lower())
+
+
+def to_text(value):
+    return value
+
+
+def to_integer(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{value!r} is not a number")
+    if not number.is_integer() or number < 0:
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(number)
+
+
+def to_real(value):
+    try:
+        number = float(value.replace(',', ''))
+    except ValueError:
+        raise ValueError(f"{value!r} is not a number")
+    if number < 0:
+        raise ValueError(f"{value!r} is negative")
+    return number
+
+
+def to_boolean(value):
+    lowered = value.lower()
+    if lowered in _TRUE_VALUES:
+        return True
+    if lowered in _FALSE_VALUES:
+        return False
+    raise ValueError(f"{value!r} is not yes/no")
+
+
+def to_year_date(value):
+    """Dates are stored as YYYY-MM-DD; a bare year becomes January 1st (as in PropertyForm)."""
+    if len(value) == 4 and value.isdigit():
+        return f"{value}-01-01"
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"{value!r} is not a year or YYYY-MM-DD date")
+
+
+def to_phone(value):
+    phone = _PHONE_SEPARATORS.sub('', value)
+    if not PHONE_PATTERN.match(phone):
+        raise ValueError("Phone number must be 11 digits and start with 07")
+    return phone
+
+
+def lookup_converter(values, what):
+    """Return a converter mapping case-insensitive text through values."""
+    def convert(value):
+        code = values.get(value.lower())
+        if code is None:
+            raise ValueError(f"unknown {what} {value!r}")
+        return code
+    return convert
+
+
+OWNER_FIELDS = (
+    ImportField('ownername', to_text, required=True, aliases=('name', 'owner', 'owner name')),
+    ImportField('ownerphone', to_phone, required=True, aliases=('phone', 'owner phone')),
+    ImportField('Note', to_text, aliases=('notes',)),
+)
+
+# Fields without a converter are lookups resolved by BulkImporter (code or name -> code)
+PROPERTY_FIELDS = (
+    ImportField('Rstatetcode', None, required=True, aliases=('property type', 'type')),
+    ImportField('Yearmake', to_year_date, aliases=('year', 'year built')),
+    ImportField('Buildtcode', None, required=True, aliases=('building type',)),
+    ImportField('Property-area', to_real, required=True, aliases=('area',)),
+    ImportField('Unitm-code', None, aliases=('unit', 'unit measure'), default='05001'),
+    ImportField('Property-facade', to_real, aliases=('facade',)),
+    ImportField('Property-depth', to_real, aliases=('depth',)),
+    ImportField('N-of-bedrooms', to_integer, aliases=('bedrooms',)),
+    ImportField('N-of-bathrooms', to_integer, aliases=('bathrooms',)),
+    ImportField('Property-corner', to_boolean, aliases=('corner',), default=False),
+    ImportField('Offer-Type-Code', None, aliases=('offer type', 'offer')),
+    ImportField('Province-code', None, aliases=('province',)),
+    ImportField('Region-code', None, aliases=('region', 'city')),
+    ImportField('Property-address', to_text, aliases=('address',)),
+    ImportField('Ownercode', None, required=True, aliases=('owner code', 'owner')),
+    ImportField('Descriptions', to_text, aliases=('description',)),
+)
+
+# Maincode record type of each lookup column
+PROPERTY_LOOKUPS = {
+    'Rstatetcode': '03',
+    'Buildtcode': '04',
+    'Unitm-code': '05',
+    'Offer-Type-Code': '06',
+    'Province-code': '01',
+    'Region-code': '02',
+}
+
+
+class ImportReport:
+    """Outcome of a bulk import."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.rows_read = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+        self.unmapped_columns = []
+        self.aborted = None     # reason the import stopped early
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, message))
+
+    def __repr__(self):
+        return (f"<ImportReport(kind={self.kind}, read={self.rows_read}, "
+                f"imported={self.imported}, errors={self.error_count})>")
+
+
+class _ChunkFailed(Exception):
+    """Rolls back a chunk whose batch insert failed."""
+
+
+class BulkImporter:
+    """
+    Streams owner or property rows from CSV into the database.
+
+    Columns are matched to fields by header name (case, spaces and hyphens
+    are ignored, common aliases are accepted) unless a column_map is given.
+    Property lookup columns accept a Maincode code or name; owners must
+    already exist. Codes are allocated in bulk per chunk and never read from
+    the file.
+    """
+
+    def __init__(self, api, kind, chunk_size=IMPORT_CHUNK_SIZE, column_map=None, progress=None):
+        """
+        Initialize the importer.
+
+        Args:
+            api (DatabaseAPI): API the rows are imported through
+            kind (str): 'owners' or 'properties'
+            chunk_size (int): Rows inserted per transaction
+            column_map (dict, optional): CSV header -> table column; columns
+                                         not listed are ignored
+            progress (callable, optional): Called with the ImportReport after
+                                           each chunk; returning False stops
+                                           the import
+        """
+        if kind not in ('owners', 'properties'):
+            raise ValueError(f"Unknown import kind: {kind}")
+
+        self.api = api
+        self.kind = kind
+        self.chunk_size = chunk_size
+        self.column_map = column_map
+        self.progress = progress
+        self.fields = OWNER_FIELDS if kind == 'owners' else PROPERTY_FIELDS
+
+    def import_file(self, path, encoding='utf-8-sig', **reader_options):
+        """
+        Import a CSV file.
+
+        Args:
+            path (str): Path of the CSV file; the first row is the header
+            encoding (str): File encoding (the default strips a UTF-8 BOM)
+            **reader_options: Passed to csv.reader (e.g. delimiter=';')
+
+        Returns:
+            ImportReport: Counts and row errors of the import
+        """
+        with open(path, newline='', encoding=encoding) as csv_file:
+            return self.import_reader(csv.reader(csv_file, **reader_options))
+
+    def import_reader(self, reader):
+        """
+        Import rows from a csv.reader (or any iterator of lists whose first item is the header).
+
+        Returns:
+            ImportReport: Counts and row errors of the import
+        """
+        report = ImportReport(self.kind)
+        header = next(reader, None)
+        if header is None:
+            report.aborted = "The file is empty"
+            return report
+
+        mapping = self._map_columns(header, report)
+        missing = [field.column for field in self.fields if field.required and field not in mapping.values()]
+        if missing:
+            report.aborted = f"Missing required columns: {', '.join(missing)}"
+            return report
+
+        if self.kind == 'properties' and not self.api.company_code:
+            raise ValueError("Company code not set")
+        converters = self._converters()
+
+        # (column index or None when not in the file, field, converter) in insert order
+        positions = {field: index for index, field in mapping.items()}
+        plan = [(positions.get(field), field, converters[field]) for field in self.fields]
+        counts_lines = hasattr(reader, 'line_num')
+
+        chunk = []
+        for row in reader:
+            report.rows_read += 1
+            line = reader.line_num if counts_lines else report.rows_read + 1
+            values = self._convert(row, plan, line, report)
+            if values is not None:
+                chunk.append((line, values))
+
+            if len(chunk) >= self.chunk_size and not self._flush(chunk, report):
+                return report
+
+        if chunk:
+            self._flush(chunk, report)
+        return report
+
+    def _map_columns(self, header, report):
+        """Match CSV columns to fields; returns {column index: field}."""
+        by_key = {}
+        by_column = {field.column: field for field in self.fields}
+        for field in self.fields:
+            for key in field.header_keys():
+                by_key.setdefault(key, field)
+
+        mapping = {}
+        for index, name in enumerate(header):
+            if self.column_map is not None:
+                field = by_column.get(self.column_map.get(name))
+            else:
+                field = by_key.get(normalize_header(name))
+            if field is None or field in mapping.values():
+                report.unmapped_columns.append(name)
+            else:
+                mapping[index] = field
+        return mapping
+
+    def _converters(self):
+        """Map each field to its converter; lookup columns convert a code or name to the code."""
+        converters = {field: field.convert for field in self.fields if field.convert is not None}
+        if self.kind != 'properties':
+            return converters
+
+        for field in self.fields:
+            if field.column in PROPERTY_LOOKUPS:
+                values = {}
+                for row in self.api.get_main_codes_by_type(PROPERTY_LOOKUPS[field.column]):
+                    values[row['name'].lower()] = row['code']
+                    values[row['code'].lower()] = row['code']
+                converters[field] = lookup_converter(values, "code or name")
+            elif field.column == 'Ownercode':
+                rows = self.api.db.execute_query("SELECT Ownercode FROM Owners") or []
+                converters[field] = lookup_converter(
+                    {row['Ownercode'].lower(): row['Ownercode'] for row in rows}, "owner"
+                )
+        return converters
+
+    def _convert(self, row, plan, line, report):
+        """Validate and normalize one CSV row; returns the column values or None."""
+        values = []
+        width = len(row)
+        for index, field, convert in plan:
+            text = row[index].strip() if index is not None and index < width else ''
+            if text:
+                try:
+                    values.append(convert(text))
+                except ValueError as e:
+                    report.add_error(line, f"{field.column}: {e}")
+                    return None
+            elif field.required:
+                report.add_error(line, f"{field.column} is required")
+                return None
+            else:
+                values.append(field.default)
+        return values
+
+    def _flush(self, chunk, report):
+        """Insert a chunk of converted rows; returns False if the import must stop."""
+        try:
+            if self.kind == 'owners':
+                codes = self.api.reserve_owner_codes(len(chunk))
+            else:
+                codes = self.api.reserve_property_codes(len(chunk))
+        except CodeSpaceExhausted as e:
+            report.aborted = str(e)
+            for line, _ in chunk:
+                report.add_error(line, "No code left to allocate")
+            chunk.clear()
+            return False
+
+        query, rows = self._insert_rows(codes, chunk)
+        db = self.api.db
+        try:
+            try:
+                if self.kind == 'properties':
+                    db.bulk_insert_properties(query, rows, codes)
+                else:
+                    with db.transaction('IMMEDIATE'):
+                        if not db.execute_batch(query, rows):
+                            raise _ChunkFailed()
+                report.imported += len(rows)
+            except (_ChunkFailed, Error):
+                # Redo the chunk row by row to find the offending rows
+                with db.transaction('IMMEDIATE'):
+                    for (line, _), params in zip(chunk, rows):
+                        if db.execute_query(query, params):
+                            report.imported += 1
+                        else:
+                            report.add_error(line, "Rejected by the database")
+        except Exception as e:
+            logger.error(f"Bulk import failed: {e}")
+            report.aborted = str(e)
+            return False
+        finally:
+            chunk.clear()
+
+        if self.progress is not None and self.progress(report) is False:
+            report.aborted = "Cancelled"
+            return False
+        return True
+
+    def _insert_rows(self, codes, chunk):
+        """Build the INSERT statement and its parameter tuples for a chunk."""
+        columns = [field.column for field in self.fields]
+        if self.kind == 'owners':
+            columns = ['Ownercode'] + columns
+            rows = [(code, *values) for code, (_, values) in zip(codes, chunk)]
+        else:
+            columns = ['Companyco', 'realstatecode', 'Photosituation'] + columns
+            company = self.api.company_code
+            rows = [(company, code, False, *values) for code, (_, values) in zip(codes, chunk)]
+
+        table = 'Owners' if self.kind == 'owners' else 'Realstatspecification'
+        query = (f"INSERT INTO {table} ({', '.join(quote_column(c) for c in columns)}) "
+                 f"VALUES ({', '.join('?' for _ in columns)})")
+        return query, rows
@@ -0,0 +1,237 @@
+"""
+Code allocator for owner and property codes.
+Codes are handed out from a per-family sequence stored in the
+code_sequences table, so allocating a code never probes the target table.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger('database')
+
+# Digits first, then letters: sequential codes sort in allocation order
+BASE36_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+class CodeSpaceExhausted(Exception):
+    """Raised when every code of a code space is already in use."""
+
+
+class CodeSpace:
+    """A family of fixed-width codes: a prefix followed by width symbols."""
+
+    def __init__(self, name, table, column, prefix, alphabet, width):
+        """
+        Initialize the code space.
+
+        Args:
+            name (str): Sequence name in code_sequences
+            table (str): Table holding the codes
+            column (str): Column holding the codes
+            prefix (str): Fixed prefix of every code
+            alphabet (str): Symbols used after the prefix, in sort order
+            width (int): Number of symbols after the prefix
+        """
+        self.name = name
+        self.table = table
+        self.column = column
+        self.prefix = prefix
+        self.alphabet = alphabet
+        self.width = width
+        self.capacity = len(alphabet) ** width
+
+    def format(self, value):
+        """Return the code for a sequence value."""
+        base = len(self.alphabet)
+        symbols = []
+        for _ in range(self.width):
+            value, digit = divmod(value, base)
+            symbols.append(self.alphabet[digit])
+        return self.prefix + ''.join(reversed(symbols))
+
+    def parse(self, code):
+        """Return the sequence value of a code, or None if it is not in this space."""
+        if not code or len(code) != len(self.prefix) + self.width or not code.startswith(self.prefix):
+            return None
+        value = 0
+        for symbol in code[len(self.prefix):]:
+            digit = self.alphabet.find(symbol)
+            if digit < 0:
+                return None
+            value = value * len(self.alphabet) + digit
+        return value
+
+    @property
+    def glob_pattern(self):
+        """GLOB pattern matching every code of this space."""
+        return self.prefix + f"[{self.alphabet}]" * self.width
+
+    def __str__(self):
+        return f"{self.format(0)}-{self.format(self.capacity - 1)}"
+
+
+def owner_code_space():
+    """Owner codes: 'A' followed by three digits (A000-A999)."""
+    return CodeSpace('owner', 'Owners', 'Ownercode', 'A', '0123456789', 3)
+
+
+def property_code_space(company_code):
+    """Property codes: the company code followed by four base-36 symbols."""
+    return CodeSpace(f'property:{company_code}', 'Realstatspecification', 'realstatecode',
+                     company_code, BASE36_ALPHABET, 4)
+
+
+class CodeAllocator:
+    """
+    Hands out unique codes from a CodeSpace in O(1).
+
+    Values are reserved from the database sequence in blocks of block_size
+    and served from memory until the block runs out; unused values of a
+    block are simply skipped. A new sequence starts after the highest code
+    already in the table. Once the sequence reaches the end of the space,
+    the allocator reclaims free codes (left by deletes or legacy random codes)
+    from a one-off scan of the used codes; when none remain it raises
+    CodeSpaceExhausted. Inside a caller's transaction() block, which may
+    still roll the sequence back, only the requested values are reserved.
+    """
+
+    def __init__(self, db, space, block_size=1):
+        """
+        Initialize the allocator.
+
+        Args:
+            db (DatabaseManager): Database holding the sequence and the codes
+            space (CodeSpace): Code family to allocate from
+            block_size (int): Sequence values reserved per database round trip
+        """
+        self.db = db
+        self.space = space
+        self.block_size = block_size
+        self._block = []
+        self._free = None
+        self._lock = threading.Lock()
+
+    def next_code(self):
+        """Allocate a single code."""
+        return self.allocate(1)[0]
+
+    def allocate(self, count=1):
+        """
+        Allocate several codes at once, e.g. for a bulk import.
+
+        Args:
+            count (int): Number of codes
+
+        Returns:
+            list: count distinct unused codes
+
+        Raises:
+            CodeSpaceExhausted: If the space cannot supply count codes; no
+                codes are consumed in that case
+        """
+        # Check out this thread's connection first so a thread never waits
+        # for a pool slot while holding the lock
+        self.db.connection
+        with self._lock:
+            # Inside an enclosing transaction a reservation only lasts if that
+            # transaction commits, so reserve no more than the request needs
+            # and keep nothing from it in memory
+            nested = self.db.in_transaction
+            held = len(self._block)
+            try:
+                # Grow the block until it covers the request; if the space runs
+                # out first, the reserved values stay in the block for later
+                while len(self._block) < count:
+                    needed = count - len(self._block)
+                    self._reserve(needed if nested else max(self.block_size, needed))
+            except Exception:
+                if nested:
+                    del self._block[held:]
+                    self._free = None
+                raise
+            values = self._block[:count]
+            del self._block[:count]
+        return [self.space.format(value) for value in values]
+
+    def resync(self):
+        """
+        Move the sequence past codes inserted without the allocator
+        (seed merges, manual imports) and drop any reserved block.
+        """
+        self.db.connection
+        with self._lock:
+            self._block = []
+            self._free = None
+            with self.db.transaction('IMMEDIATE'):
+                high = self._highest_used_value()
+                self.db.execute_query(
+                    "UPDATE code_sequences SET next_value = MAX(next_value, ?) WHERE name = ?",
+                    (high + 1, self.space.name)
+                )
+
+    def _reserve(self, count):
+        """Reserve count values from the sequence (or the reclaimed free list)."""
+        with self.db.transaction('IMMEDIATE'):
+            next_value = self._next_value()
+            if next_value < self.space.capacity:
+                end = min(next_value + count, self.space.capacity)
+                self.db.execute_query(
+                    "UPDATE code_sequences SET next_value = ? WHERE name = ?",
+                    (end, self.space.name)
+                )
+                values = list(range(next_value, end))
+            else:
+                values = self._reclaim(count)
+
+        if not values:
+            raise CodeSpaceExhausted(
+                f"All {self.space.capacity} codes in {self.space} are in use"
+            )
+        self._block.extend(values)
+
+    def _next_value(self):
+        """Read the sequence, creating it after the highest existing code."""
+        rows = self.db.execute_query(
+            "SELECT next_value FROM code_sequences WHERE name = ?", (self.space.name,)
+        )
+        if rows:
+            return rows[0]['next_value']
+
+        next_value = self._highest_used_value() + 1
+        self.db.execute_query(
+            "INSERT INTO code_sequences (name, next_value) VALUES (?, ?)",
+            (self.space.name, next_value)
+        )
+        return next_value
+
+    def _highest_used_value(self):
+        """Return the value of the highest code in the table, or -1."""
+        space = self.space
+        rows = self.db.execute_query(
+            f"SELECT MAX({space.column}) AS code FROM {space.table} WHERE {space.column} GLOB ?",
+            (space.glob_pattern,)
+        )
+        value = space.parse(rows[0]['code']) if rows else None
+        return -1 if value is None else value
+
+    def _reclaim(self, count):
+        """Take up to count values from the free list, building it on first use."""
+        if self._free is None:
+            space = self.space
+            logger.info(f"Code sequence {space.name} wrapped; scanning for free codes")
+            used = {
+                space.parse(row[0])
+                for row in self.db.iter_query(
+                    f"SELECT {space.column} FROM {space.table} WHERE {space.column} GLOB ?",
+                    (space.glob_pattern,)
+                )
+            }
+            # Values already reserved in the block are not free either
+            used.update(self._block)
+            # Highest free values last so pop() hands out the lowest first
+            self._free = [value for value in range(space.capacity - 1, -1, -1) if value not in used]
+
+        values = []
+        while self._free and len(values) < count:
+            values.append(self._free.pop())
+        return values
@@ -4,15 +4,41 @@ This module provides the API functions for interacting with the database.
 """
 
 import os
+import sqlite3
 import sys
-import random
-import string
 import datetime
 from pathlib import Path
 
 # Add the parent directory to sys.path to allow importing from configs
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from configs.database import DatabaseManager
+from configs import settings
+from configs.database import DatabaseManager, FETCH_BATCH_SIZE
+from src.models.bulk_import import BulkImporter, IMPORT_CHUNK_SIZE
+from src.models.code_allocator import CodeAllocator, owner_code_space, property_code_space
+from src.models.maincode import MaincodeCache
+from src.models.photo_store import PhotoStore
+from src.models.search_criteria import SearchCriteria, fts_match_query, sort_keyset
+
+# Default number of rows per page of search results
+SEARCH_PAGE_SIZE = 100
+
+# Default number of owners returned by search_owners()
+OWNER_SEARCH_LIMIT = 200
+
+# Property change log entries kept for incrementally refreshed views
+PROPERTY_CHANGE_LOG_SIZE = 10000
+
+# Maincode record type naming the groups of each dashboard statistics dimension
+DASHBOARD_NAME_TYPES = {'type': '03', 'province': '01', 'offer': '06'}
+
+# Property rows joined with their owner name and type names
+PROPERTY_SELECT = """
+    SELECT r.*, o.ownername, m1.name as property_type, m2.name as building_type
+    FROM Realstatspecification r
+    LEFT JOIN Owners o ON r.Ownercode = o.Ownercode
+    LEFT JOIN Maincode m1 ON r.Rstatetcode = m1.code AND m1.recty = '03'
+    LEFT JOIN Maincode m2 ON r.Buildtcode = m2.code AND m2.recty = '04'
+"""
 
 class DatabaseAPI:
     """Database API for the Real Estate desktop application."""
@@ -21,10 +47,26 @@ class DatabaseAPI:
         """Initialize the database API."""
         self.db = DatabaseManager()
         self.company_code = None
+        self.maincodes = MaincodeCache(self.db)
+        self.owner_codes = CodeAllocator(self.db, owner_code_space())
+        self._property_codes = {}
+        self.photo_store = PhotoStore()
 
     def connect(self):
         """Connect to the database."""
-        return self.db.connect_local() and self.db.create_tables()
+        if not (self.db.connect_local() and self.db.create_tables()):
+            return False
+
+        # A failed check is logged; the data stays reachable for export/repair
+        if settings.DATABASE_INTEGRITY_CHECK:
+            self.db.check_integrity(settings.DATABASE_INTEGRITY_CHECK)
+
+        # Load every lookup code once so forms and spinners never query Maincode
+        self.maincodes.load()
+
+        self.prune_property_changes()
+
+        return True
 
     def close(self):
         """Close the database connection."""
@@ -57,12 +99,8 @@ class DatabaseAPI:
         Returns:
             str: The owner code if successful, None otherwise
         """
-        # Generate a unique owner code (A + 3 digits)
-        while True:
-            owner_code = 'A' + ''.join(random.choices(string.digits, k=3))
-            existing = self.db.execute_query("SELECT COUNT(*) as count FROM Owners WHERE Ownercode = ?", (owner_code,))
-            if existing[0]['count'] == 0:
-                break
+        # Allocate a unique owner code (A + 3 digits); raises CodeSpaceExhausted when full
+        owner_code = self.owner_codes.next_code()
 
         result = self.db.execute_query(
             "INSERT INTO Owners (Ownercode, ownername, ownerphone, Note) VALUES (?, ?, ?, ?)",
@@ -114,14 +152,19 @@ class DatabaseAPI:
 
     def get_all_properties(self):
         """Get all properties from the database."""
-        return self.db.execute_query("""
-            SELECT r.*, o.ownername, m1.name as property_type, m2.name as building_type
-            FROM Realstatspecification r
-            LEFT JOIN Owners o ON r.Ownercode = o.Ownercode
-            LEFT JOIN Maincode m1 ON r.Rstatetcode = m1.code AND m1.recty = '03'
-            LEFT JOIN Maincode m2 ON r.Buildtcode = m2.code AND m2.recty = '04'
-            ORDER BY r.realstatecode
-        """)
+        return self.db.execute_query(PROPERTY_SELECT + " ORDER BY r.realstatecode")
+
+    def iter_all_properties(self, batch_size=FETCH_BATCH_SIZE):
+        """
+        Stream all properties without loading the whole table.
+
+        Args:
+            batch_size (int): Number of rows fetched per round trip
+
+        Yields:
+            Record: One property row at a time, in property code order
+        """
+        return self.db.iter_query(PROPERTY_SELECT + " ORDER BY r.realstatecode", batch_size=batch_size)
 
     def get_property_by_code(self, property_code):
         """Get a property by code."""
@@ -131,6 +174,76 @@ class DatabaseAPI:
         )
         return properties[0] if properties else None
 
+    def get_properties_by_codes(self, property_codes):
+        """
+        Get several properties, with owner and type names, by code.
+
+        Args:
+            property_codes (iterable): Property codes
+
+        Returns:
+            list: The properties that exist, in code order
+        """
+        codes = list(dict.fromkeys(property_codes))
+        properties = []
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(codes), FETCH_BATCH_SIZE):
+            chunk = codes[start:start + FETCH_BATCH_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            properties.extend(self.db.execute_query(
+                PROPERTY_SELECT + f" WHERE r.realstatecode IN ({placeholders})", tuple(chunk)
+            ) or [])
+        properties.sort(key=lambda prop: prop['realstatecode'])
+        return properties
+
+    def latest_property_change(self):
+        """Return the sequence number of the latest logged property change (0 if none)."""
+        rows = self.db.execute_query(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'property_changes'"
+        )
+        return rows[0]['seq'] if rows else 0
+
+    def get_property_changes(self, since):
+        """
+        Get the codes of properties added, edited or deleted after a change.
+
+        Args:
+            since (int): Sequence number returned by an earlier call or by
+                         latest_property_change()
+
+        Returns:
+            tuple: (latest sequence number, list of changed codes), or
+                   (latest sequence number, None) if the changes since that
+                   point were pruned and the caller must reload
+        """
+        latest = self.latest_property_change()
+        if since == latest:
+            return latest, []
+
+        rows = self.db.execute_query(
+            "SELECT MIN(seq) AS first FROM property_changes WHERE seq > ?", (since,)
+        )
+        first = rows[0]['first'] if rows else None
+        if since > latest or first != since + 1:
+            return latest, None
+
+        changes = self.db.execute_query(
+            "SELECT DISTINCT code FROM property_changes WHERE seq > ? AND seq <= ?",
+            (since, latest)
+        )
+        return latest, [change['code'] for change in changes]
+
+    def prune_property_changes(self, keep=PROPERTY_CHANGE_LOG_SIZE):
+        """
+        Drop all but the latest keep entries of the property change log.
+
+        Views that fell further behind reload instead of patching.
+        """
+        return self.db.execute_query(
+            "DELETE FROM property_changes WHERE seq <= (SELECT MAX(seq) FROM property_changes) - ?",
+            (keep,)
+        )
+
     def get_property_photos(self, property_code):
         """Get photos for a property."""
         return self.db.execute_query(
@@ -138,22 +251,79 @@ class DatabaseAPI:
             (property_code,)
         )
 
+    def get_photos_by_codes(self, property_codes):
+        """
+        Get the photos of several properties.
+
+        Args:
+            property_codes (iterable): Property codes
+
+        Returns:
+            dict: Property code -> list of its photos; properties without
+                  photos are absent
+        """
+        codes = list(dict.fromkeys(property_codes))
+        photos = {}
+        for start in range(0, len(codes), FETCH_BATCH_SIZE):
+            chunk = codes[start:start + FETCH_BATCH_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            for photo in self.db.execute_query(
+                f"SELECT * FROM realstatephotos WHERE realstatecode IN ({placeholders}) ORDER BY rowid",
+                tuple(chunk)
+            ) or []:
+                photos.setdefault(photo['realstatecode'], []).append(photo)
+        return photos
+
     def generate_property_code(self):
-        """Generate a unique property code (CompanyCode + Random 4 chars)."""
-        if not self.company_code:
-            raise ValueError("Company code not set")
+        """Generate a unique property code (CompanyCode + 4 base-36 chars)."""
+        return self.property_codes().next_code()
+
+    def property_codes(self, company_code=None):
+        """
+        Get the property code allocator of a company.
 
-        while True:
-            random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-            property_code = self.company_code + random_part
+        Args:
+            company_code (str, optional): Company code, defaults to the current one
+
+        Returns:
+            CodeAllocator: Allocator handing out that company's property codes
+        """
+        code = company_code or self.company_code
+        if not code:
+            raise ValueError("Company code not set")
 
-            existing = self.db.execute_query(
-                "SELECT COUNT(*) as count FROM Realstatspecification WHERE realstatecode = ?",
-                (property_code,)
+        allocator = self._property_codes.get(code)
+        if allocator is None:
+            # setdefault keeps one allocator per company when threads race here
+            allocator = self._property_codes.setdefault(
+                code, CodeAllocator(self.db, property_code_space(code), block_size=16)
             )
+        return allocator
+
+    def reserve_owner_codes(self, count):
+        """
+        Reserve owner codes in bulk (e.g. for an import).
+
+        Args:
+            count (int): Number of codes
+
+        Returns:
+            list: count unused owner codes
+        """
+        return self.owner_codes.allocate(count)
+
+    def reserve_property_codes(self, count, company_code=None):
+        """
+        Reserve property codes in bulk (e.g. for an import).
 
-            if existing[0]['count'] == 0:
-                return property_code
+        Args:
+            count (int): Number of codes
+            company_code (str, optional): Company code, defaults to the current one
+
+        Returns:
+            list: count unused property codes
+        """
+        return self.property_codes(company_code).allocate(count)
 
     def add_property(self, property_data):
         """
@@ -237,15 +407,22 @@ class DatabaseAPI:
             property_code (str): The code of the property to delete
 
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, None if an error occurred (nothing is deleted)
         """
-        # First delete all photos
-        self.db.execute_query("DELETE FROM realstatephotos WHERE realstatecode = ?", (property_code,))
-
-        # Then delete the property
-        return self.db.execute_query("DELETE FROM Realstatspecification WHERE realstatecode = ?", (property_code,))
+        try:
+            # Strict statements raise, so a failed property delete rolls back the photo delete too
+            with self.db.transaction():
+                # First delete all photos
+                self.db.execute_query("DELETE FROM realstatephotos WHERE realstatecode = ?", (property_code,),
+                                      strict=True)
+
+                # Then delete the property
+                return self.db.execute_query("DELETE FROM Realstatspecification WHERE realstatecode = ?",
+                                             (property_code,), strict=True)
+        except sqlite3.Error:
+            return None
 
-    def add_property_photo(self, property_code, file_path, photo_filename, photo_extension):
+    def add_property_photo(self, property_code, file_path, photo_filename, photo_extension, photo_hash=None):
         """
         Add a photo for a property.
 
@@ -254,25 +431,90 @@ class DatabaseAPI:
             file_path (str): Path to store the photo
             photo_filename (str): Filename of the photo
             photo_extension (str): File extension
+            photo_hash (str, optional): Hash of the file in the photo store
 
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, None if an error occurred (nothing is added)
         """
-        result = self.db.execute_query(
-            """INSERT INTO realstatephotos
-               (realstatecode, Storagepath, photofilename, Photoextension)
-               VALUES (?, ?, ?, ?)""",
-            (property_code, file_path, photo_filename, photo_extension)
-        )
+        try:
+            with self.db.transaction():
+                self.db.execute_query(
+                    """INSERT INTO realstatephotos
+                       (realstatecode, Storagepath, photofilename, Photoextension, photohash)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    (property_code, file_path, photo_filename, photo_extension, photo_hash),
+                    strict=True
+                )
+
+                # Update the Photosituation flag in the property record
+                return self.db.execute_query(
+                    "UPDATE Realstatspecification SET Photosituation = ? WHERE realstatecode = ?",
+                    (True, property_code), strict=True
+                )
+        except sqlite3.Error:
+            return None
 
-        # Update the Photosituation flag in the property record
-        if result:
-            self.db.execute_query(
-                "UPDATE Realstatspecification SET Photosituation = ? WHERE realstatecode = ?",
-                (True, property_code)
-            )
+    def store_property_photos(self, property_code, paths, progress=None):
+        """
+        Copy photo files into the photo store and attach them to a property.
 
-        return result
+        Files are hashed and copied in parallel; content that is already
+        stored is not copied again. A photo with the same name as one the
+        property already has replaces it.
+
+        Args:
+            property_code (str): The code of the property
+            paths (list): Photo files to add
+            progress (callable, optional): Called with (files done, total) from
+                                           the copying threads
+
+        Returns:
+            list: One StoredPhoto per path, in order; failed files have error
+                  set, and if the rows cannot be written every stored file
+                  has error set and none is attached
+        """
+        stored = self.photo_store.ingest(paths, progress)
+        rows = [
+            (property_code, PhotoStore.shard(photo.digest), os.path.splitext(os.path.basename(photo.source))[0],
+             photo.extension, photo.digest)
+            for photo in stored if photo.error is None
+        ]
+        if rows:
+            try:
+                # The flag is only set once the rows exist; a failure rolls both back
+                with self.db.transaction():
+                    self.db.execute_batch(
+                        """INSERT OR REPLACE INTO realstatephotos
+                           (realstatecode, Storagepath, photofilename, Photoextension, photohash)
+                           VALUES (?, ?, ?, ?, ?)""",
+                        rows, strict=True
+                    )
+                    self.db.execute_query(
+                        "UPDATE Realstatspecification SET Photosituation = ? WHERE realstatecode = ?",
+                        (True, property_code), strict=True
+                    )
+            except sqlite3.Error as e:
+                # The copied files stay in the store until prune_photo_store() removes them
+                stored = [photo if photo.error is not None else photo._replace(error=str(e)) for photo in stored]
+        return stored
+
+    def photo_file(self, photo):
+        """Return the file of a photo row returned by get_property_photos()."""
+        return self.photo_store.photo_file(photo)
+
+    def prune_photo_store(self):
+        """
+        Remove stored photo files that no property references any more.
+
+        Returns:
+            int: Number of files removed
+        """
+        rows = self.db.execute_query(
+            "SELECT DISTINCT photohash FROM realstatephotos WHERE photohash IS NOT NULL"
+        )
+        if rows is None:
+            return 0
+        return self.photo_store.prune({row['photohash'] for row in rows})
 
     def delete_property_photo(self, property_code, photo_filename):
         """
@@ -283,25 +525,29 @@ class DatabaseAPI:
             photo_filename (str): Filename of the photo
 
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, None if an error occurred (nothing is deleted)
         """
-        result = self.db.execute_query(
-            "DELETE FROM realstatephotos WHERE realstatecode = ? AND photofilename = ?",
-            (property_code, photo_filename)
-        )
-
-        # Check if any photos remain for this property
-        photos = self.db.execute_query(
-            "SELECT COUNT(*) as count FROM realstatephotos WHERE realstatecode = ?",
-            (property_code,)
-        )
-
-        # If no photos remain, update the Photosituation flag
-        if photos[0]['count'] == 0:
-            self.db.execute_query(
-                "UPDATE Realstatspecification SET Photosituation = ? WHERE realstatecode = ?",
-                (False, property_code)
-            )
+        try:
+            with self.db.transaction():
+                result = self.db.execute_query(
+                    "DELETE FROM realstatephotos WHERE realstatecode = ? AND photofilename = ?",
+                    (property_code, photo_filename), strict=True
+                )
+
+                # Check if any photos remain for this property
+                photos = self.db.execute_query(
+                    "SELECT COUNT(*) as count FROM realstatephotos WHERE realstatecode = ?",
+                    (property_code,), strict=True
+                )
+
+                # If no photos remain, update the Photosituation flag
+                if photos[0]['count'] == 0:
+                    self.db.execute_query(
+                        "UPDATE Realstatspecification SET Photosituation = ? WHERE realstatecode = ?",
+                        (False, property_code), strict=True
+                    )
+        except sqlite3.Error:
+            return None
 
         return result
 
@@ -314,12 +560,22 @@ class DatabaseAPI:
             record_type (str): Record type code (e.g. '01', '02', '03', etc.)
 
         Returns:
-            list: List of dictionaries containing Code and Name
+            list: List of rows containing code and name, served from the MaincodeCache
         """
-        return self.db.execute_query(
-            "SELECT DISTINCT code, name FROM Maincode WHERE recty = ? ORDER BY name",
-            (record_type,)
-        )
+        return self.maincodes.get_codes(record_type)
+
+    def get_main_code_name(self, record_type, code, default=None):
+        """
+        Get the name of a main code without querying the database.
+
+        Args:
+            record_type (str): Record type code
+            code (str): Classification code
+
+        Returns:
+            str: The name, or default if the code is unknown
+        """
+        return self.maincodes.name_for(record_type, code, default)
 
     def get_provinces(self):
         """Get all provinces."""
@@ -358,11 +614,16 @@ class DatabaseAPI:
         Returns:
             bool: True if successful, False otherwise
         """
-        return self.db.execute_query(
+        result = self.db.execute_query(
             "INSERT INTO Maincode (recty, code, name, description) VALUES (?, ?, ?, ?)",
             (record_type, code, name, description)
         )
 
+        if result:
+            self.maincodes.invalidate()
+
+        return result
+
     # Company Information Functions
 
     def get_company_info(self, company_code=None):
@@ -428,53 +689,431 @@ class DatabaseAPI:
 
     # Search & Report Functions
 
-    def search_properties(self, search_criteria):
+    def search_properties(self, search_criteria, after=None, limit=None, sort_by=None, descending=False,
+                          strict=False):
         """
         Search properties based on criteria.
 
         Args:
-            search_criteria (dict): Search criteria
+            search_criteria (SearchCriteria or dict): Search criteria
+            after (str or tuple, optional): Only return properties after this
+                keyset cursor (see build_search_query)
+            limit (int, optional): Maximum number of properties to return
+            sort_by (str, optional): Field to sort by instead of the code
+            descending (bool): Sort direction for sort_by
+            strict (bool): Raise database errors instead of logging them and
+                           returning None
+
+        Returns:
+            list: List of properties matching the criteria, in code order
+                  unless sort_by is given
+        """
+        query, values = self.build_search_query(search_criteria, after, limit, sort_by, descending)
+        return self.db.execute_query(query, values, strict=strict)
+
+    def search_properties_page(self, search_criteria, after=None, limit=SEARCH_PAGE_SIZE,
+                               sort_by=None, descending=False, strict=False):
+        """
+        Fetch one page of search results using keyset pagination.
+
+        Args:
+            search_criteria (SearchCriteria or dict): Search criteria
+            after (str or tuple, optional): next_after of the previous page
+            limit (int): Page size
+            sort_by (str, optional): Field to sort by instead of the code
+            descending (bool): Sort direction for sort_by
+            strict (bool): Raise database errors instead of returning an
+                           empty page (e.g. so a worker reports the failure)
+
+        Returns:
+            dict: 'results' (list of properties), 'total' (number of matches
+                  across all pages) and 'next_after' (value to pass as after
+                  for the next page with the same sort, or None on the last page)
+        """
+        criteria = self._as_criteria(search_criteria)
+
+        # Fetch one extra row to learn whether another page follows
+        results = self.search_properties(criteria, after, limit + 1, sort_by, descending, strict) or []
+        next_after = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_after = last['realstatecode'] if sort_by is None else (last[sort_by], last['realstatecode'])
+
+        return {
+            'results': results,
+            'total': self.count_properties(criteria, strict),
+            'next_after': next_after,
+        }
+
+    def iter_search_batches(self, search_criteria, batch_size=FETCH_BATCH_SIZE):
+        """
+        Stream every property matching the criteria without loading them all.
+
+        Args:
+            search_criteria (SearchCriteria or dict): Search criteria
+            batch_size (int): Number of rows fetched per round trip
+
+        Yields:
+            list: Batches of matching properties, in code order; database
+                  errors are raised rather than ending the stream early
+        """
+        query, values = self.build_search_query(search_criteria)
+        return self.db.iter_batches(query, values, batch_size, strict=True)
+
+    def count_properties(self, search_criteria, strict=False):
+        """
+        Count the properties matching the criteria.
+
+        Args:
+            search_criteria (SearchCriteria or dict): Search criteria
+            strict (bool): Raise database errors instead of logging them and
+                           returning 0
+
+        Returns:
+            int: Number of matching properties
+        """
+        criteria = self._as_criteria(search_criteria)
+        where_clause, values = criteria.to_sql()
+
+        # Only join the tables the predicates actually reference
+        query = "SELECT COUNT(*) AS count FROM Realstatspecification r"
+        if criteria.uses_field('o.'):
+            query += " LEFT JOIN Owners o ON r.Ownercode = o.Ownercode"
+        if criteria.uses_field('m1.'):
+            query += " LEFT JOIN Maincode m1 ON r.Rstatetcode = m1.code AND m1.recty = '03'"
+        if criteria.uses_field('m2.'):
+            query += " LEFT JOIN Maincode m2 ON r.Buildtcode = m2.code AND m2.recty = '04'"
+        if where_clause:
+            query += " WHERE " + where_clause
+
+        counts = self.db.execute_query(query, values, strict=strict)
+        return counts[0]['count'] if counts else 0
+
+    def get_search_summary(self, search_criteria):
+        """
+        Summarize the properties matching the criteria.
+
+        Args:
+            search_criteria (SearchCriteria or dict): Search criteria
 
         Returns:
-            list: List of properties matching the criteria
+            dict: count, avg_area, avg_bedrooms, corner (number of corner
+                  properties), types (list of (type name, count, average
+                  area), largest first) and bedrooms (bedroom count ->
+                  number of properties)
+        """
+        query, values = self.build_search_query(search_criteria)
+        totals = self.db.execute_query(f"""
+            SELECT COUNT(*) AS count, AVG("Property-area") AS avg_area,
+                   AVG("N-of-bedrooms") AS avg_bedrooms, TOTAL("Property-corner") AS corner
+            FROM ({query})
+        """, values)
+        types = self.db.execute_query(f"""
+            SELECT property_type, COUNT(*) AS count, AVG("Property-area") AS avg_area
+            FROM ({query}) GROUP BY property_type ORDER BY count DESC, property_type
+        """, values) or []
+        bedrooms = self.db.execute_query(f"""
+            SELECT "N-of-bedrooms" AS bedrooms, COUNT(*) AS count
+            FROM ({query}) WHERE "N-of-bedrooms" IS NOT NULL GROUP BY bedrooms ORDER BY bedrooms
+        """, values) or []
+
+        total = totals[0] if totals else {}
+        return {
+            'count': total.get('count') or 0,
+            'avg_area': total.get('avg_area'),
+            'avg_bedrooms': total.get('avg_bedrooms'),
+            'corner': int(total.get('corner') or 0),
+            'types': [(row['property_type'] or 'Not specified', row['count'], row['avg_area']) for row in types],
+            'bedrooms': {row['bedrooms']: row['count'] for row in bedrooms},
+        }
+
+    def build_search_query(self, search_criteria, after=None, limit=None, sort_by=None, descending=False):
         """
-        where_clauses = []
+        Build the SQL for a property search.
+
+        Args:
+            search_criteria (SearchCriteria or dict): Search criteria. A dict maps
+                column names to values; string values containing '%' use LIKE.
+            after (str or tuple, optional): Keyset pagination cursor: a
+                realstatecode, or (sort_by value, realstatecode) when sorted
+            limit (int, optional): Maximum number of rows
+            sort_by (str, optional): Field to sort by (see sort_keyset);
+                results are in code order otherwise
+            descending (bool): Sort direction for sort_by
+
+        Returns:
+            tuple: (query, parameters)
+        """
+        where_clause, values = self._as_criteria(search_criteria).to_sql()
+        where_clauses = [where_clause] if where_clause else []
+        values = list(values)
+
+        if sort_by is None:
+            order_by = "r.realstatecode"
+            if after is not None:
+                where_clauses.append("r.realstatecode > ?")
+                values.append(after)
+        else:
+            order_by, predicate, after_values = sort_keyset(sort_by, descending, after)
+            if predicate:
+                where_clauses.append(f"({predicate})")
+                values.extend(after_values)
+
+        query = PROPERTY_SELECT
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+        query += " ORDER BY " + order_by
+
+        if limit is not None:
+            query += " LIMIT ?"
+            values.append(limit)
+
+        return query, tuple(values)
+
+    @staticmethod
+    def _as_criteria(search_criteria):
+        """Accept either a SearchCriteria or a legacy criteria dict."""
+        if isinstance(search_criteria, SearchCriteria):
+            return search_criteria
+        return SearchCriteria.from_dict(search_criteria or {})
+
+    # Full-Text Search Functions
+
+    @property
+    def full_text_enabled(self):
+        """True if the FTS5 search index is available."""
+        return self.db.fts_enabled
+
+    def full_text_search(self, query, limit=20, kind=None):
+        """
+        Search property addresses/descriptions and owner names/phones/notes.
+
+        Every word in query is matched as a prefix. Results are ranked with
+        bm25, weighting the title (address or owner name) above the body.
+
+        Args:
+            query (str): Free text to search for
+            limit (int, optional): Maximum number of results, None for all
+            kind (str, optional): 'property' or 'owner' to restrict the results
+
+        Returns:
+            list: Rows with kind, code, title (matches wrapped in [ ]),
+                  snippet (body excerpt with matches wrapped in [ ]) and rank
+                  (lower is better)
+        """
+        expression = fts_match_query(query)
+        if not expression:
+            return []
+
+        if not self.db.fts_enabled:
+            return self._like_text_search(query, limit, kind)
+
+        sql = """
+            SELECT d.kind, d.code,
+                   highlight(search_fts, 0, '[', ']') AS title,
+                   snippet(search_fts, 1, '[', ']', '...', 12) AS snippet,
+                   bm25(search_fts, 10.0, 1.0) AS rank
+            FROM search_fts
+            CROSS JOIN fts_docs d ON d.docid = search_fts.rowid
+            WHERE search_fts MATCH ?
+        """
+        values = [expression]
+        if kind:
+            sql += " AND d.kind = ?"
+            values.append(kind)
+        sql += " ORDER BY rank LIMIT ?"
+        values.append(-1 if limit is None else limit)
+
+        return self.db.execute_query(sql, tuple(values)) or []
+
+    def search_owners(self, query, limit=OWNER_SEARCH_LIMIT):
+        """
+        Find owners by name, phone prefix or note words.
+
+        Args:
+            query (str): Free text to search for
+            limit (int, optional): Maximum number of owners, None for all;
+                                   ask for one more than will be shown to
+                                   learn whether more owners match
+
+        Returns:
+            list: Owner rows, best matches first
+        """
+        matches = self.full_text_search(query, limit, kind='owner')
+        if not matches:
+            return []
+
+        codes = [match['code'] for match in matches]
+        owners = []
+        # Stay below SQLite's limit on bound parameters
+        for start in range(0, len(codes), FETCH_BATCH_SIZE):
+            chunk = codes[start:start + FETCH_BATCH_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            owners += self.db.execute_query(
+                f"SELECT * FROM Owners WHERE Ownercode IN ({placeholders})", tuple(chunk)
+            ) or []
+
+        # Keep the relevance order of the full-text matches
+        position = {code: i for i, code in enumerate(codes)}
+        return sorted(owners, key=lambda owner: position[owner['Ownercode']])
+
+    def _like_text_search(self, query, limit, kind):
+        """Full-text search fallback for SQLite builds without FTS5."""
+        pattern = f"%{query.strip()}%"
+        parts = []
         values = []
+        if kind in (None, 'property'):
+            parts.append("""
+                SELECT 'property' AS kind, realstatecode AS code, "Property-address" AS title,
+                       Descriptions AS snippet, 0 AS rank
+                FROM Realstatspecification
+                WHERE "Property-address" LIKE ? OR Descriptions LIKE ?""")
+            values += [pattern, pattern]
+        if kind in (None, 'owner'):
+            parts.append("""
+                SELECT 'owner' AS kind, Ownercode AS code, ownername AS title,
+                       Note AS snippet, 0 AS rank
+                FROM Owners
+                WHERE ownername LIKE ? OR ownerphone LIKE ? OR Note LIKE ?""")
+            values += [pattern, pattern, pattern]
+
+        sql = " UNION ALL ".join(parts) + " LIMIT ?"
+        values.append(-1 if limit is None else limit)
+        return self.db.execute_query(sql, tuple(values)) or []
+
+    def rebuild_search_index(self):
+        """Repopulate the full-text search index from the property and owner tables."""
+        return self.db.rebuild_search_index()
+
+    # Import Functions
+
+    def import_csv(self, path, kind, column_map=None, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+        """
+        Import owners or properties from a CSV file.
+
+        Rows are streamed and inserted in chunked transactions; invalid rows
+        are reported and skipped. See BulkImporter for column matching.
+
+        Args:
+            path (str): Path of the CSV file (first row is the header)
+            kind (str): 'owners' or 'properties'
+            column_map (dict, optional): CSV header -> table column
+            chunk_size (int): Rows inserted per transaction
+            progress (callable, optional): Called with the ImportReport after each
+                                           chunk; returning False stops the import
 
-        # Build WHERE clause based on search criteria
-        for field, value in search_criteria.items():
-            if value is not None and value != "":
-                if isinstance(value, str) and '%' in value:
-                    # For LIKE searches
-                    where_clauses.append(f'"{field}" LIKE ?' if '-' in field else f"{field} LIKE ?")
-                else:
-                    # For exact matches
-                    where_clauses.append(f'"{field}" = ?' if '-' in field else f"{field} = ?")
-                values.append(value)
-
-        # Default query if no criteria provided
-        if not where_clauses:
-            return self.get_all_properties()
-
-        # Build the full query
-        where_clause = " AND ".join(where_clauses)
-
-        query = f"""
-            SELECT r.*, o.ownername, m1.name as property_type, m2.name as building_type
-            FROM Realstatspecification r
-            LEFT JOIN Owners o ON r.Ownercode = o.Ownercode
-            LEFT JOIN Maincode m1 ON r.Rstatetcode = m1.code AND m1.recty = '03'
-            LEFT JOIN Maincode m2 ON r.Buildtcode = m2.code AND m2.recty = '04'
-            WHERE {where_clause}
-            ORDER BY r.realstatecode
+        Returns:
+            ImportReport: Counts and row errors of the import
         """
+        importer = BulkImporter(self, kind, chunk_size=chunk_size, column_map=column_map, progress=progress)
+        report = importer.import_file(path)
 
-        return self.db.execute_query(query, tuple(values))
+        # Views patching from the change log would fetch every imported row;
+        # trimming the log makes them reload instead
+        if kind == 'properties' and report.imported > PROPERTY_CHANGE_LOG_SIZE:
+            self.prune_property_changes()
+        return report
+
+    # Dashboard Functions
+
+    def get_dashboard_stats(self, limit=None):
+        """
+        Get property statistics per type, province, offer type and owner.
+
+        Reads the trigger-maintained statistics tables, so the cost depends on
+        the number of groups rather than the number of properties.
+
+        Args:
+            limit (int, optional): Maximum number of groups per dimension,
+                                   largest groups first
+
+        Returns:
+            dict: 'total' maps to the statistics of all properties; 'type',
+                  'province', 'offer' and 'owner' map to lists of group
+                  statistics sorted by count. Each statistics dict has key,
+                  name, count, area_sum, avg_area, avg_bedrooms and bedrooms
+                  (bedroom count -> number of properties).
+        """
+        empty = {'key': '', 'name': 'All properties', 'count': 0, 'area_sum': 0.0,
+                 'avg_area': None, 'avg_bedrooms': None, 'bedrooms': {}}
+        stats = {'total': empty, 'type': [], 'province': [], 'offer': [], 'owner': []}
+
+        rows = self.db.execute_query("""
+            SELECT s.*, o.ownername
+            FROM property_stats s
+            LEFT JOIN Owners o ON s.dimension = 'owner' AND o.Ownercode = s.group_key
+            ORDER BY s.dimension, s.count DESC, s.group_key
+        """) or []
+        histogram = {}
+        for row in self.db.execute_query(
+            "SELECT dimension, group_key, bedrooms, count FROM property_bedroom_stats ORDER BY bedrooms"
+        ) or []:
+            histogram.setdefault((row['dimension'], row['group_key']), {})[row['bedrooms']] = row['count']
+
+        for row in rows:
+            dimension, key = row['dimension'], row['group_key']
+            if dimension == 'all':
+                name = empty['name']
+            elif dimension == 'owner':
+                name = row['ownername']
+            else:
+                name = self.get_main_code_name(DASHBOARD_NAME_TYPES[dimension], key)
+
+            group = {
+                'key': key,
+                'name': name or (key or 'Not specified'),
+                'count': row['count'],
+                'area_sum': row['area_sum'],
+                'avg_area': row['area_sum'] / row['area_count'] if row['area_count'] else None,
+                'avg_bedrooms': row['bedrooms_sum'] / row['bedrooms_count'] if row['bedrooms_count'] else None,
+                'bedrooms': histogram.get((dimension, key), {}),
+            }
+            if dimension == 'all':
+                stats['total'] = group
+            elif limit is None or len(stats[dimension]) < limit:
+                stats[dimension].append(group)
+
+        return stats
+
+    def rebuild_dashboard_stats(self):
+        """Recompute the dashboard statistics from the property table to repair drift."""
+        return self.db.rebuild_statistics()
+
+    # Diagnostics Functions
+
+    def get_query_stats(self, sort_by='total_ms', limit=None):
+        """
+        Get per-statement query statistics collected since start-up or the last reset.
+
+        Args:
+            sort_by (str): Statistic to sort by, descending ('total_ms', 'count',
+                           'mean_ms', 'p95_ms', 'p99_ms', 'max_ms' or 'rows')
+            limit (int, optional): Maximum number of statements
+
+        Returns:
+            list: One dict per normalized statement with count, total_ms, mean_ms,
+                  p50_ms, p95_ms, p99_ms, max_ms, rows and callers (function ->
+                  number of calls); empty if statistics are disabled
+        """
+        if self.db.query_stats is None:
+            return []
+        return self.db.query_stats.snapshot(sort_by, limit)
+
+    def reset_query_stats(self):
+        """Clear the collected query statistics."""
+        if self.db.query_stats is not None:
+            self.db.query_stats.reset()
 
     # Initial Setup Functions
 
     def insert_initial_data(self):
-        """Insert initial data into the database."""
+        """
+        Insert initial data into the database.
+
+        Returns:
+            bool: True if successful, False if an error occurred (nothing is inserted)
+        """
         # Insert initial main codes
         main_codes = [
             # Provinces (recty = 01)
@@ -514,29 +1153,35 @@ class DatabaseAPI:
             ('06', '06002', 'For Rent', 'Property for rent')
         ]
 
-        for code_data in main_codes:
-            self.db.execute_query(
-                "INSERT OR IGNORE INTO Maincode (recty, code, name, description) VALUES (?, ?, ?, ?)",
-                code_data
-            )
-
-        # Insert sample company if none exists
-        companies = self.db.execute_query("SELECT COUNT(*) as count FROM Companyinfo")
-
-        if companies[0]['count'] == 0:
-            self.db.execute_query(
-                """INSERT INTO Companyinfo (
-                    Companyco, Companyna, Cityco, Caddress, Cophoneno,
-                    Username, Password, SubscriptionTCode,
-                    Lastpayment, Subscriptionduration, Registrationdate
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                ('E901', 'Best Real Estate', '02001', '123 King St.', '07901234567',
-                 'admin', 'pass1234', '1',
-                 datetime.date.today().isoformat(), '3', datetime.date.today().isoformat())
-            )
-
-            # Set the company code
-            self.company_code = 'E901'
+        try:
+            with self.db.transaction():
+                self.db.execute_batch(
+                    "INSERT OR IGNORE INTO Maincode (recty, code, name, description) VALUES (?, ?, ?, ?)",
+                    main_codes, strict=True
+                )
+
+                # Insert sample company if none exists
+                companies = self.db.execute_query("SELECT COUNT(*) as count FROM Companyinfo", strict=True)
+
+                if companies[0]['count'] == 0:
+                    self.db.execute_query(
+                        """INSERT INTO Companyinfo (
+                            Companyco, Companyna, Cityco, Caddress, Cophoneno,
+                            Username, Password, SubscriptionTCode,
+                            Lastpayment, Subscriptionduration, Registrationdate
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        ('E901', 'Best Real Estate', '02001', '123 King St.', '07901234567',
+                         'admin', 'pass1234', '1',
+                         datetime.date.today().isoformat(), '3', datetime.date.today().isoformat()),
+                        strict=True
+                    )
+
+                    # Set the company code
+                    self.company_code = 'E901'
+        except sqlite3.Error:
+            return False
+        finally:
+            self.maincodes.invalidate()
 
         return True
 
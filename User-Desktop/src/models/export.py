@@ -0,0 +1,471 @@
+"""
+Streaming property export.
+Rows are read from a SQLite cursor in batches and written straight to the
+output file, so memory use does not grow with the number of exported rows.
+Output formats are registered in EXPORTERS and share one column projection
+(PROPERTY_EXPORT_COLUMNS). An export is meant to run on a worker thread; it
+reports progress through a callback and can be cancelled between batches.
+"""
+
+import csv
+import datetime
+import gzip
+import json
+import os
+import sqlite3
+from collections import namedtuple
+from operator import itemgetter
+
+from configs.database import Record
+from src.models.search_criteria import SearchCriteria
+
+# Rows fetched from SQLite and written per batch
+EXPORT_BATCH_SIZE = 1000
+
+# Directory exports are written to by default
+EXPORT_DIR = os.path.join(os.path.expanduser('~'), 'property_exports')
+
+# Credential columns blanked in database snapshots, which are made to be shared
+SNAPSHOT_REDACTED_COLUMNS = {
+    'Companyinfo': ('Username', 'Password'),
+}
+
+
+class ExportCancelled(Exception):
+    """Raised by PropertyExport.run() when the export was cancelled."""
+
+
+class ExportColumn(namedtuple('ExportColumn', ['header', 'field', 'format'])):
+    """An exported column: its header, the property field and a value formatter."""
+
+    def value(self, row):
+        value = row.get(self.field)
+        if self.format is not None:
+            return self.format(value)
+        return value
+
+
+def yes_no(value):
+    return 'Yes' if value else 'No'
+
+
+PROPERTY_EXPORT_COLUMNS = (
+    ExportColumn('Property Code', 'realstatecode', None),
+    ExportColumn('Property Type', 'property_type', None),
+    ExportColumn('Building Type', 'building_type', None),
+    ExportColumn('Area', 'Property-area', None),
+    ExportColumn('Bedrooms', 'N-of-bedrooms', None),
+    ExportColumn('Bathrooms', 'N-of-bathrooms', None),
+    ExportColumn('Corner Property', 'Property-corner', yes_no),
+    ExportColumn('Address', 'Property-address', None),
+    ExportColumn('Owner Name', 'ownername', None),
+    ExportColumn('Owner Code', 'Ownercode', None),
+    ExportColumn('Description', 'Descriptions', None),
+)
+
+
+def project(rows, columns=PROPERTY_EXPORT_COLUMNS):
+    """
+    Apply the column projection to a batch of rows.
+
+    Args:
+        rows (list): Property rows (dicts or Records)
+        columns (tuple): ExportColumns to project
+
+    Returns:
+        list: One list of values per row, in column order (None for missing values)
+    """
+    if rows and isinstance(rows[0], Record) and all(type(row) is type(rows[0]) for row in rows):
+        return _project_records(rows, columns)
+    return [[column.value(row) for column in columns] for row in rows]
+
+
+def _project_records(rows, columns):
+    """
+    Project Records of one statement by position.
+
+    The column positions are resolved once per batch instead of once per
+    value, which is most of the cost of projecting large exports.
+    """
+    record_type = type(rows[0])
+    missing = len(record_type._columns)
+    positions = []
+    for column in columns:
+        position = record_type._index.get(column.field)
+        if position is None:
+            position = record_type._folded_index.get(column.field.lower(), missing)
+        positions.append(position)
+
+    # Absent fields read the None appended after the row's own values
+    getter = itemgetter(*positions) if len(positions) > 1 else lambda values: (values[positions[0]],)
+    formatters = [(i, column.format) for i, column in enumerate(columns) if column.format is not None]
+    padding = (None,)
+
+    projected = []
+    for row in rows:
+        values = list(getter(tuple(row) + padding))
+        for i, formatter in formatters:
+            values[i] = formatter(values[i])
+        projected.append(values)
+    return projected
+
+
+def export_path(extension, directory=EXPORT_DIR):
+    """
+    Build a timestamped export file name, creating the directory if needed.
+
+    Args:
+        extension (str): File extension including the dot (e.g. '.csv.gz')
+        directory (str): Directory of the export
+
+    Returns:
+        str: Path of the new export file
+    """
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(directory, f'property_export_{timestamp}{extension}')
+
+
+def open_text(path, compress=False):
+    """Open a text file for writing, gzip-compressed if requested."""
+    if compress:
+        return gzip.open(path, 'wt', newline='', encoding='utf-8', compresslevel=6)
+    return open(path, 'w', newline='', encoding='utf-8')
+
+
+# Export Formats
+
+EXPORTERS = {}
+
+def register_exporter(cls):
+    """Class decorator adding an export format to EXPORTERS under its name."""
+    EXPORTERS[cls.name] = cls
+    return cls
+
+
+def get_exporter(name):
+    """
+    Get a registered export format.
+
+    Args:
+        name (str): Format name (e.g. 'csv', 'jsonl', 'xlsx', 'sqlite')
+
+    Returns:
+        type: The PropertyExport subclass of the format
+    """
+    try:
+        return EXPORTERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown export format: {name}")
+
+
+def available_exporters():
+    """Return the registered formats whose dependencies are installed, by name."""
+    return {name: cls for name, cls in EXPORTERS.items() if cls.available()}
+
+
+class PropertyExport:
+    """
+    Base class of the export formats.
+
+    run() streams the properties matching the criteria through the shared
+    column projection into the writer hooks (open_output, write_header,
+    write_rows, close_output) of a subclass. The file is written under a
+    temporary name and renamed when complete, so a cancelled or failed
+    export never leaves a truncated file behind.
+    """
+
+    name = None
+    label = None
+    extension = None
+    compressible = False
+
+    def __init__(self, path, criteria=None, compress=False, batch_size=EXPORT_BATCH_SIZE,
+                 columns=PROPERTY_EXPORT_COLUMNS, progress=None):
+        """
+        Initialize the export.
+
+        Args:
+            path (str): Output file
+            criteria (SearchCriteria, optional): Properties to export, defaults to all
+            compress (bool): Write gzip-compressed output (text formats only)
+            batch_size (int): Rows fetched and written per batch
+            columns (tuple): ExportColumns to write
+            progress (callable, optional): Called with (rows written, total rows)
+                                           after each batch, on the export thread
+        """
+        self.path = path
+        self.criteria = criteria if criteria is not None else SearchCriteria()
+        self.compress = compress and self.compressible
+        self.batch_size = batch_size
+        self.columns = columns
+        self.progress = progress
+        self.written = 0
+        self.total = None
+        self._cancelled = False
+
+    @classmethod
+    def available(cls):
+        """True if the format's dependencies are installed."""
+        return True
+
+    @classmethod
+    def default_extension(cls, compress=False):
+        """File extension of the format, with .gz when compressed."""
+        return cls.extension + ('.gz' if compress and cls.compressible else '')
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        """Stop the export after the batch being written."""
+        self._cancelled = True
+
+    def run(self, api):
+        """
+        Write the export.
+
+        Args:
+            api (DatabaseAPI): API to read from; with QueryExecutor.submit()
+                               this is the worker's API
+
+        Returns:
+            str: Path of the written file
+
+        Raises:
+            ExportCancelled: If cancel() was called before the export finished
+        """
+        self.total = api.count_properties(self.criteria)
+        partial = self.path + '.part'
+        try:
+            self.write(api, partial)
+            if self._cancelled:
+                raise ExportCancelled("Export cancelled")
+            os.replace(partial, self.path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return self.path
+
+    def write(self, api, path):
+        """Stream the matching rows into path."""
+        output = self.open_output(path)
+        try:
+            self.write_header(output)
+            self._report()
+            for batch in api.iter_search_batches(self.criteria, self.batch_size):
+                if self._cancelled:
+                    raise ExportCancelled("Export cancelled")
+                self.write_rows(output, project(batch, self.columns))
+                self.written += len(batch)
+                self._report()
+        finally:
+            self.close_output(output)
+
+    def headers(self):
+        return [column.header for column in self.columns]
+
+    def open_output(self, path):
+        raise NotImplementedError
+
+    def write_header(self, output):
+        pass
+
+    def write_rows(self, output, rows):
+        raise NotImplementedError
+
+    def close_output(self, output):
+        output.close()
+
+    def _report(self):
+        if self.progress is not None:
+            self.progress(self.written, max(self.total, self.written))
+
+
+@register_exporter
+class PropertyCsvExport(PropertyExport):
+    """Comma-separated values; missing values are written as empty cells."""
+
+    name = 'csv'
+    label = 'CSV'
+    extension = '.csv'
+    compressible = True
+
+    def open_output(self, path):
+        output = open_text(path, self.compress)
+        self.writer = csv.writer(output)
+        return output
+
+    def write_header(self, output):
+        self.writer.writerow(self.headers())
+
+    def write_rows(self, output, rows):
+        self.writer.writerows(['' if value is None else value for value in row] for row in rows)
+
+
+@register_exporter
+class PropertyJsonLinesExport(PropertyExport):
+    """One JSON object per line, keyed by column header; missing values are null."""
+
+    name = 'jsonl'
+    label = 'JSON Lines'
+    extension = '.jsonl'
+    compressible = True
+
+    def open_output(self, path):
+        self.encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+        return open_text(path, self.compress)
+
+    def write_rows(self, output, rows):
+        headers = self.headers()
+        encode = self.encoder.encode
+        output.write(''.join(encode(dict(zip(headers, row))) + '\n' for row in rows))
+
+
+@register_exporter
+class PropertyXlsxExport(PropertyExport):
+    """Excel workbook written with openpyxl's write-only mode, which streams rows to disk."""
+
+    name = 'xlsx'
+    label = 'Excel (XLSX)'
+    extension = '.xlsx'
+
+    @classmethod
+    def available(cls):
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def open_output(self, path):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("XLSX export requires the openpyxl package")
+
+        workbook = Workbook(write_only=True)
+        self.sheet = workbook.create_sheet('Properties')
+        self.output_path = path
+        return workbook
+
+    def write_header(self, output):
+        self.sheet.append(self.headers())
+
+    def write_rows(self, output, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close_output(self, output):
+        # A write-only workbook keeps rows in a temporary file until saved
+        output.save(self.output_path)
+
+
+@register_exporter
+class DatabaseSnapshotExport(PropertyExport):
+    """
+    Self-contained copy of the whole database made with VACUUM INTO.
+
+    The snapshot is transactionally consistent and compacted; it holds every
+    table, so the search criteria and columns do not apply. The credential
+    columns in SNAPSHOT_REDACTED_COLUMNS are blanked in the copy.
+    """
+
+    name = 'sqlite'
+    label = 'SQLite snapshot'
+    extension = '.db'
+
+    def write(self, api, path):
+        self._report()
+        if not api.db.snapshot(path):
+            raise RuntimeError("Could not write the database snapshot")
+        try:
+            self.redact(path)
+        except sqlite3.Error:
+            os.remove(path)
+            raise
+        self.written = self.total
+        self._report()
+
+    @staticmethod
+    def redact(path):
+        """
+        Blank the SNAPSHOT_REDACTED_COLUMNS in a snapshot file.
+
+        secure_delete overwrites the old values instead of leaving them in
+        free space of the copied pages.
+
+        Args:
+            path (str): Snapshot file
+        """
+        connection = sqlite3.connect(path)
+        try:
+            connection.execute("PRAGMA secure_delete = ON")
+            with connection:
+                for table, columns in SNAPSHOT_REDACTED_COLUMNS.items():
+                    assignments = ', '.join(f"{column} = NULL" for column in columns)
+                    connection.execute(f"UPDATE {table} SET {assignments}")
+        finally:
+            connection.close()
+
+
+@register_exporter
+class PropertyPdfExport(PropertyExport):
+    """
+    PDF report: summary statistics followed by a property table.
+
+    Rendering is done by src.models.reports on the export's thread; the
+    columns of the export do not apply.
+    """
+
+    name = 'pdf'
+    label = 'PDF report'
+    extension = '.pdf'
+    layout = 'table'
+
+    @classmethod
+    def available(cls):
+        from src.models.reports import reports_available
+        return reports_available()
+
+    def write(self, api, path):
+        from src.models.reports import PropertyReport
+
+        def progress(rendered, total):
+            self.written = rendered
+            self._report()
+
+        report = PropertyReport(self.criteria, layout=self.layout, progress=progress,
+                                cancelled=lambda: self._cancelled)
+        report.render(api, path)
+
+
+@register_exporter
+class PropertyBrochureExport(PropertyPdfExport):
+    """PDF catalogue with one brochure page (photos and details) per property."""
+
+    name = 'brochure'
+    label = 'PDF brochures'
+    layout = 'brochure'
+
+
+def write_csv(rows, path, columns=PROPERTY_EXPORT_COLUMNS, compress=False):
+    """
+    Write already loaded property rows to a CSV file.
+
+    Args:
+        rows (list): Property rows (dicts or Records)
+        path (str): Output file
+        columns (tuple): ExportColumns to write
+        compress (bool): Write gzip-compressed output
+
+    Returns:
+        int: Number of rows written
+    """
+    with open_text(path, compress) as output:
+        writer = csv.writer(output)
+        writer.writerow([column.header for column in columns])
+        writer.writerows(['' if value is None else value for value in row] for row in project(rows, columns))
+    return len(rows)
@@ -1,3 +1,8 @@
+import threading
+import time
+from collections import namedtuple
+
+
 class Maincode:
     def __init__(self, recty, code, name, description):
         self.recty = recty
@@ -15,4 +20,119 @@ class Maincode:
             code=data.get('Code'),
             name=data.get('Name'),
             description=data.get('Description')
-        )
\ No newline at end of file
+        )
+
+# One consistent copy of the Maincode table. Loads build a new snapshot and
+# swap it in with a single assignment, so readers never see a mix of old and
+# new lookups.
+MaincodeSnapshot = namedtuple('MaincodeSnapshot', ('rows', 'names', 'codes', 'version'))
+
+
+class MaincodeCache:
+    """
+    In-memory copy of the Maincode lookup table.
+
+    All record types are loaded with one query and then served from memory.
+    The cache reloads itself after invalidate() (called by writers) or when
+    the maincode_version counter, which triggers bump on every change to
+    Maincode from any connection or thread, differs from the version it
+    loaded; that check runs at most once per check_interval.
+    The cache may be shared between threads.
+    """
+
+    def __init__(self, db, check_interval=2.0):
+        """
+        Initialize the cache.
+
+        Args:
+            db (DatabaseManager): Database to load lookup codes from
+            check_interval (float): Minimum seconds between version checks
+        """
+        self.db = db
+        self.check_interval = check_interval
+        self._snapshot = None   # MaincodeSnapshot, or None until loaded
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load every record type from the database."""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        """Build a new snapshot and swap it in; the caller holds the lock."""
+        version = self._current_version()
+        rows = self.db.execute_query(
+            "SELECT Recty AS recty, Code AS code, Name AS name, Description AS description "
+            "FROM Maincode ORDER BY Recty, Name"
+        ) or []
+
+        by_type = {}
+        for row in rows:
+            by_type.setdefault(row['recty'], []).append(row)
+
+        snapshot = MaincodeSnapshot(
+            rows={recty: tuple(items) for recty, items in by_type.items()},
+            names={recty: {row['code']: row['name'] for row in items} for recty, items in by_type.items()},
+            codes={recty: {row['name']: row['code'] for row in items} for recty, items in by_type.items()},
+            version=version,
+        )
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        return snapshot
+
+    def invalidate(self):
+        """Drop the cached codes; the next lookup reloads them."""
+        with self._lock:
+            self._snapshot = None
+
+    def get_codes(self, record_type):
+        """
+        Get the codes of one record type.
+
+        Args:
+            record_type (str): Record type code (e.g. '01', '02', '03', etc.)
+
+        Returns:
+            list: Rows with code and name, ordered by name
+        """
+        return list(self._ensure_fresh().rows.get(record_type, ()))
+
+    def name_for(self, record_type, code, default=None):
+        """Return the name of a code, or default if it is unknown."""
+        return self._ensure_fresh().names.get(record_type, {}).get(code, default)
+
+    def code_for(self, record_type, name, default=None):
+        """Return the code for a name, or default if it is unknown."""
+        return self._ensure_fresh().codes.get(record_type, {}).get(name, default)
+
+    def _ensure_fresh(self):
+        """
+        Return a current snapshot, reloading it if it is missing or stale.
+
+        Returns:
+            MaincodeSnapshot: Snapshot to serve the lookup from
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while this one waited
+            snapshot = self._snapshot
+            if snapshot is None:
+                return self._load()
+
+            now = time.monotonic()
+            if now - self._checked_at < self.check_interval:
+                return snapshot
+            self._checked_at = now
+
+            if self._current_version() != snapshot.version:
+                return self._load()
+            return snapshot
+
+    def _current_version(self):
+        """Return the maincode_version counter, which changes on every commit to Maincode."""
+        rows = self.db.execute_query("SELECT version FROM maincode_version WHERE id = 1")
+        return rows[0][0] if rows else None
@@ -0,0 +1,246 @@
+"""
+Content-addressed photo store.
+Each photo file is stored once, named after the BLAKE2b hash of its bytes,
+in a sharded directory tree (<root>/ab/cd/abcd...<ext>) so no directory
+grows too large. The extension is kept for viewers but is not part of the
+key: the same bytes saved as .jpg and .jpeg are one file. realstatephotos rows reference the file by hash, so the
+same photo attached to several listings is stored only once.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from configs import settings
+
+logger = logging.getLogger('database')
+
+# Bytes of the BLAKE2b digest (64 hex characters)
+PHOTO_HASH_SIZE = 32
+
+# Bytes read per call while hashing
+PHOTO_READ_SIZE = 1024 * 1024
+
+# Seconds an unreferenced file is kept before prune() removes it, so a
+# photo stored moments ago is not removed before its row is written
+PHOTO_PRUNE_GRACE = 3600
+
+# Store used when settings.PHOTO_STORE_DIR is not set
+DEFAULT_PHOTO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                 'data', 'photos')
+
+# Directory inside the store holding files being copied in
+INCOMING_DIR = 'incoming'
+
+# Result of adding one file: the stored hash and path, whether the content
+# was already stored, or the error that prevented storing it
+StoredPhoto = namedtuple('StoredPhoto', ['source', 'digest', 'extension', 'size', 'path', 'duplicate', 'error'])
+
+
+def hash_file(path):
+    """
+    Hash a file's contents.
+
+    Args:
+        path (str): File to hash
+
+    Returns:
+        tuple: (hex digest, size in bytes)
+    """
+    digest = hashlib.blake2b(digest_size=PHOTO_HASH_SIZE)
+    size = 0
+    with open(path, 'rb') as photo_file:
+        # hashlib releases the GIL on large buffers, so ingest threads hash in parallel
+        while True:
+            chunk = photo_file.read(PHOTO_READ_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def normalize_extension(extension):
+    """Lower-case an extension and make sure it starts with a dot ('JPG' -> '.jpg')."""
+    extension = (extension or '').lower()
+    if extension and not extension.startswith('.'):
+        extension = '.' + extension
+    return extension
+
+
+class PhotoStore:
+    """Files stored by content hash under one root directory."""
+
+    def __init__(self, root=None, workers=None):
+        """
+        Initialize the store.
+
+        Args:
+            root (str, optional): Store directory, defaults to settings.PHOTO_STORE_DIR
+                                  or DEFAULT_PHOTO_DIR
+            workers (int, optional): Threads used by ingest(), defaults to
+                                     settings.PHOTO_INGEST_WORKERS
+        """
+        self.root = root or settings.PHOTO_STORE_DIR or DEFAULT_PHOTO_DIR
+        self.workers = workers or settings.PHOTO_INGEST_WORKERS
+        # Serializes the existence check and rename of add_file()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def shard(digest):
+        """Relative directory of a hash ('abcd...' -> 'ab/cd')."""
+        return f"{digest[:2]}/{digest[2:4]}"
+
+    def path_for(self, digest, extension):
+        """Path of the stored file with the given hash and extension."""
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + normalize_extension(extension))
+
+    def find(self, digest):
+        """Return the stored file with the given hash, whatever its extension, or None."""
+        directory = os.path.join(self.root, digest[:2], digest[2:4])
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if os.path.splitext(name)[0] == digest:
+                return os.path.join(directory, name)
+        return None
+
+    def _existing(self, source, digest, size):
+        """Return a StoredPhoto for content already in the store, or None."""
+        path = self.find(digest)
+        if path is None:
+            return None
+        try:
+            # Restart the prune grace period of a file about to be referenced again
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return StoredPhoto(source, digest, os.path.splitext(path)[1], size, path, True, None)
+
+    def photo_file(self, photo):
+        """
+        Return the file of a realstatephotos row.
+
+        Rows added before the store existed have no hash; their file is
+        Storagepath + photofilename + Photoextension.
+        """
+        if photo.get('photohash'):
+            return self.path_for(photo['photohash'], photo.get('Photoextension'))
+        return os.path.join(photo.get('Storagepath') or '',
+                            (photo.get('photofilename') or '') + (photo.get('Photoextension') or ''))
+
+    def add_file(self, source):
+        """
+        Store a file unless a file with the same content is already stored.
+
+        The copy is written to the store's incoming directory and renamed into
+        place, so readers never see a partial file. Content that is already
+        stored under another extension is not stored again; the result then
+        has the extension of the stored file.
+
+        Args:
+            source (str): File to store
+
+        Returns:
+            StoredPhoto: The stored file (error is None)
+
+        Raises:
+            OSError: If the file cannot be read or copied
+        """
+        extension = normalize_extension(os.path.splitext(source)[1])
+        digest, size = hash_file(source)
+        existing = self._existing(source, digest, size)
+        if existing is not None:
+            return existing
+
+        target = self.path_for(digest, extension)
+        incoming = os.path.join(self.root, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=incoming, suffix=extension)
+        os.close(fd)
+        try:
+            shutil.copyfile(source, partial)
+            with self._lock:
+                # Another thread may have stored the same content meanwhile
+                existing = self._existing(source, digest, size)
+                if existing is None:
+                    os.replace(partial, target)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        if existing is not None:
+            os.remove(partial)
+            return existing
+        return StoredPhoto(source, digest, extension, size, target, False, None)
+
+    def ingest(self, sources, progress=None):
+        """
+        Store several files in parallel.
+
+        A file that cannot be stored is reported in its result rather than
+        stopping the others.
+
+        Args:
+            sources (list): Files to store
+            progress (callable, optional): Called with (files done, total) as
+                                           each file finishes, on a worker thread
+
+        Returns:
+            list: One StoredPhoto per source, in the order given
+        """
+        sources = list(sources)
+        results = [None] * len(sources)
+        if not sources:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(sources)),
+                                thread_name_prefix='photo-ingest') as pool:
+            futures = {pool.submit(self.add_file, source): i for i, source in enumerate(sources)}
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except OSError as e:
+                    logger.warning(f"Could not store photo {sources[i]}: {e}")
+                    results[i] = StoredPhoto(sources[i], None, None, 0, None, False, str(e))
+                if progress is not None:
+                    progress(done, len(sources))
+        return results
+
+    def prune(self, referenced, grace=PHOTO_PRUNE_GRACE):
+        """
+        Remove stored files whose hash is no longer referenced.
+
+        Args:
+            referenced (set): Hashes still referenced by realstatephotos
+            grace (float): Only remove files older than this many seconds
+
+        Returns:
+            int: Number of files removed
+        """
+        cutoff = time.time() - grace
+        removed = 0
+        for directory, _, files in os.walk(self.root):
+            in_incoming = os.path.basename(directory) == INCOMING_DIR
+            for name in files:
+                path = os.path.join(directory, name)
+                digest = os.path.splitext(name)[0]
+                if not in_incoming and digest in referenced:
+                    continue
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError as e:
+                    logger.warning(f"Could not remove stored photo {path}: {e}")
+        return removed
@@ -0,0 +1,125 @@
+"""
+Paging data source behind the property management list.
+Rows are loaded a page at a time in property code order and kept current
+from the property change log, so showing the list again only fetches the
+rows that were added, edited or deleted in the meantime.
+"""
+
+from bisect import bisect_left
+
+from src.models.search_criteria import SearchCriteria
+
+# Properties fetched per page while scrolling
+PROPERTY_PAGE_SIZE = 100
+
+
+class PropertyListSource:
+    """
+    Loaded prefix of the property list, patched in place on refresh().
+
+    rows and codes are parallel lists sorted by property code; only the
+    pages the user scrolled to are loaded.
+    """
+
+    def __init__(self, api, page_size=PROPERTY_PAGE_SIZE):
+        """
+        Initialize an empty source.
+
+        Args:
+            api (DatabaseAPI): API the rows are read from
+            page_size (int): Number of properties fetched per page
+        """
+        self.api = api
+        self.page_size = page_size
+        self.rows = []
+        self.codes = []
+        self.exhausted = False
+        self.change_seq = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def loaded(self):
+        """True once the first page has been loaded."""
+        return self.change_seq is not None
+
+    def load(self):
+        """
+        Discard the loaded rows and load the first page.
+
+        Returns:
+            list: The rows of the first page
+        """
+        # Read the change position first: anything changed while the page
+        # loads is replayed by the next refresh()
+        self.change_seq = self.api.latest_property_change()
+        self.rows = []
+        self.codes = []
+        self.exhausted = False
+        return self.load_more()
+
+    def load_more(self):
+        """
+        Load the next page after the last loaded property.
+
+        Returns:
+            list: The appended rows (empty when everything is loaded)
+        """
+        if self.exhausted:
+            return []
+
+        after = self.codes[-1] if self.codes else None
+        page = self.api.search_properties(SearchCriteria(), after=after, limit=self.page_size) or []
+        self.rows.extend(page)
+        self.codes.extend(row['realstatecode'] for row in page)
+        self.exhausted = len(page) < self.page_size
+        return page
+
+    def refresh(self):
+        """
+        Apply the property changes logged since the last load or refresh.
+
+        Returns:
+            list: Patches applied to rows, in order; each is ('insert', index, row),
+                  ('update', index, row) or ('remove', index, None). None if the
+                  list had to be reloaded instead.
+        """
+        if not self.loaded:
+            self.load()
+            return None
+
+        latest, changed = self.api.get_property_changes(self.change_seq)
+        if changed is None:
+            self.load()
+            return None
+
+        self.change_seq = latest
+        if not changed:
+            return []
+
+        current = {row['realstatecode']: row for row in self.api.get_properties_by_codes(changed)}
+        patches = []
+        for code in sorted(changed):
+            index = bisect_left(self.codes, code)
+            present = index < len(self.codes) and self.codes[index] == code
+            row = current.get(code)
+
+            if row is None or not self._in_loaded_range(code):
+                if present:
+                    del self.rows[index]
+                    del self.codes[index]
+                    patches.append(('remove', index, None))
+            elif present:
+                self.rows[index] = row
+                patches.append(('update', index, row))
+            else:
+                self.rows.insert(index, row)
+                self.codes.insert(index, code)
+                patches.append(('insert', index, row))
+
+        return patches
+
+    def _in_loaded_range(self, code):
+        """True if code falls within the loaded pages; later rows arrive with load_more()."""
+        return self.exhausted or (bool(self.codes) and code <= self.codes[-1])
@@ -0,0 +1,237 @@
+"""
+Background query executor.
+DatabaseAPI calls submitted here run on a worker thread, which gets its own
+SQLite connection from the DatabaseManager pool, so a slow query never
+blocks the Kivy main thread. Each call returns a Future; results can also be
+delivered to callbacks that run on the main thread via Clock.schedule_once.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import CancelledError, Future
+
+from src.models.database_api import get_api
+
+logger = logging.getLogger('database')
+
+# SQLite virtual machine instructions between two cancellation checks
+PROGRESS_INTERVAL = 1000
+
+
+class QueryCancelled(CancelledError):
+    """Set on the future of a request that was cancelled while it was running."""
+
+
+def kivy_dispatch(callback):
+    """Run callback on the Kivy main thread at the next frame."""
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback(), 0)
+
+
+class QueryRequest:
+    """A submitted call and the future its result is delivered to."""
+
+    def __init__(self, func, args, kwargs, key=None):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.future = Future()
+        self.cancelled = False
+
+    def run(self, api):
+        """Run the call against the worker's DatabaseAPI."""
+        if isinstance(self.func, str):
+            return getattr(api, self.func)(*self.args, **self.kwargs)
+        return self.func(api, *self.args, **self.kwargs)
+
+
+class QueryExecutor:
+    """
+    Runs DatabaseAPI calls on a single worker thread.
+
+    Requests run in submission order on the worker's own pooled connection,
+    which the main thread never touches. Requests submitted with a key
+    replace the previous request with that key: a queued one is dropped, a
+    running one is aborted through sqlite3's progress handler and interrupt().
+
+    In-memory databases have a single connection shared by all threads; for
+    those the requests run inline on the calling thread.
+    """
+
+    def __init__(self, api=None, dispatch=kivy_dispatch):
+        """
+        Initialize the executor.
+
+        Args:
+            api (DatabaseAPI, optional): API the requests run against,
+                                         defaults to get_api()
+            dispatch (callable, optional): Schedules a zero-argument callback
+                                           on the UI thread
+        """
+        self.api = api or get_api()
+        self.dispatch = dispatch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = {}      # key -> latest request with that key
+        self._current = None    # request running on the worker
+        self._thread = None
+        self._worker_connection = None
+
+    @property
+    def inline(self):
+        """True if requests run on the calling thread (in-memory databases)."""
+        return self.api.db.db_path == ":memory:"
+
+    def submit(self, func, *args, key=None, on_result=None, on_error=None, **kwargs):
+        """
+        Queue a database call.
+
+        Args:
+            func (str or callable): Name of a DatabaseAPI method, or a callable
+                                    taking the worker's DatabaseAPI as first argument
+            *args: Positional arguments for the call
+            key (str, optional): Requests with the same key supersede each other
+            on_result (callable, optional): Called on the UI thread with the result
+            on_error (callable, optional): Called on the UI thread with the exception
+            **kwargs: Keyword arguments for the call
+
+        Returns:
+            Future: Resolves to the call's result; cancelled requests raise CancelledError
+        """
+        request = QueryRequest(func, args, kwargs, key)
+
+        with self._lock:
+            if key is not None:
+                stale = self._pending.get(key)
+                if stale is not None:
+                    self._cancel(stale)
+                self._pending[key] = request
+
+        if on_result or on_error:
+            request.future.add_done_callback(
+                lambda future: self._deliver(future, on_result, on_error)
+            )
+
+        if self.inline:
+            self._execute(request, self.api)
+        else:
+            self._ensure_worker()
+            self._queue.put(request)
+        return request.future
+
+    def cancel(self, key):
+        """Cancel the queued or running request with the given key."""
+        with self._lock:
+            request = self._pending.pop(key, None)
+            if request is not None:
+                self._cancel(request)
+
+    def shutdown(self, wait=True):
+        """Cancel pending requests and stop the worker thread."""
+        with self._lock:
+            for request in self._pending.values():
+                self._cancel(request)
+            self._pending.clear()
+
+        if self._thread is not None:
+            self._queue.put(None)
+            if wait:
+                self._thread.join()
+            self._thread = None
+
+    def _cancel(self, request):
+        """Mark a request cancelled and abort it if it is running (lock held)."""
+        request.cancelled = True
+        if request.future.cancel():
+            return
+        if self._current is request and self._worker_connection is not None:
+            # Aborts the statement that is running right now; the progress
+            # handler stops any further statements of the same request
+            self._worker_connection.interrupt()
+
+    def _ensure_worker(self):
+        """Start the worker thread on first use."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='query-executor', daemon=True)
+            self._thread.start()
+
+    def _open_worker_connection(self):
+        """Open the worker thread's pooled connection and hook up cancellation."""
+        connection = self.api.db.connection
+        if connection is not None:
+            connection.set_progress_handler(self._progress, PROGRESS_INTERVAL)
+        return connection
+
+    def _progress(self):
+        """SQLite progress handler: a non-zero return aborts the running statement."""
+        current = self._current
+        return 1 if current is not None and current.cancelled else 0
+
+    def _run(self):
+        """Worker thread loop."""
+        self._worker_connection = self._open_worker_connection()
+        try:
+            while True:
+                request = self._queue.get()
+                if request is None:
+                    break
+                if self._worker_connection is None:
+                    request.future.set_exception(RuntimeError("Query worker could not connect to the database"))
+                    continue
+                self._execute(request, self.api)
+        finally:
+            if self._worker_connection is not None:
+                self._worker_connection = None
+                self.api.db.release_connection()
+
+    def _execute(self, request, api):
+        """Run a request and resolve its future."""
+        if not request.future.set_running_or_notify_cancel():
+            return
+
+        with self._lock:
+            self._current = request
+        try:
+            result = request.run(api)
+            error = None
+        except Exception as e:
+            result, error = None, e
+        finally:
+            with self._lock:
+                self._current = None
+                if request.key is not None and self._pending.get(request.key) is request:
+                    del self._pending[request.key]
+
+        if request.cancelled:
+            request.future.set_exception(QueryCancelled(f"Request {request.key!r} was cancelled"))
+        elif error is not None:
+            logger.error(f"Background query failed: {error}")
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(result)
+
+    def _deliver(self, future, on_result, on_error):
+        """Hand a finished future to the UI callbacks; cancelled requests are dropped."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, CancelledError):
+            return
+        if error is not None:
+            if on_error:
+                self.dispatch(lambda: on_error(error))
+        elif on_result:
+            result = future.result()
+            self.dispatch(lambda: on_result(result))
+
+
+executor = None
+
+def get_executor():
+    """Get the shared query executor, creating it on first use."""
+    global executor
+    if executor is None:
+        executor = QueryExecutor()
+    return executor
@@ -0,0 +1,524 @@
+"""
+PDF property reports.
+Renders search-result reports (summary statistics followed by a property
+table) and brochure catalogues (one page per property with its photos) with
+ReportLab. Rows are streamed from the database in chunks and rendered on
+the calling thread, which in the app is the export worker.
+"""
+
+import datetime
+import math
+import os
+from functools import lru_cache
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from src.models.export import ExportCancelled
+from src.models.search_criteria import SearchCriteria
+
+# Properties read from the database and rendered per chunk
+REPORT_CHUNK_SIZE = 250
+
+# Rows of the property table per page
+TABLE_ROWS_PER_PAGE = 28
+
+# Height of every property table row in points. Cells are cut to a fixed
+# number of lines so a page always holds TABLE_ROWS_PER_PAGE rows and the
+# page count is known before rendering: 29 rows of 24 pt fit the 700 pt
+# below the A4 page header.
+TABLE_ROW_HEIGHT = 24
+
+# Lines of wrapped text per table cell (font size and leading of the cells)
+TABLE_CELL_LINES = 2
+TABLE_CELL_FONT_SIZE = 7.5
+TABLE_CELL_LEADING = 9
+
+# Horizontal padding ReportLab tables leave inside each cell
+TABLE_CELL_PADDING = 2 * 6
+
+# Photos shown on a brochure page
+BROCHURE_PHOTOS = 4
+
+# Resolution photos are downscaled to before they are embedded
+REPORT_IMAGE_DPI = 150
+
+# Decoded images kept per process (logo and recently used photos)
+REPORT_IMAGE_CACHE_SIZE = 64
+
+# Page margin in points (15 mm)
+PAGE_MARGIN = 15 * 72 / 25.4
+
+REPORT_LAYOUTS = ('table', 'brochure')
+
+
+def reports_available():
+    """True if ReportLab is installed."""
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def photo_path(photo):
+    """Return the file of a photo in a report chunk (resolved by DatabaseAPI.photo_file())."""
+    return photo['path']
+
+
+def body_pages(layout, count):
+    """Number of pages after the summary page for count properties."""
+    if layout == 'brochure':
+        return count
+    return math.ceil(count / TABLE_ROWS_PER_PAGE)
+
+
+def _format_number(value, digits=1):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:,.{digits}f}"
+    return f"{value:,}"
+
+
+# Rendering (styles and images are cached per process)
+
+@lru_cache(maxsize=None)
+def _styles():
+    """Paragraph and table styles, built once per process."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+
+    sample = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle('ReportTitle', parent=sample['Heading1'], fontSize=18, spaceAfter=6),
+        'heading': ParagraphStyle('ReportHeading', parent=sample['Heading2'], fontSize=13, spaceBefore=10),
+        'body': ParagraphStyle('ReportBody', parent=sample['BodyText'], fontSize=9, leading=12),
+        'table': TableStyle([
+            ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 8),
+            ('FONT', (0, 1), (-1, -1), 'Helvetica', TABLE_CELL_FONT_SIZE, TABLE_CELL_LEADING),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2e6da4')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f5f8')]),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#c8d0d8')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        'details': TableStyle([
+            ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 9),
+            ('FONT', (1, 0), (1, -1), 'Helvetica', 9),
+            ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.HexColor('#c8d0d8')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]),
+    }
+
+
+@lru_cache(maxsize=REPORT_IMAGE_CACHE_SIZE)
+def _load_image(path, modified, width, height):
+    """
+    Decode an image downscaled to the size it is printed at.
+
+    Cached by path and modification time, so a logo or photo used on many
+    pages is decoded and compressed only once per process.
+
+    Returns:
+        ImageReader: The image, or None if it cannot be read
+    """
+    from PIL import Image
+    from reportlab.lib.utils import ImageReader
+
+    pixels = (max(1, int(width / 72 * REPORT_IMAGE_DPI)), max(1, int(height / 72 * REPORT_IMAGE_DPI)))
+    try:
+        with Image.open(path) as image:
+            # Lets the JPEG decoder skip detail that would be thrown away
+            image.draft('RGB', pixels)
+            image.thumbnail(pixels)
+            buffer = BytesIO()
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image.save(buffer, 'PNG', optimize=False)
+            else:
+                image.convert('RGB').save(buffer, 'JPEG', quality=80)
+    except (OSError, ValueError):
+        return None
+    buffer.seek(0)
+    return ImageReader(buffer)
+
+
+def report_image(path, width, height):
+    """Return the cached ImageReader of a file for a box of width x height points, or None."""
+    try:
+        modified = os.path.getmtime(path)
+    except OSError:
+        return None
+    return _load_image(path, modified, width, height)
+
+
+class PageWriter:
+    """
+    Canvas wrapper drawing the shared page frame.
+
+    The header (company, title, logo) is drawn once into a PDF form
+    XObject and referenced from every page, so it is stored once per file.
+    """
+
+    margin = PAGE_MARGIN
+
+    def __init__(self, path, header, total_pages):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        self.width, self.height = A4
+        self.total_pages = total_pages
+        self.canvas = canvas.Canvas(path, pagesize=A4, pageCompression=1)
+        self.canvas.setTitle(header['title'])
+        self.canvas.setAuthor(header['company'])
+        self._define_header(header)
+
+    def _define_header(self, header):
+        c = self.canvas
+        c.beginForm('page_header')
+        top = self.height - self.margin
+        logo = report_image(header['logo'], 40, 40) if header.get('logo') else None
+        text_x = self.margin
+        if logo is not None:
+            c.drawImage(logo, self.margin, top - 40, 40, 40, preserveAspectRatio=True, mask='auto')
+            text_x += 48
+        c.setFont('Helvetica-Bold', 12)
+        c.drawString(text_x, top - 14, header['company'])
+        c.setFont('Helvetica', 9)
+        c.drawString(text_x, top - 28, header['title'])
+        c.drawRightString(self.width - self.margin, top - 14, header['generated'])
+        c.setLineWidth(0.5)
+        c.line(self.margin, top - 46, self.width - self.margin, top - 46)
+        c.endForm()
+
+    @property
+    def body_top(self):
+        """Top of the area below the header."""
+        return self.height - self.margin - 56
+
+    @property
+    def body_width(self):
+        return self.width - 2 * self.margin
+
+    def finish_page(self, number):
+        """Draw the header and footer and start a new page."""
+        c = self.canvas
+        c.doForm('page_header')
+        c.setFont('Helvetica', 8)
+        c.drawCentredString(self.width / 2, self.margin / 2, f"Page {number} of {self.total_pages}")
+        c.showPage()
+
+    def save(self):
+        self.canvas.save()
+
+
+def _paragraph(text, style):
+    from reportlab.platypus import Paragraph
+    return Paragraph(escape(str(text)) if text is not None else '', _styles()[style])
+
+
+def draw_summary(writer, summary, criteria_text):
+    """Draw the summary statistics page."""
+    from reportlab.platypus import KeepInFrame, Table
+
+    styles = _styles()
+    rows = [
+        ['Properties', _format_number(summary['count'])],
+        ['Average area', _format_number(summary['avg_area'])],
+        ['Average bedrooms', _format_number(summary['avg_bedrooms'])],
+        ['Corner properties', _format_number(summary['corner'])],
+    ]
+    totals = Table(rows, colWidths=[writer.body_width * 0.4, writer.body_width * 0.3], hAlign='LEFT')
+    totals.setStyle(styles['details'])
+
+    types = Table(
+        [['Property type', 'Properties', 'Average area']] +
+        [[name, _format_number(count), _format_number(avg_area)] for name, count, avg_area in summary['types']],
+        colWidths=[writer.body_width * 0.4, writer.body_width * 0.2, writer.body_width * 0.2],
+        hAlign='LEFT'
+    )
+    types.setStyle(styles['table'])
+
+    bedrooms = Table(
+        [['Bedrooms', 'Properties']] +
+        [[_format_number(n), _format_number(count)] for n, count in summary['bedrooms'].items()],
+        colWidths=[writer.body_width * 0.2, writer.body_width * 0.2],
+        hAlign='LEFT'
+    )
+    bedrooms.setStyle(styles['table'])
+
+    content = [
+        _paragraph('Property Report Summary', 'title'),
+        _paragraph(criteria_text, 'body'),
+        totals,
+        _paragraph('By property type', 'heading'),
+        types,
+        _paragraph('By number of bedrooms', 'heading'),
+        bedrooms,
+    ]
+    height = writer.body_top - writer.margin
+    frame = KeepInFrame(writer.body_width, height, content, mode='truncate')
+    _, used = frame.wrapOn(writer.canvas, writer.body_width, height)
+    frame.drawOn(writer.canvas, writer.margin, writer.body_top - used)
+
+
+# Column header, property field and width (fraction of the page) of the table layout
+TABLE_COLUMNS = (
+    ('Code', 'realstatecode', 0.11),
+    ('Type', 'property_type', 0.12),
+    ('Building', 'building_type', 0.11),
+    ('Area', 'Property-area', 0.08),
+    ('Beds', 'N-of-bedrooms', 0.06),
+    ('Baths', 'N-of-bathrooms', 0.06),
+    ('Owner', 'ownername', 0.16),
+    ('Address', 'Property-address', 0.30),
+)
+
+
+# Table columns wrapped onto up to TABLE_CELL_LINES lines; other text keeps to one line
+WRAPPED_TABLE_FIELDS = ('ownername', 'Property-address')
+
+
+def clip_lines(text, width, lines):
+    """
+    Wrap text to width and keep at most lines lines, ending cut text with an ellipsis.
+
+    Args:
+        text (str): Cell text
+        width (float): Available width in points
+        lines (int): Maximum number of lines
+
+    Returns:
+        str: The kept lines joined by newlines
+    """
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    wrapped = simpleSplit(text, 'Helvetica', TABLE_CELL_FONT_SIZE, width)
+    if len(wrapped) <= lines:
+        return '\n'.join(wrapped)
+
+    kept = wrapped[:lines]
+    last = kept[-1]
+    while last and stringWidth(last + '\u2026', 'Helvetica', TABLE_CELL_FONT_SIZE) > width:
+        last = last[:-1]
+    kept[-1] = last.rstrip() + '\u2026'
+    return '\n'.join(kept)
+
+
+def _table_cell(field, value, width):
+    if isinstance(value, (int, float)):
+        return _format_number(value)
+    if not value:
+        return ''
+    return clip_lines(str(value), width, TABLE_CELL_LINES if field in WRAPPED_TABLE_FIELDS else 1)
+
+
+def draw_table_page(writer, rows):
+    """
+    Draw one page of the property table.
+
+    Returns:
+        float: Height of the drawn table
+    """
+    from reportlab.platypus import Table
+
+    widths = [writer.body_width * width for _, _, width in TABLE_COLUMNS]
+    data = [[header for header, _, _ in TABLE_COLUMNS]]
+    for row in rows:
+        data.append([_table_cell(field, row.get(field), width - TABLE_CELL_PADDING)
+                     for (_, field, _), width in zip(TABLE_COLUMNS, widths)])
+    table = Table(data, colWidths=widths, rowHeights=[TABLE_ROW_HEIGHT] * len(data), repeatRows=1)
+    table.setStyle(_styles()['table'])
+    _, height = table.wrapOn(writer.canvas, writer.body_width, writer.body_top - writer.margin)
+    table.drawOn(writer.canvas, writer.margin, writer.body_top - height)
+    return height
+
+
+# Label and field of the details table on brochure pages
+BROCHURE_DETAILS = (
+    ('Property type', 'property_type'),
+    ('Building type', 'building_type'),
+    ('Area', 'Property-area'),
+    ('Bedrooms', 'N-of-bedrooms'),
+    ('Bathrooms', 'N-of-bathrooms'),
+    ('Corner property', 'Property-corner'),
+    ('Address', 'Property-address'),
+    ('Owner', 'ownername'),
+)
+
+
+def draw_brochure_page(writer, row, photos):
+    """Draw the brochure page of one property: title, photos, details and description."""
+    from reportlab.platypus import KeepInFrame, Table
+
+    c = writer.canvas
+    top = writer.body_top
+    width = writer.body_width
+
+    title = _paragraph(f"{row.get('property_type') or 'Property'} {row.get('realstatecode')}", 'title')
+    _, title_height = title.wrapOn(c, width, 40)
+    title.drawOn(c, writer.margin, top - title_height)
+    top -= title_height + 8
+
+    # Main photo on top, up to BROCHURE_PHOTOS - 1 thumbnails below it
+    main_height = 250
+    thumb_height = 80
+    files = [photo_path(photo) for photo in photos[:BROCHURE_PHOTOS]]
+    boxes = [(writer.margin, top - main_height, width, main_height)]
+    thumb_width = (width - 2 * 6) / 3
+    for i in range(1, len(files)):
+        boxes.append((writer.margin + (i - 1) * (thumb_width + 6), top - main_height - 6 - thumb_height,
+                      thumb_width, thumb_height))
+    for path, (x, y, box_width, box_height) in zip(files, boxes):
+        image = report_image(path, box_width, box_height)
+        if image is not None:
+            c.drawImage(image, x, y, box_width, box_height, preserveAspectRatio=True, anchor='c', mask='auto')
+        else:
+            c.setStrokeGray(0.75)
+            c.rect(x, y, box_width, box_height)
+    top -= main_height + (6 + thumb_height if len(files) > 1 else 0) + 12
+
+    details = []
+    for label, field in BROCHURE_DETAILS:
+        value = row.get(field)
+        if field == 'Property-corner':
+            value = 'Yes' if value else 'No'
+        elif isinstance(value, (int, float)):
+            value = _format_number(value)
+        details.append([label, _paragraph(value, 'body')])
+    table = Table(details, colWidths=[width * 0.25, width * 0.75])
+    table.setStyle(_styles()['details'])
+
+    content = [table]
+    if row.get('Descriptions'):
+        content += [_paragraph('Description', 'heading'), _paragraph(row['Descriptions'], 'body')]
+    height = top - writer.margin
+    frame = KeepInFrame(width, height, content, mode='truncate')
+    _, used = frame.wrapOn(c, width, height)
+    frame.drawOn(c, writer.margin, top - used)
+
+
+def draw_pages(writer, layout, rows, photos, first_page):
+    """
+    Draw the body pages of a batch of properties.
+
+    Returns:
+        int: Number of the next page
+    """
+    page = first_page
+    if layout == 'brochure':
+        for row in rows:
+            draw_brochure_page(writer, row, photos.get(row['realstatecode'], []))
+            writer.finish_page(page)
+            page += 1
+    else:
+        for start in range(0, len(rows), TABLE_ROWS_PER_PAGE):
+            draw_table_page(writer, rows[start:start + TABLE_ROWS_PER_PAGE])
+            writer.finish_page(page)
+            page += 1
+    return page
+
+
+class PropertyReport:
+    """
+    Renders a PDF report of the properties matching search criteria.
+
+    The first page summarizes the matches; the following pages hold a
+    property table ('table' layout) or one brochure page per property
+    ('brochure' layout). Rows are streamed from the database in chunks and
+    rendered on the calling thread. Reports are not rendered in worker
+    processes: forking the multithreaded app is unsafe, and spawned workers
+    would re-import the Kivy entry module.
+    """
+
+    def __init__(self, criteria=None, layout='table', title=None, chunk_size=REPORT_CHUNK_SIZE,
+                 logo=None, progress=None, cancelled=None):
+        """
+        Initialize the report.
+
+        Args:
+            criteria (SearchCriteria, optional): Properties to report, defaults to all
+            layout (str): 'table' or 'brochure'
+            title (str, optional): Title printed in the page header
+            chunk_size (int): Properties read and rendered per chunk
+            logo (str, optional): Image file printed in the page header
+            progress (callable, optional): Called with (properties rendered, total)
+            cancelled (callable, optional): Returns True when the report should stop
+        """
+        if layout not in REPORT_LAYOUTS:
+            raise ValueError(f"Unknown report layout: {layout}")
+        self.criteria = criteria if criteria is not None else SearchCriteria()
+        self.layout = layout
+        self.title = title or ('Property Catalogue' if layout == 'brochure' else 'Property Report')
+        self.chunk_size = chunk_size
+        if layout == 'table':
+            # Chunks hold whole pages, as each chunk starts a new table page
+            self.chunk_size = max(1, math.ceil(chunk_size / TABLE_ROWS_PER_PAGE)) * TABLE_ROWS_PER_PAGE
+        self.logo = logo
+        self.progress = progress
+        self.cancelled = cancelled or (lambda: False)
+        self.rendered = 0
+
+    def header(self, api):
+        """Build the page header shared by every chunk."""
+        company = api.get_company_info()
+        return {
+            'company': (company['Companyna'] if company else None) or api.company_code or '',
+            'title': self.title,
+            'generated': datetime.datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'logo': self.logo,
+        }
+
+    def render(self, api, path):
+        """
+        Write the report to path.
+
+        Args:
+            api (DatabaseAPI): API to read from
+            path (str): Output PDF
+
+        Raises:
+            ExportCancelled: If cancelled() returned True before the report finished
+        """
+        summary = api.get_search_summary(self.criteria)
+        total = summary['count']
+        total_pages = 1 + body_pages(self.layout, total)
+        header = self.header(api)
+        self._report(total)
+
+        writer = PageWriter(path, header, total_pages)
+        draw_summary(writer, summary, self.criteria_text())
+        writer.finish_page(1)
+        page = 2
+        for rows, photos in self._chunks(api):
+            page = draw_pages(writer, self.layout, rows, photos, page)
+            self.rendered += len(rows)
+            self._report(total)
+        writer.save()
+
+    def _chunks(self, api):
+        """Stream matching properties as chunks of rows and photos."""
+        for batch in api.iter_search_batches(self.criteria, self.chunk_size):
+            if self.cancelled():
+                raise ExportCancelled("Report cancelled")
+            rows = [row.as_dict() if hasattr(row, 'as_dict') else dict(row) for row in batch]
+            photos = {}
+            if self.layout == 'brochure':
+                photos = {
+                    code: [{'photofilename': photo['photofilename'], 'path': api.photo_file(photo)}
+                           for photo in code_photos]
+                    for code, code_photos in api.get_photos_by_codes(row['realstatecode'] for row in rows).items()
+                }
+            yield rows, photos
+
+    def criteria_text(self):
+        """Describe the search criteria for the summary page."""
+        filters = len(self.criteria.predicates)
+        if not filters:
+            return 'All properties'
+        return f"Properties matching {filters} search filter{'s' if filters > 1 else ''}"
+
+    def _report(self, total):
+        if self.progress is not None:
+            self.progress(self.rendered, total)
@@ -0,0 +1,121 @@
+"""
+Data model behind the virtualized search result list.
+The model owns the full result set and turns it into the flat dicts a
+RecycleView consumes, so widgets are only created for visible rows and
+sorting never touches the widget tree.
+"""
+
+# (field, view attribute, text shown when the field is empty)
+RESULT_COLUMNS = (
+    ('realstatecode', 'code_text', 'N/A'),
+    ('property_type', 'type_text', 'Unknown'),
+    ('Property-area', 'area_text', '0'),
+    ('N-of-bedrooms', 'bedrooms_text', '0'),
+    ('ownername', 'owner_text', 'Unknown'),
+    ('Property-address', 'address_text', 'Not specified'),
+)
+
+
+def sort_key(value):
+    """Sort key that orders numbers before text and puts empty values last."""
+    if value is None or value == '':
+        return (2, 0)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    return (1, str(value).casefold())
+
+
+class PropertyResultModel:
+    """
+    Ordered list of result rows and the sort order they are shown in.
+
+    Rows are the records returned by DatabaseAPI; view_data() renders them
+    to display strings once per change rather than once per widget. Pages
+    fetched with the model's sort order arrive already sorted by the
+    database and are kept as given; sort_by() sorts in memory, which is only
+    correct once every matching row is loaded.
+    """
+
+    def __init__(self, columns=RESULT_COLUMNS):
+        """
+        Initialize an empty model.
+
+        Args:
+            columns (tuple): (field, view attribute, default text) triples
+        """
+        self.columns = columns
+        self.rows = []
+        self.sort_field = None
+        self.descending = False
+
+    def __len__(self):
+        return len(self.rows)
+
+    def set_rows(self, rows):
+        """Replace the rows, keeping the order they were fetched in."""
+        self.rows = list(rows)
+
+    def extend(self, rows):
+        """Append rows (e.g. the next page fetched with the same sort order)."""
+        self.rows.extend(rows)
+
+    def clear(self):
+        """Remove all rows and reset the sort order."""
+        self.rows = []
+        self.sort_field = None
+        self.descending = False
+
+    def set_sort(self, field, descending=None):
+        """
+        Change the sort order without reordering the loaded rows.
+
+        Choosing the current field again flips the direction unless
+        descending is given explicitly.
+
+        Args:
+            field (str): Record field to sort by
+            descending (bool, optional): Sort direction
+        """
+        if descending is None:
+            descending = not self.descending if field == self.sort_field else False
+        self.sort_field = field
+        self.descending = descending
+
+    def sort_by(self, field, descending=None):
+        """
+        Change the sort order (see set_sort) and sort the loaded rows.
+
+        Args:
+            field (str): Record field to sort by
+            descending (bool, optional): Sort direction
+        """
+        self.set_sort(field, descending)
+        self._apply_sort()
+
+    def _apply_sort(self):
+        """Re-sort the rows by the current sort field."""
+        if self.sort_field is None:
+            return
+        field = self.sort_field
+        empty = [row for row in self.rows if row.get(field) in (None, '')]
+        filled = [row for row in self.rows if row.get(field) not in (None, '')]
+        filled.sort(key=lambda row: sort_key(row.get(field)), reverse=self.descending)
+        # Empty values stay at the bottom in both directions
+        self.rows = filled + empty
+
+    def view_row(self, row):
+        """Render one row to the dict a result row widget is refreshed from."""
+        data = {'property_data': row}
+        for field, attribute, default in self.columns:
+            value = row.get(field)
+            data[attribute] = default if value is None else str(value)
+        return data
+
+    def view_data(self):
+        """
+        Render all rows for a RecycleView.
+
+        Returns:
+            list: One dict per row, in display order
+        """
+        return [self.view_row(row) for row in self.rows]
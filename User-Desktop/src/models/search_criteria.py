@@ -0,0 +1,203 @@
+"""
+Structured search criteria for property searches.
+This module turns search screen filters into SQL predicates so that all
+filtering happens inside SQLite instead of over the full result set.
+"""
+
+import re
+
+# Search fields that live on joined tables rather than on Realstatspecification
+JOINED_FIELDS = {
+    'ownername': 'o.ownername',
+    'property_type': 'm1.name',
+    'building_type': 'm2.name',
+}
+
+_FIELD_NAME = re.compile(r'^[A-Za-z][A-Za-z0-9_-]*$')
+
+
+def _column(field):
+    """Return the qualified SQL column for a search field."""
+    if field in JOINED_FIELDS:
+        return JOINED_FIELDS[field]
+    if not _FIELD_NAME.match(field):
+        raise ValueError(f"Invalid search field: {field!r}")
+    return f'r."{field}"' if '-' in field else f"r.{field}"
+
+
+def _escape_like(text):
+    """Escape LIKE wildcards so text matches literally."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def fts_match_query(text, column=None):
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term ("word"*), so partial words match
+    and FTS5 operators typed by the user are treated as plain text.
+
+    Args:
+        text (str): Free text typed by the user
+        column (str, optional): Restrict matching to one search_fts column
+                                ('title' or 'body')
+
+    Returns:
+        str: MATCH expression, or None if the text contains no words
+    """
+    terms = re.findall(r'\w+', text or '', re.UNICODE)
+    if not terms:
+        return None
+    expression = ' '.join(f'"{term}"*' for term in terms)
+    return f"{column} : ({expression})" if column else expression
+
+
+def sort_keyset(field, descending=False, after=None):
+    """
+    Return the ordering and keyset predicate for a search sorted by a field.
+
+    Rows are ordered like result_model.sort_key: numbers before text, text
+    case-insensitively (ASCII), empty values last in both directions, with
+    ties in ascending code order.
+
+    Args:
+        field (str): Search field to sort by
+        descending (bool): Sort direction
+        after (tuple, optional): (field value, realstatecode) of the last row
+                                 on the previous page
+
+    Returns:
+        tuple: (ORDER BY clause, predicate or None, predicate parameters)
+    """
+    column = _column(field)
+    empty = f"({column} IS NULL OR {column} = '')"
+    value = f"{column} COLLATE NOCASE"
+    direction, operator = ('DESC', '<') if descending else ('ASC', '>')
+    order_by = f"{empty}, {value} {direction}, r.realstatecode"
+
+    if after is None:
+        return order_by, None, ()
+    after_value, after_code = after
+    if after_value is None or after_value == '':
+        # Only empty values follow an empty value
+        return order_by, f"{empty} AND r.realstatecode > ?", (after_code,)
+    predicate = (f"{empty} OR {value} {operator} ?"
+                 f" OR ({value} = ? AND r.realstatecode > ?)")
+    return order_by, predicate, (after_value, after_value, after_code)
+
+
+class SearchCriteria:
+    """
+    A set of predicates combined with AND.
+
+    Each builder method returns the criteria object so calls can be chained:
+
+        SearchCriteria().equals('Rstatetcode', '03001').between('N-of-bedrooms', 2, 4)
+    """
+
+    def __init__(self):
+        """Initialize empty criteria (matches every property)."""
+        self.predicates = []
+
+    @classmethod
+    def from_dict(cls, search_criteria):
+        """
+        Build criteria from the legacy column-to-value dictionary.
+
+        Empty values are skipped, string values containing '%' become LIKE
+        patterns and everything else is an exact match.
+
+        Args:
+            search_criteria (dict): Column name to value
+
+        Returns:
+            SearchCriteria: The equivalent criteria
+        """
+        criteria = cls()
+        for field, value in search_criteria.items():
+            if value is None or value == "":
+                continue
+            if isinstance(value, str) and '%' in value:
+                criteria.predicates.append((f"{_column(field)} LIKE ?", (value,)))
+            else:
+                criteria.equals(field, value)
+        return criteria
+
+    def equals(self, field, value):
+        """Match rows where field equals value."""
+        self.predicates.append((f"{_column(field)} = ?", (value,)))
+        return self
+
+    def between(self, field, low=None, high=None):
+        """Match rows where low <= field <= high; either bound may be None."""
+        column = _column(field)
+        if low is not None:
+            self.predicates.append((f"{column} >= ?", (low,)))
+        if high is not None:
+            self.predicates.append((f"{column} <= ?", (high,)))
+        return self
+
+    def is_in(self, field, values):
+        """Match rows where field is one of values."""
+        values = tuple(values)
+        if not values:
+            # An empty IN list matches nothing
+            self.predicates.append(("0", ()))
+        else:
+            placeholders = ', '.join('?' for _ in values)
+            self.predicates.append((f"{_column(field)} IN ({placeholders})", values))
+        return self
+
+    def prefix(self, field, text):
+        """
+        Match rows where field starts with text (case-sensitive).
+
+        Expressed as a half-open range so the predicate can use an index.
+        """
+        if text:
+            column = _column(field)
+            upper = text[:-1] + chr(ord(text[-1]) + 1)
+            self.predicates.append((f"{column} >= ? AND {column} < ?", (text, upper)))
+        return self
+
+    def contains(self, field, text):
+        """Match rows where field contains text (case-insensitive for ASCII)."""
+        if text:
+            self.predicates.append((f"{_column(field)} LIKE ? ESCAPE '\\'", (f"%{_escape_like(text)}%",)))
+        return self
+
+    def matches(self, text, column=None):
+        """
+        Match properties whose full-text document contains every word of text.
+
+        Args:
+            text (str): Free text; each word is matched as a prefix
+            column (str, optional): 'title' (address) or 'body' (description)
+        """
+        expression = fts_match_query(text, column)
+        if expression:
+            self.predicates.append((
+                "r.realstatecode IN (SELECT d.code FROM search_fts CROSS JOIN fts_docs d ON d.docid = search_fts.rowid"
+                " WHERE search_fts MATCH ? AND d.kind = 'property')",
+                (expression,)
+            ))
+        return self
+
+    def uses_field(self, sql_column):
+        """Return True if any predicate references the given qualified column or alias prefix."""
+        pattern = re.compile(r'\b' + re.escape(sql_column))
+        return any(pattern.search(clause) for clause, _ in self.predicates)
+
+    def to_sql(self):
+        """
+        Return the WHERE clause body and its parameters.
+
+        Returns:
+            tuple: (clause, parameters); clause is empty for no predicates
+        """
+        clause = " AND ".join(f"({sql})" for sql, _ in self.predicates)
+        params = tuple(value for _, values in self.predicates for value in values)
+        return clause, params
+
+    def __bool__(self):
+        return bool(self.predicates)
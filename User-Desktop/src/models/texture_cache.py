@@ -0,0 +1,108 @@
+"""
+Texture cache.
+Keeps recently shown photo textures, up to a total size in bytes, so every
+screen that shows photos can reuse them instead of decoding and uploading
+the same image again. The cache stores any value with a known size; it
+does not import Kivy.
+"""
+
+import threading
+from collections import OrderedDict
+
+from configs import settings
+
+
+class TextureCache:
+    """
+    LRU cache bounded by the total size of its entries.
+
+    Evicting an entry only drops the cache's reference: a texture still
+    shown by a widget stays alive until the widget lets it go.
+    """
+
+    def __init__(self, budget=None):
+        """
+        Initialize the cache.
+
+        Args:
+            budget (int, optional): Maximum total size in bytes, defaults to
+                                    settings.TEXTURE_CACHE_BYTES
+        """
+        self.budget = budget if budget is not None else settings.TEXTURE_CACHE_BYTES
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()   # key -> (value, size in bytes)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return a cached value (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """
+        Add a value, evicting the least recently used entries to stay within budget.
+
+        A value larger than the whole budget is not cached.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            size (int): Size of the value in bytes
+
+        Returns:
+            bool: True if the value was cached
+        """
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            if size > self.budget:
+                return False
+
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.budget:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+            return True
+
+    def discard(self, key):
+        """Drop one entry if it is cached."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_texture_cache():
+    """Get the texture cache shared by all screens."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TextureCache()
+        return _cache
@@ -0,0 +1,260 @@
+"""
+Photo thumbnail service.
+Generates a pyramid of thumbnail sizes per photo with Pillow on worker
+threads and caches them on disk, keyed by the photo's content hash and
+the thumbnail size. Missing thumbnails are generated on first request, so
+the cache can be deleted at any time. Thumbnails are decoded off the UI
+thread into RGBA pixels ready to upload as Kivy textures.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from configs import settings
+
+logger = logging.getLogger('database')
+
+# Longest edge of each generated thumbnail, in pixels
+THUMBNAIL_SIZES = (160, 320, 640)
+
+# JPEG quality of the cached thumbnails
+THUMBNAIL_QUALITY = 85
+
+# Cache used when settings.THUMBNAIL_CACHE_DIR is not set
+DEFAULT_THUMBNAIL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                     'data', 'thumbnails')
+
+# A decoded thumbnail: its cache file, pyramid size, dimensions and RGBA pixels (top row first)
+Thumbnail = namedtuple('Thumbnail', ['path', 'size', 'width', 'height', 'pixels'])
+
+
+def photo_key(path, digest=None):
+    """
+    Return the cache key of a photo.
+
+    Photos in the photo store are keyed by their content hash. Older photos
+    without one are keyed by path, size and modification time, which needs
+    only a stat() rather than reading the file.
+    """
+    if digest:
+        return digest
+    stat = os.stat(path)
+    return hashlib.blake2b(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode(),
+                           digest_size=32).hexdigest()
+
+
+def render_thumbnails(source, targets, quality=THUMBNAIL_QUALITY):
+    """
+    Write thumbnails of one photo (runs on a generator thread).
+
+    The photo is decoded once at the smallest scale that still covers the
+    largest target (JPEG draft mode decodes at 1/2 to 1/8 scale directly),
+    then each size is reduced from the previous, larger one.
+
+    Args:
+        source (str): Photo file
+        targets (dict): Thumbnail size -> cache file to write
+        quality (int): JPEG quality
+
+    Returns:
+        dict: The targets that were written
+    """
+    from PIL import Image, ImageOps
+
+    largest = max(targets)
+    with Image.open(source) as original:
+        original.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        if image.mode != 'RGB':
+            # Flatten transparency onto white, as the thumbnails are JPEG
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+
+        for size in sorted(targets, reverse=True):
+            image.thumbnail((size, size), reducing_gap=2.0)
+            path = targets[size]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            image.save(partial, 'JPEG', quality=quality)
+            os.replace(partial, path)
+    return targets
+
+
+def decode_thumbnail(path, size):
+    """Decode a cached thumbnail into RGBA pixels."""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        rgba = image.convert('RGBA')
+        return Thumbnail(path, size, rgba.width, rgba.height, rgba.tobytes())
+
+
+def _forward(source, target):
+    """Copy the outcome of a finished future into target."""
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def _chain(future, transform):
+    """
+    Return a future resolving to transform(result of future).
+
+    If transform returns a future, the chained future resolves with it.
+    """
+    chained = Future()
+
+    def done(source):
+        if source.cancelled() or source.exception() is not None:
+            _forward(source, chained)
+            return
+        try:
+            result = transform(source.result())
+        except Exception as e:
+            chained.set_exception(e)
+            return
+        if isinstance(result, Future):
+            result.add_done_callback(lambda inner: _forward(inner, chained))
+        else:
+            chained.set_result(result)
+
+    future.add_done_callback(done)
+    return chained
+
+
+class ThumbnailService:
+    """
+    Generates, caches and decodes photo thumbnails.
+
+    Generation runs on a thread pool: Pillow releases the GIL while it
+    decodes, resizes and encodes, and like PDF reports (see
+    src.models.reports) thumbnails are never made in worker processes,
+    which the running Kivy app can neither fork safely nor spawn without
+    re-importing its entry module. Requests for a photo
+    already being generated share that work. Cache files live at
+    <cache_dir>/<size>/<key[:2]>/<key>.jpg.
+    """
+
+    def __init__(self, cache_dir=None, sizes=THUMBNAIL_SIZES, workers=None):
+        """
+        Initialize the service.
+
+        Args:
+            cache_dir (str, optional): Cache directory, defaults to
+                                       settings.THUMBNAIL_CACHE_DIR or DEFAULT_THUMBNAIL_DIR
+            sizes (tuple): Pyramid sizes (longest edge in pixels)
+            workers (int, optional): Generator threads, defaults to settings.THUMBNAIL_WORKERS
+        """
+        self.cache_dir = cache_dir or settings.THUMBNAIL_CACHE_DIR or DEFAULT_THUMBNAIL_DIR
+        self.sizes = tuple(sorted(sizes))
+        self.workers = workers or settings.THUMBNAIL_WORKERS
+        self._lock = threading.Lock()
+        self._generating = {}   # key -> future of the running render_thumbnails call
+        self._pool = None
+        self._decoder = None
+
+    def pick_size(self, pixels):
+        """Return the smallest pyramid size covering pixels, or the largest size."""
+        for size in self.sizes:
+            if size >= pixels:
+                return size
+        return self.sizes[-1]
+
+    def cache_path(self, key, size):
+        """Cache file of one thumbnail size."""
+        return os.path.join(self.cache_dir, str(size), key[:2], key + '.jpg')
+
+    def cached(self, key, size):
+        """Return the cache file of a thumbnail if it exists, else None."""
+        path = self.cache_path(key, size)
+        return path if os.path.exists(path) else None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='thumbnails')
+        return self._pool
+
+    def _get_decoder(self):
+        if self._decoder is None:
+            self._decoder = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumbnail-decode')
+        return self._decoder
+
+    def request(self, source, key, size):
+        """
+        Get the cache file of a thumbnail, generating the pyramid if it is missing.
+
+        Args:
+            source (str): Photo file
+            key (str): Cache key from photo_key()
+            size (int): One of the pyramid sizes
+
+        Returns:
+            Future: Resolves to the cache file path
+        """
+        path = self.cached(key, size)
+        if path is not None:
+            future = Future()
+            future.set_result(path)
+            return future
+
+        with self._lock:
+            generating = self._generating.get(key)
+            if generating is None:
+                targets = {s: self.cache_path(key, s) for s in self.sizes if not os.path.exists(self.cache_path(key, s))}
+                generating = self._get_pool().submit(render_thumbnails, source, targets)
+                self._generating[key] = generating
+                generating.add_done_callback(lambda _: self._finished(key))
+        return _chain(generating, lambda _: self.cache_path(key, size))
+
+    def _finished(self, key):
+        with self._lock:
+            self._generating.pop(key, None)
+
+    def load(self, source, key, pixels):
+        """
+        Get a thumbnail at least pixels wide or high, decoded for a texture.
+
+        Args:
+            source (str): Photo file
+            key (str): Cache key from photo_key()
+            pixels (int): Longest edge the photo is displayed at
+
+        Returns:
+            Future: Resolves to a Thumbnail; callbacks run on a worker thread
+        """
+        size = self.pick_size(pixels)
+        return _chain(self.request(source, key, size),
+                      lambda path: self._get_decoder().submit(decode_thumbnail, path, size))
+
+    def clear(self):
+        """Delete every cached thumbnail; they are regenerated on demand."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def close(self):
+        """Stop the worker pools."""
+        for pool in (self._pool, self._decoder):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._decoder = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_thumbnail_service():
+    """Get the shared thumbnail service."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ThumbnailService()
+        return _service
@@ -1,5 +1,7 @@
 from kivy.uix.screenmanager import Screen
+from kivy.uix.label import Label
 from kivy.lang import Builder
+from src.models.query_executor import get_executor
 import os
 
 # Load the KV file for the dashboard interface - use absolute path
@@ -8,17 +10,71 @@ _project_root = os.path.dirname(os.path.dirname(_current_dir))
 _kv_path = os.path.join(_project_root, 'assets', 'kv', 'dashboard.kv')
 Builder.load_file(_kv_path)
 
+# Largest groups listed per statistics dimension
+DASHBOARD_TOP_GROUPS = 5
+
+# Statistics dimensions shown on the dashboard, in display order
+DASHBOARD_SECTIONS = (
+    ('type', 'By Property Type'),
+    ('province', 'By Province'),
+    ('offer', 'By Offer Type'),
+    ('owner', 'Top Owners'),
+)
+
 class DashboardScreen(Screen):
     def __init__(self, **kwargs):
         super(DashboardScreen, self).__init__(**kwargs)
-        # Initialize any necessary variables or components here
+        self.executor = get_executor()
 
     def on_enter(self):
-        # Code to execute when entering the dashboard screen
-        pass
+        """Load the property statistics in the background."""
+        self.ids.stats_summary.text = 'Loading statistics...'
+        self.executor.submit(
+            'get_dashboard_stats', limit=DASHBOARD_TOP_GROUPS, key='dashboard',
+            on_result=self.show_stats, on_error=self.on_stats_error
+        )
 
     def on_leave(self):
-        # Code to execute when leaving the dashboard screen
-        pass
+        """Drop a statistics load that has not finished yet."""
+        self.executor.cancel('dashboard')
+
+    def on_stats_error(self, error):
+        """Report statistics that failed to load."""
+        self.ids.stats_summary.text = f'Failed to load statistics: {error}'
+
+    def show_stats(self, stats):
+        """Display the statistics returned by DatabaseAPI.get_dashboard_stats()."""
+        total = stats['total']
+        summary = f"{total['count']} properties"
+        if total['avg_area'] is not None:
+            summary += f", average area {total['avg_area']:.0f}"
+        if total['avg_bedrooms'] is not None:
+            summary += f", average {total['avg_bedrooms']:.1f} bedrooms"
+        self.ids.stats_summary.text = summary
+
+        grid = self.ids.stats_grid
+        grid.clear_widgets()
+        for dimension, title in DASHBOARD_SECTIONS:
+            groups = stats[dimension]
+            if not groups:
+                continue
+            grid.add_widget(self._stats_label(title, bold=True))
+            for group in groups:
+                text = f"{group['name']}: {group['count']}"
+                if group['bedrooms']:
+                    histogram = ', '.join(f"{beds} bd x{count}" for beds, count in group['bedrooms'].items())
+                    text += f"  ({histogram})"
+                grid.add_widget(self._stats_label(text))
 
-    # Additional methods for dashboard functionalities can be added here
\ No newline at end of file
+    def _stats_label(self, text, bold=False):
+        """Create a one-line label for the statistics grid."""
+        label = Label(
+            text=text,
+            bold=bold,
+            size_hint_y=None,
+            height='26dp',
+            halign='left',
+            color=(0.2, 0.2, 0.2, 1) if bold else (0.4, 0.4, 0.4, 1)
+        )
+        label.bind(size=lambda instance, size: setattr(instance, 'text_size', size))
+        return label
@@ -12,7 +12,9 @@ from kivy.uix.spinner import Spinner
 from kivy.properties import StringProperty
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.image import Image
-from src.models.database_api import get_api
+from src.models.database_api import OWNER_SEARCH_LIMIT, get_api
+from src.models.query_executor import get_executor
+from src.models.code_allocator import CodeSpaceExhausted
 import re
 
 class OwnerForm(BoxLayout):
@@ -189,6 +191,7 @@ class OwnerManagementScreen(Screen):
     def __init__(self, **kwargs):
         super(OwnerManagementScreen, self).__init__(**kwargs)
         self.api = get_api()
+        self.executor = get_executor()
 
         # Set white background for the entire screen
         with self.canvas.before:
@@ -327,14 +330,28 @@ class OwnerManagementScreen(Screen):
             self.load_owners()
             return
 
-        # Filter owners from the cached list
-        filtered_owners = [
-            owner for owner in self.all_owners
-            if search_text in owner['ownername'].lower() or search_text in owner['ownerphone']
-        ]
+        # Name words, phone prefixes and note words via the full-text index;
+        # runs on the query worker and supersedes any search still running.
+        # One owner more than is shown tells whether the list is cut short.
+        self.set_busy(True)
+        self.executor.submit(
+            'search_owners', search_text, limit=OWNER_SEARCH_LIMIT + 1,
+            key='owners',
+            on_result=self.show_search_results,
+            on_error=self.on_load_error
+        )
 
-        self.display_owners(filtered_owners)
-        self.stats_label.text = f'Found: {len(filtered_owners)} owners'
+    def show_search_results(self, owners):
+        """Display owners found by a search, noting when more owners match."""
+        self.set_busy(False)
+        owners = owners or []
+        if len(owners) > OWNER_SEARCH_LIMIT:
+            self.display_owners(owners[:OWNER_SEARCH_LIMIT])
+            self.stats_label.text = (f'Showing the best {OWNER_SEARCH_LIMIT} owners; '
+                                     'more match, refine the search to see them')
+        else:
+            self.display_owners(owners)
+            self.stats_label.text = f'Found: {len(owners)} owners'
 
     def clear_search(self, instance):
         """Clear search and show all owners."""
@@ -347,10 +364,31 @@ class OwnerManagementScreen(Screen):
 
     def load_owners(self):
         """Load owners from the database and display them."""
-        self.all_owners = self.api.get_all_owners()
+        self.set_busy(True)
+        self.executor.submit(
+            'get_all_owners',
+            key='owners',
+            on_result=self.show_all_owners,
+            on_error=self.on_load_error
+        )
+
+    def show_all_owners(self, owners):
+        """Display the full owners list delivered by the query worker."""
+        self.set_busy(False)
+        self.all_owners = owners or []
         self.display_owners(self.all_owners)
         self.stats_label.text = f'Total Owners: {len(self.all_owners)}'
 
+    def on_load_error(self, error):
+        """Leave the busy state and report a failed load."""
+        self.set_busy(False)
+        self.stats_label.text = f'Failed to load owners: {error}'
+
+    def set_busy(self, busy):
+        """Show that owners are loading instead of blocking the window."""
+        if busy:
+            self.stats_label.text = 'Loading owners...'
+
     def display_owners(self, owners):
         """Display the list of owners."""
         self.owners_container.clear_widgets()
@@ -436,7 +474,11 @@ class OwnerManagementScreen(Screen):
 
     def add_owner(self, owner_name, owner_phone, note, owner_code=None):
         """Add a new owner to the database."""
-        owner_code = self.api.add_owner(owner_name, owner_phone, note)
+        try:
+            owner_code = self.api.add_owner(owner_name, owner_phone, note)
+        except CodeSpaceExhausted as e:
+            self.show_error(f"Cannot add owner: {e}")
+            return
 
         if owner_code:
             self.popup.dismiss()
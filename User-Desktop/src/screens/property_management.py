@@ -9,11 +9,20 @@ from kivy.uix.checkbox import CheckBox
 from kivy.uix.spinner import Spinner
 from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
+from kivy.uix.progressbar import ProgressBar
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.metrics import dp
 from kivy.clock import Clock
+from kivy.properties import StringProperty, ObjectProperty
 from datetime import datetime
 import os
 from src.models.database_api import get_api
+from src.models.query_executor import get_executor, kivy_dispatch
+from src.models.code_allocator import CodeSpaceExhausted
+from src.models.property_list import PropertyListSource
+from src.widgets.photos import PhotoGallery
 
 class PropertyForm(BoxLayout):
     """Form for adding or editing a property."""
@@ -540,7 +549,7 @@ class PropertyForm(BoxLayout):
         photo_layout.add_widget(browse_button)
 
         # Selected photos
-        self.photos_grid = GridLayout(cols=4, spacing=dp(5), size_hint_y=None, height=dp(130))
+        self.photos_grid = PhotoGallery(cols=4, size_hint_y=None, height=dp(260))
         photo_layout.add_widget(self.photos_grid)
 
         form_layout.add_widget(photo_layout)
@@ -581,18 +590,19 @@ class PropertyForm(BoxLayout):
         self.rect.size = instance.size
 
     def load_existing_photos(self):
-        """Load existing photos for the property."""
-        photos = self.api.get_property_photos(self.property_code)
-        if photos:
-            for photo in photos:
-                # Create a label to display the photo filename
-                photo_label = Label(
-                    text=photo.get('photofilename', 'Unknown'),
-                    size_hint_y=None,
-                    height=dp(30),
-                    color=(0.2, 0.2, 0.2, 1)
-                )
-                self.photos_grid.add_widget(photo_label)
+        """Load existing photos for the property in the background."""
+        get_executor().submit(
+            'get_property_photos', self.property_code,
+            key='property_photos',
+            on_result=self.show_existing_photos
+        )
+
+    def show_existing_photos(self, photos):
+        """Show the existing photos of the property in the gallery."""
+        self.photos_grid.add_photos([
+            (self.api.photo_file(photo), photo.get('photofilename', 'Unknown'), photo.get('photohash'))
+            for photo in photos or []
+        ])
 
     def show_file_chooser(self, instance):
         """Show file chooser to select photos."""
@@ -636,21 +646,8 @@ class PropertyForm(BoxLayout):
         if selection:
             self.selected_photos.extend(selection)
 
-            # Update the photos grid
-            self.photos_grid.clear_widgets()
-
-            for photo_path in self.selected_photos:
-                # Get just the filename
-                filename = os.path.basename(photo_path)
-
-                # Create a label to display the photo filename
-                photo_label = Label(
-                    text=filename,
-                    size_hint_y=None,
-                    height=dp(30),
-                    color=(0.2, 0.2, 0.2, 1)
-                )
-                self.photos_grid.add_widget(photo_label)
+            # Add the new photos to the gallery
+            self.photos_grid.add_photos([(photo_path, os.path.basename(photo_path), None) for photo_path in selection])
 
         popup.dismiss()
 
@@ -668,7 +665,11 @@ class PropertyForm(BoxLayout):
 
     def add_owner(self, owner_name, owner_phone, note, owner_code=None):
         """Add a new owner to the database."""
-        owner_code = self.api.add_owner(owner_name, owner_phone, note)
+        try:
+            owner_code = self.api.add_owner(owner_name, owner_phone, note)
+        except CodeSpaceExhausted as e:
+            self.show_error(f"Cannot add owner: {e}")
+            return
 
         if owner_code:
             self.owner_popup.dismiss()            # Refresh the owner dropdown
@@ -769,12 +770,125 @@ class PropertyForm(BoxLayout):
         )
         popup.open()
 
+def property_view_data(prop):
+    """Render a property to the data dict of a PropertyListRow."""
+    def text(field):
+        value = prop.get(field)
+        return 'N/A' if value is None else str(value)
+
+    return {
+        'code_text': text('realstatecode'),
+        'type_text': text('property_type'),
+        'area_text': f"{text('Property-area')} m²",
+        'owner_text': text('ownername'),
+        'property_data': prop,
+    }
+
+class PropertyListRow(RecycleDataViewBehavior, GridLayout):
+    """Recycled row of the properties list with Edit and Delete actions."""
+
+    code_text = StringProperty('')
+    type_text = StringProperty('')
+    area_text = StringProperty('')
+    owner_text = StringProperty('')
+    property_data = ObjectProperty(None, allownone=True)
+
+    def __init__(self, **kwargs):
+        super(PropertyListRow, self).__init__(**kwargs)
+        self.cols = 5
+        self.list_view = None
+
+        for attribute in ('code_text', 'type_text', 'area_text', 'owner_text'):
+            label = Label(text=getattr(self, attribute), color=(0.2, 0.2, 0.2, 1))
+            self.bind(**{attribute: label.setter('text')})
+            self.add_widget(label)
+
+        actions = BoxLayout(spacing=dp(5))
+
+        edit_button = Button(
+            text='Edit',
+            background_color=(0.3, 0.6, 0.9, 1),
+            color=(1, 1, 1, 1)
+        )
+        edit_button.bind(on_press=self.on_edit)
+        actions.add_widget(edit_button)
+
+        delete_button = Button(
+            text='Delete',
+            background_color=(0.8, 0.3, 0.3, 1),
+            color=(1, 1, 1, 1)
+        )
+        delete_button.bind(on_press=self.on_delete)
+        actions.add_widget(delete_button)
+
+        self.add_widget(actions)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Refresh the row from its data dict when it is (re)used."""
+        self.list_view = rv
+        return super(PropertyListRow, self).refresh_view_attrs(rv, index, data)
+
+    def on_edit(self, instance):
+        """Open the edit form for the property shown by this row."""
+        if self.list_view is not None and self.property_data is not None:
+            self.list_view.screen.show_edit_property_form(self.property_data)
+
+    def on_delete(self, instance):
+        """Ask to delete the property shown by this row."""
+        if self.list_view is not None and self.property_data is not None:
+            self.list_view.screen.confirm_delete_property(self.property_data.get('realstatecode', ''))
+
+class PropertyListView(RecycleView):
+    """RecycleView over the rows of a PropertyListSource."""
+
+    def __init__(self, screen, **kwargs):
+        super(PropertyListView, self).__init__(**kwargs)
+        self.screen = screen
+        self.viewclass = PropertyListRow
+        self.do_scroll_x = False
+
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(40)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=dp(2)
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
+class PhotoUploadPopup(Popup):
+    """Progress bar for photos being copied into the photo store."""
+
+    def __init__(self, total, **kwargs):
+        super(PhotoUploadPopup, self).__init__(**kwargs)
+        self.title = 'Storing Photos'
+        self.size_hint = (0.6, 0.25)
+        self.auto_dismiss = False
+
+        content = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(10))
+        self.status_label = Label(color=(1, 1, 1, 1))
+        content.add_widget(self.status_label)
+
+        self.progress_bar = ProgressBar(max=max(total, 1), value=0, size_hint_y=None, height=dp(20))
+        content.add_widget(self.progress_bar)
+
+        self.content = content
+        self.set_progress(0, total)
+
+    def set_progress(self, done, total):
+        """Show how many photos have been stored."""
+        self.progress_bar.max = max(total, 1)
+        self.progress_bar.value = done
+        self.status_label.text = f'Stored {done} of {total} photos'
+
 class PropertyManagementScreen(Screen):
     """Screen for managing properties."""
 
     def __init__(self, **kwargs):
         super(PropertyManagementScreen, self).__init__(**kwargs)
         self.api = get_api()
+        self.executor = get_executor()
 
         # Set white background for the screen
         with self.canvas.before:
@@ -815,13 +929,32 @@ class PropertyManagementScreen(Screen):
         list_header.add_widget(Label(text='Actions', bold=True, color=(0.2, 0.2, 0.2, 1)))
         self.layout.add_widget(list_header)
 
-        # Properties list in a scrollview
-        self.properties_container = GridLayout(cols=1, spacing=dp(2), size_hint_y=None)
-        self.properties_container.bind(minimum_height=self.properties_container.setter('height'))
+        # Virtualized properties list; pages load on the query worker as the
+        # user scrolls down (the source is created there, see _source)
+        self.properties_source = None
+        self.exhausted = False
+        self.loading_more = False
+
+        self.status_label = Label(
+            text='',
+            size_hint_y=None,
+            height=dp(20),
+            color=(0.4, 0.4, 0.4, 1)
+        )
+        self.layout.add_widget(self.status_label)
+
+        self.empty_label = Label(
+            text='No properties found. Click "Add Property" to create one.',
+            size_hint_y=None,
+            height=0,
+            opacity=0,
+            color=(0.5, 0.5, 0.5, 1)
+        )
+        self.layout.add_widget(self.empty_label)
 
-        scroll_view = ScrollView(size_hint=(1, 1), do_scroll_x=False)
-        scroll_view.add_widget(self.properties_container)
-        self.layout.add_widget(scroll_view)
+        self.properties_view = PropertyListView(self, size_hint=(1, 1))
+        self.properties_view.bind(scroll_y=self.on_list_scroll)
+        self.layout.add_widget(self.properties_view)
 
         # Back button with better positioning
         footer_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(60), padding=[0, dp(10), 0, 0])
@@ -846,56 +979,105 @@ class PropertyManagementScreen(Screen):
         self.rect.size = instance.size
 
     def on_enter(self):
-        """Load the properties list when entering the screen."""
-        self.load_properties()
+        """Bring the properties list up to date when entering the screen."""
+        self.refresh_properties()
 
     def load_properties(self):
-        """Load properties from the database and display them."""
-        self.properties_container.clear_widgets()
-
-        properties = self.api.get_all_properties()
-
-        if not properties:
-            self.properties_container.add_widget(
-                Label(
-                    text='No properties found. Click "Add Property" to create one.',
-                    size_hint_y=None,
-                    height=dp(40),
-                    color=(0.5, 0.5, 0.5, 1)
-                )
-            )
+        """Reload the properties list from the first page."""
+        self.set_busy(True)
+        self.executor.submit(self._load_source, on_result=self.show_loaded_properties, on_error=self.on_load_error)
+
+    def refresh_properties(self):
+        """Patch the rows that were added, edited or deleted since the list was last shown."""
+        self.set_busy(True)
+        self.executor.submit(self._refresh_source, on_result=self.apply_refresh, on_error=self.on_load_error)
+
+    def load_more_properties(self):
+        """Append the next page of properties."""
+        if self.loading_more:
             return
-
-        for prop in properties:
-            property_row = GridLayout(cols=5, size_hint_y=None, height=dp(40))
-
-            # Ensure none of the text values are None, replace with 'N/A' if they are
-            property_row.add_widget(Label(text=str(prop.get('realstatecode', 'N/A')), color=(0.2, 0.2, 0.2, 1)))
-            property_row.add_widget(Label(text=str(prop.get('property_type', 'N/A')), color=(0.2, 0.2, 0.2, 1)))
-            property_row.add_widget(Label(text=f"{str(prop.get('Property-area', 'N/A'))} m²", color=(0.2, 0.2, 0.2, 1)))
-            property_row.add_widget(Label(text=str(prop.get('ownername', 'N/A')), color=(0.2, 0.2, 0.2, 1)))
-
-            actions = BoxLayout(spacing=dp(5))
-
-            edit_button = Button(
-                text='Edit',
-                background_color=(0.3, 0.6, 0.9, 1),
-                color=(1, 1, 1, 1)
-            )
-            edit_button.bind(on_press=lambda x, p=prop: self.show_edit_property_form(p))
-            actions.add_widget(edit_button)
-
-            delete_button = Button(
-                text='Delete',
-                background_color=(0.8, 0.3, 0.3, 1),
-                color=(1, 1, 1, 1)
-            )
-            delete_button.bind(on_press=lambda x, code=prop.get('realstatecode', ''): self.confirm_delete_property(code))
-            actions.add_widget(delete_button)
-
-            property_row.add_widget(actions)
-
-            self.properties_container.add_widget(property_row)
+        self.loading_more = True
+        self.executor.submit(self._load_more_source, on_result=self.append_properties, on_error=self.on_load_error)
+
+    # The source is only touched from the query worker, in submission order;
+    # the UI applies the snapshots and patches these methods return.
+
+    def _source(self, api):
+        """Get the list source, bound to the worker's API."""
+        if self.properties_source is None:
+            self.properties_source = PropertyListSource(api)
+        return self.properties_source
+
+    def _load_source(self, api):
+        """Reload the first page (worker side)."""
+        source = self._source(api)
+        source.load()
+        return list(source.rows), source.exhausted
+
+    def _refresh_source(self, api):
+        """Refresh from the change log (worker side)."""
+        source = self._source(api)
+        patches = source.refresh()
+        rows = list(source.rows) if patches is None else None
+        return patches, rows, source.exhausted, len(source)
+
+    def _load_more_source(self, api):
+        """Load the next page (worker side)."""
+        source = self._source(api)
+        return source.load_more(), source.exhausted
+
+    def show_loaded_properties(self, result):
+        """Show a freshly loaded first page."""
+        rows, self.exhausted = result
+        self.properties_view.data = [property_view_data(prop) for prop in rows]
+        self.set_busy(False)
+        self.update_empty_state(len(rows))
+
+    def apply_refresh(self, result):
+        """Apply the result of a refresh to the view data."""
+        patches, rows, self.exhausted, count = result
+        if patches is None:
+            # First visit, or too far behind the change log: show the reloaded rows
+            self.properties_view.data = [property_view_data(prop) for prop in rows]
+        else:
+            data = self.properties_view.data
+            for action, index, prop in patches:
+                if action == 'remove':
+                    del data[index]
+                elif action == 'update':
+                    data[index] = property_view_data(prop)
+                else:
+                    data.insert(index, property_view_data(prop))
+        self.set_busy(False)
+        self.update_empty_state(count)
+
+    def append_properties(self, result):
+        """Append a page delivered by the query worker."""
+        page, self.exhausted = result
+        self.loading_more = False
+        if page:
+            self.properties_view.data.extend(property_view_data(prop) for prop in page)
+
+    def on_load_error(self, error):
+        """Leave the busy state and report a failed load."""
+        self.loading_more = False
+        self.set_busy(False)
+        self.show_error(f"Failed to load properties: {error}")
+
+    def on_list_scroll(self, instance, scroll_y):
+        """Load the next page when the list is scrolled to the bottom."""
+        if scroll_y <= 0.05 and not self.exhausted:
+            self.load_more_properties()
+
+    def set_busy(self, busy):
+        """Show a loading hint while the list is fetched in the background."""
+        self.status_label.text = 'Loading properties...' if busy else ''
+
+    def update_empty_state(self, count):
+        """Show the empty-list hint only when there are no properties."""
+        empty = count == 0
+        self.empty_label.height = dp(40) if empty else 0
+        self.empty_label.opacity = 1 if empty else 0
 
     def show_add_property_form(self, instance):
         """Show the form for adding a new property."""
@@ -931,7 +1113,11 @@ class PropertyManagementScreen(Screen):
 
     def add_property(self, property_data, photos, property_code=None):
         """Add a new property to the database."""
-        property_code = self.api.add_property(property_data)
+        try:
+            property_code = self.api.add_property(property_data)
+        except CodeSpaceExhausted as e:
+            self.show_error(f"Cannot add property: {e}")
+            return
 
         if property_code:
             # Upload photos
@@ -940,7 +1126,7 @@ class PropertyManagementScreen(Screen):
 
             self.popup.dismiss()
             self.show_success(f"Property '{property_code}' added successfully!")
-            self.load_properties()
+            self.refresh_properties()
         else:
             self.show_error("Failed to add property. Please try again.")
 
@@ -953,20 +1139,36 @@ class PropertyManagementScreen(Screen):
 
             self.popup.dismiss()
             self.show_success(f"Property '{property_code}' updated successfully!")
-            self.load_properties()
+            self.refresh_properties()
         else:
             self.show_error("Failed to update property. Please try again.")
 
     def upload_photos(self, property_code, photo_paths):
-        """Upload photos for a property."""
-        for photo_path in photo_paths:
-            # Get the filename and extension
-            filename = os.path.basename(photo_path)
-            name, ext = os.path.splitext(filename)
+        """Copy photos into the photo store and attach them to a property, in the background."""
+        photo_paths = list(photo_paths)
+        upload_popup = PhotoUploadPopup(len(photo_paths))
+        upload_popup.open()
+
+        def finished(callback):
+            def handler(value):
+                upload_popup.dismiss()
+                callback(value)
+            return handler
+
+        # Progress arrives on the copying threads; the popup is updated on the UI thread
+        self.executor.submit(
+            'store_property_photos', property_code, photo_paths,
+            progress=lambda done, total: kivy_dispatch(lambda: upload_popup.set_progress(done, total)),
+            on_result=finished(self.on_photos_stored),
+            on_error=finished(lambda e: self.show_error(f"Failed to store photos: {e}"))
+        )
 
-            # Add to database
-            storage_path = f"/photos/{self.api.company_code}/"
-            self.api.add_property_photo(property_code, storage_path, name, ext)
+    def on_photos_stored(self, stored):
+        """Report photos that could not be stored."""
+        failed = [photo for photo in stored if photo.error is not None]
+        if failed:
+            names = ', '.join(os.path.basename(photo.source) for photo in failed)
+            self.show_error(f"Could not store {len(failed)} photo(s): {names}")
 
     def confirm_delete_property(self, property_code):
         """Show confirmation dialog for deleting a property."""
@@ -1006,7 +1208,7 @@ class PropertyManagementScreen(Screen):
         if self.api.delete_property(property_code):
             self.confirm_popup.dismiss()
             self.show_success("Property deleted successfully!")
-            self.load_properties()
+            self.refresh_properties()
         else:
             self.confirm_popup.dismiss()
             self.show_error("Failed to delete property. Please try again.")
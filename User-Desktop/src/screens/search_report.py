@@ -8,24 +8,44 @@ from kivy.uix.scrollview import ScrollView
 from kivy.uix.spinner import Spinner
 from kivy.uix.checkbox import CheckBox
 from kivy.uix.popup import Popup
+from kivy.uix.progressbar import ProgressBar
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.metrics import dp
 from kivy.graphics import Color, Rectangle
+from kivy.properties import StringProperty, ObjectProperty
 from src.models.database_api import get_api
-import datetime
-import os
-import csv
+from src.models.search_criteria import SearchCriteria
+from src.models.result_model import PropertyResultModel
+from src.models.query_executor import QueryExecutor, get_executor, kivy_dispatch
+from src.models.export import ExportCancelled, available_exporters, export_path, write_csv
+
+# Number of search results fetched per page
+RESULTS_PAGE_SIZE = 200
+
+class PropertyRow(RecycleDataViewBehavior, BoxLayout):
+    """
+    Recycled widget representing a property row in the search results.
+
+    The RecycleView creates only enough rows to fill the viewport and
+    refreshes them from PropertyResultModel data while scrolling.
+    """
+
+    code_text = StringProperty('')
+    type_text = StringProperty('')
+    area_text = StringProperty('')
+    bedrooms_text = StringProperty('')
+    owner_text = StringProperty('')
+    address_text = StringProperty('')
+    property_data = ObjectProperty(None, allownone=True)
 
-class PropertyRow(BoxLayout):
-    """Widget representing a property row in the search results."""
-
-    def __init__(self, property_data, on_view_callback, on_export_callback, **kwargs):
+    def __init__(self, **kwargs):
         super(PropertyRow, self).__init__(**kwargs)
-        self.property_data = property_data
         self.orientation = 'horizontal'
-        self.size_hint_y = None
-        self.height = dp(40)
         self.spacing = dp(5)
         self.padding = dp(5)
+        self.results_view = None
 
         # Add background - lighter gray for contrast
         with self.canvas.before:
@@ -34,65 +54,16 @@ class PropertyRow(BoxLayout):
 
         self.bind(pos=self.update_rect, size=self.update_rect)
 
-        # Property code
-        property_code = property_data.get('realstatecode', 'N/A')
-        if property_code is None:
-            property_code = 'N/A'
-        self.add_widget(Label(
-            text=str(property_code),
-            size_hint_x=0.15,
-            color=(0, 0, 0, 1)  # Black text
-        ))
-
-        # Property type
-        property_type = property_data.get('property_type', 'Unknown')
-        if property_type is None:
-            property_type = 'Unknown'
-        self.add_widget(Label(
-            text=str(property_type),
-            size_hint_x=0.15,
-            color=(0, 0, 0, 1)  # Black text
-        ))
-
-        # Area
-        area = property_data.get('Property-area', '0')
-        if area is None:
-            area = '0'
-        self.add_widget(Label(
-            text=str(area),
-            size_hint_x=0.1,
-            color=(0, 0, 0, 1)  # Black text
-        ))
-
-        # Bedrooms
-        bedrooms = property_data.get('N-of-bedrooms', '0')
-        if bedrooms is None:
-            bedrooms = '0'
-        self.add_widget(Label(
-            text=str(bedrooms),
-            size_hint_x=0.1,
-            color=(0, 0, 0, 1)  # Black text
-        ))
-
-        # Owner name
-        owner_name = property_data.get('ownername', 'Unknown')
-        if owner_name is None:
-            owner_name = 'Unknown'
-        self.add_widget(Label(
-            text=str(owner_name),
-            size_hint_x=0.2,
-            color=(0, 0, 0, 1)  # Black text
-        ))
-
-        # Address
-        address = property_data.get('Property-address', 'Not specified')
-        if address is None:
-            address = 'Not specified'
-        self.add_widget(Label(
-            text=str(address),
-            size_hint_x=0.2,
-            color=(0, 0, 0, 1)  # Black text
-        ))
+        # One label per column, kept in sync with the row's text properties
+        for attribute, size in (('code_text', 0.15), ('type_text', 0.15), ('area_text', 0.1),
+                                ('bedrooms_text', 0.1), ('owner_text', 0.2), ('address_text', 0.2)):
+            label = Label(
+                text=getattr(self, attribute),
+                size_hint_x=size,
+                color=(0, 0, 0, 1)  # Black text
+            )
+            self.bind(**{attribute: label.setter('text')})
+            self.add_widget(label)
 
         # Action buttons
         actions = BoxLayout(size_hint_x=0.1, spacing=dp(5))
@@ -102,16 +73,45 @@ class PropertyRow(BoxLayout):
             background_color=(0.2, 0.6, 1, 1),  # Blue button
             color=(1, 1, 1, 1)  # White text
         )
-        view_button.bind(on_press=lambda x: on_view_callback(property_data))
+        view_button.bind(on_press=self.on_view)
         actions.add_widget(view_button)
 
         self.add_widget(actions)
 
+    def refresh_view_attrs(self, rv, index, data):
+        """Refresh the row from its data dict when it is (re)used."""
+        self.results_view = rv
+        return super(PropertyRow, self).refresh_view_attrs(rv, index, data)
+
+    def on_view(self, instance):
+        """Open the details of the property currently shown by this row."""
+        if self.results_view is not None and self.property_data is not None:
+            self.results_view.on_view_callback(self.property_data)
+
     def update_rect(self, instance, value):
         """Update the rectangle position and size."""
         instance.rect.pos = instance.pos
         instance.rect.size = instance.size
 
+class PropertyResultsView(RecycleView):
+    """RecycleView listing search results from a PropertyResultModel."""
+
+    def __init__(self, on_view_callback, **kwargs):
+        super(PropertyResultsView, self).__init__(**kwargs)
+        self.on_view_callback = on_view_callback
+        self.viewclass = PropertyRow
+        self.do_scroll_x = False
+
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(40)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=dp(2)
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
 class PropertyDetailPopup(Popup):
     """Popup to show property details."""
 
@@ -194,12 +194,51 @@ class PropertyDetailPopup(Popup):
 
         self.content = content
 
+class ExportProgressPopup(Popup):
+    """Progress bar and Cancel button for an export running in the background."""
+
+    def __init__(self, on_cancel, **kwargs):
+        super(ExportProgressPopup, self).__init__(**kwargs)
+        self.title = 'Exporting Properties'
+        self.size_hint = (0.6, 0.3)
+        self.auto_dismiss = False
+
+        content = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(10))
+        self.status_label = Label(text='Preparing export...', color=(1, 1, 1, 1))
+        content.add_widget(self.status_label)
+
+        self.progress_bar = ProgressBar(max=1, value=0, size_hint_y=None, height=dp(20))
+        content.add_widget(self.progress_bar)
+
+        self.cancel_button = Button(
+            text='Cancel',
+            size_hint_y=None,
+            height=dp(45),
+            background_color=(0.8, 0.3, 0.3, 1),
+            color=(1, 1, 1, 1)
+        )
+        self.cancel_button.bind(on_press=lambda instance: on_cancel())
+        content.add_widget(self.cancel_button)
+
+        self.content = content
+
+    def set_progress(self, written, total):
+        """Show how many rows have been written."""
+        self.progress_bar.max = max(total, 1)
+        self.progress_bar.value = written
+        self.status_label.text = f'Exported {written} of {total} properties'
+
 class SearchReportScreen(Screen):
     """Screen for searching properties and generating reports."""
 
     def __init__(self, **kwargs):
         super(SearchReportScreen, self).__init__(**kwargs)
         self.api = get_api()
+        self.executor = get_executor()
+        # Exports get their own worker so searches are not queued behind them
+        self.export_executor = QueryExecutor(self.api)
+        self.export_job = None
+        self.export_popup = None
 
         # Set white background for the screen
         with self.canvas.before:
@@ -427,6 +466,7 @@ class SearchReportScreen(Screen):
         )
         search_button.bind(on_press=self.perform_search)
         buttons_layout.add_widget(search_button)
+        self.search_button = search_button
 
         clear_button = Button(
             text='Clear All',
@@ -440,7 +480,7 @@ class SearchReportScreen(Screen):
 
         export_button = Button(
             text='Export Results',
-            size_hint_x=0.3,
+            size_hint_x=0.2,
             background_color=(0.2, 0.7, 0.3, 1),
             color=(1, 1, 1, 1),
             font_size=dp(16)
@@ -448,6 +488,23 @@ class SearchReportScreen(Screen):
         export_button.bind(on_press=self.export_results)
         buttons_layout.add_widget(export_button)
 
+        # Only formats whose optional dependencies are installed are offered
+        self.export_formats = {cls.label: cls for cls in available_exporters().values()}
+        self.export_format_spinner = Spinner(
+            text='CSV',
+            values=list(self.export_formats),
+            size_hint_x=0.15,
+            background_color=(0.98, 0.98, 0.98, 1),
+            color=(0, 0, 0, 1)
+        )
+        buttons_layout.add_widget(self.export_format_spinner)
+
+        compress_layout = BoxLayout(orientation='horizontal', size_hint_x=0.15)
+        self.compress_checkbox = CheckBox(size_hint_x=None, width=dp(30))
+        compress_layout.add_widget(self.compress_checkbox)
+        compress_layout.add_widget(Label(text='gzip', color=(0, 0, 0, 1)))
+        buttons_layout.add_widget(compress_layout)
+
         self.layout.add_widget(buttons_layout)
 
         # Results section with better spacing
@@ -482,34 +539,58 @@ class SearchReportScreen(Screen):
         results_header.bind(pos=lambda instance, value: setattr(results_header.rect, 'pos', instance.pos))
         results_header.bind(size=lambda instance, value: setattr(results_header.rect, 'size', instance.size))
 
+        # Column headers sort the result model; Actions is not sortable
         headers = [
-            ('Code', 0.15),
-            ('Type', 0.15),
-            ('Area', 0.1),
-            ('Bedrooms', 0.1),
-            ('Owner', 0.2),
-            ('Address', 0.2),
-            ('Actions', 0.1)
+            ('Code', 0.15, 'realstatecode'),
+            ('Type', 0.15, 'property_type'),
+            ('Area', 0.1, 'Property-area'),
+            ('Bedrooms', 0.1, 'N-of-bedrooms'),
+            ('Owner', 0.2, 'ownername'),
+            ('Address', 0.2, 'Property-address'),
+            ('Actions', 0.1, None)
         ]
 
-        for header, size in headers:
-            results_header.add_widget(Label(
+        self.sort_buttons = {}
+        for header, size, field in headers:
+            if field is None:
+                results_header.add_widget(Label(
+                    text=header,
+                    size_hint_x=size,
+                    bold=True,
+                    color=(0.1, 0.1, 0.1, 1),
+                    font_size=dp(14)
+                ))
+                continue
+
+            sort_button = Button(
                 text=header,
                 size_hint_x=size,
                 bold=True,
+                background_normal='',
+                background_color=(0.9, 0.9, 0.9, 1),
                 color=(0.1, 0.1, 0.1, 1),
                 font_size=dp(14)
-            ))
+            )
+            sort_button.bind(on_press=lambda instance, field=field: self.sort_results(field))
+            self.sort_buttons[field] = (sort_button, header)
+            results_header.add_widget(sort_button)
 
         results_section.add_widget(results_header)
 
-        # Results container with scroll
-        self.results_container = GridLayout(cols=1, spacing=dp(2), size_hint_y=None)
-        self.results_container.bind(minimum_height=self.results_container.setter('height'))
+        # Virtualized results list; only visible rows are instantiated
+        self.results_model = PropertyResultModel()
+        self.results_view = PropertyResultsView(self.view_property_details, size_hint=(1, 1))
 
-        results_scroll = ScrollView(size_hint=(1, 1), do_scroll_x=False)
-        results_scroll.add_widget(self.results_container)
-        results_section.add_widget(results_scroll)
+        self.no_results_label = Label(
+            text="No properties found matching your criteria.",
+            size_hint_y=None,
+            height=0,
+            opacity=0,
+            color=(0.5, 0.5, 0.5, 1),
+            font_size=dp(16)
+        )
+        results_section.add_widget(self.no_results_label)
+        results_section.add_widget(self.results_view)
 
         self.layout.add_widget(results_section)
 
@@ -526,10 +607,24 @@ class SearchReportScreen(Screen):
         back_button.bind(on_press=self.go_to_dashboard)
         footer_layout.add_widget(back_button)
         footer_layout.add_widget(Label())  # Spacer
+
+        self.load_more_button = Button(
+            text='Load More',
+            size_hint=(None, None),
+            size=(dp(200), dp(50)),
+            background_color=(0.2, 0.6, 1, 1),
+            color=(1, 1, 1, 1),
+            font_size=dp(16),
+            disabled=True
+        )
+        self.load_more_button.bind(on_press=self.load_more_results)
+        footer_layout.add_widget(self.load_more_button)
         self.layout.add_widget(footer_layout)
 
-        # Store search results
-        self.search_results = []
+        # Search state; further pages are fetched after next_after
+        self.search_criteria = SearchCriteria()
+        self.total_results = 0
+        self.next_after = None
 
         self.add_widget(self.layout)
 
@@ -567,104 +662,150 @@ class SearchReportScreen(Screen):
             print(f"Error loading building types: {e}")
             self.building_type_spinner.values = ['All Types']
 
-    def perform_search(self, instance):
-        """Perform property search based on criteria."""
-        search_criteria = {}
+    def build_criteria(self):
+        """Build search criteria from the form fields."""
+        criteria = SearchCriteria()
 
         # Property type
         if self.property_type_spinner.text != 'All Types':
-            code = self.property_type_spinner.text.split(' - ')[0]
-            search_criteria['Rstatetcode'] = code
+            criteria.equals('Rstatetcode', self.property_type_spinner.text.split(' - ')[0])
 
         # Building type
         if self.building_type_spinner.text != 'All Types':
-            code = self.building_type_spinner.text.split(' - ')[0]
-            search_criteria['Buildtcode'] = code
+            criteria.equals('Buildtcode', self.building_type_spinner.text.split(' - ')[0])
 
-        # Bedrooms
-        if self.min_bedrooms.text and self.max_bedrooms.text:
-            # We'll handle min/max in the client side filtering
-            pass
-        elif self.min_bedrooms.text:
-            search_criteria['N-of-bedrooms'] = int(self.min_bedrooms.text)
-        elif self.max_bedrooms.text:
-            # Just use max as exact for now (refine later)
-            search_criteria['N-of-bedrooms'] = int(self.max_bedrooms.text)
+        # Bedrooms range
+        criteria.between(
+            'N-of-bedrooms',
+            int(self.min_bedrooms.text) if self.min_bedrooms.text else None,
+            int(self.max_bedrooms.text) if self.max_bedrooms.text else None
+        )
 
-        # Area - handle in client side filtering
+        # Area range
+        criteria.between(
+            'Property-area',
+            float(self.min_area.text) if self.min_area.text else None,
+            float(self.max_area.text) if self.max_area.text else None
+        )
 
-        # Address
-        if self.address_input.text:
-            search_criteria['Property-address'] = '%' + self.address_input.text + '%'
+        # Address words go through the full-text index when it is available
+        if self.api.full_text_enabled:
+            criteria.matches(self.address_input.text, column='title')
+        else:
+            criteria.contains('Property-address', self.address_input.text.strip())
 
-        # Owner name - search in joined table
-        # We'll handle this in client side filtering
+        # Owner name substring
+        criteria.contains('ownername', self.owner_input.text.strip())
 
         # Corner property
         if self.corner_checkbox.active:
-            search_criteria['Property-corner'] = True
-
-        # Perform the search
-        results = self.api.search_properties(search_criteria)
-
-        # Apply client-side filtering for complex criteria
-        filtered_results = []
-        for prop in results:
-            # Filter by area range if specified
-            if self.min_area.text and self.max_area.text:
-                min_area = float(self.min_area.text)
-                max_area = float(self.max_area.text)
-                if 'Property-area' not in prop or prop['Property-area'] < min_area or prop['Property-area'] > max_area:
-                    continue
-            elif self.min_area.text:
-                min_area = float(self.min_area.text)
-                if 'Property-area' not in prop or prop['Property-area'] < min_area:
-                    continue
-            elif self.max_area.text:
-                max_area = float(self.max_area.text)
-                if 'Property-area' not in prop or prop['Property-area'] > max_area:
-                    continue
-
-            # Filter by bedroom range if both min and max specified
-            if self.min_bedrooms.text and self.max_bedrooms.text:
-                min_bedrooms = int(self.min_bedrooms.text)
-                max_bedrooms = int(self.max_bedrooms.text)
-                if 'N-of-bedrooms' not in prop or prop['N-of-bedrooms'] < min_bedrooms or prop['N-of-bedrooms'] > max_bedrooms:
-                    continue
-
-            # Filter by owner name
-            if self.owner_input.text:
-                owner_name = self.owner_input.text.lower()
-                if 'ownername' not in prop or owner_name not in prop['ownername'].lower():
-                    continue
-
-            filtered_results.append(prop)
-
-        # Store and display results
-        self.search_results = filtered_results
-        self.display_results(filtered_results)
-
-    def display_results(self, results):
-        """Display the search results."""
-        self.results_container.clear_widgets()
-        self.results_count.text = f"{len(results)} properties found"
+            criteria.equals('Property-corner', True)
 
-        if not results:
-            self.results_container.add_widget(Label(
-                text="No properties found matching your criteria.",
-                size_hint_y=None,
-                height=dp(60),
-                color=(0.5, 0.5, 0.5, 1),
-                font_size=dp(16)
-            ))
+        return criteria
+
+    def perform_search(self, instance):
+        """Perform property search based on criteria."""
+        self.search_criteria = self.build_criteria()
+        self.fetch_first_page()
+
+    def fetch_first_page(self):
+        """Fetch the first page of the current search in the current sort order."""
+        self.set_busy(True)
+
+        # Runs on the query worker; a newer search cancels this one and a
+        # database error reaches on_search_error instead of showing no results
+        self.executor.submit(
+            'search_properties_page', self.search_criteria, limit=RESULTS_PAGE_SIZE,
+            sort_by=self.results_model.sort_field, descending=self.results_model.descending, strict=True,
+            key='search',
+            on_result=lambda page: self.show_page(page, append=False),
+            on_error=self.on_search_error
+        )
+
+    def load_more_results(self, instance):
+        """Fetch the next page of results for the current search."""
+        if self.next_after is None:
             return
 
-        for prop in results:
-            self.results_container.add_widget(PropertyRow(
-                prop,
-                self.view_property_details,
-                self.export_property
-            ))
+        self.set_busy(True)
+        self.executor.submit(
+            'search_properties_page', self.search_criteria, after=self.next_after, limit=RESULTS_PAGE_SIZE,
+            sort_by=self.results_model.sort_field, descending=self.results_model.descending, strict=True,
+            key='search',
+            on_result=lambda page: self.show_page(page, append=True),
+            on_error=self.on_search_error
+        )
+
+    def show_page(self, page, append):
+        """Store and display a page of results delivered by the query worker."""
+        if append:
+            self.results_model.extend(page['results'])
+        else:
+            self.results_model.set_rows(page['results'])
+        self.total_results = page['total']
+        self.next_after = page['next_after']
+        self.set_busy(False)
+        self.display_results()
+
+    def on_search_error(self, error):
+        """Leave the busy state and report a failed search."""
+        self.set_busy(False)
+        self.results_count.text = f"Search failed: {error}"
+
+    def set_busy(self, busy):
+        """Show that a search is running instead of blocking the window."""
+        self.search_button.disabled = busy
+        if busy:
+            self.load_more_button.disabled = True
+            self.results_count.text = 'Searching...'
+        else:
+            self.load_more_button.disabled = self.next_after is None
+
+    @property
+    def search_results(self):
+        """Loaded search results in display order."""
+        return self.results_model.rows
+
+    def sort_results(self, field):
+        """
+        Sort the results by a column; clicking again reverses the order.
+
+        Once every match is loaded the rows are sorted in memory; otherwise
+        the search is fetched again in the new order, since the loaded pages
+        are only the start of the old order.
+        """
+        if self.next_after is None:
+            self.results_model.sort_by(field)
+            self.update_sort_headers()
+            self.results_view.data = self.results_model.view_data()
+        else:
+            self.results_model.set_sort(field)
+            self.update_sort_headers()
+            self.fetch_first_page()
+
+    def update_sort_headers(self):
+        """Mark the sorted column header with the sort direction."""
+        for field, (button, title) in self.sort_buttons.items():
+            if field == self.results_model.sort_field:
+                button.text = f"{title} {'▼' if self.results_model.descending else '▲'}"
+            else:
+                button.text = title
+
+    def display_results(self):
+        """Display the search results."""
+        loaded = len(self.results_model)
+        if loaded < self.total_results:
+            self.results_count.text = f"Showing {loaded} of {self.total_results} properties found"
+        else:
+            self.results_count.text = f"{self.total_results} properties found"
+        self.load_more_button.disabled = self.next_after is None
+
+        self.no_results_label.height = 0 if loaded else dp(60)
+        self.no_results_label.opacity = 0 if loaded else 1
+
+        # Rows are recycled; replacing the data only re-renders the visible ones
+        self.update_sort_headers()
+        self.results_view.data = self.results_model.view_data()
 
     def view_property_details(self, property_data):
         """Show detailed view of a property."""
@@ -676,8 +817,8 @@ class SearchReportScreen(Screen):
         self.export_to_csv([property_data])
 
     def export_results(self, instance):
-        """Export all search results to CSV."""
-        if not self.search_results:
+        """Export every property matching the current search in the chosen format, in the background."""
+        if not self.total_results:
             popup = Popup(
                 title='Export Error',
                 content=Label(text='No search results to export.', color=(0, 0, 0, 1)),
@@ -686,45 +827,79 @@ class SearchReportScreen(Screen):
             popup.open()
             return
 
-        self.export_to_csv(self.search_results)
+        if self.export_job is not None:
+            return
+
+        exporter = self.export_formats[self.export_format_spinner.text]
+        compress = self.compress_checkbox.active
+        try:
+            filename = export_path(exporter.default_extension(compress))
+        except OSError as e:
+            self.show_export_error(e)
+            return
+
+        # Progress arrives on the export thread; the popup is updated on the UI thread
+        self.export_job = exporter(
+            filename, self.search_criteria, compress=compress,
+            progress=lambda written, total: kivy_dispatch(lambda: self.update_export_progress(written, total))
+        )
+        self.export_popup = ExportProgressPopup(on_cancel=self.export_job.cancel)
+        self.export_popup.open()
+
+        self.export_executor.submit(
+            self.export_job.run, key='export',
+            on_result=self.on_export_done,
+            on_error=self.on_export_error
+        )
+
+    def update_export_progress(self, written, total):
+        """Move the progress bar of the running export."""
+        if self.export_popup is not None:
+            self.export_popup.set_progress(written, total)
+
+    def on_export_done(self, filename):
+        """Close the progress popup and show where the export was written."""
+        self.finish_export()
+        popup = Popup(
+            title='Export Successful',
+            content=Label(text=f'Properties exported to:\n{filename}', color=(0, 0, 0, 1)),
+            size_hint=(0.7, 0.3)
+        )
+        popup.open()
+
+    def on_export_error(self, error):
+        """Close the progress popup and report a failed or cancelled export."""
+        self.finish_export()
+        if not isinstance(error, ExportCancelled):
+            self.show_export_error(error)
+
+    def finish_export(self):
+        """Close the progress popup and forget the finished export."""
+        if self.export_popup is not None:
+            self.export_popup.dismiss()
+        self.export_popup = None
+        self.export_job = None
+
+    def shutdown(self):
+        """Cancel a running export and stop the export worker (called when the app stops)."""
+        if self.export_job is not None:
+            self.export_job.cancel()
+        self.export_executor.shutdown()
+
+    def show_export_error(self, error):
+        """Show a popup explaining why an export could not be written."""
+        popup = Popup(
+            title='Export Error',
+            content=Label(text=f'Failed to export properties: {str(error)}', color=(0, 0, 0, 1)),
+            size_hint=(0.7, 0.3)
+        )
+        popup.open()
 
     def export_to_csv(self, properties):
-        """Export properties to a CSV file."""
+        """Export already loaded properties to a CSV file."""
         try:
-            # Create exports directory if it doesn't exist
-            export_dir = os.path.join(os.path.expanduser('~'), 'property_exports')
-            os.makedirs(export_dir, exist_ok=True)
-
-            # Generate filename with timestamp
-            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = os.path.join(export_dir, f'property_export_{timestamp}.csv')
-
-            # Define CSV headers
-            headers = [
-                'Property Code', 'Property Type', 'Building Type', 'Area',
-                'Bedrooms', 'Bathrooms', 'Corner Property', 'Address',
-                'Owner Name', 'Owner Code', 'Description'
-            ]
-
-            # Write to CSV
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
-
-                for prop in properties:
-                    writer.writerow([
-                        prop.get('realstatecode', ''),
-                        prop.get('property_type', ''),
-                        prop.get('building_type', ''),
-                        prop.get('Property-area', ''),
-                        prop.get('N-of-bedrooms', ''),
-                        prop.get('N-of-bathrooms', ''),
-                        'Yes' if prop.get('Property-corner', False) else 'No',
-                        prop.get('Property-address', ''),
-                        prop.get('ownername', ''),
-                        prop.get('Ownercode', ''),
-                        prop.get('Descriptions', '')
-                    ])
+            filename = export_path('.csv')
+            write_csv(properties, filename)
 
             # Show success message
             popup = Popup(
@@ -735,16 +910,12 @@ class SearchReportScreen(Screen):
             popup.open()
 
         except Exception as e:
-            # Show error message
-            popup = Popup(
-                title='Export Error',
-                content=Label(text=f'Failed to export properties: {str(e)}', color=(0, 0, 0, 1)),
-                size_hint=(0.7, 0.3)
-            )
-            popup.open()
+            self.show_export_error(e)
 
     def clear_search(self, instance):
         """Clear all search criteria."""
+        self.executor.cancel('search')
+        self.search_button.disabled = False
         self.property_type_spinner.text = 'All Types'
         self.building_type_spinner.text = 'All Types'
         self.min_bedrooms.text = ''
@@ -756,8 +927,14 @@ class SearchReportScreen(Screen):
         self.corner_checkbox.active = False
 
         # Clear results
-        self.search_results = []
-        self.results_container.clear_widgets()
+        self.results_model.clear()
+        self.total_results = 0
+        self.next_after = None
+        self.load_more_button.disabled = True
+        self.no_results_label.height = 0
+        self.no_results_label.opacity = 0
+        self.update_sort_headers()
+        self.results_view.data = []
         self.results_count.text = '0 properties found'
 
     def go_to_dashboard(self, instance=None):
@@ -2,12 +2,19 @@ from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
+from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp
 from kivy.graphics import Color, Rectangle
+from kivy.utils import escape_markup
+from src.models.database_api import get_api
+
+# Number of statements listed in the query statistics panel
+QUERY_STATS_ROWS = 15
 
 class SettingsScreen(Screen):
     def __init__(self, **kwargs):
         super(SettingsScreen, self).__init__(**kwargs)
+        self.api = get_api()
 
         # Main layout
         self.layout = BoxLayout(orientation='vertical', padding=dp(20), spacing=dp(15))
@@ -53,10 +60,55 @@ class SettingsScreen(Screen):
         )
         content_area.add_widget(settings_info)
 
-        self.layout.add_widget(content_area)
+        # Query statistics panel: the slowest statements by total time
+        stats_header = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(40), spacing=dp(10))
+        stats_header.add_widget(Label(
+            text='Query Statistics',
+            font_size=dp(18),
+            bold=True,
+            color=(0.2, 0.2, 0.2, 1),
+            halign='left'
+        ))
+
+        refresh_button = Button(
+            text='Refresh',
+            size_hint_x=None,
+            width=dp(100),
+            background_color=(0.2, 0.6, 1, 1),
+            color=(1, 1, 1, 1)
+        )
+        refresh_button.bind(on_press=self.refresh_query_stats)
+        stats_header.add_widget(refresh_button)
+
+        reset_button = Button(
+            text='Reset',
+            size_hint_x=None,
+            width=dp(100),
+            background_color=(0.7, 0.7, 0.7, 1),
+            color=(1, 1, 1, 1)
+        )
+        reset_button.bind(on_press=self.reset_query_stats)
+        stats_header.add_widget(reset_button)
+        content_area.add_widget(stats_header)
+
+        self.stats_label = Label(
+            text='',
+            font_size=dp(12),
+            size_hint_y=None,
+            color=(0.2, 0.2, 0.2, 1),
+            halign='left',
+            valign='top',
+            markup=True
+        )
+        self.stats_label.bind(
+            width=lambda instance, value: setattr(instance, 'text_size', (value, None)),
+            texture_size=lambda instance, value: setattr(instance, 'height', value[1])
+        )
+        stats_scroll = ScrollView(do_scroll_x=False)
+        stats_scroll.add_widget(self.stats_label)
+        content_area.add_widget(stats_scroll)
 
-        # Spacer to push buttons to bottom
-        self.layout.add_widget(Label())
+        self.layout.add_widget(content_area)
 
         # Button layout at the bottom
         button_layout = BoxLayout(
@@ -102,6 +154,33 @@ class SettingsScreen(Screen):
         self.rect.pos = instance.pos
         self.rect.size = instance.size
 
+    def on_enter(self):
+        """Show current query statistics when entering the screen."""
+        self.refresh_query_stats()
+
+    def refresh_query_stats(self, instance=None):
+        """Show the statements with the highest total time."""
+        stats = self.api.get_query_stats(limit=QUERY_STATS_ROWS)
+        if not stats:
+            self.stats_label.text = 'No queries recorded yet.'
+            return
+
+        lines = []
+        for entry in stats:
+            caller = max(entry['callers'], key=entry['callers'].get)
+            lines.append(
+                f"[b]{entry['count']}x[/b]  total {entry['total_ms']:.1f} ms  "
+                f"p50 {entry['p50_ms']:.2f}  p95 {entry['p95_ms']:.2f}  p99 {entry['p99_ms']:.2f} ms  "
+                f"rows {entry['rows']}  [i]{caller}[/i]\n"
+                f"    {escape_markup(entry['sql'][:160])}"
+            )
+        self.stats_label.text = '\n'.join(lines)
+
+    def reset_query_stats(self, instance=None):
+        """Clear the query statistics."""
+        self.api.reset_query_stats()
+        self.refresh_query_stats()
+
     def go_to_dashboard(self, instance=None):
         """Navigate back to the dashboard."""
         self.manager.current = 'dashboard'
@@ -0,0 +1,214 @@
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.graphics.texture import Texture
+from kivy.metrics import dp
+from kivy.properties import StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.image import Image
+from kivy.uix.label import Label
+from kivy.uix.scrollview import ScrollView
+
+from configs import settings
+from src.models.query_executor import kivy_dispatch
+from src.models.texture_cache import get_texture_cache
+from src.models.thumbnails import get_thumbnail_service, photo_key
+
+# Textures uploaded per frame; the rest wait for the following frames
+TEXTURE_UPLOADS_PER_FRAME = 4
+
+
+def thumbnail_texture(thumbnail):
+    """Upload a decoded Thumbnail as a texture (UI thread only)."""
+    texture = Texture.create(size=(thumbnail.width, thumbnail.height), colorfmt='rgba')
+    texture.blit_buffer(thumbnail.pixels, colorfmt='rgba', bufferfmt='ubyte')
+    # Pillow rows run top to bottom, texture rows bottom to top
+    texture.flip_vertical()
+    return texture
+
+
+class TextureUploader:
+    """
+    Uploads decoded thumbnails a few per frame.
+
+    Photos often finish decoding together; spreading their uploads over
+    several frames keeps each frame short.
+    """
+
+    def __init__(self, per_frame=TEXTURE_UPLOADS_PER_FRAME):
+        self.per_frame = per_frame
+        self._pending = deque()
+        self._trigger = Clock.create_trigger(self._upload, 0)
+
+    def submit(self, cache_key, thumbnail, callback):
+        """
+        Queue a thumbnail for upload (UI thread only).
+
+        Args:
+            cache_key (tuple): Texture cache key (photo key, pyramid size)
+            thumbnail (Thumbnail): Decoded thumbnail
+            callback (callable): Called with the texture once uploaded
+        """
+        self._pending.append((cache_key, thumbnail, callback))
+        self._trigger()
+
+    def _upload(self, dt):
+        cache = get_texture_cache()
+        for _ in range(min(self.per_frame, len(self._pending))):
+            cache_key, thumbnail, callback = self._pending.popleft()
+            # Another widget may have uploaded the same photo meanwhile
+            texture = cache.get(cache_key)
+            if texture is None:
+                texture = thumbnail_texture(thumbnail)
+                cache.put(cache_key, texture, thumbnail.width * thumbnail.height * 4)
+            callback(texture)
+        if self._pending:
+            self._trigger()
+
+
+_uploader = None
+
+def get_uploader():
+    """Get the shared texture uploader (UI thread only)."""
+    global _uploader
+    if _uploader is None:
+        _uploader = TextureUploader()
+    return _uploader
+
+
+class PhotoThumbnail(BoxLayout):
+    """
+    A photo shown at thumbnail size with its name underneath.
+
+    Nothing is read until load() is called. The texture comes from the shared
+    texture cache when possible; otherwise the thumbnail is generated or read
+    from the thumbnail cache in the background. The name is shown alone until
+    it arrives or if the photo cannot be read.
+    """
+
+    source = StringProperty('')
+    caption = StringProperty('')
+
+    def __init__(self, source, caption, digest=None, **kwargs):
+        kwargs.setdefault('orientation', 'vertical')
+        kwargs.setdefault('size_hint_y', None)
+        kwargs.setdefault('height', dp(120))
+        super().__init__(**kwargs)
+        self.source = source
+        self.caption = caption
+        self.digest = digest
+        self.requested = False
+        self.image = Image(fit_mode='contain')
+        self.add_widget(self.image)
+        self.add_widget(Label(text=caption, size_hint_y=None, height=dp(20),
+                              color=(0.2, 0.2, 0.2, 1), shorten=True))
+
+    def load(self):
+        """Show the thumbnail sized for this widget's height (once)."""
+        if self.requested:
+            return
+        self.requested = True
+        try:
+            key = photo_key(self.source, self.digest)
+        except OSError:
+            return
+
+        service = get_thumbnail_service()
+        size = service.pick_size(int(self.height))
+        cache_key = (key, size)
+        texture = get_texture_cache().get(cache_key)
+        if texture is not None:
+            self.image.texture = texture
+            return
+
+        future = service.load(self.source, key, size)
+        future.add_done_callback(lambda done: kivy_dispatch(lambda: self._loaded(done, cache_key)))
+
+    def _loaded(self, future, cache_key):
+        if future.cancelled() or future.exception() is not None:
+            return
+        get_uploader().submit(cache_key, future.result(), self._show)
+
+    def _show(self, texture):
+        self.image.texture = texture
+
+
+class PhotoGallery(ScrollView):
+    """
+    Scrollable grid of photo thumbnails.
+
+    Only the photos in view are loaded, followed by the next rows in the
+    direction of scrolling, so a property with many photos opens at once
+    and scrolling finds the next photos ready.
+    """
+
+    def __init__(self, cols=4, tile_height=dp(120), prefetch_rows=None, **kwargs):
+        """
+        Initialize the gallery.
+
+        Args:
+            cols (int): Photos per row
+            tile_height (float): Height of each photo with its name
+            prefetch_rows (int, optional): Rows loaded beyond the visible ones,
+                                           defaults to settings.GALLERY_PREFETCH_ROWS
+        """
+        super().__init__(**kwargs)
+        self.cols = cols
+        self.tile_height = tile_height
+        self.prefetch_rows = settings.GALLERY_PREFETCH_ROWS if prefetch_rows is None else prefetch_rows
+        self.tiles = []
+        self._last_scroll_y = 1.0
+
+        self.grid = GridLayout(cols=cols, spacing=dp(5), size_hint_y=None)
+        self.grid.bind(minimum_height=self.grid.setter('height'))
+        self.add_widget(self.grid)
+
+        self._trigger_load = Clock.create_trigger(self.load_visible, 0)
+        self.bind(scroll_y=self._trigger_load, height=self._trigger_load)
+        self.grid.bind(height=self._trigger_load)
+
+    def add_photos(self, photos):
+        """
+        Add photos to the end of the gallery.
+
+        Args:
+            photos (list): (file, caption, content hash or None) tuples
+        """
+        for source, caption, digest in photos:
+            tile = PhotoThumbnail(source, caption, digest=digest, height=self.tile_height)
+            self.tiles.append(tile)
+            self.grid.add_widget(tile)
+        self._trigger_load()
+
+    def clear_photos(self):
+        """Remove every photo."""
+        self.grid.clear_widgets()
+        self.tiles = []
+
+    def visible_rows(self):
+        """Return the (first, last) rows at least partly in view."""
+        pitch = self.tile_height + self.grid.spacing[1]
+        hidden = max(self.grid.height - self.height, 0)
+        top = (1 - self.scroll_y) * hidden
+        return int(top // pitch), int((top + self.height) // pitch)
+
+    def load_visible(self, *args):
+        """Load the photos in view, then the rows ahead of the scrolling direction."""
+        if not self.tiles:
+            return
+        first, last = self.visible_rows()
+        scrolling_up = self.scroll_y > self._last_scroll_y
+        self._last_scroll_y = self.scroll_y
+
+        rows = list(range(first, last + 1))
+        if scrolling_up:
+            rows += list(range(first - 1, first - 1 - self.prefetch_rows, -1))
+        else:
+            rows += list(range(last + 1, last + 1 + self.prefetch_rows))
+
+        for row in rows:
+            if row < 0:
+                continue
+            for tile in self.tiles[row * self.cols:(row + 1) * self.cols]:
+                tile.load()
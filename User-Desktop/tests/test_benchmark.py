@@ -0,0 +1,106 @@
+"""
+Test script for the benchmark suite and its baseline comparison.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_utils.api_benchmark import run_benchmarks
+from database_utils.benchmark_results import (compare_results, load_results, regressions, timing_result,
+                                              write_results)
+
+
+def document(*results):
+    return {'suite': 'api', 'results': list(results)}
+
+
+class TestBenchmarkResults(unittest.TestCase):
+    """Test cases for the results file and comparison."""
+
+    def test_timing_result(self):
+        """Repeated timings are summarized by their median."""
+        result = timing_result('search.type', 1000, 10, [0.3, 0.1, 0.2])
+        self.assertEqual((result['median_s'], result['min_s'], result['max_s']), (0.2, 0.1, 0.3))
+        self.assertEqual(result['ops_per_second'], 50.0)
+
+    def test_compare(self):
+        """Slowdowns beyond the threshold are flagged; noise and new measurements are not."""
+        baseline = document(
+            timing_result('search.type', 1000, 1, [0.100]),
+            timing_result('search.ranges', 1000, 1, [0.100]),
+            timing_result('owners.get_all', 1000, 1, [0.0001]),
+            timing_result('export.csv', 1000, 1, [0.500]),
+            timing_result('dashboard.stats', 1000, 1, [0.100]),
+        )
+        current = document(
+            timing_result('search.type', 1000, 1, [0.150]),
+            timing_result('search.ranges', 1000, 1, [0.110]),
+            timing_result('owners.get_all', 1000, 1, [0.0004]),
+            timing_result('export.csv', 1000, 1, [0.200]),
+            timing_result('search.type', 5000, 1, [0.900]),
+        )
+
+        statuses = {(c.name, c.scale): c.status for c in compare_results(baseline, current, threshold=0.2)}
+        self.assertEqual(statuses, {
+            ('search.type', 1000): 'regression',
+            ('search.ranges', 1000): 'unchanged',
+            ('owners.get_all', 1000): 'unchanged',
+            ('export.csv', 1000): 'improvement',
+            ('search.type', 5000): 'new',
+            ('dashboard.stats', 1000): 'missing',
+        })
+        self.assertEqual(len(regressions(compare_results(baseline, current, threshold=0.6))), 0)
+
+    def test_round_trip(self):
+        """Written results load back with the run's environment."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'results', 'run.json')
+            write_results(path, 'api', [timing_result('search.type', 1000, 1, [0.1])], {'repeats': 1})
+            loaded = load_results(path)
+            self.assertEqual(loaded['results'][0]['name'], 'search.type')
+            self.assertEqual(loaded['environment']['sqlite'], sqlite3.sqlite_version)
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+class TestApiBenchmark(unittest.TestCase):
+    """Test cases for run_benchmarks."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Tear down test case."""
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def dump(self):
+        path = os.path.join(self.tmpdir, 'benchmark_300_42.db')
+        with sqlite3.connect(path) as connection:
+            return [connection.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3").fetchall()
+                    for table in ('Owners', 'Realstatspecification', 'realstatephotos')]
+
+    def test_run(self):
+        """Every measurement runs, and the changes they make are undone."""
+        results = run_benchmarks(scales=(300,), repeats=1, data_dir=self.tmpdir,
+                                 only=['search.', 'properties.', 'photos.'])
+        before = self.dump()
+        names = {result['name'] for result in results}
+        self.assertTrue({'search.full_text', 'properties.add', 'properties.update', 'photos.add_delete'} <= names)
+        self.assertTrue(all(result['scale'] == 300 and result['repeats'] == 1 for result in results))
+
+        # The generated database is reused, and left as generated
+        run_benchmarks(scales=(300,), repeats=1, data_dir=self.tmpdir, only=['properties.', 'photos.'])
+        self.assertEqual(self.dump(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Test script for the bulk CSV importer.
+"""
+
+import csv
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.bulk_import import BulkImporter, normalize_header
+from src.models.code_allocator import CodeSpaceExhausted
+from src.models.database_api import DatabaseAPI
+
+
+class TestBulkImport(unittest.TestCase):
+    """Test cases for BulkImporter."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.api = DatabaseAPI()
+        self.api.db.db_path = ":memory:"
+        self.assertTrue(self.api.connect())
+        self.api.set_company_code('E901')
+        self.api.insert_initial_data()
+        self.owner_code = self.api.add_owner("Import Owner", "07901234567")
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.api.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmpdir, 'import.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+            csv.writer(csv_file).writerows(rows)
+        return path
+
+    def property_rows(self, count):
+        header = ['Property Type', 'building_type', '"Property-area"', 'Bedrooms', 'Province', 'Owner', 'Address', 'Year']
+        rows = [header]
+        for i in range(count):
+            rows.append(['03001', 'Apartment', str(50 + i), str(i % 4), 'Basra', self.owner_code, f'Street {i}', '2010'])
+        return rows
+
+    def test_normalize_header(self):
+        """Headers match regardless of case, spaces, hyphens and quotes."""
+        self.assertEqual(normalize_header('"Property-area"'), 'propertyarea')
+        self.assertEqual(normalize_header(' N of Bedrooms '), 'nofbedrooms')
+
+    def test_import_properties(self):
+        """Rows are normalized, get allocated codes and feed the derived tables."""
+        report = self.api.import_csv(self.write_csv(self.property_rows(25)), 'properties', chunk_size=10)
+
+        self.assertEqual((report.rows_read, report.imported, report.error_count), (25, 25, 0))
+        self.assertEqual(report.unmapped_columns, [])
+
+        properties = self.api.get_all_properties()
+        self.assertEqual(len(properties), 25)
+        first = min(properties, key=lambda row: row['realstatecode'])
+        self.assertEqual(first['Buildtcode'], '04001')
+        self.assertEqual(first['Province-code'], '01002')
+        self.assertEqual(first['Property-area'], 50.0)
+        self.assertEqual(first['Yearmake'], '2010-01-01')
+        self.assertEqual(first['Unitm-code'], '05001')
+
+        # The set-based trigger work matches what the triggers would have done
+        self.assertEqual(len(self.api.full_text_search('street', kind='property', limit=50)), 25)
+        self.assertEqual(self.api.get_dashboard_stats()['total']['count'], 25)
+        stats = self.api.db.execute_query("SELECT * FROM property_stats ORDER BY dimension, group_key")
+        histogram = self.api.db.execute_query("SELECT * FROM property_bedroom_stats ORDER BY dimension, group_key, bedrooms")
+        self.assertTrue(self.api.rebuild_dashboard_stats())
+        self.assertEqual([tuple(row) for row in stats], [tuple(row) for row in self.api.db.execute_query(
+            "SELECT * FROM property_stats ORDER BY dimension, group_key")])
+        self.assertEqual([tuple(row) for row in histogram], [tuple(row) for row in self.api.db.execute_query(
+            "SELECT * FROM property_bedroom_stats ORDER BY dimension, group_key, bedrooms")])
+        self.assertEqual(len(self.api.get_property_changes(0)[1]), 25)
+
+        triggers = {row['name'] for row in self.api.db.execute_query(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        self.assertTrue({'chg_property_insert', 'stats_property_insert', 'fts_property_insert'} <= triggers)
+
+    def test_row_errors_do_not_abort(self):
+        """Invalid rows are reported with their line numbers and skipped."""
+        rows = self.property_rows(4)
+        rows[2][0] = 'Castle'      # unknown property type
+        rows[3][2] = 'big'         # not a number
+        rows[4][5] = ''            # missing owner
+        report = self.api.import_csv(self.write_csv(rows), 'properties')
+
+        self.assertEqual(report.imported, 1)
+        self.assertEqual([error.line for error in report.errors], [3, 4, 5])
+        self.assertIn('Rstatetcode', report.errors[0].message)
+        self.assertEqual(str(report.errors[2]), "Line 5: Ownercode is required")
+
+    def test_missing_required_column(self):
+        """A file without a required column is rejected before any row is read."""
+        report = self.api.import_csv(self.write_csv([['Area'], ['100']]), 'properties')
+        self.assertIn('Rstatetcode', report.aborted)
+        self.assertEqual(report.rows_read, 0)
+
+    def test_column_map_and_owners(self):
+        """An explicit column map overrides header matching."""
+        path = self.write_csv([
+            ['Full Name', 'Mobile', 'Ignored'],
+            ['Sara Kamil', '0790 123 4567', 'x'],
+            ['Bad Phone', '12345', 'x'],
+        ])
+        report = self.api.import_csv(path, 'owners', column_map={'Full Name': 'ownername', 'Mobile': 'ownerphone'})
+
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(report.unmapped_columns, ['Ignored'])
+        owners = {owner['ownername']: owner for owner in self.api.get_all_owners()}
+        self.assertEqual(owners['Sara Kamil']['ownerphone'], '07901234567')
+
+    def test_failed_batch_falls_back_to_rows(self):
+        """A batch the database rejects is retried row by row."""
+        with mock.patch.object(self.api.db, 'bulk_insert_properties', side_effect=sqlite3.Error("boom")):
+            report = self.api.import_csv(self.write_csv(self.property_rows(3)), 'properties')
+        self.assertEqual(report.imported, 3)
+        self.assertEqual(len(self.api.get_all_properties()), 3)
+
+    def test_rejected_batch_keeps_triggers(self):
+        """A failed bulk insert rolls back, restoring the suspended triggers."""
+        query = "INSERT INTO Realstatspecification (Companyco, realstatecode) VALUES (?, ?)"
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.api.db.bulk_insert_properties(query, [('E901', 'E9019999'), ('E901', 'E9019999')], ['E9019999'])
+        self.assertEqual(self.api.get_all_properties(), [])
+
+        self.api.add_property({'Rstatetcode': '03001'})
+        self.assertEqual(self.api.get_dashboard_stats()['total']['count'], 1)
+
+    def test_progress_can_stop(self):
+        """Returning False from the progress callback stops after the current chunk."""
+        reports = []
+
+        def progress(report):
+            reports.append(report.imported)
+            return False
+
+        importer = BulkImporter(self.api, 'properties', chunk_size=5, progress=progress)
+        report = importer.import_file(self.write_csv(self.property_rows(20)))
+        self.assertEqual(reports, [5])
+        self.assertEqual(report.imported, 5)
+        self.assertEqual(report.aborted, "Cancelled")
+
+    def test_code_space_exhausted(self):
+        """Running out of codes stops the import and reports the rows left over."""
+        with mock.patch.object(self.api, 'reserve_owner_codes', side_effect=CodeSpaceExhausted("Owner codes are exhausted")):
+            report = self.api.import_csv(self.write_csv([['Name', 'Phone'], ['A', '07901234567']]), 'owners')
+        self.assertEqual(report.imported, 0)
+        self.assertEqual(report.error_count, 1)
+        self.assertEqual(report.aborted, "Owner codes are exhausted")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Test script for the owner and property code allocator.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.database_api import DatabaseAPI
+from src.models.code_allocator import (
+    CodeAllocator, CodeSpace, CodeSpaceExhausted, owner_code_space, property_code_space
+)
+
+
+class TestCodeSpace(unittest.TestCase):
+    """Test cases for CodeSpace formatting."""
+
+    def test_format_and_parse(self):
+        """Codes round-trip through their sequence value."""
+        space = property_code_space('E901')
+        self.assertEqual(space.format(0), 'E9010000')
+        self.assertEqual(space.format(36), 'E9010010')
+        self.assertEqual(space.parse('E901ZZZZ'), space.capacity - 1)
+        self.assertIsNone(space.parse('E9020000'))
+        self.assertIsNone(space.parse('E901abc!'))
+
+        owners = owner_code_space()
+        self.assertEqual(owners.format(5), 'A005')
+        self.assertEqual(owners.parse('A999'), 999)
+        self.assertEqual(str(owners), 'A000-A999')
+
+
+class TestCodeAllocator(unittest.TestCase):
+    """Test cases for CodeAllocator."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.api = DatabaseAPI()
+        self.api.db.db_path = ":memory:"
+        self.assertTrue(self.api.connect())
+        self.api.set_company_code('E901')
+        self.api.insert_initial_data()
+        self.db = self.api.db
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.api.close()
+
+    def add_owner(self, code):
+        self.db.execute_query(
+            "INSERT INTO Owners (Ownercode, ownername, ownerphone) VALUES (?, ?, ?)",
+            (code, f"Owner {code}", "0790000000")
+        )
+
+    def test_sequential_owner_codes(self):
+        """Owner codes are handed out in order without collisions."""
+        codes = [self.api.add_owner(f"Owner {i}", "0790000000") for i in range(5)]
+        self.assertEqual(codes, ['A000', 'A001', 'A002', 'A003', 'A004'])
+
+    def test_sequence_starts_after_existing_codes(self):
+        """A new sequence continues after codes already in the table."""
+        self.add_owner('A005')
+        self.add_owner('X123')  # outside the code space, ignored
+        self.assertEqual(self.api.add_owner("New Owner", "0790000000"), 'A006')
+
+    def test_bulk_reservation(self):
+        """Bulk reservations return distinct codes and advance the sequence."""
+        codes = self.api.reserve_owner_codes(10)
+        self.assertEqual(len(set(codes)), 10)
+        self.assertEqual(self.api.add_owner("Next", "0790000000"), 'A010')
+
+        property_codes = self.api.reserve_property_codes(40)
+        self.assertEqual(property_codes[0], 'E9010000')
+        self.assertEqual(property_codes[-1], 'E9010013')
+
+        self.api.company_code = None
+        with self.assertRaises(ValueError):
+            self.api.reserve_property_codes(1)
+
+    def test_block_reservation(self):
+        """Codes of a reserved block are served without touching the sequence."""
+        allocator = CodeAllocator(self.db, owner_code_space(), block_size=8)
+        self.assertEqual(allocator.next_code(), 'A000')
+        rows = self.db.execute_query("SELECT next_value FROM code_sequences WHERE name = 'owner'")
+        self.assertEqual(rows[0]['next_value'], 8)
+
+        # A second allocator (another session) starts after the reserved block
+        other = CodeAllocator(self.db, owner_code_space())
+        self.assertEqual(other.next_code(), 'A008')
+        self.assertEqual(allocator.next_code(), 'A001')
+
+    def test_reclaims_free_codes_and_exhausts(self):
+        """After the sequence wraps, free codes are reused until none remain."""
+        space = CodeSpace('tiny', 'Owners', 'Ownercode', 'T', '0123', 1)
+        allocator = CodeAllocator(self.db, space)
+        for code in allocator.allocate(4):
+            self.add_owner(code)
+
+        self.db.execute_query("DELETE FROM Owners WHERE Ownercode = 'T1'")
+        self.assertEqual(allocator.next_code(), 'T1')
+        self.add_owner('T1')
+
+        with self.assertRaises(CodeSpaceExhausted):
+            allocator.next_code()
+
+    def test_exhausted_request_consumes_nothing(self):
+        """A request larger than the remaining codes fails without losing any."""
+        space = CodeSpace('tiny', 'Owners', 'Ownercode', 'T', '0123', 1)
+        allocator = CodeAllocator(self.db, space)
+        self.add_owner(allocator.next_code())
+        with self.assertRaises(CodeSpaceExhausted):
+            allocator.allocate(4)
+        self.assertEqual(allocator.allocate(3), ['T1', 'T2', 'T3'])
+
+        # Same once the sequence has wrapped and codes come from the free list
+        self.db.execute_query("DELETE FROM Owners WHERE Ownercode IN ('T0', 'T2')")
+        allocator = CodeAllocator(self.db, space)
+        for code in ('T1', 'T3'):
+            self.add_owner(code)
+        with self.assertRaises(CodeSpaceExhausted):
+            allocator.allocate(3)
+        self.assertEqual(allocator.allocate(2), ['T0', 'T2'])
+
+    def test_reservation_in_rolled_back_transaction(self):
+        """Codes reserved in a transaction that rolls back are not handed out twice."""
+        allocator = CodeAllocator(self.db, owner_code_space(), block_size=8)
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.assertEqual(allocator.next_code(), 'A000')
+                raise RuntimeError("abort")
+
+        codes = [allocator.next_code() for _ in range(14)]
+        self.assertEqual(len(set(codes)), 14)
+        self.assertEqual(codes[:2], ['A000', 'A001'])
+
+    def test_resync(self):
+        """resync moves the sequence past codes inserted without the allocator."""
+        allocator = self.api.owner_codes
+        self.assertEqual(allocator.next_code(), 'A000')
+        self.add_owner('A050')
+        allocator.resync()
+        self.assertEqual(allocator.next_code(), 'A051')
+
+    def test_property_codes_are_unique(self):
+        """Properties get distinct codes from the company's space."""
+        owner_code = self.api.add_owner("Owner", "0790000000")
+        codes = set()
+        for _ in range(20):
+            codes.add(self.api.add_property({
+                'Rstatetcode': '01001',
+                'Yearmake': '2020-01-01',
+                'Ownercode': owner_code,
+            }))
+        self.assertEqual(len(codes), 20)
+        self.assertTrue(all(code.startswith('E901') for code in codes))
+
+
+if __name__ == '__main__':
+    unittest.main()
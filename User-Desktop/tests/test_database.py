@@ -2,11 +2,16 @@ import os
 import sys
 import unittest
 import sqlite3
+import tempfile
+import threading
 
 # Add parent directory to path to allow importing from configs
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from configs.database import DatabaseManager, connect_to_local_db, connect_to_cloud_db
+from configs.database import (
+    DatabaseManager, StatementCache, ConnectionPool, QueryStats, classify_query, normalize_sql, INDEXES,
+    connect_to_local_db, connect_to_cloud_db
+)
 
 class TestDatabaseConnection(unittest.TestCase):
 
@@ -51,6 +56,39 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertIn('Realstatspecification', table_names)
         self.assertIn('realstatephotos', table_names)
 
+    def test_create_indexes(self):
+        """Test the managed index catalogue is created and migrated."""
+        self.assertTrue(self.db.create_tables())
+
+        def managed_indexes():
+            rows = self.db.execute_query("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'")
+            return {row['name'] for row in rows}
+
+        self.assertEqual(managed_indexes(), {name for name, _, _ in INDEXES})
+
+        # Obsolete managed indexes are dropped, changed ones rebuilt
+        self.db.execute_query("CREATE INDEX idx_obsolete ON Owners (ownerphone)")
+        self.db.execute_query("DROP INDEX idx_owners_name")
+        self.db.execute_query("CREATE INDEX idx_owners_name ON Owners (ownerphone)")
+        self.assertTrue(self.db.create_tables())
+
+        self.assertNotIn('idx_obsolete', managed_indexes())
+        sql = self.db.execute_query("SELECT sql FROM sqlite_master WHERE name = 'idx_owners_name'")[0]['sql']
+        self.assertEqual(sql, "CREATE INDEX idx_owners_name ON Owners (ownername)")
+
+    def test_add_missing_columns(self):
+        """Test columns added in later versions are added to existing tables."""
+        self.db.execute_query(
+            "CREATE TABLE realstatephotos (realstatecode CHAR(8) NOT NULL, Storagepath VARCHAR(50), "
+            "photofilename VARCHAR(30), Photoextension CHAR(4), PRIMARY KEY (realstatecode, photofilename))"
+        )
+        self.db.execute_query("INSERT INTO realstatephotos VALUES ('E9010000', '/photos/E901/', 'front', '.jpg')")
+        self.assertTrue(self.db.create_tables())
+
+        photo = self.db.execute_query("SELECT * FROM realstatephotos")[0]
+        self.assertEqual(photo['photofilename'], 'front')
+        self.assertIsNone(photo['photohash'])
+
     def test_insert_and_query(self):
         """Test inserting and querying data."""
         self.db.create_tables()
@@ -97,8 +135,318 @@ class TestDatabaseManager(unittest.TestCase):
         owners = self.db.execute_query("SELECT * FROM Owners WHERE Ownercode = ?", ('A123',))
         self.assertEqual(len(owners), 0)
 
-if __name__ == '__main__':
-    unittest.main()
+class TestQueryLayer(unittest.TestCase):
+    """Test cases for statement caching, records and streaming queries."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.db = DatabaseManager(db_path=":memory:")
+        self.assertTrue(self.db.connect_local())
+        self.db.create_tables()
+        for i in range(25):
+            self.db.execute_query(
+                "INSERT INTO Owners (Ownercode, ownername, ownerphone) VALUES (?, ?, ?)",
+                (f'A{i:03d}', f'Owner {i}', '07800000000')
+            )
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.db.close()
+
+    def test_classify_query(self):
+        """Test query kinds are detected past whitespace and comments."""
+        self.assertTrue(classify_query("  select 1").returns_rows)
+        self.assertTrue(classify_query("-- note\n/* block */ PRAGMA user_version").returns_rows)
+        self.assertTrue(classify_query("WITH x AS (SELECT 1) SELECT * FROM x").returns_rows)
+        self.assertEqual(classify_query("\nINSERT INTO Owners VALUES (1)").kind, 'INSERT')
+        self.assertFalse(classify_query("DELETE FROM Owners").returns_rows)
+
+    def test_statement_cache_lru(self):
+        """Test statements are classified once and evicted least-recently-used first."""
+        cache = StatementCache(maxsize=2)
+        cache.get("SELECT 1")
+        cache.get("SELECT 2")
+        cache.get("SELECT 1")
+        cache.get("SELECT 3")
+
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(len(cache), 2)
+        cache.get("SELECT 2")
+        self.assertEqual(cache.misses, 4)
+
+    def test_record_access(self):
+        """Test records support index, name, case-insensitive and dict access."""
+        owner = self.db.execute_query("SELECT * FROM Owners WHERE Ownercode = ?", ('A001',))[0]
+
+        self.assertEqual(owner[0], 'A001')
+        self.assertEqual(owner['ownername'], 'Owner 1')
+        self.assertEqual(owner['OWNERCODE'], 'A001')
+        self.assertIsNone(owner.get('missing'))
+        self.assertIn('ownerphone', owner)
+        self.assertEqual(dict(owner)['Ownercode'], 'A001')
+        self.assertEqual(owner.keys(), ['Ownercode', 'ownername', 'ownerphone', 'Note'])
+
+        # Rows of the same statement share one column index
+        owners = self.db.execute_query("SELECT * FROM Owners")
+        self.assertIs(type(owners[0]), type(owners[-1]))
+
+    def test_iter_query_batches(self):
+        """Test streaming queries yield every row in fixed-size batches."""
+        batches = list(self.db.iter_batches("SELECT * FROM Owners ORDER BY Ownercode", batch_size=10))
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+
+        codes = [row['Ownercode'] for row in self.db.iter_query("SELECT Ownercode FROM Owners ORDER BY Ownercode", batch_size=7)]
+        self.assertEqual(len(codes), 25)
+        self.assertEqual(codes[0], 'A000')
+        self.assertEqual(codes[-1], 'A024')
+
+class TestTransactions(unittest.TestCase):
+    """Test cases for transaction blocks and batch execution."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.db = DatabaseManager(db_path=":memory:")
+        self.assertTrue(self.db.connect_local())
+        self.db.create_tables()
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.db.close()
+
+    def count_owners(self):
+        return self.db.execute_query("SELECT COUNT(*) AS count FROM Owners")[0]['count']
+
+    def test_transaction_commits_once(self):
+        """Test statements in a block are committed together on exit."""
+        with self.db.transaction():
+            self.db.execute_query("INSERT INTO Owners (Ownercode, ownername) VALUES ('A001', 'One')")
+            self.db.execute_query("INSERT INTO Owners (Ownercode, ownername) VALUES ('A002', 'Two')")
+            self.assertTrue(self.db.in_transaction)
+            self.assertTrue(self.db.connection.in_transaction)
+
+        self.assertFalse(self.db.connection.in_transaction)
+        self.assertEqual(self.count_owners(), 2)
+
+    def test_transaction_rolls_back_on_error(self):
+        """Test an exception discards every statement in the block."""
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.execute_query("INSERT INTO Owners (Ownercode, ownername) VALUES ('A001', 'One')")
+                raise RuntimeError("abort")
+
+        self.assertFalse(self.db.in_transaction)
+        self.assertEqual(self.count_owners(), 0)
+
+    def test_nested_savepoint_rollback(self):
+        """Test an inner block rolls back alone while the outer block commits."""
+        with self.db.transaction():
+            self.db.execute_query("INSERT INTO Owners (Ownercode, ownername) VALUES ('A001', 'One')")
+            with self.assertRaises(ValueError):
+                with self.db.transaction():
+                    self.db.execute_query("INSERT INTO Owners (Ownercode, ownername) VALUES ('A002', 'Two')")
+                    raise ValueError("inner")
+            self.db.execute_query("INSERT INTO Owners (Ownercode, ownername) VALUES ('A003', 'Three')")
+
+        codes = [row['Ownercode'] for row in self.db.execute_query("SELECT Ownercode FROM Owners ORDER BY Ownercode")]
+        self.assertEqual(codes, ['A001', 'A003'])
+
+    def test_execute_batch(self):
+        """Test executemany-backed batch inserts."""
+        rows = [(f'A{i:03d}', f'Owner {i}') for i in range(100)]
+        self.assertTrue(self.db.execute_batch("INSERT INTO Owners (Ownercode, ownername) VALUES (?, ?)", rows))
+        self.assertEqual(self.count_owners(), 100)
+
+        # A failing batch reports an error
+        self.assertIsNone(self.db.execute_batch("INSERT INTO Owners (Ownercode, ownername) VALUES (?, ?)", rows[:1]))
+
+    def test_strict_batch_rolls_back_transaction(self):
+        """Test a strict batch failing inside a transaction commits nothing."""
+        rows = [('A001', 'One'), ('A002', 'Two'), ('A001', 'Again')]
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.db.transaction():
+                self.db.execute_batch("INSERT INTO Owners (Ownercode, ownername) VALUES (?, ?)", rows, strict=True)
+                self.db.execute_query("INSERT INTO Owners (Ownercode, ownername) VALUES ('A009', 'Nine')")
+
+        self.assertFalse(self.db.in_transaction)
+        self.assertEqual(self.count_owners(), 0)
+
+class TestConnectionProfile(unittest.TestCase):
+    """Test cases for the PRAGMA profile applied on connect."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'profile.db')
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.tmpdir.cleanup()
+
+    def pragma(self, db, name):
+        return db.execute_query(f"PRAGMA {name}")[0][0]
+
+    def test_default_profile(self):
+        """Test the default profile enables WAL and relaxed syncing."""
+        db = DatabaseManager(db_path=self.db_path)
+        self.assertTrue(db.connect_local())
+
+        self.assertEqual(self.pragma(db, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(db, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(db, 'temp_store'), 2)   # MEMORY
+        self.assertEqual(self.pragma(db, 'busy_timeout'), 5000)
+        db.close()
+
+    def test_custom_profile(self):
+        """Test a custom profile replaces the defaults."""
+        db = DatabaseManager(db_path=self.db_path, pragmas={'cache_size': -2000}, optimize_on_close=False)
+        self.assertTrue(db.connect_local())
+
+        self.assertEqual(self.pragma(db, 'cache_size'), -2000)
+        self.assertEqual(self.pragma(db, 'journal_mode'), 'delete')
+        db.close()
+
+    def test_check_integrity(self):
+        """Test quick and full integrity checks on a healthy database."""
+        db = DatabaseManager(db_path=self.db_path)
+        self.assertTrue(db.connect_local())
+        db.create_tables()
+
+        self.assertTrue(db.check_integrity('quick'))
+        self.assertTrue(db.check_integrity('full'))
+        db.close()
+
+class TestConnectionPool(unittest.TestCase):
+    """Test cases for per-thread connections."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(db_path=os.path.join(self.tmpdir.name, 'pool.db'))
+        self.assertTrue(self.db.connect_local())
+        self.db.create_tables()
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def in_thread(self, func):
+        """Run func on a new thread and return its result."""
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func()))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_each_thread_gets_its_own_connection(self):
+        """Threads get distinct connections to the same database."""
+        main_connection = self.db.connection
+        self.assertIs(self.db.connection, main_connection)
+
+        other = self.in_thread(lambda: (self.db.connection, self.db.execute_query("SELECT COUNT(*) FROM Owners")[0][0]))
+        self.assertIsNot(other[0], main_connection)
+        self.assertEqual(other[1], 0)
+
+    def test_transactions_are_per_thread(self):
+        """A transaction open on one thread does not capture another thread's writes."""
+        with self.db.transaction():
+            self.db.execute_query(
+                "INSERT INTO Owners (Ownercode, ownername, ownerphone) VALUES ('A001', 'Main', '1')"
+            )
+            self.assertFalse(self.in_thread(lambda: self.db.in_transaction))
+        self.assertEqual(self.in_thread(lambda: len(self.db.execute_query("SELECT * FROM Owners"))), 1)
+
+    def test_pool_is_bounded(self):
+        """Threads wait for a free slot; connections of exited threads are reclaimed."""
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:", check_same_thread=False),
+                              max_connections=1, timeout=0.1)
+        self.assertIsNotNone(pool.get())
+        self.assertIsNone(self.in_thread(pool.get))
+
+        pool.release()
+        self.assertIsNotNone(self.in_thread(pool.get))
+        # The previous thread has exited, so its connection is reclaimed
+        self.assertIsNotNone(pool.get())
+        self.assertEqual(len(pool), 1)
+        pool.close_all()
+
+    def test_in_memory_connection_is_shared(self):
+        """In-memory databases hand every thread the same connection."""
+        db = DatabaseManager(db_path=":memory:")
+        self.assertTrue(db.connect_local())
+        self.assertIs(self.in_thread(lambda: db.connection), db.connection)
+        db.close()
+
+class TestQueryStats(unittest.TestCase):
+    """Test cases for query instrumentation."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.db = DatabaseManager(db_path=":memory:", slow_query_ms=float('inf'))
+        self.assertTrue(self.db.connect_local())
+        self.db.create_tables()
+        self.db.query_stats.reset()
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.db.close()
+
+    def test_normalize_sql(self):
+        """Queries differing only in literal values share a shape."""
+        self.assertEqual(
+            normalize_sql("SELECT *  FROM Owners\n WHERE Ownercode = 'A001' AND x > 10"),
+            "SELECT * FROM Owners WHERE Ownercode = ? AND x > ?"
+        )
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE code IN (?, ?, ?)"),
+            normalize_sql("SELECT * FROM t WHERE code IN (?)")
+        )
+        # Digits inside identifiers are kept
+        self.assertEqual(normalize_sql("SELECT m1.name FROM sp_1"), "SELECT m1.name FROM sp_1")
+
+    def test_counts_rows_and_callers(self):
+        """Each execution is counted against its shape and calling function."""
+        for code in ('A001', 'A002', 'A003'):
+            self.db.execute_query(
+                "INSERT INTO Owners (Ownercode, ownername, ownerphone) VALUES (?, ?, ?)",
+                (code, f"Owner {code}", "1")
+            )
+        self.db.execute_query("SELECT * FROM Owners WHERE Ownercode = 'A001'")
+        self.db.execute_query("SELECT * FROM Owners WHERE Ownercode = 'A002'")
+        rows = sum(len(batch) for batch in self.db.iter_batches("SELECT * FROM Owners", batch_size=2))
+        self.assertEqual(rows, 3)
+
+        stats = {entry['sql']: entry for entry in self.db.query_stats.snapshot()}
+        insert = stats["INSERT INTO Owners (Ownercode, ownername, ownerphone) VALUES (?, ?, ?)"]
+        self.assertEqual((insert['count'], insert['rows']), (3, 3))
+
+        lookup = stats["SELECT * FROM Owners WHERE Ownercode = ?"]
+        self.assertEqual((lookup['count'], lookup['rows']), (2, 2))
+        self.assertEqual(lookup['callers'], {'test_database.TestQueryStats.test_counts_rows_and_callers': 2})
+        self.assertLessEqual(lookup['p50_ms'], lookup['p99_ms'])
+        self.assertLessEqual(lookup['p99_ms'], lookup['max_ms'])
+
+        self.assertEqual(stats["SELECT * FROM Owners"]['rows'], 3)
+
+    def test_percentiles(self):
+        """Percentiles use the nearest rank of the recent samples."""
+        stats = QueryStats(samples=100)
+        for ms in range(1, 101):
+            stats.record('SELECT ?', ms / 1000, 1, 'caller')
+        entry = stats.snapshot()[0]
+        self.assertAlmostEqual(entry['p50_ms'], 50)
+        self.assertAlmostEqual(entry['p95_ms'], 95)
+        self.assertAlmostEqual(entry['p99_ms'], 99)
+        self.assertEqual(entry['count'], 100)
+
+    def test_slow_query_log(self):
+        """Statements over the threshold are logged with their query plan."""
+        self.db.slow_query_ms = 0
+        with self.assertLogs('database', level='WARNING') as logs:
+            self.db.execute_query("SELECT * FROM Owners WHERE ownername = ?", ('x',))
+        self.assertIn('Slow query', logs.output[0])
+        self.assertIn('idx_owners_name', logs.output[0])
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -3,14 +3,21 @@ Test script for the database API.
 """
 
 import os
+import re
+import sqlite3
 import sys
+import tempfile
+import threading
 import unittest
+from unittest import mock
 from datetime import date
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.models.database_api import DatabaseAPI
+from src.models.database_api import OWNER_SEARCH_LIMIT, DatabaseAPI
+from src.models.result_model import PropertyResultModel
+from src.models.search_criteria import SearchCriteria
 
 class TestDatabaseAPI(unittest.TestCase):
     """Test cases for the DatabaseAPI class."""
@@ -138,6 +145,34 @@ class TestDatabaseAPI(unittest.TestCase):
         property_obj = self.api.get_property_by_code(property_code)
         self.assertIsNone(property_obj)
 
+    def test_delete_property_is_atomic(self):
+        """Test a failed property delete keeps its photos."""
+        owner_code = self.api.add_owner("Photo Owner", "07901234567")
+        property_code = self.api.add_property({'Rstatetcode': '03001', 'Ownercode': owner_code})
+        self.assertTrue(self.api.add_property_photo(property_code, '/photos/', 'front', '.jpg'))
+
+        self.api.db.execute_query(
+            "CREATE TEMP TRIGGER block_delete BEFORE DELETE ON Realstatspecification "
+            "BEGIN SELECT RAISE(ABORT, 'blocked'); END"
+        )
+        self.assertIsNone(self.api.delete_property(property_code))
+        self.assertEqual(len(self.api.get_property_photos(property_code)), 1)
+        self.assertIsNotNone(self.api.get_property_by_code(property_code))
+
+    def test_photo_writes_are_atomic(self):
+        """Test a failed photo insert leaves the property's photo flag alone."""
+        owner_code = self.api.add_owner("Photo Owner", "07901234567")
+        property_code = self.api.add_property({'Rstatetcode': '03001', 'Ownercode': owner_code})
+        self.assertTrue(self.api.add_property_photo(property_code, '/photos/', 'front', '.jpg'))
+        self.assertTrue(self.api.delete_property_photo(property_code, 'front'))
+
+        self.api.db.execute_query(
+            "CREATE TEMP TRIGGER block_photo BEFORE INSERT ON realstatephotos "
+            "BEGIN SELECT RAISE(ABORT, 'blocked'); END"
+        )
+        self.assertIsNone(self.api.add_property_photo(property_code, '/photos/', 'back', '.jpg'))
+        self.assertFalse(self.api.get_property_by_code(property_code)['Photosituation'])
+
     def test_lookup_data(self):
         """Test lookup data functions."""
         # Get property types
@@ -156,6 +191,75 @@ class TestDatabaseAPI(unittest.TestCase):
         cities = self.api.get_cities()
         self.assertGreater(len(cities), 0)
 
+    def test_maincode_cache(self):
+        """Test lookups are served from memory and refreshed on change."""
+        self.api.maincodes.load()
+
+        with mock.patch.object(self.api.db, 'execute_query', wraps=self.api.db.execute_query) as execute:
+            # The five lookups made when the property form opens
+            self.api.get_property_types()
+            self.api.get_building_types()
+            self.api.get_offer_types()
+            self.api.get_provinces()
+            self.api.get_cities()
+            self.assertEqual(execute.call_count, 0)
+
+        self.assertEqual(self.api.get_main_code_name('04', '04003'), 'Villa')
+        self.assertEqual(self.api.maincodes.code_for('06', 'For Rent'), '06002')
+        self.assertEqual([t['name'] for t in self.api.get_offer_types()], ['For Rent', 'For Sale'])
+
+        # add_main_code invalidates the cache
+        self.assertTrue(self.api.add_main_code('06', '06003', 'For Lease'))
+        self.assertEqual(self.api.get_main_code_name('06', '06003'), 'For Lease')
+
+    def test_maincode_cache_sees_other_connections(self):
+        """Test a commit from another connection is picked up via maincode_version."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            api = DatabaseAPI()
+            api.db.db_path = os.path.join(tmpdir, 'lookup.db')
+            self.assertTrue(api.connect())
+            api.insert_initial_data()
+            api.maincodes.check_interval = 0
+            self.assertIsNone(api.get_main_code_name('05', '05003'))
+
+            other = DatabaseAPI()
+            other.db.db_path = api.db.db_path
+            self.assertTrue(other.connect())
+            other.add_main_code('05', '05003', 'Dunam')
+            other.close()
+
+            self.assertEqual(api.get_main_code_name('05', '05003'), 'Dunam')
+            api.close()
+
+    def test_maincode_cache_sees_same_connection_and_threads(self):
+        """Test writes that bypass invalidate() are seen from any thread's connection."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            api = DatabaseAPI()
+            api.db.db_path = os.path.join(tmpdir, 'lookup.db')
+            self.assertTrue(api.connect())
+            api.insert_initial_data()
+            api.maincodes.check_interval = 0
+            self.assertIsNone(api.get_main_code_name('05', '05003'))
+
+            # Write on this thread's own connection without invalidating
+            api.db.execute_query(
+                "INSERT INTO Maincode (recty, code, name) VALUES ('05', '05003', 'Dunam')")
+            self.assertEqual(api.get_main_code_name('05', '05003'), 'Dunam')
+
+            # Write on a worker thread's pooled connection, then read on both threads
+            def worker():
+                api.db.execute_query("UPDATE Maincode SET name = 'Olk' WHERE code = '05003'")
+                names.append(api.get_main_code_name('05', '05003'))
+                api.db.release_connection()
+
+            names = []
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join(timeout=10)
+            self.assertEqual(names, ['Olk'])
+            self.assertEqual(api.get_main_code_name('05', '05003'), 'Olk')
+            api.close()
+
     def test_search_properties(self):
         """Test property search."""
         # Add an owner for the property
@@ -197,6 +301,276 @@ class TestDatabaseAPI(unittest.TestCase):
         results = self.api.search_properties({'Province-code': '01001'})
         self.assertEqual(len(results), 5)  # All properties
 
+    def test_search_criteria_and_pagination(self):
+        """Test range, IN, prefix and substring predicates with keyset pages."""
+        first_owner = self.api.add_owner("Ali Karim", "07901234567")
+        second_owner = self.api.add_owner("Sara 100%", "07901234568")
+
+        for i in range(12):
+            self.assertIsNotNone(self.api.add_property({
+                'Rstatetcode': '03001' if i % 3 else '03002',
+                'Buildtcode': '04002',
+                'Property-area': 50 + i * 10,
+                'N-of-bedrooms': i % 5,
+                'Property-address': f'Street {i} Karrada' if i < 6 else f'Street {i} Mansour',
+                'Ownercode': first_owner if i % 2 else second_owner,
+            }))
+
+        criteria = SearchCriteria().between('Property-area', 80, 120)
+        self.assertEqual(len(self.api.search_properties(criteria)), 5)
+
+        criteria = SearchCriteria().between('N-of-bedrooms', low=3)
+        self.assertEqual(self.api.count_properties(criteria), 4)
+
+        criteria = SearchCriteria().is_in('Rstatetcode', ['03002'])
+        self.assertEqual(self.api.count_properties(criteria), 4)
+        self.assertEqual(self.api.count_properties(SearchCriteria().is_in('Rstatetcode', [])), 0)
+
+        criteria = SearchCriteria().prefix('Property-address', 'Street 1')
+        self.assertEqual(self.api.count_properties(criteria), 3)  # 1, 10, 11
+
+        criteria = SearchCriteria().contains('ownername', 'karim').contains('Property-address', 'mansour')
+        results = self.api.search_properties(criteria)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r['ownername'] == 'Ali Karim' for r in results))
+
+        # LIKE wildcards in the search text match literally
+        self.assertEqual(self.api.count_properties(SearchCriteria().contains('ownername', '0%')), 6)
+        self.assertEqual(self.api.count_properties(SearchCriteria().contains('ownername', 'a_i')), 0)
+
+        # Keyset pages cover every match exactly once
+        codes = []
+        page = self.api.search_properties_page(SearchCriteria(), limit=5)
+        self.assertEqual(page['total'], 12)
+        while True:
+            codes.extend(r['realstatecode'] for r in page['results'])
+            if page['next_after'] is None:
+                break
+            page = self.api.search_properties_page(SearchCriteria(), after=page['next_after'], limit=5)
+
+        self.assertEqual(len(codes), 12)
+        self.assertEqual(codes, sorted(set(codes)))
+
+        # A failed search is an empty page unless the caller asks for the error
+        self.api.db.connection.set_progress_handler(lambda: 1, 1)
+        try:
+            self.assertEqual(self.api.search_properties_page(SearchCriteria(), limit=5)['results'], [])
+            with self.assertRaises(sqlite3.OperationalError):
+                self.api.search_properties_page(SearchCriteria(), limit=5, strict=True)
+        finally:
+            self.api.db.connection.set_progress_handler(None, 1)
+
+        with self.assertRaises(ValueError):
+            SearchCriteria().equals('bad field; --', 1)
+
+    def test_sorted_search_pages(self):
+        """Sorted keyset pages match sorting the full result set."""
+        owners = [self.api.add_owner(name, "07901234567") for name in ("bob", "Alice", "carol")]
+        for i in range(14):
+            self.api.add_property({
+                'Rstatetcode': ('03001', '03002', None)[i % 3],
+                'Property-area': (None, 80, 120.5, 80, 300)[i % 5],
+                'Ownercode': owners[i % 3] if i % 4 else None,
+                'Property-address': f'Street {i % 6}' if i % 7 else '',
+            })
+
+        everything = self.api.search_properties(SearchCriteria())
+        for field in ('Property-area', 'ownername', 'property_type', 'Property-address', 'realstatecode'):
+            for descending in (False, True):
+                with self.subTest(field=field, descending=descending):
+                    model = PropertyResultModel()
+                    model.set_rows(everything)
+                    model.sort_by(field, descending)
+                    expected = [row['realstatecode'] for row in model.rows]
+
+                    codes = []
+                    page = self.api.search_properties_page(
+                        SearchCriteria(), limit=4, sort_by=field, descending=descending)
+                    while True:
+                        codes.extend(row['realstatecode'] for row in page['results'])
+                        if page['next_after'] is None:
+                            break
+                        page = self.api.search_properties_page(
+                            SearchCriteria(), after=page['next_after'], limit=4,
+                            sort_by=field, descending=descending)
+                    self.assertEqual(codes, expected)
+
+    def test_full_text_search(self):
+        """Test the FTS index follows inserts, updates and deletes."""
+        self.assertTrue(self.api.full_text_enabled)
+
+        owner_code = self.api.add_owner("Hassan Jaber", "07705550000", "Prefers villas")
+        villa = self.api.add_property({
+            'Property-address': 'Al-Mansour Street 14',
+            'Descriptions': 'Modern villa with a large garden',
+            'Ownercode': owner_code,
+        })
+        shop = self.api.add_property({
+            'Property-address': 'Karrada Market',
+            'Descriptions': 'Corner shop near the garden park',
+            'Ownercode': owner_code,
+        })
+
+        # Prefix matching, ranking and highlighted snippets
+        results = self.api.full_text_search('mans', kind='property')
+        self.assertEqual([r['code'] for r in results], [villa])
+        self.assertIn('[Mansour]', results[0]['title'])
+
+        results = self.api.full_text_search('garden', kind='property')
+        self.assertEqual({r['code'] for r in results}, {villa, shop})
+        self.assertIn('[garden]', results[0]['snippet'])
+
+        # Operators typed by the user are treated as plain words
+        self.assertEqual(self.api.full_text_search('villa OR "'), self.api.full_text_search('villa or'))
+
+        # Updates and deletes are reflected through the triggers
+        self.api.update_property(shop, {'Property-address': 'Arasat Street'})
+        self.assertEqual(self.api.full_text_search('karrada'), [])
+        self.assertEqual(self.api.full_text_search('arasat')[0]['code'], shop)
+
+        self.api.delete_property(villa)
+        self.assertEqual(self.api.full_text_search('mansour'), [])
+
+        # Owner search by name, phone prefix and note
+        self.assertEqual(self.api.search_owners('hass')[0]['Ownercode'], owner_code)
+        self.assertEqual(self.api.search_owners('0770')[0]['Ownercode'], owner_code)
+        self.assertEqual(self.api.search_owners('villas')[0]['Ownercode'], owner_code)
+        self.api.update_owner(owner_code, "Hassan Ali", "07705550000")
+        self.assertEqual(self.api.search_owners('jaber'), [])
+
+        # Search criteria can combine full-text and column predicates
+        criteria = SearchCriteria().matches('arasat', column='title').equals('Ownercode', owner_code)
+        self.assertEqual(self.api.count_properties(criteria), 1)
+
+    def test_owner_search_limit(self):
+        """Owner search is capped by its limit, and limit=None returns every match."""
+        for i in range(700):
+            self.api.add_owner(f"Salim {i}", "07801234567")
+
+        self.assertEqual(len(self.api.search_owners('salim')), OWNER_SEARCH_LIMIT)
+        self.assertEqual(len(self.api.search_owners('salim', limit=OWNER_SEARCH_LIMIT + 1)), OWNER_SEARCH_LIMIT + 1)
+        owners = self.api.search_owners('salim', limit=None)
+        self.assertEqual(len(owners), 700)
+        self.assertEqual(len({owner['Ownercode'] for owner in owners}), 700)
+
+    def test_query_stats(self):
+        """Test query statistics attribute statements to API methods."""
+        self.api.reset_query_stats()
+        self.api.get_all_owners()
+        self.api.get_all_owners()
+
+        stats = self.api.get_query_stats(sort_by='count')
+        owners = [entry for entry in stats if entry['sql'] == "SELECT * FROM Owners ORDER BY ownername"]
+        self.assertEqual(len(owners), 1)
+        self.assertEqual(owners[0]['count'], 2)
+        self.assertEqual(owners[0]['callers'], {'database_api.DatabaseAPI.get_all_owners': 2})
+
+        self.api.reset_query_stats()
+        self.assertEqual(self.api.get_query_stats(), [])
+
+    def test_rebuild_search_index(self):
+        """Test rows indexed before the FTS tables existed are backfilled."""
+        self.api.add_owner("Layla Aziz", "07801112222")
+
+        # Simulate a database created before the search index existed
+        triggers = self.api.db.execute_query("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'fts_%'")
+        for trigger in triggers:
+            self.api.db.execute_query(f"DROP TRIGGER {trigger['name']}")
+        self.api.db.execute_query("DROP TABLE fts_docs")
+        self.api.db.execute_query("DROP TABLE search_fts")
+        self.api.db.execute_query("DELETE FROM Owners")
+        self.api.db.execute_query("INSERT INTO Owners (Ownercode, ownername) VALUES ('A900', 'Noor Saleh')")
+
+        self.assertTrue(self.api.db.create_search_index())
+        self.assertEqual(self.api.full_text_search('noor')[0]['code'], 'A900')
+
+        self.api.db.execute_query("DELETE FROM search_fts")
+        self.assertEqual(self.api.full_text_search('noor'), [])
+        self.assertTrue(self.api.rebuild_search_index())
+        self.assertEqual(self.api.full_text_search('noor')[0]['code'], 'A900')
+
+    def dashboard_tables(self):
+        return (
+            [tuple(row) for row in self.api.db.execute_query(
+                "SELECT * FROM property_stats ORDER BY dimension, group_key")],
+            [tuple(row) for row in self.api.db.execute_query(
+                "SELECT * FROM property_bedroom_stats ORDER BY dimension, group_key, bedrooms")],
+        )
+
+    def test_dashboard_stats(self):
+        """Test the statistics triggers agree with a full recomputation."""
+        owner_code = self.api.add_owner("Stats Owner", "07901234567")
+        codes = [
+            self.api.add_property({'Rstatetcode': '03001', 'Property-area': 100, 'N-of-bedrooms': 2,
+                                   'Province-code': '01001', 'Offer-Type-Code': '06001',
+                                   'Ownercode': owner_code}),
+            self.api.add_property({'Rstatetcode': '03001', 'Property-area': 200, 'N-of-bedrooms': 4,
+                                   'Province-code': '01002', 'Ownercode': owner_code}),
+            self.api.add_property({'Rstatetcode': '03002', 'N-of-bedrooms': 2}),
+        ]
+
+        stats = self.api.get_dashboard_stats()
+        self.assertEqual(stats['total']['count'], 3)
+        self.assertEqual(stats['total']['avg_area'], 150)
+        self.assertEqual(stats['total']['bedrooms'], {2: 2, 4: 1})
+        self.assertEqual([(g['name'], g['count']) for g in stats['type']], [('Residential', 2), ('Commercial', 1)])
+        self.assertEqual(stats['type'][0]['bedrooms'], {2: 1, 4: 1})
+        self.assertEqual(stats['type'][1]['avg_area'], None)
+        self.assertEqual({g['name']: g['count'] for g in stats['province']},
+                         {'Baghdad': 1, 'Basra': 1, 'Not specified': 1})
+        self.assertEqual(stats['owner'][0]['name'], "Stats Owner")
+        self.assertEqual(len(self.api.get_dashboard_stats(limit=1)['type']), 1)
+
+        # Edits and deletes move rows between groups and drop empty groups
+        self.api.update_property(codes[0], {'Rstatetcode': '03002', 'N-of-bedrooms': 3})
+        self.api.delete_property(codes[1])
+        self.api.delete_property(codes[2])
+        stats = self.api.get_dashboard_stats()
+        self.assertEqual([(g['key'], g['count']) for g in stats['type']], [('03002', 1)])
+        self.assertEqual(stats['total']['bedrooms'], {3: 1})
+
+        maintained = self.dashboard_tables()
+        self.assertTrue(self.api.rebuild_dashboard_stats())
+        self.assertEqual(self.dashboard_tables(), maintained)
+
+    def test_rebuild_dashboard_stats(self):
+        """Test rebuilding repairs statistics that drifted from the property table."""
+        self.api.add_property({'Rstatetcode': '03001', 'Property-area': 80, 'N-of-bedrooms': 1})
+        expected = self.dashboard_tables()
+
+        self.api.db.execute_query("UPDATE property_stats SET count = 99")
+        self.api.db.execute_query("DELETE FROM property_bedroom_stats")
+        self.assertNotEqual(self.dashboard_tables(), expected)
+
+        self.assertTrue(self.api.rebuild_dashboard_stats())
+        self.assertEqual(self.dashboard_tables(), expected)
+
+    def test_search_summary(self):
+        """Test the report summary aggregates only the matching properties."""
+        for data in ({'Rstatetcode': '03001', 'Property-area': 100, 'N-of-bedrooms': 2, 'Property-corner': True},
+                     {'Rstatetcode': '03001', 'Property-area': 200, 'N-of-bedrooms': 4},
+                     {'Rstatetcode': '03002', 'N-of-bedrooms': 2}):
+            self.api.add_property(data)
+
+        summary = self.api.get_search_summary(SearchCriteria())
+        self.assertEqual((summary['count'], summary['avg_area'], summary['corner']), (3, 150, 1))
+        self.assertEqual(summary['types'], [('Residential', 2, 150), ('Commercial', 1, None)])
+        self.assertEqual(summary['bedrooms'], {2: 2, 4: 1})
+
+        summary = self.api.get_search_summary(SearchCriteria().equals('Rstatetcode', '03002'))
+        self.assertEqual((summary['count'], summary['avg_bedrooms'], summary['bedrooms']), (1, 2, {2: 1}))
+
+    def test_photos_by_codes(self):
+        """Test photos of several properties are fetched in one call."""
+        first = self.api.add_property({'Rstatetcode': '03001'})
+        second = self.api.add_property({'Rstatetcode': '03001'})
+        self.api.add_property_photo(first, '/photos/E901/', 'front', '.jpg')
+        self.api.add_property_photo(first, '/photos/E901/', 'back', '.jpg')
+
+        photos = self.api.get_photos_by_codes([first, second])
+        self.assertEqual([photo['photofilename'] for photo in photos[first]], ['front', 'back'])
+        self.assertNotIn(second, photos)
+
     def test_company_info(self):
         """Test company information functions."""
         # Get company info
@@ -219,5 +593,164 @@ class TestDatabaseAPI(unittest.TestCase):
         self.assertEqual(company['Companyna'], 'Updated Company')
         self.assertEqual(company['Caddress'], 'Updated Address')
 
+class TestQueryPlans(unittest.TestCase):
+    """Guard hot queries against regressing to full table scans."""
+
+    # A plan step that reads a whole table without an index
+    FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+( AS \w+)?$')
+
+    def setUp(self):
+        """Set up test case."""
+        self.api = DatabaseAPI()
+        self.api.db.db_path = ":memory:"
+        self.assertTrue(self.api.connect())
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.api.close()
+
+    def assertIndexed(self, query, params=()):
+        plan = self.api.db.explain(query, params)
+        scans = [step for step in plan if self.FULL_SCAN.match(step)]
+        self.assertEqual(scans, [], f"Full table scan in plan: {plan}")
+        return plan
+
+    def test_search_plans(self):
+        """Test search filter combinations use the secondary indexes."""
+        for criteria in [
+            {'Rstatetcode': '03001'},
+            {'Buildtcode': '04002'},
+            {'Rstatetcode': '03001', 'Buildtcode': '04002'},
+            {'Rstatetcode': '03001', 'Buildtcode': '04002', 'N-of-bedrooms': 3},
+            {'N-of-bedrooms': 3},
+            {'Property-corner': True},
+            {'Ownercode': 'A001'},
+            {'Offer-Type-Code': '06001', 'Province-code': '01001'},
+            SearchCriteria().between('Property-area', 80, 120),
+            SearchCriteria().between('N-of-bedrooms', 2, 4).between('Property-area', 100, None),
+        ]:
+            with self.subTest(criteria=criteria):
+                self.assertIndexed(*self.api.build_search_query(criteria))
+
+    def test_full_text_plans(self):
+        """Test MATCH runs once, before the document lookups, even without statistics."""
+        if not self.api.db.fts_enabled:
+            self.skipTest("FTS5 not available")
+        plan = self.api.db.explain(*self.api.build_search_query(SearchCriteria().matches('family')))
+        fts = next(i for i, step in enumerate(plan) if 'search_fts VIRTUAL TABLE' in step)
+        docs = next(i for i, step in enumerate(plan) if step.startswith('SEARCH d '))
+        self.assertLess(fts, docs, f"MATCH evaluated per document: {plan}")
+
+    def test_lookup_plans(self):
+        """Test owner listing and lookup queries avoid scans and sorts."""
+        plan = self.assertIndexed("SELECT * FROM Owners ORDER BY ownername")
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan))
+
+        plan = self.assertIndexed("SELECT DISTINCT code, name FROM Maincode WHERE recty = ? ORDER BY name", ('03',))
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan))
+
+        self.assertIndexed("SELECT COUNT(*) as count FROM Realstatspecification WHERE Ownercode = ?", ('A001',))
+        self.assertIndexed("SELECT * FROM realstatephotos WHERE realstatecode = ?", ('E901AAAA',))
+
+class TestThreadSafety(unittest.TestCase):
+    """Stress test for using the shared DatabaseAPI from several threads."""
+
+    THREADS = 8
+    ITERATIONS = 25
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.api = DatabaseAPI()
+        self.api.db.db_path = os.path.join(self.tmpdir.name, 'threads.db')
+        self.assertTrue(self.api.connect())
+        self.api.set_company_code('E901')
+        self.api.insert_initial_data()
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.api.close()
+        self.tmpdir.cleanup()
+
+    def worker(self, index, owners, properties, errors):
+        """Mix of writes, transactions and reads as a background job would issue them."""
+        try:
+            for i in range(self.ITERATIONS):
+                owner_code = self.api.add_owner(f"Owner {index}-{i}", "07901234567")
+                owners.append(owner_code)
+
+                property_code = self.api.add_property({
+                    'Rstatetcode': '03001',
+                    'Yearmake': '2020-01-01',
+                    'N-of-bedrooms': i % 5,
+                    'Ownercode': owner_code,
+                })
+                properties.append(property_code)
+
+                with self.api.db.transaction():
+                    self.api.update_property(property_code, {'Property-area': float(i)})
+                    self.api.add_property_photo(property_code, '/photos/E901/', f'photo{i}', '.jpg')
+
+                self.assertIsNotNone(self.api.get_property_by_code(property_code))
+                self.assertIsNotNone(self.api.search_properties({'N-of-bedrooms': i % 5}))
+                self.api.get_all_owners()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            self.api.db.release_connection()
+
+    def test_mixed_reads_and_writes(self):
+        """Concurrent threads never corrupt cursors, collide on codes or lose writes."""
+        owners, properties, errors = [], [], []
+        threads = [
+            threading.Thread(target=self.worker, args=(index, owners, properties, errors))
+            for index in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+        self.assertEqual(errors, [])
+        total = self.THREADS * self.ITERATIONS
+        self.assertEqual(len(set(owners)), total)
+        self.assertEqual(len(set(properties)), total)
+        self.assertNotIn(None, owners + properties)
+
+        counts = self.api.db.execute_query(
+            "SELECT (SELECT COUNT(*) FROM Owners) AS owners,"
+            " (SELECT COUNT(*) FROM Realstatspecification) AS properties,"
+            " (SELECT COUNT(*) FROM realstatephotos) AS photos"
+        )[0]
+        self.assertEqual((counts['owners'], counts['properties'], counts['photos']), (total, total, total))
+        self.assertTrue(self.api.db.check_integrity('full'))
+
+    def test_maincode_cache_under_invalidation(self):
+        """Lookups racing with invalidate() always see a complete snapshot."""
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            try:
+                while not stop.is_set():
+                    self.assertEqual(self.api.get_main_code_name('04', '04003'), 'Villa')
+                    self.assertEqual(self.api.maincodes.code_for('06', 'For Rent'), '06002')
+                    self.assertTrue(self.api.get_offer_types())
+            except Exception as e:
+                errors.append(e)
+            finally:
+                self.api.db.release_connection()
+
+        threads = [threading.Thread(target=reader) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for _ in range(200):
+            self.api.maincodes.invalidate()
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=60)
+
+        self.assertEqual(errors, [])
+
 if __name__ == '__main__':
     unittest.main()
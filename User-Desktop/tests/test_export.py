@@ -0,0 +1,183 @@
+"""
+Test script for the streaming property export.
+"""
+
+import csv
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import tracemalloc
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.database_api import DatabaseAPI
+from src.models.export import (
+    EXPORTERS, ExportCancelled, PropertyCsvExport, PropertyXlsxExport, get_exporter, project, write_csv
+)
+from src.models.search_criteria import SearchCriteria
+
+
+class TestPropertyCsvExport(unittest.TestCase):
+    """Test cases for PropertyCsvExport."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.api = DatabaseAPI()
+        self.api.db.db_path = ":memory:"
+        self.assertTrue(self.api.connect())
+        self.api.set_company_code('E901')
+        self.api.insert_initial_data()
+
+        owner_code = self.api.add_owner("Export Owner", "07901234567")
+        codes = self.api.reserve_property_codes(3000)
+        self.api.db.execute_batch(
+            'INSERT INTO Realstatspecification (Companyco, realstatecode, Rstatetcode, "N-of-bedrooms", '
+            '"Property-corner", "Property-address", Ownercode) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [('E901', code, '03001' if i % 3 else '03002', i % 5, i % 2 == 0, f'Street {i}', owner_code)
+             for i, code in enumerate(codes)]
+        )
+        self.path = os.path.join(self.tmpdir, 'export.csv')
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.api.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def read_csv(self, path, compressed=False):
+        opener = gzip.open if compressed else open
+        with opener(path, 'rt', newline='', encoding='utf-8') as csv_file:
+            return list(csv.reader(csv_file))
+
+    def test_exports_matching_rows(self):
+        """Every matching property is written, not just the loaded page."""
+        progress = []
+        criteria = SearchCriteria().equals('Rstatetcode', '03002')
+        export = PropertyCsvExport(self.path, criteria, batch_size=250,
+                                   progress=lambda written, total: progress.append((written, total)))
+        self.assertEqual(export.run(self.api), self.path)
+
+        rows = self.read_csv(self.path)
+        self.assertEqual(rows[0][:3], ['Property Code', 'Property Type', 'Building Type'])
+        self.assertEqual(len(rows), 1001)
+        self.assertEqual(rows[1][1], 'Commercial')
+        self.assertEqual(rows[1][6], 'Yes')
+        self.assertEqual(rows[1][8], 'Export Owner')
+        self.assertEqual(progress[0], (0, 1000))
+        self.assertEqual(progress[-1], (1000, 1000))
+        self.assertEqual(len(progress), 5)
+
+    def test_gzip_output(self):
+        """Compressed exports hold the same rows."""
+        path = self.path + '.gz'
+        PropertyCsvExport(path, compress=True).run(self.api)
+        self.assertEqual(len(self.read_csv(path, compressed=True)), 3001)
+
+    def test_cancel_leaves_no_file(self):
+        """A cancelled export raises ExportCancelled and removes its partial output."""
+        export = PropertyCsvExport(self.path, batch_size=100)
+        export.progress = lambda written, total: written >= 500 and export.cancel()
+
+        with self.assertRaises(ExportCancelled):
+            export.run(self.api)
+        self.assertLess(export.written, 3000)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_memory_stays_flat(self):
+        """Peak memory depends on the batch size, not on the number of rows."""
+        def peak(criteria):
+            tracemalloc.start()
+            try:
+                PropertyCsvExport(self.path, criteria, batch_size=100).run(self.api)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small = peak(SearchCriteria().between('N-of-bedrooms', 0, 0))
+        large = peak(SearchCriteria())
+        self.assertLess(large, small * 2)
+
+    def test_write_loaded_rows(self):
+        """Loaded rows are written with the same columns."""
+        write_csv([{'realstatecode': 'E9010000', 'Property-corner': None}], self.path)
+        rows = self.read_csv(self.path)
+        self.assertEqual(rows[1][0], 'E9010000')
+        self.assertEqual(rows[1][6], 'No')
+
+    def test_projection_matches_records_and_dicts(self):
+        """Records are projected by position with the same values as dict rows."""
+        rows = self.api.db.execute_query(
+            "SELECT r.*, NULL AS ownername FROM Realstatspecification r ORDER BY realstatecode LIMIT 3")
+        self.assertEqual(project(rows), project([row.as_dict() for row in rows]))
+        self.assertIsNone(project(rows)[0][1])  # property_type is not selected
+
+    def test_registry(self):
+        """Formats are looked up by name and unknown names are rejected."""
+        self.assertEqual(set(EXPORTERS), {'csv', 'jsonl', 'xlsx', 'sqlite', 'pdf', 'brochure'})
+        self.assertIs(get_exporter('csv'), PropertyCsvExport)
+        self.assertEqual(get_exporter('jsonl').default_extension(compress=True), '.jsonl.gz')
+        self.assertEqual(get_exporter('sqlite').default_extension(compress=True), '.db')
+        with self.assertRaises(ValueError):
+            get_exporter('docx')
+
+    def test_json_lines(self):
+        """JSON Lines holds one object per property keyed by header, with nulls kept."""
+        path = os.path.join(self.tmpdir, 'export.jsonl')
+        get_exporter('jsonl')(path, SearchCriteria().equals('Rstatetcode', '03002'), batch_size=300).run(self.api)
+
+        with open(path, encoding='utf-8') as json_file:
+            rows = [json.loads(line) for line in json_file]
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(rows[0]['Property Type'], 'Commercial')
+        self.assertEqual(rows[0]['Corner Property'], 'Yes')
+        self.assertIsNone(rows[0]['Area'])
+
+    def test_database_snapshot(self):
+        """The SQLite snapshot is a complete, standalone copy of the database."""
+        path = os.path.join(self.tmpdir, 'snapshot.db')
+        progress = []
+        get_exporter('sqlite')(path, progress=lambda written, total: progress.append(written)).run(self.api)
+
+        snapshot = sqlite3.connect(path)
+        try:
+            self.assertEqual(snapshot.execute("SELECT COUNT(*) FROM Realstatspecification").fetchone()[0], 3000)
+        finally:
+            snapshot.close()
+        self.assertEqual(progress, [0, 3000])
+
+    def test_database_snapshot_drops_credentials(self):
+        """The SQLite snapshot keeps the company but not its login."""
+        path = os.path.join(self.tmpdir, 'snapshot.db')
+        get_exporter('sqlite')(path).run(self.api)
+
+        snapshot = sqlite3.connect(path)
+        try:
+            self.assertEqual(
+                snapshot.execute("SELECT Companyna, Username, Password FROM Companyinfo").fetchall(),
+                [('Best Real Estate', None, None)]
+            )
+        finally:
+            snapshot.close()
+        with open(path, 'rb') as snapshot_file:
+            self.assertNotIn(b'pass1234', snapshot_file.read())
+        self.assertIsNotNone(self.api.get_company_info('E901')['Password'])
+
+    @unittest.skipUnless(PropertyXlsxExport.available(), "openpyxl is not installed")
+    def test_xlsx(self):
+        """The XLSX workbook holds a header row and every property."""
+        from openpyxl import load_workbook
+
+        path = os.path.join(self.tmpdir, 'export.xlsx')
+        get_exporter('xlsx')(path).run(self.api)
+        sheet = load_workbook(path, read_only=True)['Properties']
+        self.assertEqual(sheet.max_row, 3001)
+
+
+if __name__ == '__main__':
+    unittest.main()
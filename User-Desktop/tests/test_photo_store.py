@@ -0,0 +1,162 @@
+"""
+Test script for the content-addressed photo store.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.database_api import DatabaseAPI
+from src.models.photo_store import PhotoStore, hash_file
+
+
+class TestPhotoStore(unittest.TestCase):
+    """Test cases for PhotoStore."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = PhotoStore(os.path.join(self.tmpdir, 'store'), workers=4)
+
+    def tearDown(self):
+        """Tear down test case."""
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as photo_file:
+            photo_file.write(content)
+        return path
+
+    def stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(directory, name), self.store.root)
+            for directory, _, files in os.walk(self.store.root) for name in files
+        )
+
+    def test_sharded_layout(self):
+        """Files are named by hash inside two levels of shard directories."""
+        source = self.write('Front.JPG', b'front photo')
+        digest, size = hash_file(source)
+        stored = self.store.add_file(source)
+
+        self.assertEqual((stored.digest, stored.size, stored.extension), (digest, 11, '.jpg'))
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(self.stored_files(), [os.path.join(digest[:2], digest[2:4], digest + '.jpg')])
+        self.assertEqual(self.store.photo_file({'photohash': digest, 'Photoextension': '.jpg'}), stored.path)
+
+    def test_same_content_is_stored_once(self):
+        """A photo reused under another name costs no extra space."""
+        first = self.store.add_file(self.write('a.jpg', b'same bytes'))
+        second = self.store.add_file(self.write('b.jpg', b'same bytes'))
+
+        self.assertFalse(first.duplicate)
+        self.assertTrue(second.duplicate)
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(len(self.stored_files()), 1)
+
+    def test_same_content_under_another_extension(self):
+        """The extension is not part of the key; the stored file's extension is reported."""
+        first = self.store.add_file(self.write('a.jpg', b'same bytes'))
+        results = self.store.ingest([self.write(f'{i}.jpeg', b'same bytes') for i in range(8)])
+
+        self.assertTrue(all(result.duplicate for result in results))
+        self.assertEqual({(result.path, result.extension) for result in results}, {(first.path, '.jpg')})
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(self.store.photo_file({'photohash': first.digest, 'Photoextension': results[0].extension}),
+                         first.path)
+
+        # Threads storing new content under different extensions still keep one file
+        results = self.store.ingest([self.write(f'{i}.{ext}', b'new bytes')
+                                     for i, ext in enumerate(('png', 'PNG', 'jpeg', 'jpg') * 4)])
+        self.assertEqual(len({result.path for result in results}), 1)
+        self.assertEqual(sum(not result.duplicate for result in results), 1)
+        self.assertEqual(len(self.stored_files()), 2)
+
+    def test_ingest(self):
+        """Parallel ingest keeps input order, reports progress and isolates failures."""
+        sources = [self.write(f'{i}.jpg', bytes([i]) * 1000) for i in range(10)]
+        sources.insert(3, os.path.join(self.tmpdir, 'missing.jpg'))
+        progress = []
+
+        results = self.store.ingest(sources, progress=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual([result.source for result in results], sources)
+        self.assertIsNotNone(results[3].error)
+        self.assertEqual(sum(result.error is None for result in results), 10)
+        self.assertEqual(sorted(progress), [(i, 11) for i in range(1, 12)])
+        self.assertEqual(len(self.stored_files()), 10)
+
+    def test_prune(self):
+        """Unreferenced files are removed once older than the grace period."""
+        kept = self.store.add_file(self.write('kept.jpg', b'kept'))
+        dropped = self.store.add_file(self.write('dropped.jpg', b'dropped'))
+
+        self.assertEqual(self.store.prune({kept.digest}), 0)
+        old = time.time() - 7200
+        os.utime(dropped.path, (old, old))
+        self.assertEqual(self.store.prune({kept.digest}), 1)
+        self.assertTrue(os.path.exists(kept.path))
+        self.assertFalse(os.path.exists(dropped.path))
+
+    def test_property_photos(self):
+        """Photos attached through the API reference the store by hash."""
+        api = DatabaseAPI()
+        api.db.db_path = ":memory:"
+        self.assertTrue(api.connect())
+        api.photo_store = self.store
+        try:
+            api.set_company_code('E901')
+            api.insert_initial_data()
+            first = api.add_property({'Rstatetcode': '03001'})
+            second = api.add_property({'Rstatetcode': '03001'})
+            source = self.write('garden.png', b'garden')
+
+            api.store_property_photos(first, [source])
+            api.store_property_photos(second, [source])
+
+            photo = api.get_property_photos(second)[0]
+            self.assertEqual(photo['photofilename'], 'garden')
+            self.assertEqual(api.photo_file(photo), self.store.add_file(source).path)
+            self.assertTrue(api.get_property_by_code(second)['Photosituation'])
+            self.assertEqual(len(self.stored_files()), 1)
+
+            api.delete_property(first)
+            self.assertEqual(api.prune_photo_store(), 0)
+            api.delete_property(second)
+            self.assertEqual(api.prune_photo_store(), 0)  # Within the grace period
+            self.assertEqual(self.store.prune(set(), grace=-1), 1)
+        finally:
+            api.close()
+
+    def test_failed_photo_rows_are_reported(self):
+        """If the rows cannot be written, the photos report an error and the flag stays unset."""
+        api = DatabaseAPI()
+        api.db.db_path = ":memory:"
+        self.assertTrue(api.connect())
+        api.photo_store = self.store
+        try:
+            api.set_company_code('E901')
+            api.insert_initial_data()
+            code = api.add_property({'Rstatetcode': '03001'})
+            api.db.execute_query(
+                "CREATE TEMP TRIGGER block_photo BEFORE INSERT ON realstatephotos "
+                "BEGIN SELECT RAISE(ABORT, 'blocked'); END"
+            )
+
+            results = api.store_property_photos(code, [self.write('a.jpg', b'a'), self.write('b.jpg', b'b')])
+            self.assertTrue(all(photo.error for photo in results))
+            self.assertEqual(api.get_property_photos(code), [])
+            self.assertFalse(api.get_property_by_code(code)['Photosituation'])
+        finally:
+            api.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Test script for the incrementally refreshed property list.
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.database_api import DatabaseAPI
+from src.models.property_list import PropertyListSource
+
+
+class TestPropertyListSource(unittest.TestCase):
+    """Test cases for PropertyListSource."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.api = DatabaseAPI()
+        self.api.db.db_path = ":memory:"
+        self.assertTrue(self.api.connect())
+        self.api.set_company_code('E901')
+        self.api.insert_initial_data()
+
+        self.owner_code = self.api.add_owner("List Owner", "07901234567")
+        self.property_codes = [self.add_property(i) for i in range(5)]
+        self.source = PropertyListSource(self.api, page_size=2)
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.api.close()
+
+    def add_property(self, bedrooms):
+        return self.api.add_property({
+            'Rstatetcode': '03001',
+            'Yearmake': '2020-01-01',
+            'N-of-bedrooms': bedrooms,
+            'Ownercode': self.owner_code,
+        })
+
+    def test_paging(self):
+        """Pages load in code order until the table is exhausted."""
+        self.source.load()
+        self.assertEqual(self.source.codes, self.property_codes[:2])
+        self.source.load_more()
+        self.source.load_more()
+        self.assertEqual(self.source.codes, self.property_codes)
+        self.assertTrue(self.source.exhausted)
+        self.assertEqual(self.source.load_more(), [])
+
+    def test_refresh_without_changes(self):
+        """Refreshing an unchanged list reads only the change log."""
+        self.source.load()
+        with mock.patch.object(self.api, 'get_properties_by_codes') as fetch:
+            self.assertEqual(self.source.refresh(), [])
+            fetch.assert_not_called()
+
+    def test_refresh_patches_changed_rows(self):
+        """Added, edited and deleted rows are patched in place."""
+        self.source.load()
+        while not self.source.exhausted:
+            self.source.load_more()
+
+        self.api.update_property(self.property_codes[1], {'N-of-bedrooms': 9})
+        self.api.delete_property(self.property_codes[3])
+        new_code = self.add_property(7)
+
+        patches = self.source.refresh()
+        self.assertEqual(
+            [(action, index) for action, index, _ in patches],
+            [('update', 1), ('remove', 3), ('insert', 4)]
+        )
+        self.assertEqual(self.source.rows[1]['N-of-bedrooms'], 9)
+        self.assertNotIn(self.property_codes[3], self.source.codes)
+        self.assertEqual(self.source.codes[-1], new_code)
+
+    def test_owner_rename_updates_rows(self):
+        """Renaming an owner refreshes the owner name shown on their properties."""
+        self.source.load()
+        self.api.update_owner(self.owner_code, "Renamed Owner", "07901234567")
+        patches = self.source.refresh()
+        self.assertEqual([action for action, _, _ in patches], ['update', 'update'])
+        self.assertTrue(all(row['ownername'] == "Renamed Owner" for row in self.source.rows))
+
+    def test_rows_past_loaded_pages_wait_for_paging(self):
+        """Changes beyond the loaded pages are left to load_more()."""
+        self.source.load()
+        self.api.update_property(self.property_codes[4], {'N-of-bedrooms': 8})
+        self.assertEqual(self.source.refresh(), [])
+        self.assertEqual(len(self.source), 2)
+
+    def test_pruned_log_forces_reload(self):
+        """A source that fell behind the pruned change log reloads."""
+        self.source.load()
+        self.api.update_property(self.property_codes[0], {'N-of-bedrooms': 4})
+        self.api.update_property(self.property_codes[1], {'N-of-bedrooms': 4})
+        self.api.prune_property_changes(keep=1)
+
+        self.assertIsNone(self.source.refresh())
+        self.assertEqual(self.source.codes, self.property_codes[:2])
+        self.assertEqual(self.source.change_seq, self.api.latest_property_change())
+
+
+if __name__ == '__main__':
+    unittest.main()
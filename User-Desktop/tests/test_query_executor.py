@@ -0,0 +1,128 @@
+"""
+Test script for the background query executor.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import CancelledError
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.database_api import DatabaseAPI
+from src.models.query_executor import QueryCancelled, QueryExecutor
+
+# A query that runs for many seconds unless it is interrupted
+SLOW_QUERY = """
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000)
+    SELECT COUNT(*) FROM n
+"""
+
+
+class TestQueryExecutor(unittest.TestCase):
+    """Test cases for QueryExecutor."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.api = DatabaseAPI()
+        self.api.db.db_path = os.path.join(self.tmpdir, 'executor.db')
+        self.assertTrue(self.api.connect())
+        self.api.set_company_code('E901')
+        self.api.insert_initial_data()
+
+        # Deliver UI callbacks immediately, recording the thread they ran on
+        self.delivered = []
+        self.executor = QueryExecutor(self.api, dispatch=self.dispatch)
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.executor.shutdown()
+        self.api.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def dispatch(self, callback):
+        self.delivered.append(threading.current_thread().name)
+        callback()
+
+    def test_runs_on_worker_thread(self):
+        """Calls run on the worker thread's own connection and resolve their futures."""
+        self.api.add_owner("Worker Owner", "07901234567")
+
+        results = []
+        future = self.executor.submit('get_all_owners', on_result=results.append)
+        owners = future.result(timeout=5)
+
+        self.assertEqual([owner['ownername'] for owner in owners], ["Worker Owner"])
+        self.assertEqual(results, [owners])
+        self.assertIsNotNone(self.executor._worker_connection)
+        self.assertIsNot(self.executor._worker_connection, self.api.db.connection)
+
+        thread_names = self.executor.submit(lambda api: threading.current_thread().name).result(timeout=5)
+        self.assertEqual(thread_names, 'query-executor')
+
+    def test_errors_reach_on_error(self):
+        """Exceptions raised by a call are delivered to on_error."""
+        errors = []
+        future = self.executor.submit(lambda api: 1 / 0, on_error=errors.append)
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=5)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+    def test_newer_request_interrupts_running_one(self):
+        """A request with the same key aborts the running query."""
+        started = threading.Event()
+
+        def slow(api):
+            started.set()
+            return api.db.execute_query(SLOW_QUERY)
+
+        results = []
+        stale = self.executor.submit(slow, key='search', on_result=results.append)
+        self.assertTrue(started.wait(timeout=5))
+
+        fresh = self.executor.submit('get_main_code_name', '03', '03001', key='search', on_result=results.append)
+        with self.assertRaises(QueryCancelled):
+            stale.result(timeout=5)
+        self.assertIsNotNone(fresh.result(timeout=5))
+
+        # Only the fresh result was delivered to the UI
+        self.assertEqual(len(results), 1)
+
+    def test_cancel_queued_request(self):
+        """A request cancelled before it starts never runs."""
+        release = threading.Event()
+        blocker = self.executor.submit(lambda api: release.wait(timeout=5))
+
+        ran = []
+        queued = self.executor.submit(lambda api: ran.append(True), key='owners')
+        self.executor.cancel('owners')
+        release.set()
+
+        blocker.result(timeout=5)
+        with self.assertRaises(CancelledError):
+            queued.result(timeout=5)
+        self.assertEqual(ran, [])
+
+    def test_in_memory_database_runs_inline(self):
+        """In-memory databases cannot be shared, so requests run on the caller's thread."""
+        api = DatabaseAPI()
+        api.db.db_path = ":memory:"
+        self.assertTrue(api.connect())
+        executor = QueryExecutor(api, dispatch=self.dispatch)
+        try:
+            self.assertTrue(executor.inline)
+            future = executor.submit(lambda api: threading.current_thread().name)
+            self.assertTrue(future.done())
+            self.assertEqual(future.result(), threading.current_thread().name)
+        finally:
+            executor.shutdown()
+            api.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
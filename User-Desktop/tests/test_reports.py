@@ -0,0 +1,140 @@
+"""
+Test script for the PDF report engine.
+"""
+
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.database_api import DatabaseAPI
+from src.models.export import ExportCancelled, get_exporter
+from src.models.reports import (
+    BROCHURE_DETAILS, TABLE_CELL_LINES, TABLE_ROW_HEIGHT, TABLE_ROWS_PER_PAGE, PageWriter, PropertyReport,
+    body_pages, clip_lines, draw_table_page, photo_path, reports_available
+)
+from src.models.search_criteria import SearchCriteria
+
+
+class TestPropertyReport(unittest.TestCase):
+    """Test cases for PropertyReport."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.api = DatabaseAPI()
+        self.api.db.db_path = ":memory:"
+        self.assertTrue(self.api.connect())
+        self.api.set_company_code('E901')
+        self.api.insert_initial_data()
+
+        owner_code = self.api.add_owner("Report Owner", "07901234567")
+        codes = self.api.reserve_property_codes(300)
+        self.api.db.execute_batch(
+            'INSERT INTO Realstatspecification (Companyco, realstatecode, Rstatetcode, "Property-area", '
+            '"N-of-bedrooms", "Property-address", Ownercode) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [('E901', code, '03001' if i % 3 else '03002', 50 + i, i % 5, f'Street {i}', owner_code)
+             for i, code in enumerate(codes)]
+        )
+        self.path = os.path.join(self.tmpdir, 'report.pdf')
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.api.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_page_counts(self):
+        """Tables fill whole pages; brochures use one page per property."""
+        self.assertEqual(body_pages('table', TABLE_ROWS_PER_PAGE + 1), 2)
+        self.assertEqual(body_pages('brochure', 7), 7)
+        self.assertEqual(body_pages('table', 0), 0)
+
+        # Table chunks are rounded up to whole pages so page numbers line up
+        self.assertEqual(PropertyReport(chunk_size=40).chunk_size % TABLE_ROWS_PER_PAGE, 0)
+        with self.assertRaises(ValueError):
+            PropertyReport(layout='poster')
+
+    def test_chunks(self):
+        """Chunks hold plain rows and resolved photo files."""
+        code = self.api.get_all_properties()[0]['realstatecode']
+        self.api.add_property_photo(code, self.tmpdir, 'front', '.jpg')
+
+        report = PropertyReport(SearchCriteria().equals('realstatecode', code), layout='brochure')
+        rows, photos = next(report._chunks(self.api))
+
+        self.assertEqual(rows[0]['ownername'], "Report Owner")
+        self.assertEqual(photo_path(photos[code][0]), os.path.join(self.tmpdir, 'front.jpg'))
+
+    def test_brochure_details_are_columns(self):
+        """Every brochure detail names a property field."""
+        rows, _ = next(PropertyReport()._chunks(self.api))
+        fields = set(rows[0])
+        for label, field in BROCHURE_DETAILS:
+            self.assertIn(field, fields, label)
+
+    @unittest.skipUnless(reports_available(), "reportlab is not installed")
+    def test_table_report(self):
+        """The table report holds a summary page and the property pages."""
+        progress = []
+        get_exporter('pdf')(self.path, progress=lambda rendered, total: progress.append(rendered)).run(self.api)
+
+        with open(self.path, 'rb') as pdf:
+            self.assertTrue(pdf.read(5).startswith(b'%PDF'))
+        self.assertEqual(progress[-1], 300)
+
+    @unittest.skipUnless(reports_available(), "reportlab is not installed")
+    def test_long_cells_keep_table_on_page(self):
+        """Long owners and addresses are cut to a fixed row height, so a full page fits."""
+        long_text = ' '.join(f'Building {i} Long Street District' for i in range(40))
+        rows = [{'realstatecode': f'E901{i:04d}', 'ownername': long_text, 'Property-address': long_text}
+                for i in range(TABLE_ROWS_PER_PAGE)]
+
+        writer = PageWriter(self.path, {'company': 'E901', 'title': 'Report', 'generated': ''}, 1)
+        height = draw_table_page(writer, rows)
+        writer.finish_page(1)
+        writer.save()
+
+        self.assertEqual(height, (TABLE_ROWS_PER_PAGE + 1) * TABLE_ROW_HEIGHT)
+        self.assertLessEqual(height, writer.body_top - writer.margin)
+
+        clipped = clip_lines(long_text, 100, TABLE_CELL_LINES)
+        self.assertEqual(len(clipped.split('\n')), TABLE_CELL_LINES)
+        self.assertTrue(clipped.endswith('\u2026'))
+        self.assertEqual(clip_lines('Short', 100, TABLE_CELL_LINES), 'Short')
+
+    @unittest.skipUnless(reports_available(), "reportlab is not installed")
+    def test_brochure_photos_are_optional(self):
+        """Missing photo files leave an empty frame instead of failing the report."""
+        code = self.api.get_all_properties()[0]['realstatecode']
+        self.api.add_property_photo(code, self.tmpdir, 'missing', '.jpg')
+
+        criteria = SearchCriteria().equals('realstatecode', code)
+        PropertyReport(criteria, layout='brochure').render(self.api, self.path)
+        self.assertGreater(os.path.getsize(self.path), 0)
+
+    @unittest.skipUnless(reports_available(), "reportlab is not installed")
+    def test_report_spans_chunks(self):
+        """Chunks are rendered in page order into one file."""
+        PropertyReport(chunk_size=64).render(self.api, self.path)
+        with open(self.path, 'rb') as pdf:
+            pages = re.findall(rb'/Type\s*/Page\b', pdf.read())
+        self.assertEqual(len(pages), 1 + body_pages('table', 300))
+        self.assertEqual([name for name in os.listdir(self.tmpdir)], ['report.pdf'])
+
+    @unittest.skipUnless(reports_available(), "reportlab is not installed")
+    def test_cancel(self):
+        """A cancelled report raises ExportCancelled and leaves no file."""
+        export = get_exporter('brochure')(self.path)
+        export.progress = lambda rendered, total: rendered and export.cancel()
+        with self.assertRaises(ExportCancelled):
+            export.run(self.api)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Test script for the search result data model.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.result_model import PropertyResultModel
+
+
+class TestPropertyResultModel(unittest.TestCase):
+    """Test cases for PropertyResultModel."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.model = PropertyResultModel()
+        self.model.set_rows([
+            {'realstatecode': 'E9010002', 'Property-area': 120.5, 'ownername': 'bob'},
+            {'realstatecode': 'E9010000', 'Property-area': None, 'ownername': 'Alice'},
+            {'realstatecode': 'E9010001', 'Property-area': 80, 'ownername': None},
+        ])
+
+    def codes(self):
+        return [row['realstatecode'] for row in self.model.rows]
+
+    def test_sort_and_toggle(self):
+        """Sorting by the same field twice reverses the order; empty values stay last."""
+        self.model.sort_by('Property-area')
+        self.assertEqual(self.codes(), ['E9010001', 'E9010002', 'E9010000'])
+
+        self.model.sort_by('Property-area')
+        self.assertTrue(self.model.descending)
+        self.assertEqual(self.codes(), ['E9010002', 'E9010001', 'E9010000'])
+
+        self.model.sort_by('ownername')
+        self.assertFalse(self.model.descending)
+        self.assertEqual(self.codes(), ['E9010000', 'E9010002', 'E9010001'])
+
+    def test_extend_keeps_fetched_order(self):
+        """Pages arrive sorted by the database and are appended as given."""
+        self.model.sort_by('realstatecode', descending=True)
+        self.model.extend([{'realstatecode': 'E9009999'}])
+        self.assertEqual(self.codes(), ['E9010002', 'E9010001', 'E9010000', 'E9009999'])
+
+    def test_set_sort(self):
+        """set_sort toggles the order like sort_by but leaves the rows alone."""
+        self.model.set_sort('Property-area')
+        self.model.set_sort('Property-area')
+        self.assertEqual((self.model.sort_field, self.model.descending), ('Property-area', True))
+        self.assertEqual(self.codes(), ['E9010002', 'E9010000', 'E9010001'])
+
+    def test_view_data(self):
+        """View data carries display strings and the source record."""
+        self.model.sort_by('realstatecode')
+        data = self.model.view_data()
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[0]['code_text'], 'E9010000')
+        self.assertEqual(data[0]['area_text'], '0')
+        self.assertEqual(data[0]['address_text'], 'Not specified')
+        self.assertEqual(data[1]['owner_text'], 'Unknown')
+        self.assertIs(data[2]['property_data'], self.model.rows[2])
+
+        self.model.clear()
+        self.assertEqual(self.model.view_data(), [])
+        self.assertIsNone(self.model.sort_field)
+
+
+if __name__ == '__main__':
+    unittest.main()
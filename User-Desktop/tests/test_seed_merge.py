@@ -0,0 +1,148 @@
+"""
+Test script for the set-based seed merge.
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_utils.seed_data import create_seed_database
+from database_utils.seed_merge import merge_seed
+from src.models.database_api import DatabaseAPI
+
+
+class TestSeedMerge(unittest.TestCase):
+    """Test cases for merge_seed."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.api = self.open_api(":memory:")
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.api.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def open_api(self, path):
+        api = DatabaseAPI()
+        api.db.db_path = path
+        self.assertTrue(api.connect())
+        api.set_company_code('E901')
+        api.insert_initial_data()
+        return api
+
+    def legacy_seed(self):
+        """Write the legacy seed.db layout into the temporary directory."""
+        cwd = os.getcwd()
+        os.chdir(self.tmpdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return os.path.join(self.tmpdir, create_seed_database())
+        finally:
+            os.chdir(cwd)
+
+    def count(self, table):
+        return self.api.db.execute_query(f"SELECT COUNT(*) AS count FROM {table}")[0]['count']
+
+    def test_legacy_seed(self):
+        """The legacy layout is mapped onto the main schema and merges only once."""
+        seed = self.legacy_seed()
+
+        merged = merge_seed(self.api, seed)
+        self.assertEqual((merged['Owners'], merged['Realstatspecification'], merged['realstatephotos']), (5, 5, 8))
+        self.assertEqual(merge_seed(self.api, seed)['Realstatspecification'], 0)
+        self.assertEqual(self.count('Realstatspecification'), 5)
+
+        villa = self.api.db.execute_query(
+            "SELECT * FROM Realstatspecification WHERE Ownercode = 'A001'"
+        )[0]
+        self.assertEqual(villa['Rstatetcode'], '03001')
+        self.assertEqual(villa['Property-address'], 'Al-Karkh, Al-Mansour, Street 14, 25')
+        photos = self.api.get_property_photos(villa['realstatecode'])
+        self.assertEqual({photo['photofilename'] for photo in photos}, {'villa1_main', 'villa1_garden'})
+        self.assertEqual(photos[0]['Storagepath'], 'images/properties')
+
+        # Statistics and search index were updated for the bulk-inserted rows
+        self.assertEqual(self.api.get_dashboard_stats()['total']['count'], 5)
+        self.assertEqual(self.count('search_fts'), 10)
+        # New codes continue after the merged ones
+        self.assertNotIn(self.api.generate_property_code(),
+                         {row['realstatecode'] for row in self.api.get_all_properties()})
+
+    def test_replace(self):
+        """Replace mode updates existing rows in place instead of skipping them."""
+        seed = self.legacy_seed()
+        merge_seed(self.api, seed)
+        self.api.update_owner('A002', 'Renamed Owner', '07900000000')
+
+        merge_seed(self.api, seed)
+        self.assertEqual(self.api.get_owner_by_code('A002')['ownername'], 'Renamed Owner')
+        merge_seed(self.api, seed, replace=True)
+        self.assertEqual(self.api.get_owner_by_code('A002')['ownername'], 'Fatima Ahmed')
+        self.assertEqual(self.count('Realstatspecification'), 5)
+
+    def test_main_schema_seed(self):
+        """A seed in the main schema is merged column for column."""
+        other = self.open_api(os.path.join(self.tmpdir, 'other.db'))
+        try:
+            owner = other.add_owner("Seed Owner", "07901234567")
+            codes = [other.add_property({'Rstatetcode': '03001', 'Ownercode': owner, 'Property-area': 100.0})
+                     for _ in range(3)]
+            self.assertTrue(other.db.snapshot(os.path.join(self.tmpdir, 'seed.db')))
+        finally:
+            other.close()
+
+        merged = merge_seed(self.api, os.path.join(self.tmpdir, 'seed.db'))
+        self.assertEqual(merged['Realstatspecification'], 3)
+        self.assertEqual(self.api.get_property_by_code(codes[0])['Property-area'], 100.0)
+        self.assertEqual(self.api.get_owner_by_code(owner)['ownername'], "Seed Owner")
+
+    def test_failed_merge_changes_nothing(self):
+        """A failing statement rolls the whole merge back and detaches the seed."""
+        seed = self.legacy_seed()
+        with sqlite3.connect(seed) as connection:
+            connection.execute("UPDATE Owners SET ownername = NULL WHERE Ownercode = 'A003'")
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            merge_seed(self.api, seed, replace=True)
+        self.assertEqual(self.count('Owners'), 0)
+        self.assertEqual(self.count('Realstatspecification'), 0)
+        self.assertEqual([row[1] for row in self.api.db.connection.execute("PRAGMA database_list")], ['main', 'temp'])
+
+    def test_failed_merge_reuses_no_codes(self):
+        """Property codes reserved by a merge that rolls back are not handed out twice."""
+        seed = self.legacy_seed()
+        # Start the sequence and use up the reserved block, so the merge reserves codes itself
+        self.api.reserve_property_codes(16)
+        # Fails after the property codes are assigned
+        self.api.db.execute_query(
+            "CREATE TEMP TRIGGER block_photo BEFORE INSERT ON realstatephotos "
+            "BEGIN SELECT RAISE(ABORT, 'blocked'); END"
+        )
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            merge_seed(self.api, seed)
+        self.api.db.execute_query("DROP TRIGGER temp.block_photo")
+        self.assertEqual(self.count('Realstatspecification'), 0)
+
+        codes = [self.api.add_property({'Rstatetcode': '03001'}) for _ in range(20)]
+        self.assertNotIn(None, codes)
+        self.assertEqual(len(set(codes)), 20)
+
+    def test_missing_seed(self):
+        """A missing seed file is reported instead of attached as an empty database."""
+        with self.assertRaises(FileNotFoundError):
+            merge_seed(self.api, os.path.join(self.tmpdir, 'missing.db'))
+
+
+if __name__ == '__main__':
+    unittest.main()
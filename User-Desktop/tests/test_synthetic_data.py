@@ -0,0 +1,82 @@
+"""
+Test script for the synthetic data generator.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_utils.synthetic_data import company_codes, generate_dataset
+from src.models.bulk_import import PHONE_PATTERN
+
+
+class TestSyntheticData(unittest.TestCase):
+    """Test cases for generate_dataset."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Tear down test case."""
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def generate(self, name, **kwargs):
+        path = os.path.join(self.tmpdir, name)
+        counts = generate_dataset(path, 2500, owners=50, seed=11, block_size=400, **kwargs)
+        return path, counts
+
+    def dump(self, path):
+        with sqlite3.connect(path) as connection:
+            return [connection.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3").fetchall()
+                    for table in ('Maincode', 'Owners', 'Realstatspecification', 'realstatephotos')]
+
+    def test_reproducible(self):
+        """The same seed gives the same rows whatever the shard and worker counts."""
+        first, counts = self.generate('first.db', workers=1, shards=1)
+        second, _ = self.generate('second.db', workers=2, shards=5)
+
+        self.assertEqual(counts['Realstatspecification'], 2500)
+        self.assertEqual(counts['Owners'], 50)
+        self.assertEqual(self.dump(first), self.dump(second))
+        # Shard databases are removed once merged
+        self.assertFalse([name for name in os.listdir(self.tmpdir) if name.startswith('synthetic_')])
+
+    def test_rows_follow_the_schema(self):
+        """Generated rows reference existing codes and follow the code formats."""
+        path, counts = self.generate('data.db', workers=2)
+        with sqlite3.connect(path) as connection:
+            def scalar(query):
+                return connection.execute(query).fetchone()[0]
+
+            self.assertEqual(scalar("SELECT COUNT(*) FROM Realstatspecification "
+                                    "WHERE realstatecode NOT GLOB 'E901[0-9A-Z][0-9A-Z][0-9A-Z][0-9A-Z]'"), 0)
+            for column, recty in (('Rstatetcode', '03'), ('Buildtcode', '04'), ('"Offer-Type-Code"', '06'),
+                                  ('"Province-code"', '01'), ('"Region-code"', '02')):
+                self.assertEqual(scalar(f"SELECT COUNT(*) FROM Realstatspecification r WHERE NOT EXISTS "
+                                        f"(SELECT 1 FROM Maincode m WHERE m.Recty = '{recty}' AND m.Code = r.{column})"), 0)
+            # Regions belong to the property's province
+            self.assertEqual(scalar('SELECT COUNT(*) FROM Realstatspecification '
+                                    'WHERE substr("Region-code", 3, 3) != substr("Province-code", 3, 3)'), 0)
+            self.assertEqual(scalar("SELECT COUNT(*) FROM Realstatspecification r "
+                                    "WHERE NOT EXISTS (SELECT 1 FROM Owners o WHERE o.Ownercode = r.Ownercode)"), 0)
+            self.assertEqual(scalar("SELECT COUNT(*) FROM Realstatspecification r WHERE Photosituation != "
+                                    "EXISTS (SELECT 1 FROM realstatephotos p WHERE p.realstatecode = r.realstatecode)"), 0)
+            self.assertEqual(scalar("SELECT COUNT(*) FROM realstatephotos"), counts['realstatephotos'])
+            phones = [row[0] for row in connection.execute("SELECT ownerphone FROM Owners")]
+            self.assertTrue(all(PHONE_PATTERN.match(phone) for phone in phones))
+
+    def test_company_codes(self):
+        """Listings beyond one company's code space go to further companies."""
+        self.assertEqual(company_codes('E901', 1000), ['E901'])
+        self.assertEqual(company_codes('E901', 36 ** 4 + 1), ['E901', 'S001'])
+
+
+if __name__ == '__main__':
+    unittest.main()
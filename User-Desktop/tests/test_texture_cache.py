@@ -0,0 +1,46 @@
+"""
+Test script for the texture cache.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.texture_cache import TextureCache
+
+
+class TestTextureCache(unittest.TestCase):
+    """Test cases for TextureCache."""
+
+    def test_evicts_least_recently_used(self):
+        """Entries are evicted oldest-use first to stay within the byte budget."""
+        cache = TextureCache(budget=100)
+        cache.put('a', 'texture a', 40)
+        cache.put('b', 'texture b', 40)
+        self.assertEqual(cache.get('a'), 'texture a')  # 'b' is now least recently used
+
+        self.assertTrue(cache.put('c', 'texture c', 40))
+        self.assertNotIn('b', cache)
+        self.assertEqual((len(cache), cache.size, cache.evictions), (2, 80, 1))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_replace_and_oversized(self):
+        """Replacing an entry updates the size; entries over budget are not kept."""
+        cache = TextureCache(budget=100)
+        cache.put('a', 'small', 10)
+        cache.put('a', 'large', 60)
+        self.assertEqual((cache.get('a'), cache.size), ('large', 60))
+
+        self.assertFalse(cache.put('huge', 'too large', 101))
+        self.assertEqual((len(cache), cache.size), (1, 60))
+
+        cache.discard('a')
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
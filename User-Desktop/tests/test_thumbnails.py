@@ -0,0 +1,97 @@
+"""
+Test script for the photo thumbnail service.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from concurrent.futures import Future
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.thumbnails import ThumbnailService, _chain, photo_key
+
+try:
+    import PIL  # noqa: F401
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+
+class TestThumbnailService(unittest.TestCase):
+    """Test cases for ThumbnailService."""
+
+    def setUp(self):
+        """Set up test case."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.service = ThumbnailService(os.path.join(self.tmpdir, 'cache'), workers=2)
+
+    def tearDown(self):
+        """Tear down test case."""
+        self.service.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_photo_key(self):
+        """Stored photos use their hash; others are keyed by path, size and mtime."""
+        path = os.path.join(self.tmpdir, 'front.jpg')
+        with open(path, 'wb') as photo_file:
+            photo_file.write(b'front')
+
+        self.assertEqual(photo_key(path, 'ab' * 32), 'ab' * 32)
+        key = photo_key(path)
+        self.assertEqual(len(key), 64)
+        self.assertEqual(photo_key(path), key)
+        os.utime(path, ns=(0, 0))
+        self.assertNotEqual(photo_key(path), key)
+
+    def test_pick_size_and_cache_path(self):
+        """The smallest covering size is picked and files are sharded by key."""
+        self.assertEqual(self.service.pick_size(100), 160)
+        self.assertEqual(self.service.pick_size(161), 320)
+        self.assertEqual(self.service.pick_size(5000), 640)
+        self.assertEqual(self.service.cache_path('abcdef', 320),
+                         os.path.join(self.service.cache_dir, '320', 'ab', 'abcdef.jpg'))
+        self.assertIsNone(self.service.cached('abcdef', 320))
+
+    def test_chain(self):
+        """Chained futures follow results, nested futures and errors."""
+        source = Future()
+        inner = Future()
+        chained = _chain(source, lambda value: inner)
+        source.set_result(1)
+        self.assertFalse(chained.done())
+        inner.set_result(2)
+        self.assertEqual(chained.result(timeout=1), 2)
+
+        failing = Future()
+        chained = _chain(failing, lambda value: value)
+        failing.set_exception(OSError('unreadable'))
+        self.assertIsInstance(chained.exception(timeout=1), OSError)
+
+    @unittest.skipUnless(HAS_PIL, "Pillow is not installed")
+    def test_generate_and_load(self):
+        """A missing pyramid is generated once and served from the cache after."""
+        from PIL import Image
+
+        source = os.path.join(self.tmpdir, 'wide.jpg')
+        Image.new('RGB', (1200, 600), (200, 50, 50)).save(source)
+        key = photo_key(source)
+
+        thumbnail = self.service.load(source, key, 300).result(timeout=30)
+        self.assertEqual((thumbnail.size, thumbnail.width, thumbnail.height), (320, 320, 160))
+        self.assertEqual(len(thumbnail.pixels), 320 * 160 * 4)
+        for size in self.service.sizes:
+            self.assertIsNotNone(self.service.cached(key, size))
+
+        cached = self.service.request(source, key, 160)
+        self.assertTrue(cached.done())
+        self.service.clear()
+        self.assertIsNone(self.service.cached(key, 160))
+        self.assertEqual(self.service.load(source, key, 100).result(timeout=30).width, 160)
+
+
+if __name__ == '__main__':
+    unittest.main()
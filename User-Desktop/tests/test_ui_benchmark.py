@@ -0,0 +1,93 @@
+"""
+Test script for the UI performance harness (without Kivy).
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_utils.ui_benchmark import FramePump, Scenario, measure_scenario, percentile
+
+
+class FakeScreen:
+    """Finishes a load a few frames after it was started, like a query worker would."""
+
+    def __init__(self, frames_to_load):
+        self.frames_to_load = frames_to_load
+        self.remaining = 0
+        self.rows = []
+
+    def start(self):
+        self.remaining = self.frames_to_load
+
+    def tick(self):
+        if self.remaining:
+            self.remaining -= 1
+            if not self.remaining:
+                self.show_rows(list(range(50)))
+
+    def show_rows(self, rows):
+        self.rows = rows
+
+    def walk(self, restrict=False):
+        yield self
+        yield from self.rows
+
+
+class FakeApp:
+    def __init__(self, screen):
+        self.screen = screen
+        self.sm = self
+
+    def get_screen(self, name):
+        return self.screen
+
+
+class TestUiBenchmark(unittest.TestCase):
+    """Test cases for the frame pump and scenario measurement."""
+
+    def test_percentile(self):
+        """Nearest-rank percentiles of frame times."""
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 0.5), 3)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 0.95), 5)
+        self.assertIsNone(percentile([], 0.95))
+
+    def test_pump_timeout(self):
+        """A screen that never finishes fails the run instead of hanging it."""
+        pump = FramePump(lambda: None)
+        with self.assertRaises(RuntimeError):
+            pump.until(lambda: False, timeout=0.01)
+
+    def test_measure_scenario(self):
+        """A scenario reports settle time, screen method time, frames and widgets."""
+        screen = FakeScreen(frames_to_load=3)
+        app = FakeApp(screen)
+        pump = FramePump(screen.tick)
+        scenario = Scenario('ui.fake.load', 'fake', lambda app, screen: screen.show_rows([]),
+                            lambda app, screen: screen.start(), lambda screen: not screen.remaining,
+                            'show_rows')
+
+        results = measure_scenario(app, pump, scenario, scale=1000, repeats=2)
+        self.assertEqual([result['name'] for result in results],
+                         ['ui.fake.load', 'ui.fake.load.show_rows', 'ui.fake.load.max_frame'])
+        self.assertTrue(all(result['repeats'] == 2 and result['scale'] == 1000 for result in results))
+        self.assertEqual(results[0]['widgets'], 51)
+        # Three frames until loaded, then the settling frames
+        self.assertEqual(results[0]['frames'], 3 + 5)
+        # The timing wrapper is removed afterwards
+        self.assertNotIn('show_rows', vars(screen))
+
+    def test_callback_not_called(self):
+        """A scenario whose screen method never runs is reported, not timed as zero."""
+        screen = FakeScreen(frames_to_load=1)
+        scenario = Scenario('ui.fake.noop', 'fake', None, lambda app, screen: None,
+                            lambda screen: True, 'show_rows')
+        with self.assertRaises(RuntimeError):
+            measure_scenario(FakeApp(screen), FramePump(screen.tick), scenario, scale=1000, repeats=1)
+
+
+if __name__ == '__main__':
+    unittest.main()